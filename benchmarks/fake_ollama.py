@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+부하 테스트용 Ollama 대체 서버
+
+실제 모델 대신 지정한 지연 시간 후 고정된 답변 / 결정적인 임베딩을 반환합니다.
+    POST /api/generate    (stream true/false)
+    POST /api/chat        (stream true/false)
+    POST /api/embeddings  {"prompt": ...} → {"embedding": [...]}
+    POST /api/embed       {"input": str | [str]} → {"embeddings": [[...]]}
+    GET  /api/tags
+
+사용법:
+    python benchmarks/fake_ollama.py --port 11435 --generate-latency 0.8 --embed-latency 0.02
+    OLLAMA_BASE_URL=http://localhost:11435 python main.py
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+ANSWER = {
+    "answer": "평가 계획에 따르면 지필평가 60%, 수행평가 40%로 반영됩니다.",
+    "key_facts": ["지필평가 60%", "수행평가 40%"],
+    "confidence": 0.9
+}
+
+
+class FakeOllamaConfig:
+    def __init__(
+        self,
+        generate_latency: float = 0.5,
+        embed_latency: float = 0.01,
+        token_delay: float = 0.01,
+        jitter: float = 0.1,
+        dimension: int = 768,
+        error_rate: float = 0.0
+    ):
+        """
+        Args:
+            generate_latency: 답변 생성 지연 (stream이면 첫 토큰까지)
+            embed_latency: 임베딩 요청당 지연
+            token_delay: stream 토큰 사이 지연
+            jitter: 지연 시간 무작위 변동 비율 (0.1 = ±10%)
+            dimension: 임베딩 차원
+            error_rate: 500 응답 비율
+        """
+        self.generate_latency = generate_latency
+        self.embed_latency = embed_latency
+        self.token_delay = token_delay
+        self.jitter = jitter
+        self.dimension = dimension
+        self.error_rate = error_rate
+
+    def sleep(self, seconds: float):
+        if seconds > 0:
+            time.sleep(seconds * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+
+def fake_embedding(text: str, dimension: int) -> List[float]:
+    """텍스트 해시로 만든 결정적인 단위 벡터 (같은 질문 → 같은 벡터)"""
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    vector = [(digest[i % len(digest)] - 127.5) / 127.5 for i in range(dimension)]
+    norm = sum(x * x for x in vector) ** 0.5
+    return [x / norm for x in vector]
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    config = FakeOllamaConfig()
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload: dict, status: int = 200):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, chunks: List[dict]):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i, chunk in enumerate(chunks):
+            if i:
+                self.config.sleep(self.config.token_delay)
+            line = (json.dumps(chunk, ensure_ascii=False) + "\n").encode("utf-8")
+            self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json({"models": [{"name": "llama3:latest"}, {"name": "nomic-embed-text:latest"}]})
+        else:
+            self._send_json({"error": "not found"}, 404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_json({"error": "invalid json"}, 400)
+            return
+
+        if random.random() < self.config.error_rate:
+            self._send_json({"error": "injected failure"}, 500)
+            return
+
+        if self.path == "/api/embeddings":
+            self.config.sleep(self.config.embed_latency)
+            self._send_json({"embedding": fake_embedding(request.get("prompt", ""), self.config.dimension)})
+        elif self.path == "/api/embed":
+            inputs = request.get("input", "")
+            inputs = [inputs] if isinstance(inputs, str) else inputs
+            self.config.sleep(self.config.embed_latency)
+            self._send_json({
+                "model": request.get("model"),
+                "embeddings": [fake_embedding(text, self.config.dimension) for text in inputs]
+            })
+        elif self.path in ("/api/generate", "/api/chat"):
+            self.config.sleep(self.config.generate_latency)
+            answer = json.dumps(ANSWER, ensure_ascii=False)
+            key = "response" if self.path == "/api/generate" else "message"
+
+            def piece(text: str, done: bool) -> dict:
+                content = text if key == "response" else {"role": "assistant", "content": text}
+                return {"model": request.get("model"), key: content, "done": done}
+
+            if request.get("stream", self.path == "/api/chat"):
+                tokens = [answer[i:i + 8] for i in range(0, len(answer), 8)]
+                self._stream([piece(t, False) for t in tokens] + [piece("", True)])
+            else:
+                self._send_json(piece(answer, True))
+        else:
+            self._send_json({"error": "not found"}, 404)
+
+
+def start_fake_ollama(host: str = "127.0.0.1", port: int = 0, config: FakeOllamaConfig = None) -> ThreadingHTTPServer:
+    """백그라운드 스레드에서 서버 시작 (port=0이면 빈 포트), server.server_address로 주소 확인"""
+    handler = type("ConfiguredFakeOllamaHandler", (FakeOllamaHandler,), {"config": config or FakeOllamaConfig()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=11435)
+    arg_parser.add_argument("--generate-latency", type=float, default=0.5)
+    arg_parser.add_argument("--embed-latency", type=float, default=0.01)
+    arg_parser.add_argument("--token-delay", type=float, default=0.01)
+    arg_parser.add_argument("--jitter", type=float, default=0.1)
+    arg_parser.add_argument("--error-rate", type=float, default=0.0)
+    arg_parser.add_argument("--dimension", type=int, default=768)
+    args = arg_parser.parse_args()
+
+    server = start_fake_ollama(args.host, args.port, FakeOllamaConfig(
+        generate_latency=args.generate_latency,
+        embed_latency=args.embed_latency,
+        token_delay=args.token_delay,
+        jitter=args.jitter,
+        dimension=args.dimension,
+        error_rate=args.error_rate
+    ))
+    print(f"Fake Ollama listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Ingest 파이프라인 단계별 벤치마크 (오프라인)
+
+templates/teaching_plan.typ로 페이지 수가 다른 합성 교수학습 계획 PDF를 만들고
+각 PDF에 대해 아래 단계를 따로 측정합니다.
+
+    parse     PDFTableParser.parse                       (PDF → Markdown)
+    generate  EnhancedJSONGenerator.generate_from_markdown (Markdown → Enhanced JSON)
+    write     EnhancedJSONStore.put                       (JSON 파일 + 인덱스 쓰기)
+    index     HierarchicalChromaStore.add_hierarchical_document
+
+임베딩/LLM은 결정적인 가짜 벡터를 돌려주는 StubOllamaClient로 대체하므로
+Ollama 없이 실행되며, 결과는 임베딩 모델이 아닌 파이프라인 자체의 비용입니다.
+
+사용법:
+    python benchmarks/ingest_stages.py
+    python benchmarks/ingest_stages.py --pages 1 10 50 --repeat 3 --json bench_ingest.json
+    python benchmarks/ingest_stages.py --json new.json --compare bench_ingest.json --max-regression 0.2
+    python benchmarks/ingest_stages.py --pdf downloads/B100000662/2025/teaching_plans/*.pdf
+
+단계별 평균/최소 소요 시간, 단계 중 최대 RSS, 처리량(pages/sec, chunks/sec)을 출력합니다.
+--compare를 지정하면 기준 결과 대비 단계별 변화율을 출력하고,
+--max-regression보다 느려진 단계가 있으면 종료 코드 1을 반환합니다.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pdfplumber
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT.parent / "mathesis-common"))
+
+from src.pdf_gen import TypstGenerator
+from src.rag.parser import PDFTableParser
+from src.rag.enhanced_json_generator import EnhancedJSONGenerator
+from src.rag.document_store import EnhancedJSONStore
+
+STAGES = ("parse", "generate", "write", "index")
+
+# teaching_plan.typ 교과 운영 표에서 한 페이지에 들어가는 대략의 행 수
+ROWS_PER_PAGE = 14
+
+AREAS = ["수와 연산", "문자와 식", "함수", "기하", "확률과 통계"]
+
+METADATA = {
+    "school_code": "BENCH000001",
+    "school_name": "벤치중학교",
+    "year": "2025",
+    "grade": "1",
+    "subject": "teaching_plan",
+    "semester": "1"
+}
+
+
+# ============= Stub LLM / Embedder =============
+
+class StubOllamaClient:
+    """
+    OllamaClient 대체 (네트워크 없음)
+    텍스트 해시로 만든 결정적인 단위 벡터를 반환
+    """
+
+    def __init__(self, dimension: int = 768):
+        self.dimension = dimension
+        self.embed_calls = 0
+
+    def embed(self, text: str, model: Optional[str] = None) -> List[float]:
+        self.embed_calls += 1
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        vector = [(digest[i % len(digest)] - 127.5) / 127.5 for i in range(self.dimension)]
+        norm = sum(x * x for x in vector) ** 0.5
+        return [x / norm for x in vector]
+
+    def embed_batch(self, texts: List[str], model: Optional[str] = None) -> List[List[float]]:
+        return [self.embed(text, model) for text in texts]
+
+    def generate(self, prompt: str, system: Optional[str] = None, **kwargs) -> str:
+        return json.dumps({"answer": "benchmark", "key_facts": [], "confidence": 1.0})
+
+
+# ============= Measurement =============
+
+class RSSSampler:
+    """측정 구간 동안 RSS를 주기적으로 읽어 최대값 기록 (/proc 없으면 ru_maxrss)"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+    def _current(self) -> int:
+        try:
+            with open("/proc/self/statm", "r") as f:
+                return int(f.read().split()[1]) * self._page_size
+        except (OSError, ValueError, IndexError):
+            # Linux는 KB, macOS는 bytes 단위 (프로세스 전체 최대값)
+            maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self._current())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak = self._current()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self._current())
+
+
+@contextmanager
+def measure(samples: Dict[str, List[dict]], stage: str):
+    with RSSSampler() as rss:
+        start = time.perf_counter()
+        yield
+        seconds = time.perf_counter() - start
+    samples.setdefault(stage, []).append({"seconds": seconds, "peak_rss": rss.peak})
+
+
+# ============= Synthetic PDFs =============
+
+def synthetic_data(pages: int) -> dict:
+    rows = []
+    for i in range(pages * ROWS_PER_PAGE):
+        area = AREAS[i % len(AREAS)]
+        rows.append({
+            "area": f"{area} {i + 1}",
+            "detail": f"{area} 단원의 핵심 개념을 이해하고 실생활 문제에 적용한다. "
+                      f"수행평가 {i % 4 + 1}회차와 연계하여 탐구 보고서를 작성한다."
+        })
+    return {
+        "filename": f"synthetic_{pages}p",
+        "school_name": METADATA["school_name"],
+        "year": METADATA["year"],
+        "curriculum_content": rows,
+        "rag_analysis": "벤치마크용 합성 문서입니다."
+    }
+
+
+def build_pdfs(page_counts: List[int], out_dir: Path) -> List[Path]:
+    """페이지 수별 합성 PDF 생성 (같은 설정으로 이미 만든 파일은 재사용)"""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    generator = TypstGenerator()
+    template = str(ROOT / "templates" / "teaching_plan.typ")
+
+    pdfs = []
+    for pages in page_counts:
+        pdf_path = out_dir / f"teaching_plan_{pages}p_r{ROWS_PER_PAGE}.pdf"
+        if not pdf_path.exists():
+            print(f"Generating {pdf_path.name} ...")
+            generator.compile(template, synthetic_data(pages), str(pdf_path))
+        pdfs.append(pdf_path)
+    return pdfs
+
+
+# ============= Benchmark =============
+
+def make_store(persist_dir: str, collection_prefix: str, dimension: int):
+    from mathesis_core.db.hierarchical_chroma import HierarchicalChromaStore
+
+    return HierarchicalChromaStore(
+        collection_prefix=collection_prefix,
+        ollama_client=StubOllamaClient(dimension),
+        persist_dir=persist_dir
+    )
+
+
+def bench_pdf(pdf_path: Path, args, work_dir: Path) -> dict:
+    with pdfplumber.open(str(pdf_path)) as pdf:
+        page_count = len(pdf.pages)
+
+    parser = PDFTableParser(extraction_mode=args.mode, workers=args.workers)
+    samples: Dict[str, List[dict]] = {}
+    chunks = sections = json_bytes = 0
+
+    for run in range(args.repeat):
+        # 매 반복마다 새 저장소 / 컬렉션 (이전 반복의 색인 결과가 영향을 주지 않도록)
+        run_dir = work_dir / f"{pdf_path.stem}_{run}"
+
+        with measure(samples, "parse"):
+            markdown = parser.parse(str(pdf_path))
+
+        with measure(samples, "generate"):
+            enhanced_json = EnhancedJSONGenerator().generate_from_markdown(markdown, dict(METADATA))
+        sections = len(enhanced_json["sections"])
+
+        store = EnhancedJSONStore(str(run_dir / "json"))
+        doc_id = enhanced_json["document_metadata"]["document_id"]
+        with measure(samples, "write"):
+            json_path = store.put(doc_id, enhanced_json)
+        json_bytes = json_path.stat().st_size
+
+        if not args.skip_index:
+            vector_store = make_store(str(run_dir / "chroma"), f"bench_{run}", args.dimension)
+            with measure(samples, "index"):
+                chunks = vector_store.add_hierarchical_document(enhanced_json) or 0
+
+    stages = {}
+    for stage, runs in samples.items():
+        seconds = [r["seconds"] for r in runs]
+        mean = sum(seconds) / len(seconds)
+        stages[stage] = {
+            "mean_sec": mean,
+            "min_sec": min(seconds),
+            "peak_rss_mb": max(r["peak_rss"] for r in runs) / (1024 * 1024),
+            "pages_per_sec": page_count / mean if mean > 0 else None
+        }
+    if "index" in stages and stages["index"]["mean_sec"] > 0:
+        stages["index"]["chunks_per_sec"] = chunks / stages["index"]["mean_sec"]
+    if "write" in stages and stages["write"]["mean_sec"] > 0:
+        stages["write"]["mb_per_sec"] = json_bytes / (1024 * 1024) / stages["write"]["mean_sec"]
+
+    total = sum(s["mean_sec"] for s in stages.values())
+    return {
+        "pdf": str(pdf_path),
+        "pages": page_count,
+        "sections": sections,
+        "chunks": chunks,
+        "json_bytes": json_bytes,
+        "stages": stages,
+        "total_sec": total,
+        "pages_per_sec": page_count / total if total > 0 else None
+    }
+
+
+def compare(results: List[dict], baseline_path: str, max_regression: float) -> List[str]:
+    """기준 결과와 단계별 평균 시간 비교, 허용치보다 느려진 항목 목록 반환"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {Path(r["pdf"]).name: r for r in json.load(f)["results"]}
+
+    regressions = []
+    print(f"\nvs {baseline_path}")
+    print(f"{'pages':>6} {'stage':>9} {'base(s)':>10} {'now(s)':>10} {'change':>8}")
+    for result in results:
+        base = baseline.get(Path(result["pdf"]).name)
+        if base is None:
+            continue
+        for stage in STAGES:
+            if stage not in result["stages"] or stage not in base["stages"]:
+                continue
+            before = base["stages"][stage]["mean_sec"]
+            after = result["stages"][stage]["mean_sec"]
+            change = (after - before) / before if before > 0 else 0.0
+            flag = " !" if change > max_regression else ""
+            print(f"{result['pages']:>6} {stage:>9} {before:>10.4f} {after:>10.4f} {change:>+7.1%}{flag}")
+            if change > max_regression:
+                regressions.append(f"{result['pages']}p {stage}: {change:+.1%}")
+    return regressions
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--pages", type=int, nargs="+", default=[1, 5, 20], help="합성 PDF 페이지 수")
+    arg_parser.add_argument("--pdf", nargs="+", help="합성 PDF 대신 사용할 PDF 경로")
+    arg_parser.add_argument("--pdf-dir", default=str(ROOT / "benchmarks" / "fixtures"), help="합성 PDF 저장 위치")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument(
+        "--mode",
+        choices=[PDFTableParser.MODE_LEGACY, PDFTableParser.MODE_SINGLE_PASS],
+        default=PDFTableParser.MODE_LEGACY,
+        help="PDFTableParser extraction mode"
+    )
+    arg_parser.add_argument("--workers", type=int, default=1, help="PDFTableParser workers")
+    arg_parser.add_argument("--dimension", type=int, default=768, help="가짜 임베딩 차원")
+    arg_parser.add_argument("--skip-index", action="store_true", help="index 단계 생략 (mathesis_core 없이 실행)")
+    arg_parser.add_argument("--json", dest="json_path", help="결과를 JSON 파일로 저장")
+    arg_parser.add_argument("--compare", help="비교할 기준 결과 JSON")
+    arg_parser.add_argument("--max-regression", type=float, default=0.2, help="허용 slowdown 비율 (0.2 = 20%%)")
+    args = arg_parser.parse_args()
+
+    pdfs = [Path(p) for p in args.pdf] if args.pdf else build_pdfs(args.pages, Path(args.pdf_dir))
+
+    work_dir = Path(tempfile.mkdtemp(prefix="bench_ingest_"))
+    try:
+        results = [bench_pdf(pdf_path, args, work_dir) for pdf_path in pdfs]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"{os.cpu_count()} CPUs, mode={args.mode}, workers={args.workers}, repeat={args.repeat}")
+    print(f"{'pages':>6} {'stage':>9} {'mean(s)':>10} {'min(s)':>10} {'rss(MB)':>9} {'pages/s':>9}")
+    for result in results:
+        for stage in STAGES:
+            s = result["stages"].get(stage)
+            if s is None:
+                continue
+            print(f"{result['pages']:>6} {stage:>9} {s['mean_sec']:>10.4f} {s['min_sec']:>10.4f} "
+                  f"{s['peak_rss_mb']:>9.1f} {s['pages_per_sec']:>9.1f}")
+        print(f"{result['pages']:>6} {'total':>9} {result['total_sec']:>10.4f} "
+              f"({result['sections']} sections, {result['chunks']} chunks)")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "cpu_count": os.cpu_count(),
+                "mode": args.mode,
+                "workers": args.workers,
+                "repeat": args.repeat,
+                "skip_index": args.skip_index,
+                "results": results
+            }, f, ensure_ascii=False, indent=2)
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.max_regression)
+        if regressions:
+            sys.exit("Regressions: " + ", ".join(regressions))
+
+
+if __name__ == "__main__":
+    main()
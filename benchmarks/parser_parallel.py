@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+PDFTableParser 직렬 vs 병렬 파싱 벤치마크
+
+사용법:
+    python benchmarks/parser_parallel.py path/to/학업성적관리규정.pdf
+    python benchmarks/parser_parallel.py big.pdf --workers 2 4 8 --pages-per-shard 16 --repeat 3
+    python benchmarks/parser_parallel.py big.pdf --mode single_pass
+
+각 설정의 평균 소요 시간, pages/sec, 직렬 대비 속도 향상을 출력하고
+병렬 결과가 직렬 결과와 동일한지 확인합니다.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import pdfplumber
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.rag.parser import PDFTableParser
+
+
+def time_parse(parser: PDFTableParser, pdf_path: str, repeat: int):
+    durations = []
+    output = ""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = parser.parse(pdf_path)
+        durations.append(time.perf_counter() - start)
+    return sum(durations) / len(durations), output
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("pdf", help="벤치마크할 PDF 경로 (수백 페이지 문서 권장)")
+    arg_parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, os.cpu_count() or 1])
+    arg_parser.add_argument("--pages-per-shard", type=int, default=16)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument(
+        "--mode",
+        choices=[PDFTableParser.MODE_LEGACY, PDFTableParser.MODE_SINGLE_PASS],
+        default=PDFTableParser.MODE_LEGACY,
+        help="PDFTableParser extraction mode"
+    )
+    arg_parser.add_argument("--json", dest="json_path", help="결과를 JSON 파일로 저장")
+    args = arg_parser.parse_args()
+
+    with pdfplumber.open(args.pdf) as pdf:
+        page_count = len(pdf.pages)
+
+    print(f"PDF: {args.pdf} ({page_count} pages, {os.cpu_count()} CPUs, mode={args.mode})")
+
+    serial_time, serial_output = time_parse(
+        PDFTableParser(extraction_mode=args.mode), args.pdf, args.repeat
+    )
+    results = [{
+        "workers": 1,
+        "seconds": serial_time,
+        "pages_per_sec": page_count / serial_time,
+        "speedup": 1.0,
+        "identical": True
+    }]
+
+    for workers in sorted(set(w for w in args.workers if w > 1)):
+        parser = PDFTableParser(
+            workers=workers,
+            pages_per_shard=args.pages_per_shard,
+            extraction_mode=args.mode
+        )
+        seconds, output = time_parse(parser, args.pdf, args.repeat)
+        results.append({
+            "workers": workers,
+            "seconds": seconds,
+            "pages_per_sec": page_count / seconds,
+            "speedup": serial_time / seconds,
+            "identical": output == serial_output
+        })
+
+    print(f"{'workers':>8} {'seconds':>10} {'pages/s':>10} {'speedup':>8} {'same':>6}")
+    for r in results:
+        print(f"{r['workers']:>8} {r['seconds']:>10.3f} {r['pages_per_sec']:>10.1f} "
+              f"{r['speedup']:>7.2f}x {str(r['identical']):>6}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "pdf": args.pdf,
+                "page_count": page_count,
+                "mode": args.mode,
+                "pages_per_shard": args.pages_per_shard,
+                "results": results
+            }, f, ensure_ascii=False, indent=2)
+
+    if not all(r["identical"] for r in results):
+        sys.exit("Parallel output differs from serial output")
+
+
+if __name__ == "__main__":
+    main()
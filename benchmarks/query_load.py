@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+FastAPI 앱(main.py) 조회 API 부하 테스트
+
+/rag/query, /rag/documents, /rag/export/{id}를 지정한 비율과 동시성으로 호출하고
+엔드포인트별 p50/p95/p99 지연, 처리량(req/sec), 오류율을 출력합니다.
+
+- 동시에 /health를 주기적으로 호출하여 그 지연(probe)을 따로 기록합니다.
+  /health는 아무 일도 하지 않으므로 probe 지연이 커지면 이벤트 루프가 막히고 있다는 뜻입니다.
+- 시작/종료 시 /rag/cache를 조회하여 답변/임베딩 캐시 적중 수 변화를 출력합니다.
+  (--distinct-questions로 질문 종류 수를 조절하면 캐시 효과를 비교할 수 있음)
+
+사용법:
+    # 이미 실행 중인 서버 (Ollama는 benchmarks/fake_ollama.py 권장)
+    python benchmarks/query_load.py --url http://localhost:8005 --concurrency 32 --duration 30
+
+    # Ollama 대체 서버 + uvicorn을 직접 띄워서 실행 (worker 수 비교)
+    python benchmarks/query_load.py --serve --uvicorn-workers 1 --generate-latency 0.8
+    python benchmarks/query_load.py --serve --uvicorn-workers 4 --generate-latency 0.8 --json w4.json
+
+--serve는 현재 디렉토리의 chroma_hierarchical / enhanced_jsons 데이터를 그대로 사용하므로
+미리 문서를 색인해 두어야 /rag/query와 /rag/export가 의미 있는 결과를 냅니다.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_ollama import FakeOllamaConfig, start_fake_ollama
+
+ROOT = Path(__file__).resolve().parent.parent
+
+QUESTIONS = [
+    "1학년 수학 평가 비율은?",
+    "수행평가는 몇 퍼센트인가요?",
+    "지필평가 시기는 언제인가요?",
+    "2학기 과학 교육목표는?",
+    "결시생 처리 기준은?",
+    "동점자 처리 방법은?",
+    "국어 수행평가 항목은?",
+    "성적 이의 신청 절차는?"
+]
+
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    """nearest-rank 백분위수"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = math.ceil(p / 100 * len(ordered))
+    return ordered[max(0, min(len(ordered), rank) - 1)]
+
+
+def summarize(samples: List[dict], elapsed: float) -> dict:
+    latencies = [s["latency"] for s in samples]
+    errors = [s for s in samples if not s["ok"]]
+    return {
+        "requests": len(samples),
+        "errors": len(errors),
+        "error_rate": len(errors) / len(samples) if samples else 0.0,
+        "throughput_rps": len(samples) / elapsed if elapsed > 0 else 0.0,
+        "p50_ms": _ms(percentile(latencies, 50)),
+        "p95_ms": _ms(percentile(latencies, 95)),
+        "p99_ms": _ms(percentile(latencies, 99)),
+        "max_ms": _ms(max(latencies) if latencies else None),
+        "status_codes": _count(s["status"] for s in samples)
+    }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 2) if seconds is not None else None
+
+
+def _count(values) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for v in values:
+        counts[str(v)] = counts.get(str(v), 0) + 1
+    return counts
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """"query=6,documents=2,export=2" → 정규화된 비율"""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ("query", "documents", "export"):
+            raise ValueError(f"Unknown endpoint in mix: {name}")
+        weights[name] = float(weight or 1)
+    total = sum(weights.values())
+    return {name: w / total for name, w in weights.items() if w > 0}
+
+
+# ============= Load generation =============
+
+class LoadGenerator:
+    def __init__(self, client: httpx.AsyncClient, args, document_ids: List[str]):
+        self.client = client
+        self.args = args
+        self.document_ids = document_ids
+        self.mix = parse_mix(args.mix)
+        if not document_ids:
+            # 내보낼 문서가 없으면 export는 모두 404이므로 제외
+            self.mix.pop("export", None)
+        self.questions = [
+            QUESTIONS[i % len(QUESTIONS)] + ("" if i < len(QUESTIONS) else f" ({i})")
+            for i in range(args.distinct_questions)
+        ]
+        self.samples: Dict[str, List[dict]] = {name: [] for name in self.mix}
+        self.probes: List[dict] = []
+        self._deadline = 0.0
+        self._remaining = 0
+
+    def _pick(self) -> str:
+        r, acc = random.random(), 0.0
+        for name, weight in self.mix.items():
+            acc += weight
+            if r < acc:
+                return name
+        return next(reversed(self.mix))
+
+    async def _call(self, endpoint: str) -> dict:
+        start = time.perf_counter()
+        try:
+            if endpoint == "query":
+                response = await self.client.post("/rag/query", json={
+                    "question": random.choice(self.questions),
+                    "k": self.args.k
+                })
+            elif endpoint == "documents":
+                response = await self.client.get("/rag/documents")
+            else:
+                response = await self.client.get(f"/rag/export/{random.choice(self.document_ids)}")
+            await response.aread()
+            status = response.status_code
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        return {"latency": time.perf_counter() - start, "status": status, "ok": status == 200}
+
+    def _has_budget(self) -> bool:
+        if self.args.requests:
+            if self._remaining <= 0:
+                return False
+            self._remaining -= 1
+            return True
+        return time.perf_counter() < self._deadline
+
+    async def _worker(self):
+        while self._has_budget():
+            endpoint = self._pick()
+            self.samples[endpoint].append(await self._call(endpoint))
+
+    async def _probe(self, stop: asyncio.Event):
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                response = await self.client.get("/health")
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            self.probes.append({"latency": time.perf_counter() - start, "ok": ok, "status": 200 if ok else "error"})
+            try:
+                await asyncio.wait_for(stop.wait(), self.args.probe_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self) -> float:
+        self._deadline = time.perf_counter() + self.args.duration
+        self._remaining = self.args.requests
+        stop = asyncio.Event()
+        probe = asyncio.create_task(self._probe(stop))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(self._worker() for _ in range(self.args.concurrency)))
+        elapsed = time.perf_counter() - start
+
+        stop.set()
+        await probe
+        return elapsed
+
+
+async def fetch_json(client: httpx.AsyncClient, path: str) -> Optional[dict]:
+    try:
+        response = await client.get(path)
+        return response.json() if response.status_code == 200 else None
+    except (httpx.HTTPError, ValueError):
+        return None
+
+
+def cache_delta(before: Optional[dict], after: Optional[dict]) -> dict:
+    """/rag/cache 통계 전후 차이 (적중/미스 수만)"""
+    if not before or not after:
+        return {}
+
+    def hits(stats: dict, section: str) -> dict:
+        data = stats.get(section) or {}
+        hit = data.get("hits", 0)
+        return {
+            "hits": sum(hit.values()) if isinstance(hit, dict) else hit,
+            "misses": data.get("misses", 0)
+        }
+
+    delta = {}
+    for section in ("answers", "embedding"):
+        b, a = hits(before, section), hits(after, section)
+        d = {key: a[key] - b[key] for key in a}
+        total = d["hits"] + d["misses"]
+        d["hit_rate"] = round(d["hits"] / total, 3) if total else None
+        delta[section] = d
+    return delta
+
+
+async def run_load(args) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency + 1, max_keepalive_connections=args.concurrency + 1)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        documents = await fetch_json(client, "/rag/documents") or {}
+        document_ids = [d.get("document_id") for d in documents.get("documents", []) if d.get("document_id")]
+
+        cache_before = await fetch_json(client, "/rag/cache")
+
+        # 워밍업 (연결 수립 / 첫 로드 비용을 측정에서 제외)
+        generator = LoadGenerator(client, args, document_ids)
+        for endpoint in generator.mix:
+            await generator._call(endpoint)
+
+        elapsed = await generator.run()
+        cache_after = await fetch_json(client, "/rag/cache")
+
+    all_samples = [s for samples in generator.samples.values() for s in samples]
+    return {
+        "url": args.url,
+        "concurrency": args.concurrency,
+        "elapsed_sec": round(elapsed, 3),
+        "documents": len(document_ids),
+        "endpoints": {name: summarize(samples, elapsed) for name, samples in generator.samples.items()},
+        "overall": summarize(all_samples, elapsed),
+        "health_probe": summarize(generator.probes, elapsed),
+        "cache": cache_delta(cache_before, cache_after)
+    }
+
+
+# ============= Local stack =============
+
+def wait_for(url: str, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError(f"{url} did not become healthy within {timeout}s")
+
+
+def start_stack(args):
+    """Ollama 대체 서버(스레드)와 uvicorn main:app(하위 프로세스) 시작"""
+    fake = start_fake_ollama(config=FakeOllamaConfig(
+        generate_latency=args.generate_latency,
+        embed_latency=args.embed_latency,
+        error_rate=args.ollama_error_rate
+    ))
+    ollama_url = f"http://127.0.0.1:{fake.server_address[1]}"
+
+    env = {**os.environ, "OLLAMA_BASE_URL": ollama_url}
+    app = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+         "--port", str(args.port), "--workers", str(args.uvicorn_workers), "--log-level", "warning"],
+        cwd=str(ROOT),
+        env=env
+    )
+    args.url = f"http://127.0.0.1:{args.port}"
+    try:
+        wait_for(args.url, args.startup_timeout)
+    except Exception:
+        app.terminate()
+        fake.shutdown()
+        raise
+    print(f"Started main:app x{args.uvicorn_workers} at {args.url} (Ollama stand-in at {ollama_url})")
+    return fake, app
+
+
+def print_report(report: dict):
+    print(f"\n{report['url']}  concurrency={report['concurrency']}  "
+          f"{report['elapsed_sec']}s  documents={report['documents']}")
+    print(f"{'endpoint':>12} {'reqs':>7} {'rps':>8} {'err%':>6} {'p50ms':>9} {'p95ms':>9} {'p99ms':>9}")
+    rows = {**report["endpoints"], "overall": report["overall"], "/health": report["health_probe"]}
+    for name, s in rows.items():
+        print(f"{name:>12} {s['requests']:>7} {s['throughput_rps']:>8.1f} {s['error_rate'] * 100:>5.1f}% "
+              f"{s['p50_ms'] or 0:>9.1f} {s['p95_ms'] or 0:>9.1f} {s['p99_ms'] or 0:>9.1f}")
+    for section, d in report["cache"].items():
+        print(f"cache {section}: {d['hits']} hits, {d['misses']} misses, hit rate {d['hit_rate']}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--url", default="http://localhost:8005")
+    arg_parser.add_argument("--concurrency", type=int, default=16)
+    arg_parser.add_argument("--duration", type=float, default=30.0, help="측정 시간(초)")
+    arg_parser.add_argument("--requests", type=int, default=0, help="총 요청 수 (지정하면 --duration 대신 사용)")
+    arg_parser.add_argument("--mix", default="query=6,documents=2,export=2", help="엔드포인트 호출 비율")
+    arg_parser.add_argument("--distinct-questions", type=int, default=len(QUESTIONS),
+                            help="서로 다른 질문 수 (적을수록 답변 캐시 적중 증가)")
+    arg_parser.add_argument("--k", type=int, default=3)
+    arg_parser.add_argument("--timeout", type=float, default=60.0)
+    arg_parser.add_argument("--probe-interval", type=float, default=0.1, help="/health probe 간격(초)")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--json", dest="json_path", help="결과를 JSON 파일로 저장")
+
+    serve = arg_parser.add_argument_group("--serve (Ollama 대체 서버 + uvicorn 직접 실행)")
+    serve.add_argument("--serve", action="store_true")
+    serve.add_argument("--port", type=int, default=8015)
+    serve.add_argument("--uvicorn-workers", type=int, default=1)
+    serve.add_argument("--generate-latency", type=float, default=0.5, help="Ollama 답변 생성 지연(초)")
+    serve.add_argument("--embed-latency", type=float, default=0.01, help="Ollama 임베딩 지연(초)")
+    serve.add_argument("--ollama-error-rate", type=float, default=0.0)
+    serve.add_argument("--startup-timeout", type=float, default=60.0)
+    args = arg_parser.parse_args()
+
+    random.seed(args.seed)
+    fake = app = None
+    if args.serve:
+        fake, app = start_stack(args)
+
+    try:
+        report = asyncio.run(run_load(args))
+    finally:
+        if app is not None:
+            app.terminate()
+            app.wait(timeout=30)
+        if fake is not None:
+            fake.shutdown()
+
+    if args.serve:
+        report["uvicorn_workers"] = args.uvicorn_workers
+        report["ollama"] = {"generate_latency": args.generate_latency, "embed_latency": args.embed_latency}
+    print_report(report)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
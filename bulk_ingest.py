@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+downloads 디렉토리 대량 색인
+
+downloads/{school_code}/{year}/teaching_plans/*.pdf 를 모두 찾아
+파일명에서 학교명/학년/학기를 추론하고 Enhanced RAG 파이프라인에 색인합니다.
+중단되어도 같은 명령으로 다시 실행하면 처리된 파일은 건너뛰고 이어서 진행합니다.
+
+사용법:
+    python bulk_ingest.py
+    python bulk_ingest.py downloads --workers 8 --log-every 32
+    python bulk_ingest.py downloads --school B100000662 --year 2025
+    python bulk_ingest.py downloads --dry-run       # 추론된 메타데이터만 출력
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+from src.rag.bulk_ingest import BulkIngestCheckpoint, BulkIngester, discover_pdfs
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("root", nargs="?", default="downloads", help="downloads 디렉토리")
+    arg_parser.add_argument("--school", help="이 school_code만 색인")
+    arg_parser.add_argument("--year", help="이 연도만 색인")
+    arg_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="PDF 파싱 프로세스 수")
+    arg_parser.add_argument("--log-every", type=int, default=16, help="진행 상황 기록 단위 (문서 수)")
+    arg_parser.add_argument("--checkpoint", default="./bulk_ingest_checkpoint.jsonl")
+    arg_parser.add_argument("--skip-failed", action="store_true", help="이전에 실패한 파일은 다시 시도하지 않음")
+    arg_parser.add_argument("--dry-run", action="store_true", help="색인하지 않고 파일과 메타데이터만 출력")
+    arg_parser.add_argument("--json", dest="json_path", help="결과 통계를 JSON 파일로 저장")
+    args = arg_parser.parse_args()
+
+    root = Path(args.root)
+    if not root.is_dir():
+        sys.exit(f"Directory not found: {root}")
+
+    files = discover_pdfs(root, school_code=args.school, year=args.year)
+    logger.info(f"Found {len(files)} PDF files under {root}")
+
+    if args.dry_run:
+        for pdf_path, metadata in files:
+            print(f"{pdf_path}\t{json.dumps(metadata, ensure_ascii=False)}")
+        return
+
+    # 무거운 의존성(mathesis_core)은 실제 색인할 때만 로드
+    from src.rag.integrated_pipeline import IntegratedRAGPipeline
+    from src.rag.settings import embedding_cache_from_env, parse_cache_from_env, pipeline_kwargs_from_env
+
+    # API 서버(main.py)와 같은 설정으로 색인
+    pipeline = IntegratedRAGPipeline(
+        parse_cache=parse_cache_from_env(),
+        embedding_cache=embedding_cache_from_env(),
+        **pipeline_kwargs_from_env()
+    )
+
+    ingester = BulkIngester(
+        pipeline,
+        BulkIngestCheckpoint(args.checkpoint),
+        workers=args.workers,
+        log_every=args.log_every,
+        retry_failed=not args.skip_failed
+    )
+    stats = ingester.run(files)
+
+    logger.info(
+        f"Done: {stats.succeeded} succeeded, {stats.failed} failed, {stats.skipped} skipped "
+        f"in {stats.elapsed:.1f}s ({stats.files_per_sec:.2f} files/sec)"
+    )
+    logger.info(
+        f"Chunks: {stats.chunks_added} added, {stats.chunks_updated} updated, {stats.chunks_removed} removed"
+    )
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(stats.to_dict(), f, ensure_ascii=False, indent=2)
+
+    if stats.failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,191 @@
 
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import FileResponse, JSONResponse
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import uvicorn
 import os
+import asyncio
+import hmac
 import logging
+from pathlib import Path
 
+from src.agent_crawler import RealBrowserCrawler
+from src.browser_pool import BrowserPool
 from src.crawler import SchoolInfoCrawler
-from src.exceptions import SchoolNotFoundError
+from src.crawl_orchestrator import CrawlManifest, CrawlOrchestrator
+from src.exceptions import SchoolNotFoundError, WorkerPoolFullError
+from src.metrics import REGISTRY, MetricsRegistry
+from src.rate_limit import RATE_LIMITER
+from src.retry import RetryBudget, RetryPolicy
+from src.tracing import TRACER
 from src.rag.integrated_pipeline import IntegratedRAGPipeline
+from src.rag.ingest_jobs import IngestJobQueue
+from src.rag.settings import embedding_cache_from_env, parse_cache_from_env, pipeline_kwargs_from_env
+from src.rag.filters import FILTER_FIELDS
+from src.rag.bulk_ingest import infer_metadata, prefer_revised
+from src.rag.export_stream import (
+    iter_ndjson, iter_json_object, gzip_chunks, encode_event_ndjson, encode_event_sse
+)
+from src.worker_pool import WorkerPool
 
 # Configure Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Tracing (요청별 span tree, TRACE_SAMPLE_RATE 비율만 기록)
+# X-Trace 헤더로 강제 기록하려면 헤더 값이 TRACE_FORCE_TOKEN과 같아야 함 (비어 있으면 사용 안 함)
+TRACE_FORCE_TOKEN = os.getenv("TRACE_FORCE_TOKEN", "")
+TRACER.configure(
+    sample_rate=float(os.getenv("TRACE_SAMPLE_RATE", "0.01")),
+    export_path=os.getenv("TRACE_EXPORT_FILE") or None,
+    buffer_size=int(os.getenv("TRACE_BUFFER_SIZE", "100")),
+    max_forced_per_second=float(os.getenv("TRACE_FORCE_PER_SECOND", "1"))
+)
+
+# Worker Pools
+# Parsing/indexing is CPU-heavy and slow, LLM calls mostly wait on Ollama,
+# so each gets its own pool and a queue limit that keeps one from starving the other.
+ingest_pool = WorkerPool(
+    "ingest",
+    max_workers=int(os.getenv("INGEST_WORKERS", "2")),
+    max_queue=int(os.getenv("INGEST_QUEUE_SIZE", "8"))
+)
+query_pool = WorkerPool(
+    "query",
+    max_workers=int(os.getenv("QUERY_WORKERS", "8")),
+    max_queue=int(os.getenv("QUERY_QUEUE_SIZE", "32"))
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await ingest_jobs.start()
+    yield
+    if crawl_batch_task is not None:
+        crawl_batch_task.cancel()
+    await ingest_jobs.stop()
+    await crawler.close()
+    await browser_pool.close()
+    rag_pipeline.close()
+    embedding_cache.close()
+    ingest_pool.shutdown(wait=False)
+    query_pool.shutdown(wait=False)
+
 app = FastAPI(
     title="School Info Service (Node5)",
     description="Independent Microservice for Scraping and PDF Generation of School Data",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """
+    요청마다 root span 생성
+    X-Trace 헤더 값이 TRACE_FORCE_TOKEN과 같으면 샘플링과 관계없이 기록
+    (초당 TRACE_FORCE_PER_SECOND건까지)
+    기록된 요청은 응답의 X-Trace-Id로 /debug/traces/{trace_id}에서 조회
+    """
+    header = request.headers.get("x-trace", "")
+    force = bool(TRACE_FORCE_TOKEN) and hmac.compare_digest(header.encode(), TRACE_FORCE_TOKEN.encode())
+    with TRACER.trace(f"{request.method} {request.url.path}", force=force) as root:
+        response = await call_next(request)
+        if root is not None:
+            root.set_attribute("status_code", response.status_code)
+            response.headers["X-Trace-Id"] = root.trace_id
+    return response
+
 # Request Models
 class CrawlRequest(BaseModel):
     year: int = 2025
 
+class BatchCrawlRequest(BaseModel):
+    school_codes: List[str]
+    years: List[int] = [2025]
+    # 다운로드가 끝난 학교의 PDF를 바로 색인 작업으로 등록
+    ingest: bool = True
+    retry_failed: bool = True
+    # 실제 브라우저(Playwright)로 크롤링, school_names는 학교 코드 → 검색할 학교명
+    browser: bool = False
+    school_names: Dict[str, str] = {}
+
 # Service Instances
-crawler = SchoolInfoCrawler("https://www.schoolinfo.go.kr")
+# Per-host request rate shared by every crawler in this process
+RATE_LIMITER.configure(
+    rate=float(os.getenv("CRAWLER_RATE_PER_HOST", "5")),
+    burst=float(os.getenv("CRAWLER_RATE_BURST", "5")),
+    max_concurrent=int(os.getenv("CRAWLER_MAX_CONCURRENT_PER_HOST", "4")),
+    min_rate=float(os.getenv("CRAWLER_RATE_MIN", "0.2")),
+    max_rate=float(os.getenv("CRAWLER_RATE_MAX", "20"))
+)
+crawler = SchoolInfoCrawler(
+    "https://www.schoolinfo.go.kr",
+    max_connections=int(os.getenv("CRAWLER_MAX_CONNECTIONS", "20")),
+    max_keepalive_connections=int(os.getenv("CRAWLER_MAX_KEEPALIVE", "10")),
+    keepalive_expiry=float(os.getenv("CRAWLER_KEEPALIVE_SECONDS", "30")),
+    http2=os.getenv("CRAWLER_HTTP2", "true").lower() == "true",
+    retry_policy=RetryPolicy(
+        max_retries=int(os.getenv("CRAWLER_MAX_RETRIES", "3")),
+        base_delay=float(os.getenv("CRAWLER_RETRY_BASE_DELAY", "0.5")),
+        max_delay=float(os.getenv("CRAWLER_RETRY_MAX_DELAY", "30")),
+        max_retry_after=float(os.getenv("CRAWLER_RETRY_AFTER_MAX", "120")),
+        budget=RetryBudget(
+            ratio=float(os.getenv("CRAWLER_RETRY_BUDGET_RATIO", "0.2")),
+            min_retries=int(os.getenv("CRAWLER_RETRY_BUDGET_MIN", "10"))
+        )
+    )
+)
+# Warm Chromium instances for browser batch crawls (launched on first use)
+browser_pool = BrowserPool(
+    size=int(os.getenv("BROWSER_POOL_SIZE", "2")),
+    max_uses=int(os.getenv("BROWSER_POOL_MAX_USES", "20")),
+    headless=os.getenv("BROWSER_HEADLESS", "true").lower() == "true"
+)
+# Pipeline settings are shared with bulk_ingest.py (src/rag/settings.py)
+parse_cache = parse_cache_from_env()
+embedding_cache = embedding_cache_from_env()
 rag_pipeline = IntegratedRAGPipeline(
-    collection_name="school_info_v2",
-    ollama_base_url="http://localhost:11434",
-    persist_dir="./chroma_hierarchical"
+    parse_cache=parse_cache,
+    embedding_cache=embedding_cache,
+    **pipeline_kwargs_from_env()
+)
+ingest_jobs = IngestJobQueue(
+    rag_pipeline,
+    db_path=os.getenv("INGEST_JOB_DB", "./ingest_jobs.db"),
+    concurrency=int(os.getenv("INGEST_JOB_CONCURRENCY", "2")),
+    max_attempts=int(os.getenv("INGEST_JOB_MAX_ATTEMPTS", "3")),
+    runner=ingest_pool.run
 )
 
 @app.get("/health")
 def health_check():
     return {"status": "ok", "service": "node5_school_info"}
 
+@app.get("/metrics")
+def metrics():
+    """
+    Prometheus 메트릭 (단계별 소요 시간 히스토그램, 캐시 적중/미스, 크롤러 재시도)
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type=MetricsRegistry.CONTENT_TYPE)
+
+@app.get("/debug/traces")
+def list_traces(limit: int = 20):
+    """
+    최근 기록된 trace 목록 (span tree 제외)
+    """
+    return {"sample_rate": TRACER.sample_rate, "traces": TRACER.recent(limit)}
+
+@app.get("/debug/traces/{trace_id}")
+def get_trace(trace_id: str):
+    """
+    trace의 전체 span tree
+    """
+    trace = TRACER.get(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Trace not found (not sampled or evicted)")
+    return trace
+
 @app.post("/schools/{school_code}/teaching-plans")
 async def fetch_teaching_plans(school_code: str, req: CrawlRequest):
     """
@@ -51,6 +200,76 @@ async def fetch_teaching_plans(school_code: str, req: CrawlRequest):
         logger.error(f"Crawl failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+DOWNLOADS_ROOT = Path(os.path.dirname(os.path.abspath(__file__))) / "downloads"
+CRAWL_MANIFEST = os.getenv("CRAWL_MANIFEST", "./crawl_manifest.jsonl")
+# Schools in flight; defaults to the per-host request cap, since every school hits the same site
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", str(RATE_LIMITER.max_concurrent)))
+crawl_orchestrator: Optional[CrawlOrchestrator] = None
+crawl_batch_task: Optional[asyncio.Task] = None
+
+def submit_downloads(school_code: str, year: int, files: List[str]) -> List[str]:
+    """
+    Register downloaded PDFs as ingest jobs (metadata inferred from the filenames).
+    Other attachments (e.g. .hwp from browser crawls) are kept but not indexed.
+    When both an original and its "(수정)" copy were downloaded, only the revised copy is submitted.
+    """
+    pdfs = [
+        (Path(file_path), infer_metadata(Path(file_path), DOWNLOADS_ROOT))
+        for file_path in files
+        if Path(file_path).suffix.lower() == ".pdf"
+    ]
+    return [
+        ingest_jobs.submit(str(pdf_path), metadata)["job_id"]
+        for pdf_path, metadata in prefer_revised(pdfs)
+    ]
+
+@app.post("/crawl/batch", status_code=202)
+async def start_batch_crawl(req: BatchCrawlRequest):
+    """
+    Crawl many schools concurrently in the background.
+    Progress is recorded in a resumable manifest; resubmitting the same batch
+    only crawls schools that are not done yet.
+    """
+    global crawl_orchestrator, crawl_batch_task
+
+    if crawl_batch_task is not None and not crawl_batch_task.done():
+        raise HTTPException(status_code=409, detail="A batch crawl is already running")
+    if not req.school_codes or not req.years:
+        raise HTTPException(status_code=400, detail="school_codes and years must not be empty")
+
+    targets = CrawlOrchestrator.targets(req.school_codes, req.years)
+    batch_crawler = (
+        RealBrowserCrawler(pool=browser_pool, school_names=req.school_names) if req.browser else crawler
+    )
+    crawl_orchestrator = CrawlOrchestrator(
+        batch_crawler,
+        CrawlManifest(CRAWL_MANIFEST),
+        concurrency=CRAWL_CONCURRENCY,
+        on_downloaded=submit_downloads if req.ingest else None,
+        retry_failed=req.retry_failed
+    )
+    crawl_batch_task = asyncio.create_task(crawl_orchestrator.run(targets))
+    return {
+        "targets": len(targets),
+        "concurrency": CRAWL_CONCURRENCY,
+        "crawler": "browser" if req.browser else "http",
+        "manifest": CRAWL_MANIFEST
+    }
+
+@app.get("/crawl/batch")
+async def get_batch_crawl():
+    """
+    Progress of the current (or last) batch crawl and the manifest totals.
+    """
+    if crawl_orchestrator is None:
+        raise HTTPException(status_code=404, detail="No batch crawl has been started")
+    return {
+        "running": crawl_orchestrator.running,
+        "stats": crawl_orchestrator.stats.to_dict(),
+        "manifest": crawl_orchestrator.manifest.summary(),
+        "browser_pool": browser_pool.stats()
+    }
+
 @app.get("/downloads/{school_code}/{year}/{filename}")
 def download_file(school_code: str, year: str, filename: str):
     """
@@ -79,11 +298,24 @@ class IngestRequest(BaseModel):
 class QueryRequest(BaseModel):
     question: str
     k: int = 3
+    # 메타데이터 필터 (지정한 항목만 검색)
+    school_code: Optional[str] = None
+    year: Optional[str] = None
+    grade: Optional[str] = None
+    subject: Optional[str] = None
+    semester: Optional[str] = None
+
+    def filters(self) -> Dict[str, str]:
+        return {
+            field: getattr(self, field)
+            for field in FILTER_FIELDS
+            if getattr(self, field) is not None
+        }
 
-@app.post("/rag/ingest")
+@app.post("/rag/ingest", status_code=202)
 async def ingest_pdf(req: IngestRequest):
     """
-    PDF를 RAG 시스템에 색인
+    PDF 색인 작업 등록 (진행 상황은 /rag/jobs/{job_id}로 조회)
     """
     try:
         metadata = {
@@ -95,24 +327,101 @@ async def ingest_pdf(req: IngestRequest):
             "semester": req.semester
         }
 
-        result = rag_pipeline.ingest_pdf(req.pdf_path, metadata)
-        return result
+        return ingest_jobs.submit(req.pdf_path, metadata)
     except Exception as e:
-        logger.error(f"Ingest failed: {e}")
+        logger.error(f"Ingest submit failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/rag/jobs")
+async def list_ingest_jobs(limit: int = 50):
+    """
+    최근 색인 작업 목록
+    """
+    return {"jobs": ingest_jobs.list_jobs(limit)}
+
+@app.get("/rag/jobs/{job_id}")
+async def get_ingest_job(job_id: str):
+    """
+    색인 작업 상태 (단계별 진행 상황)
+    """
+    job = ingest_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.post("/rag/jobs/{job_id}/retry")
+async def retry_ingest_job(job_id: str):
+    """
+    실패한 색인 작업을 실패한 단계부터 재실행
+    """
+    try:
+        job = ingest_jobs.retry(job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
 @app.post("/rag/query")
 async def rag_query(req: QueryRequest):
     """
     RAG 시스템에 질문
     """
     try:
-        answer = rag_pipeline.query(req.question, k=req.k)
+        answer = await query_pool.run(rag_pipeline.query, req.question, k=req.k, filters=req.filters())
         return answer
+    except WorkerPoolFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Query failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/rag/query/stream")
+async def rag_query_stream(req: QueryRequest, format: str = "ndjson"):
+    """
+    질의응답 (스트리밍)
+
+    검색이 끝나는 즉시 출처(sources)를 보내고, 이후 생성되는 토큰을 순서대로,
+    마지막에 파싱된 최종 답변(answer/key_facts/confidence)을 보냄
+
+    - format: ndjson (이벤트당 한 줄) | sse (text/event-stream)
+
+    /rag/query와 같은 query_pool에서 실행 (자리가 없으면 응답 시작 전에 503)
+    """
+    if format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'sse'")
+
+    try:
+        events = query_pool.iterate(
+            rag_pipeline.query_stream, req.question, k=req.k, filters=req.filters()
+        )
+    except WorkerPoolFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    if format == "sse":
+        return StreamingResponse(
+            (encode_event_sse(event) async for event in events),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache"}
+        )
+    return StreamingResponse(
+        (encode_event_ndjson(event) async for event in events),
+        media_type="application/x-ndjson"
+    )
+
+@app.get("/rag/cache")
+async def parse_cache_stats():
+    """
+    파싱 캐시 / 임베딩 캐시 / 답변 캐시 적중/미스 통계
+    """
+    stats = {
+        **parse_cache.stats(),
+        "embedding": embedding_cache.stats()
+    }
+    if rag_pipeline.answer_cache is not None:
+        stats["answers"] = rag_pipeline.answer_cache.stats()
+    return stats
+
 @app.get("/rag/documents")
 async def list_documents():
     """
@@ -133,12 +442,77 @@ async def export_json(document_id: str):
     return JSONResponse(content=json_data)
 
 @app.get("/rag/export-all")
-async def export_all_jsons():
+async def export_all_jsons(
+    format: str = "json",
+    gzip: bool = False,
+    school_code: Optional[str] = None,
+    year: Optional[str] = None
+):
     """
     모든 문서의 Enhanced JSON 다운로드 (웹 LLM용)
+    문서를 하나씩 디스크에서 읽어 스트리밍하므로 문서 수와 무관하게 메모리 사용이 일정함
+
+    - format: json ({document_id: 문서} 객체) | ndjson (문서당 한 줄)
+    - gzip: true면 gzip으로 압축
+    - school_code, year: 해당 문서만 내보내기
+    """
+    if format not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'json' or 'ndjson'")
+
+    documents = rag_pipeline.iter_export_jsons(school_code=school_code, year=year)
+    if format == "ndjson":
+        chunks = iter_ndjson(documents)
+        media_type = "application/x-ndjson"
+    else:
+        chunks = iter_json_object(documents)
+        media_type = "application/json"
+
+    headers = {}
+    if gzip:
+        chunks = gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
+
+@app.get("/rag/shards")
+async def list_shards():
+    """
+    Vector Store 샤드 목록 (VECTOR_SHARD_BY 설정 시)
     """
-    all_jsons = rag_pipeline.export_all_jsons()
-    return JSONResponse(content=all_jsons)
+    try:
+        shards = rag_pipeline.list_shards()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"total": len(shards), "shards": shards}
+
+@app.post("/rag/shards/{shard}/compact")
+async def compact_shard(shard: str):
+    """
+    샤드 정리 (색인 기록이 없는 문서의 청크 삭제, 빈 샤드 제거)
+    """
+    try:
+        return await ingest_pool.run(rag_pipeline.compact_shard, shard)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Shard not found: {shard}")
+    except WorkerPoolFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+@app.delete("/rag/shards/{shard}")
+async def drop_shard(shard: str):
+    """
+    샤드 삭제 (Enhanced JSON은 남으므로 다시 색인 가능)
+    """
+    try:
+        documents = await ingest_pool.run(rag_pipeline.drop_shard, shard)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Shard not found: {shard}")
+    except WorkerPoolFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"shard": shard, "dropped_documents": documents}
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8005, reload=True)
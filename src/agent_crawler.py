@@ -1,317 +1,429 @@
 
 import asyncio
 import logging
+import re
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
 from playwright.async_api import async_playwright
 import os
 
+try:
+    from .browser_pool import BrowserPool, launch_browser, new_context
+    from .browser_waits import StepWaits
+    from .exceptions import CrawlerException
+    from .rate_limit import RATE_LIMITER, HostRateLimiter
+except ImportError:  # run as a script: python src/agent_crawler.py
+    from browser_pool import BrowserPool, launch_browser, new_context
+    from browser_waits import StepWaits
+    from exceptions import CrawlerException
+    from rate_limit import RATE_LIMITER, HostRateLimiter
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+@dataclass
+class BrowserCrawlResult:
+    """Outcome of one browser crawl: saved files, step durations (s) and the error that ended it"""
+    school_name: str
+    files: List[str] = field(default_factory=list)
+    durations: Dict[str, float] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def path_slug(name: str) -> str:
+    """School name as a single safe path component"""
+    return re.sub(r"[^\w-]+", "_", name).strip("_") or "school"
+
+
 class RealBrowserCrawler:
     """
     Real Browser Agent using Playwright.
     Designed to bypass anti-bot protections by simulating a real user.
-    
+
     Usage:
-        python src/agent_crawler.py
-        
+        python src/agent_crawler.py [school name ...]
+
+
     Note:
         Best run in a headful environment (local machine) to avoid detection.
+        Navigations and downloads share the per-host limits of the HTTP
+        crawlers (RATE_LIMITER), so browser and HTTP crawls of the same
+        site are throttled together.
+        Pass a BrowserPool to reuse warm browsers across schools (parallel
+        runs lease separate browsers); without one every run launches and
+        closes its own Chromium. A run that ends with an error hands its
+        browser back as unhealthy, so the pool relaunches it.
+        Steps wait on page events (selectors, load states, popups,
+        downloads) rather than fixed sleeps; ``step_timeouts`` overrides
+        the per-step timeouts (ms) in browser_waits.DEFAULT_TIMEOUTS.
+        ``download_teaching_plans`` has the SchoolInfoCrawler signature, so a
+        CrawlOrchestrator can drive batch crawls through the browser;
+        ``school_names`` maps school codes to the names to search for.
     """
     BASE_URL = "https://www.schoolinfo.go.kr"
-
-    async def run(self, school_name: str = "동도중학교", headless: bool = True):
+    FILE_LINKS = "a[href*='FileDown'], a:has-text('.hwp'), a:has-text('.pdf')"
+
+    def __init__(
+        self,
+        rate_limiter: Optional[HostRateLimiter] = None,
+        pool: Optional[BrowserPool] = None,
+        step_timeouts: Optional[Dict[str, float]] = None,
+        school_names: Optional[Dict[str, str]] = None,
+        headless: bool = True
+    ):
+        self.rate_limiter = rate_limiter or RATE_LIMITER
+        self.pool = pool
+        self.step_timeouts = step_timeouts
+        self.school_names = dict(school_names or {})
+        self.headless = headless
+        self.base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    async def _goto(self, page, url: str, **kwargs):
+        """page.goto under the host's rate limit, feeding back the response status"""
+        async with self.rate_limiter.limit(url):
+            response = await page.goto(url, **kwargs)
+        if response is not None:
+            self.rate_limiter.record(url, response.status)
+        return response
+
+    async def download_teaching_plans(self, school_code: str, year: int) -> List[str]:
+        """
+        Crawl one school through the browser into downloads/<school_code>/<year>/teaching_plans
+        and return the saved files; raises CrawlerException if the crawl failed.
+        """
+        school_name = self.school_names.get(school_code, school_code)
+        download_dir = os.path.join(self.base_dir, "downloads", school_code, str(year), "teaching_plans")
+        result = await self.run(school_name, self.headless, year=year, download_dir=download_dir)
+        if not result.ok:
+            raise CrawlerException(f"Browser crawl of {school_name} failed: {result.error}")
+        return result.files
+
+    async def run(
+        self,
+        school_name: str = "동도중학교",
+        headless: bool = True,
+        year: int = 2025,
+        download_dir: Optional[str] = None
+    ) -> BrowserCrawlResult:
         """
         Run the browser crawler to search and download school files.
+        Returns the saved files, the measured duration (seconds) of each
+        step and, if the crawl failed, its error.
 
         Args:
             school_name: Name of the school to search for
-            headless: Run in headless mode (True) or visible mode (False for debugging)
+            headless: Run in headless mode (True) or visible mode (False for debugging);
+                ignored with a pool, whose browsers are already running
+            year: School year to select on the detail page
+            download_dir: Where to save the files (default: downloads/real/<school>)
+
+        Screenshots and HTML snapshots go to debug_artifacts/<school>/<run id>,
+        so parallel runs never overwrite each other's artifacts.
         """
-        logger.info(f"Starting Real Browser Agent for: {school_name}")
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        download_dir = os.path.join(base_dir, "downloads", "real")
-        debug_dir = os.path.join(base_dir, "debug_artifacts")
+        logger.info(f"Starting Real Browser Agent for: {school_name} ({year})")
+        slug = path_slug(school_name)
+        run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        download_dir = download_dir or os.path.join(self.base_dir, "downloads", "real", slug)
+        debug_dir = os.path.join(self.base_dir, "debug_artifacts", slug, run_id)
         os.makedirs(download_dir, exist_ok=True)
         os.makedirs(debug_dir, exist_ok=True)
 
+        if self.pool is not None:
+            entry = await self.pool.acquire()
+            result = None
+            try:
+                result = await self._crawl(entry.context, school_name, year, download_dir, debug_dir)
+                return result
+            finally:
+                await self.pool.release(entry, healthy=result is not None and result.ok)
+
         async with async_playwright() as p:
             # Launch Browser with Anti-Detection Args
-            browser = await p.chromium.launch(
-                headless=headless,
-                args=[
-                    "--disable-blink-features=AutomationControlled",
-                    "--no-sandbox",
-                    "--disable-setuid-sandbox",
-                    "--disable-infobars",
-                    "--window-size=1920,1080",
-                    "--start-maximized",
-                    "--disable-dev-shm-usage",  # Overcome limited resource problems
-                ]
-            )
-            context = await browser.new_context(
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36",
-                viewport={"width": 1920, "height": 1080},
-                locale="ko-KR",
-                timezone_id="Asia/Seoul",
-                accept_downloads=True
-            )
-            
-            # Anti-detection script
-            await context.add_init_script("""
-                Object.defineProperty(navigator, 'webdriver', {
-                    get: () => undefined
-                });
-            """)
-            
-            page = await context.new_page()
-
+            browser = await launch_browser(p, headless)
             try:
-                # 1. Go to Home
-                logger.info(f"Navigating to {self.BASE_URL}...")
-                await page.goto(self.BASE_URL, timeout=120000, wait_until="load")
-
-                # CRITICAL: Wait for page to fully stabilize after any redirects
-                await page.wait_for_load_state("load", timeout=30000)
-                await asyncio.sleep(2)
+                context = await new_context(browser)
+                return await self._crawl(context, school_name, year, download_dir, debug_dir)
+            finally:
+                await browser.close()
 
-                # Safe Popup Handling: Direct DOM Removal (more reliable than CSS)
-                logger.info("Removing popups via DOM manipulation...")
-                try:
-                    await page.evaluate("""
-                        () => {
-                            // Remove common popup elements
-                            const selectors = ['.layerpopup', 'div[id*="popup"]', '.dimmed', '.popup_wrap'];
-                            selectors.forEach(selector => {
-                                document.querySelectorAll(selector).forEach(el => el.remove());
-                            });
-                        }
-                    """)
-                    logger.info("Popup removal completed.")
-                except Exception as popup_err:
-                    logger.warning(f"Popup removal failed (non-critical): {popup_err}")
-
-                await asyncio.sleep(2) 
-                
-                # Debug: Screenshot
-                await page.screenshot(path=os.path.join(debug_dir, "01_homepage.png"))
-                
-                # 2. Search
-                logger.info(f"Searching for {school_name}...")
+    async def _crawl(
+        self, context, school_name: str, year: int, download_dir: str, debug_dir: str
+    ) -> BrowserCrawlResult:
+        """Search, open and download the school's files in an anti-detection context"""
+        waits = StepWaits(self.step_timeouts)
+        result = BrowserCrawlResult(school_name, durations=waits.durations)
+        page = await context.new_page()
+
+        try:
+            await self._crawl_steps(context, page, waits, result, year, download_dir, debug_dir)
+        finally:
+            logger.info(f"Step durations (s): {waits.summary()}")
+        return result
+
+    async def _crawl_steps(
+        self, context, page, waits: StepWaits, result: BrowserCrawlResult,
+        year: int, download_dir: str, debug_dir: str
+    ):
+        """The crawl steps; failures are logged and recorded in result.error instead of raised"""
+        school_name = result.school_name
+        try:
+            # 1. Go to Home
+            logger.info(f"Navigating to {self.BASE_URL}...")
+            await self._goto(page, self.BASE_URL, timeout=120000, wait_until="load")
+
+            # CRITICAL: Wait for page to fully stabilize after any redirects
+            await waits.load(page, "home_load")
+            await waits.load(page, "home_settle", state="networkidle")
+
+            # Safe Popup Handling: Direct DOM Removal (more reliable than CSS)
+            logger.info("Removing popups via DOM manipulation...")
+            try:
+                await page.evaluate("""
+                    () => {
+                        // Remove common popup elements
+                        const selectors = ['.layerpopup', 'div[id*="popup"]', '.dimmed', '.popup_wrap'];
+                        selectors.forEach(selector => {
+                            document.querySelectorAll(selector).forEach(el => el.remove());
+                        });
+                    }
+                """)
+                logger.info("Popup removal completed.")
+            except Exception as popup_err:
+                logger.warning(f"Popup removal failed (non-critical): {popup_err}")
+
+            # Debug: Screenshot
+            await page.screenshot(path=os.path.join(debug_dir, "01_homepage.png"))
+            
+            # 2. Search
+            logger.info(f"Searching for {school_name}...")
 
-                # Wait for search input to be available
-                try:
-                    search_input = page.locator("input#SEARCH_KEYWORD")
-                    await search_input.wait_for(state="visible", timeout=10000)
-
-                    # Human-like interaction
-                    await search_input.first.click()
-                    await asyncio.sleep(0.5)
-                    await search_input.first.fill(school_name)
-                    await asyncio.sleep(0.8)
+            # Wait for search input to be available
+            try:
+                search_input = page.locator("input#SEARCH_KEYWORD")
+                async with waits.step("search_input"):
+                    await search_input.wait_for(state="visible", timeout=waits.timeout("search_input"))
+
+                # click/fill wait for the input to be actionable themselves
+                await search_input.first.click()
+                await search_input.first.fill(school_name)
+                async with self.rate_limiter.limit(self.BASE_URL):
                     await page.keyboard.press("Enter")
-                    logger.info("Search submitted.")
-
-                except Exception as exc:
-                    logger.error(f"Search interaction failed: {exc}")
-                    await page.screenshot(path=os.path.join(debug_dir, "error_search.png"))
-                    return
+                logger.info("Search submitted.")
 
-                # Wait for results page to load completely
-                await page.wait_for_load_state("load", timeout=60000)
-                await asyncio.sleep(3)
-                await page.screenshot(path=os.path.join(debug_dir, "02_results.png"))
+            except Exception as exc:
+                logger.error(f"Search interaction failed: {exc}")
+                result.error = f"search failed: {exc}"
+                await page.screenshot(path=os.path.join(debug_dir, "error_search.png"))
+                return
 
-                # Debug: Save HTML to understand structure
-                html_content = await page.content()
-                with open(os.path.join(debug_dir, "02_results.html"), "w", encoding="utf-8") as f:
-                    f.write(html_content)
-                logger.info("Saved HTML for debugging")
+            # Wait for results to render
+            await waits.selector(page, "a[href*='searchSchul']", "search_results")
+            await page.screenshot(path=os.path.join(debug_dir, "02_results.png"))
 
-                # 3. Click Result
-                logger.info("Scanning for search results...")
+            # Debug: Save HTML to understand structure
+            html_content = await page.content()
+            with open(os.path.join(debug_dir, "02_results.html"), "w", encoding="utf-8") as f:
+                f.write(html_content)
+            logger.info("Saved HTML for debugging")
 
-                # The link opens in a new page/popup via JavaScript
-                try:
-                    # Find the school link (it's a JavaScript link)
-                    result_link = page.locator(f"a[href*='searchSchul']:has-text('{school_name}')").first
-                    await result_link.wait_for(state="visible", timeout=10000)
+            # 3. Click Result
+            logger.info("Scanning for search results...")
 
-                    link_text = await result_link.inner_text()
-                    logger.info(f"Found result link: {link_text}")
+            # The link opens in a new page/popup via JavaScript
+            try:
+                # Find the school link (it's a JavaScript link)
+                result_link = page.locator(f"a[href*='searchSchul']:has-text('{school_name}')").first
+                await result_link.wait_for(state="visible", timeout=10000)
 
-                    # Extract school ID from the onclick/href
-                    school_id = await result_link.get_attribute("href")
-                    logger.info(f"School link: {school_id}")
+                link_text = await result_link.inner_text()
+                logger.info(f"Found result link: {link_text}")
 
-                    # Click - this may open a new page or navigate current page
-                    await asyncio.sleep(1)
+                # Extract school ID from the onclick/href
+                school_id = await result_link.get_attribute("href")
+                logger.info(f"School link: {school_id}")
 
-                    # Listen for potential new page (popup)
-                    async with context.expect_page() as new_page_info:
+                # Click - this may open a new page or navigate current page
+                async def open_result():
+                    async with self.rate_limiter.limit(self.BASE_URL):
                         await result_link.click()
-                        try:
-                            detail_page = await new_page_info.value
-                            logger.info(f"New page opened: {detail_page.url}")
-                            # Switch to new page
-                            page = detail_page
-                        except:
-                            # No new page, check if current page navigated
-                            logger.info("No new page, checking current page...")
-                            pass
-
-                    # Wait for detail page to load
-                    await page.wait_for_load_state("load", timeout=60000)
-                    await asyncio.sleep(3)
-                    await page.screenshot(path=os.path.join(debug_dir, "03_detail.png"))
-                    logger.info(f"Detail page URL: {page.url}")
-
-                    # Save detail page HTML for analysis
-                    detail_html = await page.content()
-                    with open(os.path.join(debug_dir, "03_detail.html"), "w", encoding="utf-8") as f:
-                        f.write(detail_html)
-
-                    # 4. Select Year 2025
-                    logger.info("Selecting Year 2025...")
-                    try:
-                        # Fix: Handle duplicate IDs or multiple elements
-                        year_select = page.locator("#gsYear").first
-                        await year_select.select_option(value="2025")
-                        
-                        # Fix: Strict mode violation for #gsYearBtn
+
+                # Whichever comes first: a popup, or the year selector of the detail page
+                detail_page = await waits.click_and_wait(context, page, open_result, "#gsYear", "detail_open")
+                if detail_page is not None:
+                    logger.info(f"New page opened: {detail_page.url}")
+                    # Switch to new page
+                    page = detail_page
+                else:
+                    logger.info("No new page, using current page...")
+
+                # Wait for detail page to load
+                await waits.load(page, "detail_load")
+                await waits.load(page, "detail_settle", state="networkidle")
+                await page.screenshot(path=os.path.join(debug_dir, "03_detail.png"))
+                logger.info(f"Detail page URL: {page.url}")
+
+                # Save detail page HTML for analysis
+                detail_html = await page.content()
+                with open(os.path.join(debug_dir, "03_detail.html"), "w", encoding="utf-8") as f:
+                    f.write(detail_html)
+
+                # 4. Select Year
+                logger.info(f"Selecting Year {year}...")
+                try:
+                    # Fix: Handle duplicate IDs or multiple elements
+                    year_select = page.locator("#gsYear").first
+                    await year_select.select_option(value=str(year))
+                    
+                    # Fix: Strict mode violation for #gsYearBtn
+                    async with self.rate_limiter.limit(self.BASE_URL):
                         await page.locator("#gsYearBtn").first.click()
-                        
-                        await page.wait_for_load_state("networkidle")
-                        await asyncio.sleep(3)
-                        logger.info("Year 2025 selected.")
-                    except Exception as e:
-                        logger.warning(f"Failed to set year to 2025 (might already be 2025 or different UI): {e}")
-
-                    # 5. Targeted Download
-                    targets = [
-                        "교과별(학년별) 교수ㆍ학습 및 평가계획에 관한 사항",
-                        "교과별 학업성취 사항"
-                    ]
-
-                    # Let's try to find tabs and click them to ensure links are visible
-                    main_tabs = ["교육활동", "학업성취사항"]
-                    for tab_name in main_tabs:
-                        try:
-                            tab = page.locator(f"a:has-text('{tab_name}')").first
-                            if await tab.count() > 0:
-                                logger.info(f"Clicking Tab: {tab_name}")
-                                await tab.click()
-                                await asyncio.sleep(2)
-                        except Exception as e:
-                            logger.warning(f"Failed to click tab {tab_name}: {e}")
                     
-                    download_count = 0
+                    await waits.load(page, "year_select", state="networkidle")
+                    logger.info(f"Year {year} selected.")
+                except Exception as e:
+                    logger.warning(f"Failed to set year to {year} (might already be {year} or different UI): {e}")
+
+                # 5. Targeted Download
+                targets = [
+                    "교과별(학년별) 교수ㆍ학습 및 평가계획에 관한 사항",
+                    "교과별 학업성취 사항"
+                ]
 
-                    for target_name in targets:
-                        logger.info(f"Looking for target section: {target_name}")
-                        
-                        # Find the link for this section
-                        # It usually calls loadGongSi
-                        target_link = page.locator(f"a:has-text('{target_name}')")
-                        
-                        if await target_link.count() == 0:
-                            logger.warning(f"Could not find link for {target_name}")
-                            continue
+                # Let's try to find tabs and click them to ensure links are visible
+                main_tabs = ["교육활동", "학업성취사항"]
+                for tab_name in main_tabs:
+                    try:
+                        tab = page.locator(f"a:has-text('{tab_name}')").first
+                        if await tab.count() > 0:
+                            logger.info(f"Clicking Tab: {tab_name}")
+                            await tab.click()
+                            await waits.load(page, "tab", state="networkidle")
+                    except Exception as e:
+                        logger.warning(f"Failed to click tab {tab_name}: {e}")
+                
+                download_count = 0
+
+                for target_name in targets:
+                    logger.info(f"Looking for target section: {target_name}")
+                    
+                    # Find the link for this section
+                    # It usually calls loadGongSi
+                    target_link = page.locator(f"a:has-text('{target_name}')")
+                    
+                    if await target_link.count() == 0:
+                        logger.warning(f"Could not find link for {target_name}")
+                        continue
+                    
+                    logger.info(f"Found link for {target_name}, clicking...")
+                    
+                    # Handle both Popup and Modal (Dynamic check)
+                    async def open_section():
+                        async with self.rate_limiter.limit(self.BASE_URL):
+                            await target_link.first.click()
+
+                    popup = await waits.click_and_wait(context, page, open_section, self.FILE_LINKS, "section_open")
+                    target_page = popup or page # Default to current page (for modal)
+                    is_popup = popup is not None
+
+                    if is_popup:
+                        logger.info(f"Detected new popup window: {target_page.url}")
+                        await waits.load(target_page, "popup_load")
+                    else:
+                        logger.info("No new window detected, assuming in-page modal/content update.")
+                    
+                    try:
+                        # In the target page (popup or current), find files
+                        # File links usually contain .hwp, .pdf or are in a specific file list
                         
-                        logger.info(f"Found link for {target_name}, clicking...")
+                        # Wait for file list to appear
+                        if not await waits.selector(target_page, self.FILE_LINKS, "file_list"):
+                            logger.warning("No obvious file links found immediately.")
+
+                        # Search for attachments
+                        # The structure usually has a table with "첨부파일" (Attachment)
                         
-                        # Handle both Popup and Modal (Dynamic check)
-                        initial_pages = context.pages
-                        await target_link.first.click()
-                        await asyncio.sleep(4) # Wait for action (popup or modal load)
+                        files = await target_page.locator("a[href*='FileDown']").all() # Common pattern for gov sites
+                        if len(files) == 0:
+                            # Try generic extension search
+                            files = []
+                            all_links = await target_page.locator("a").all()
+                            for link in all_links:
+                                try:
+                                    href = await link.get_attribute("href")
+                                    text = await link.inner_text()
+                                    if href and ("down" in href.lower() or ".hwp" in text.lower() or ".pdf" in text.lower()):
+                                         if "미리보기" not in text:
+                                            files.append(link)
+                                except:
+                                    pass
                         
-                        new_pages = context.pages
-                        target_page = page # Default to current page (for modal)
-                        is_popup = False
-
-                        if len(new_pages) > len(initial_pages):
-                            target_page = new_pages[-1]
-                            is_popup = True
-                            logger.info(f"Detected new popup window: {target_page.url}")
-                            await target_page.wait_for_load_state("load")
-                        else:
-                            logger.info("No new window detected, assuming in-page modal/content update.")
+                        logger.info(f"Found {len(files)} potential files in target context for {target_name}")
                         
-                        try:
-                            # In the target page (popup or current), find files
-                            # File links usually contain .hwp, .pdf or are in a specific file list
-                            
-                            # Wait for file list to appear
+                        for i, file_link in enumerate(files):
                             try:
-                                await target_page.locator("a[href*='FileDown'], a:has-text('.hwp'), a:has-text('.pdf')").first.wait_for(state="visible", timeout=5000)
-                            except:
-                                logger.warning("No obvious file links found immediately.")
-
-                            # Search for attachments
-                            # The structure usually has a table with "첨부파일" (Attachment)
-                            
-                            files = await target_page.locator("a[href*='FileDown']").all() # Common pattern for gov sites
-                            if len(files) == 0:
-                                # Try generic extension search
-                                files = []
-                                all_links = await target_page.locator("a").all()
-                                for link in all_links:
-                                    try:
-                                        href = await link.get_attribute("href")
-                                        text = await link.inner_text()
-                                        if href and ("down" in href.lower() or ".hwp" in text.lower() or ".pdf" in text.lower()):
-                                             if "미리보기" not in text:
-                                                files.append(link)
-                                    except:
-                                        pass
-                            
-                            logger.info(f"Found {len(files)} potential files in target context for {target_name}")
-                            
-                            for i, file_link in enumerate(files):
-                                try:
-                                    # Get filename hint
-                                    text = await file_link.inner_text()
-                                    if not text.strip():
-                                        text = f"file_{i}"
+                                # Get filename hint
+                                text = await file_link.inner_text()
+                                if not text.strip():
+                                    text = f"file_{i}"
+                                
+                                logger.info(f"Downloading: {text}")
+                                
+                                async with waits.step("download"), self.rate_limiter.limit(self.BASE_URL), \
+                                        target_page.expect_download(timeout=waits.timeout("download")) as download_info:
+                                    await file_link.click()
+                                    download = await download_info.value
                                     
-                                    logger.info(f"Downloading: {text}")
+                                    # Sanitize filename
+                                    safe_filename = f"{target_name}_{download.suggested_filename}"
+                                    save_path = os.path.join(download_dir, safe_filename)
                                     
-                                    async with target_page.expect_download(timeout=30000) as download_info:
-                                        await file_link.click()
-                                        download = await download_info.value
-                                        
-                                        # Sanitize filename
-                                        safe_filename = f"{target_name}_{download.suggested_filename}"
-                                        save_path = os.path.join(download_dir, safe_filename)
-                                        
-                                        await download.save_as(save_path)
-                                        logger.info(f"✓ Downloaded: {save_path}")
-                                        download_count += 1
-                                        await asyncio.sleep(1)
-                                except Exception as dl_err:
-                                    logger.error(f"Download failed: {dl_err}")
-                            
-                            if is_popup:
-                                await target_page.close()
-                            
-                        except Exception as popup_err:
-                            logger.error(f"Failed to handle content for {target_name}: {popup_err}")
-
-                    if download_count > 0:
-                        logger.info(f"🎉 SUCCESS: Downloaded {download_count} specific requested files!")
-                    else:
-                        logger.warning("No files were successfully downloaded for the requested targets.")
+                                    await download.save_as(save_path)
+                                    logger.info(f"✓ Downloaded: {save_path}")
+                                    result.files.append(save_path)
+                                    download_count += 1
+                            except Exception as dl_err:
+                                logger.error(f"Download failed: {dl_err}")
+                        
+                        if is_popup:
+                            await target_page.close()
+                        
+                    except Exception as popup_err:
+                        logger.error(f"Failed to handle content for {target_name}: {popup_err}")
 
-                except Exception as result_err:
-                    logger.error(f"Failed to find or click search result: {result_err}")
-                    await page.screenshot(path=os.path.join(debug_dir, "error_result.png"))
+                if download_count > 0:
+                    logger.info(f"🎉 SUCCESS: Downloaded {download_count} specific requested files!")
+                else:
+                    logger.warning("No files were successfully downloaded for the requested targets.")
+
+            except Exception as result_err:
+                logger.error(f"Failed to find or click search result: {result_err}")
+                result.error = f"search result failed: {result_err}"
+                await page.screenshot(path=os.path.join(debug_dir, "error_result.png"))
+
+        except Exception as e:
+            logger.error(f"Browser Agent Failed: {e}")
+            result.error = str(e)
+            await page.screenshot(path=os.path.join(debug_dir, "error.png"))
+
+
+async def crawl_schools(school_names: List[str], pool_size: int = 2, headless: bool = True) -> List[BrowserCrawlResult]:
+    """Crawls several schools in parallel on a shared pool of warm browsers"""
+    async with BrowserPool(size=pool_size, headless=headless) as pool:
+        crawler = RealBrowserCrawler(pool=pool, headless=headless)
+        return await asyncio.gather(*(crawler.run(name) for name in school_names))
 
-            except Exception as e:
-                logger.error(f"Browser Agent Failed: {e}")
-                await page.screenshot(path=os.path.join(debug_dir, "error.png"))
-            finally:
-                await browser.close()
 
 if __name__ == "__main__":
-    crawler = RealBrowserCrawler()
-    asyncio.run(crawler.run())
+    names = sys.argv[1:] or ["동도중학교"]
+    pool_size = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+    for result in asyncio.run(crawl_schools(names, pool_size)):
+        status = "ok" if result.ok else f"failed: {result.error}"
+        logger.info(f"{result.school_name}: {len(result.files)} files, {status}")
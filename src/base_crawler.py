@@ -1,15 +1,33 @@
-
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional
+import asyncio
+import importlib.util
 import httpx
 import logging
 from .exceptions import CrawlerException, CrawlerTimeoutError
+from .metrics import CRAWLER_RETRIES
+from .rate_limit import RATE_LIMITER, HostRateLimiter
+from .retry import RetryPolicy
 
 logger = logging.getLogger(__name__)
 
 class BaseCrawler(ABC):
     """
     Abstract base class for all crawlers
+
+    Requests go through one long-lived pooled httpx.AsyncClient, so
+    connections (and their TCP/TLS handshakes) are reused across calls.
+    The client is created on first use; close it with ``await close()`` or
+    by using the crawler as an async context manager.
+
+    Failed requests are retried according to ``retry_policy`` (exponential
+    backoff with jitter, Retry-After, retry budget); by default a
+    RetryPolicy with ``max_retries`` retries. Pass one policy to several
+    crawlers to make them share a retry budget.
+
+    Every attempt also takes a slot and a token from ``rate_limiter``
+    (by default the process-wide RATE_LIMITER), whose per-host rate
+    backs off on 429/503 responses.
     """
     
     def __init__(
@@ -17,38 +35,109 @@ class BaseCrawler(ABC):
         base_url: str,
         timeout: int = 30,
         max_retries: int = 3,
-        headers: Optional[Dict[str, str]] = None
+        headers: Optional[Dict[str, str]] = None,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        http2: bool = True,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[HostRateLimiter] = None
     ):
         self.base_url = base_url
         self.timeout = timeout
-        self.max_retries = max_retries
+        self.retry_policy = retry_policy or RetryPolicy(max_retries=max_retries)
+        self.max_retries = self.retry_policy.max_retries
+        self.rate_limiter = rate_limiter or RATE_LIMITER
         self.headers = headers or {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         }
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        # HTTP/2 needs the optional h2 package (httpx[http2])
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        if http2 and not self.http2:
+            logger.warning("h2 is not installed, crawler falls back to HTTP/1.1 (pip install 'httpx[http2]')")
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_lock = asyncio.Lock()
 
     @abstractmethod
     async def fetch(self, resource_id: str) -> Dict[str, Any]:
         """Fetch resource by ID"""
         pass
 
-    async def _get(
-        self,
-        url: str,
-        params: Optional[Dict] = None,
-        retry_count: int = 0
-    ) -> httpx.Response:
+    # ============= Client lifecycle =============
+
+    async def open(self) -> httpx.AsyncClient:
+        """Returns the shared client, creating it on first use"""
+        if self._client is None or self._client.is_closed:
+            async with self._client_lock:
+                if self._client is None or self._client.is_closed:
+                    self._client = httpx.AsyncClient(
+                        headers=self.headers,
+                        timeout=self.timeout,
+                        limits=self.limits,
+                        http2=self.http2
+                    )
+        return self._client
+
+    async def close(self):
+        """Closes the shared client and its pooled connections"""
+        client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def _get(self, url: str, params: Optional[Dict] = None) -> httpx.Response:
         """Helper method for GET requests with retry logic"""
-        async with httpx.AsyncClient(headers=self.headers, timeout=self.timeout) as client:
+        client = await self.open()
+        policy = self.retry_policy
+        retry = 0
+
+        while True:
+            policy.budget.record_request()
             try:
-                response = await client.get(url, params=params)
+                async with self.rate_limiter.limit(url):
+                    response = await client.get(url, params=params)
+                self.rate_limiter.record(url, response.status_code)
                 response.raise_for_status()
                 return response
-            except httpx.TimeoutException:
-                if retry_count < self.max_retries:
-                    logger.warning(f"Timeout crawling {url}, retrying ({retry_count + 1}/{self.max_retries})")
-                    return await self._get(url, params, retry_count + 1)
-                raise CrawlerTimeoutError(f"Timeout crawling {url} after {self.max_retries} retries")
-            except httpx.HTTPError as e:
-                raise CrawlerException(f"HTTP Error crawling {url}: {str(e)}")
             except Exception as e:
-                raise CrawlerException(f"Unexpected error crawling {url}: {str(e)}")
+                if not policy.is_retryable(e):
+                    raise self._crawler_error(url, e)
+
+                failed_response = e.response if isinstance(e, httpx.HTTPStatusError) else None
+                delay = policy.delay(retry, failed_response)
+                if delay is None:
+                    raise self._crawler_error(url, e, retry)
+                if not policy.budget.try_acquire():
+                    logger.warning(f"Retry budget exhausted, not retrying {url}")
+                    raise self._crawler_error(url, e, retry)
+                if failed_response is not None:
+                    await failed_response.aclose()
+
+                reason = policy.reason(e)
+                retry += 1
+                CRAWLER_RETRIES.inc(crawler=type(self).__name__, reason=reason)
+                logger.warning(
+                    f"{reason} crawling {url}, retrying in {delay:.2f}s ({retry}/{policy.max_retries})"
+                )
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def _crawler_error(url: str, error: Exception, retries: int = 0) -> CrawlerException:
+        if isinstance(error, httpx.TimeoutException):
+            return CrawlerTimeoutError(f"Timeout crawling {url} after {retries} retries")
+        if isinstance(error, httpx.HTTPError):
+            suffix = f" after {retries} retries" if retries else ""
+            return CrawlerException(f"HTTP Error crawling {url}{suffix}: {str(error)}")
+        return CrawlerException(f"Unexpected error crawling {url}: {str(error)}")
@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Callable, List, Optional
+
+from playwright.async_api import async_playwright
+
+logger = logging.getLogger(__name__)
+
+# Anti-detection launch flags and context settings used for every browser
+LAUNCH_ARGS = [
+    "--disable-blink-features=AutomationControlled",
+    "--no-sandbox",
+    "--disable-setuid-sandbox",
+    "--disable-infobars",
+    "--window-size=1920,1080",
+    "--start-maximized",
+    "--disable-dev-shm-usage",  # Overcome limited resource problems
+]
+CONTEXT_OPTIONS = {
+    "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36",
+    "viewport": {"width": 1920, "height": 1080},
+    "locale": "ko-KR",
+    "timezone_id": "Asia/Seoul",
+    "accept_downloads": True
+}
+STEALTH_SCRIPT = """
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined
+    });
+"""
+
+
+async def launch_browser(playwright, headless: bool = True):
+    return await playwright.chromium.launch(headless=headless, args=LAUNCH_ARGS)
+
+
+async def new_context(browser):
+    context = await browser.new_context(**CONTEXT_OPTIONS)
+    await context.add_init_script(STEALTH_SCRIPT)
+    return context
+
+
+class _PooledBrowser:
+    """One warm browser with its context, and how often it has been leased"""
+
+    def __init__(self, browser, context):
+        self.browser = browser
+        self.context = context
+        self.uses = 0
+        self.created_at = time.monotonic()
+
+    def is_healthy(self) -> bool:
+        try:
+            return self.browser.is_connected()
+        except Exception:
+            return False
+
+    async def close(self):
+        try:
+            await self.browser.close()
+        except Exception as e:
+            logger.warning(f"Closing pooled browser failed: {e}")
+
+
+class BrowserPool:
+    """
+    Pool of warm Chromium instances, each with one ready browser context.
+
+    ``lease()`` hands out a context (waiting while all ``size`` browsers are
+    in use) and returns it afterwards with its pages closed, so the next
+    school reuses the running browser instead of cold-starting Chromium.
+    A browser is relaunched when it fails the health check (disconnected or
+    crashed), when the lease ended with an error, or after ``max_uses``
+    leases, which bounds memory growth and cookie/session carry-over.
+    Browsers are launched lazily, up to ``size``.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        max_uses: int = 20,
+        headless: bool = True,
+        playwright_factory: Callable[[], Any] = async_playwright
+    ):
+        if size < 1 or max_uses < 1:
+            raise ValueError("size and max_uses must be at least 1")
+        self.size = size
+        self.max_uses = max_uses
+        self.headless = headless
+        self._playwright_factory = playwright_factory
+        self._playwright = None
+        self._idle: "asyncio.Queue[_PooledBrowser]" = asyncio.Queue()
+        self._slots = asyncio.Semaphore(size)
+        self._all: List[_PooledBrowser] = []
+        self._start_lock = asyncio.Lock()
+        self._closed = False
+        self.launched = 0
+        self.recycled = 0
+
+    async def _ensure_playwright(self):
+        async with self._start_lock:
+            if self._playwright is None:
+                self._playwright = await self._playwright_factory().start()
+        return self._playwright
+
+    async def _launch(self) -> _PooledBrowser:
+        playwright = await self._ensure_playwright()
+        browser = await launch_browser(playwright, self.headless)
+        try:
+            context = await new_context(browser)
+        except Exception:
+            await browser.close()
+            raise
+        entry = _PooledBrowser(browser, context)
+        self._all.append(entry)
+        self.launched += 1
+        logger.info(f"Launched pooled browser ({len(self._all)}/{self.size})")
+        return entry
+
+    async def _discard(self, entry: _PooledBrowser):
+        if entry in self._all:
+            self._all.remove(entry)
+        self.recycled += 1
+        await entry.close()
+
+    async def acquire(self) -> _PooledBrowser:
+        if self._closed:
+            raise RuntimeError("Browser pool is closed")
+        await self._slots.acquire()
+        try:
+            while not self._idle.empty():
+                entry = self._idle.get_nowait()
+                if entry.is_healthy():
+                    entry.uses += 1
+                    return entry
+                logger.warning("Pooled browser failed health check, relaunching")
+                await self._discard(entry)
+            entry = await self._launch()
+            entry.uses += 1
+            return entry
+        except BaseException:
+            self._slots.release()
+            raise
+
+    async def release(self, entry: _PooledBrowser, healthy: bool = True):
+        try:
+            if self._closed or not healthy or not entry.is_healthy() or entry.uses >= self.max_uses:
+                await self._discard(entry)
+                return
+            try:
+                # Popups and the crawl page go; the context (and its warm session) stays
+                for page in list(entry.context.pages):
+                    await page.close()
+            except Exception as e:
+                logger.warning(f"Resetting pooled context failed, relaunching: {e}")
+                await self._discard(entry)
+                return
+            self._idle.put_nowait(entry)
+        finally:
+            self._slots.release()
+
+    @asynccontextmanager
+    async def lease(self):
+        """Browser context for one crawl: ``async with pool.lease() as context``"""
+        entry = await self.acquire()
+        healthy = True
+        try:
+            yield entry.context
+        except BaseException:
+            healthy = False
+            raise
+        finally:
+            await self.release(entry, healthy)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "browsers": len(self._all),
+            "idle": self._idle.qsize(),
+            "launched": self.launched,
+            "recycled": self.recycled
+        }
+
+    async def close(self):
+        self._closed = True
+        entries, self._all = self._all, []
+        while not self._idle.empty():
+            self._idle.get_nowait()
+        for entry in entries:
+            await entry.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
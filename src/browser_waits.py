@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, Optional
+
+try:
+    from .metrics import BROWSER_STEP_SECONDS
+    from .tracing import span
+except ImportError:  # run as a script: python src/agent_crawler.py
+    from metrics import BROWSER_STEP_SECONDS
+    from tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Per-step timeouts (ms): how long to wait for the page to become ready
+DEFAULT_TIMEOUTS = {
+    "home_load": 30000,
+    "home_settle": 5000,
+    "search_input": 10000,
+    "search_results": 15000,
+    "detail_open": 30000,
+    "detail_load": 60000,
+    "detail_settle": 5000,
+    "year_select": 15000,
+    "tab": 5000,
+    "section_open": 10000,
+    "popup_load": 30000,
+    "file_list": 5000,
+    "download": 30000,
+}
+
+
+class StepWaits:
+    """
+    Event-driven waits between browser steps.
+
+    Each wait returns as soon as the page is ready (a selector is visible,
+    a load state is reached, a popup or download event fires) and gives up
+    after that step's timeout. Wall time per step, waits included, is
+    accumulated in ``durations`` and observed into BROWSER_STEP_SECONDS.
+    Optional readiness waits return False instead of raising, so a page
+    that never goes network-idle costs one timeout rather than the crawl.
+    """
+
+    def __init__(self, timeouts: Optional[Dict[str, float]] = None):
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self.durations: Dict[str, float] = {}
+
+    def timeout(self, step: str) -> float:
+        return self.timeouts.get(step, 10000)
+
+    @asynccontextmanager
+    async def step(self, name: str):
+        start = time.perf_counter()
+        try:
+            with span(f"browser.{name}"):
+                yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.durations[name] = self.durations.get(name, 0.0) + elapsed
+            BROWSER_STEP_SECONDS.observe(elapsed, step=name)
+
+    async def load(self, page, step: str, state: str = "load") -> bool:
+        """Waits for a load state ("load", "domcontentloaded", "networkidle")"""
+        async with self.step(step):
+            try:
+                await page.wait_for_load_state(state, timeout=self.timeout(step))
+                return True
+            except Exception as e:
+                logger.info(f"Step {step}: page not {state} after {self.timeout(step):.0f}ms ({e})")
+                return False
+
+    async def selector(self, page, selector: str, step: str, state: str = "visible") -> bool:
+        """Waits for the first element matching selector to reach state"""
+        async with self.step(step):
+            try:
+                await page.locator(selector).first.wait_for(state=state, timeout=self.timeout(step))
+                return True
+            except Exception as e:
+                logger.info(f"Step {step}: {selector} not {state} after {self.timeout(step):.0f}ms ({e})")
+                return False
+
+    async def click_and_wait(
+        self,
+        context,
+        page,
+        action: Callable[[], Awaitable],
+        selector: str,
+        step: str
+    ):
+        """
+        Runs action (a click) and waits for whichever comes first: a new page
+        (popup) in the context, or a new match of selector becoming visible on
+        page (content opened in place). Returns the popup page, or None.
+
+        Matches already on the page before the click do not count, so links
+        left over from an earlier section cannot end the wait early: the wait
+        is for the match after the ones counted before the click.
+        """
+        popup = asyncio.get_running_loop().create_future()
+        matches = page.locator(selector)
+        existing = await matches.count()
+
+        def on_page(new_page):
+            if not popup.done():
+                popup.set_result(new_page)
+
+        # Registered before the click so an immediate popup is not missed
+        context.once("page", on_page)
+        async with self.step(step):
+            try:
+                await action()
+                content = asyncio.ensure_future(
+                    matches.nth(existing).wait_for(state="visible", timeout=self.timeout(step))
+                )
+                try:
+                    await asyncio.wait(
+                        {popup, content},
+                        timeout=self.timeout(step) / 1000,
+                        return_when=asyncio.FIRST_COMPLETED
+                    )
+                finally:
+                    if not content.done():
+                        content.cancel()
+                    await asyncio.gather(content, return_exceptions=True)
+            finally:
+                context.remove_listener("page", on_page)
+
+        if popup.done():
+            return popup.result()
+        if content.cancelled() or content.exception() is not None:
+            logger.info(f"Step {step}: no popup and no new {selector} after {self.timeout(step):.0f}ms")
+        return None
+
+    def summary(self) -> Dict[str, float]:
+        """Step -> seconds, rounded for logging"""
+        return {step: round(seconds, 3) for step, seconds in self.durations.items()}
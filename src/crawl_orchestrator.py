@@ -0,0 +1,224 @@
+import asyncio
+import inspect
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from .tracing import TRACER, annotate
+
+logger = logging.getLogger(__name__)
+
+# Called with (school_code, year, downloaded files) once a school is downloaded;
+# returns the ingest job ids it created (sync or async)
+IngestCallback = Callable[[str, int, List[str]], Union[List[str], Awaitable[List[str]]]]
+
+
+class CrawlManifest:
+    """
+    Per-school crawl results appended as JSON Lines, so an interrupted
+    batch crawl can be resumed: schools recorded as done are skipped.
+    The last record of a school wins.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._records: Dict[str, dict] = {}
+
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Last line cut off by a crash
+                        continue
+                    self._records[record["key"]] = record
+
+    @staticmethod
+    def key(school_code: str, year: int) -> str:
+        return f"{school_code}/{year}"
+
+    def get(self, school_code: str, year: int) -> Optional[dict]:
+        return self._records.get(self.key(school_code, year))
+
+    def is_done(self, school_code: str, year: int) -> bool:
+        record = self.get(school_code, year)
+        return record is not None and record["status"] == "done"
+
+    def has_failed(self, school_code: str, year: int) -> bool:
+        record = self.get(school_code, year)
+        return record is not None and record["status"] == "failed"
+
+    def record(self, school_code: str, year: int, status: str, **details) -> dict:
+        previous = self.get(school_code, year)
+        record = {
+            "key": self.key(school_code, year),
+            "school_code": school_code,
+            "year": year,
+            "status": status,
+            "attempts": (previous or {}).get("attempts", 0) + 1,
+            "finished_at": time.time(),
+            **details
+        }
+        self._records[record["key"]] = record
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        return record
+
+    def summary(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for record in self._records.values():
+            counts[record["status"]] = counts.get(record["status"], 0) + 1
+        return counts
+
+
+@dataclass
+class CrawlStats:
+    total: int = 0
+    skipped: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    files: int = 0
+    ingest_jobs: int = 0
+    elapsed: float = 0.0
+    failures: List[dict] = field(default_factory=list)
+
+    @property
+    def schools_per_min(self) -> float:
+        processed = self.succeeded + self.failed
+        return processed * 60 / self.elapsed if self.elapsed > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "total": self.total,
+            "skipped": self.skipped,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "files": self.files,
+            "ingest_jobs": self.ingest_jobs,
+            "elapsed_sec": round(self.elapsed, 3),
+            "schools_per_min": round(self.schools_per_min, 3),
+            "failures": self.failures
+        }
+
+
+class CrawlOrchestrator:
+    """
+    Crawls many (school, year) pairs concurrently.
+
+    At most ``concurrency`` schools are in flight at once; requests to the
+    same host are further paced by the crawler's rate limiter. Each result
+    is written to the manifest as soon as it is known, and the downloaded
+    files are handed to ``on_downloaded`` (typically submitting ingest
+    jobs), so indexing starts while the rest of the region is still being
+    crawled. A school only counts as done once its files were handed off.
+
+    ``crawler`` is anything with ``download_teaching_plans(school_code,
+    year) -> List[str]``: SchoolInfoCrawler, or RealBrowserCrawler to crawl
+    through pooled browsers. Requests to one host never exceed the rate
+    limiter's ``max_concurrent`` (CRAWLER_MAX_CONCURRENT_PER_HOST), so a
+    ``concurrency`` above it only overlaps the work done outside a request
+    (file generation, ingest hand-off) with the downloads of other schools.
+    """
+
+    def __init__(
+        self,
+        crawler,
+        manifest: CrawlManifest,
+        concurrency: int = 4,
+        on_downloaded: Optional[IngestCallback] = None,
+        retry_failed: bool = True
+    ):
+        self.crawler = crawler
+        self.manifest = manifest
+        self.concurrency = max(1, concurrency)
+        self.on_downloaded = on_downloaded
+        self.retry_failed = retry_failed
+        self.stats = CrawlStats()
+        self.running = False
+
+    @staticmethod
+    def targets(school_codes: Iterable[str], years: Iterable[int]) -> List[Tuple[str, int]]:
+        """Unique (school_code, year) pairs, in input order"""
+        years = list(years)
+        seen = {}
+        for school_code in school_codes:
+            for year in years:
+                seen.setdefault((school_code, int(year)), None)
+        return list(seen)
+
+    async def run(self, targets: List[Tuple[str, int]]) -> CrawlStats:
+        self.stats = stats = CrawlStats(total=len(targets))
+        pending = []
+        for school_code, year in targets:
+            if self.manifest.is_done(school_code, year) or (
+                not self.retry_failed and self.manifest.has_failed(school_code, year)
+            ):
+                stats.skipped += 1
+            else:
+                pending.append((school_code, year))
+
+        logger.info(f"Batch crawl: {len(pending)} schools to crawl, {stats.skipped} already done")
+        limiter = getattr(self.crawler, "rate_limiter", None)
+        if limiter is not None and self.concurrency > limiter.max_concurrent:
+            logger.info(
+                f"Batch crawl concurrency {self.concurrency} exceeds the per-host limit "
+                f"{limiter.max_concurrent}: at most {limiter.max_concurrent} requests run at once"
+            )
+        semaphore = asyncio.Semaphore(self.concurrency)
+        start = time.perf_counter()
+        self.running = True
+
+        async def crawl(school_code: str, year: int):
+            async with semaphore:
+                await self._crawl_one(school_code, year, stats)
+                stats.elapsed = time.perf_counter() - start
+
+        try:
+            await asyncio.gather(*(crawl(school_code, year) for school_code, year in pending))
+        finally:
+            self.running = False
+            stats.elapsed = time.perf_counter() - start
+
+        logger.info(
+            f"Batch crawl done: {stats.succeeded} succeeded, {stats.failed} failed, "
+            f"{stats.skipped} skipped in {stats.elapsed:.1f}s"
+        )
+        return stats
+
+    async def _crawl_one(self, school_code: str, year: int, stats: CrawlStats):
+        with TRACER.trace("crawl.school", school_code=school_code, year=year):
+            try:
+                files = await self.crawler.download_teaching_plans(school_code, year)
+            except Exception as e:
+                self._fail(school_code, year, f"download failed: {e}", stats)
+                return
+
+            job_ids: List[str] = []
+            if self.on_downloaded is not None and files:
+                try:
+                    result = self.on_downloaded(school_code, year, files)
+                    job_ids = list(await result if inspect.isawaitable(result) else result or [])
+                except Exception as e:
+                    self._fail(school_code, year, f"ingest submit failed: {e}", stats, files=files)
+                    return
+            annotate(files=len(files), ingest_jobs=len(job_ids))
+
+        self.manifest.record(school_code, year, "done", files=files, job_ids=job_ids)
+        stats.succeeded += 1
+        stats.files += len(files)
+        stats.ingest_jobs += len(job_ids)
+
+    def _fail(self, school_code: str, year: int, error: str, stats: CrawlStats, **details: Any):
+        logger.error(f"Batch crawl failed for {school_code} ({year}): {error}")
+        self.manifest.record(school_code, year, "failed", error=error, **details)
+        stats.failed += 1
+        stats.failures.append({"school_code": school_code, "year": year, "error": error})
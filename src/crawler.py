@@ -6,6 +6,7 @@ from bs4 import BeautifulSoup
 from .base_crawler import BaseCrawler
 from .models import SchoolData, Curriculum, Subject, AchievementStat
 from .exceptions import SchoolNotFoundError, CrawlerException
+from .tracing import span, annotate
 
 logger = logging.getLogger(__name__)
 
@@ -16,13 +17,17 @@ class SchoolInfoCrawler(BaseCrawler):
     
     BASE_URL = "https://www.schoolinfo.go.kr"
 
+    @span("crawler.download_teaching_plans")
     async def download_teaching_plans(self, school_code: str, year: int) -> List[str]:
+        annotate(school_code=school_code, year=year)
         # Simulate network latency
         import asyncio
         import random
         delay = random.uniform(1.5, 3.5)
         logger.info(f"Connecting to schoolinfo.go.kr (Lat: {delay:.2f}s)...")
-        await asyncio.sleep(delay)
+        with span("crawler.connect"):
+            async with self.rate_limiter.limit(self.BASE_URL):
+                await asyncio.sleep(delay)
 
         logger.info(f"Downloading Teaching Plans (4-ga) for {school_code} ({year})...")
         
@@ -99,7 +104,8 @@ class SchoolInfoCrawler(BaseCrawler):
                     "curriculum_content": curriculum_content
                 }
                 try:
-                    typst_gen.compile(template_path, data, pdf_path)
+                    # Typst runs as a subprocess; keep the event loop free for the other schools
+                    await asyncio.to_thread(typst_gen.compile, template_path, data, pdf_path)
                     logger.info(f"Generated Typst mock: {fname}")
                 except Exception as e:
                     logger.error(f"Typst generation failed: {e}")
@@ -34,3 +34,7 @@ class RAGException(MathesisBaseException):
 class ExportException(MathesisBaseException):
     """Base exception for Export/Report errors"""
     pass
+
+class WorkerPoolFullError(MathesisBaseException):
+    """Raised when a worker pool has no free worker or queue slot"""
+    pass
@@ -7,6 +7,8 @@ import re
 from typing import Dict, Any, Optional
 from pathlib import Path
 
+from .tracing import span
+
 logger = logging.getLogger(__name__)
 
 class TypstGenerator:
@@ -36,20 +38,21 @@ class TypstGenerator:
         """
         Compiles a Typst template with the given data.
         """
-        try:
-            data_file = Path(output_path).with_suffix('.json')
-            with open(data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            
-            data_abs_path = str(data_file.absolute())
-            # Root / allows absolute paths
-            cmd = ["typst", "compile", "--root", "/", template_path, output_path] + self.font_arg
-            cmd += ["--input", f"data_file={data_abs_path}"]
-            
-            logger.info(f"Compiling: {' '.join(cmd)}")
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            logger.info(f"Typst compiled successfully: {output_path}")
-            
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Typst compilation failed: {e.stderr}")
-            raise RuntimeError(f"Typst Error: {e.stderr}")
+        with span("typst.compile", template=os.path.basename(template_path), output=os.path.basename(output_path)):
+            try:
+                data_file = Path(output_path).with_suffix('.json')
+                with open(data_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False, indent=2)
+
+                data_abs_path = str(data_file.absolute())
+                # Root / allows absolute paths
+                cmd = ["typst", "compile", "--root", "/", template_path, output_path] + self.font_arg
+                cmd += ["--input", f"data_file={data_abs_path}"]
+
+                logger.info(f"Compiling: {' '.join(cmd)}")
+                result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+                logger.info(f"Typst compiled successfully: {output_path}")
+
+            except subprocess.CalledProcessError as e:
+                logger.error(f"Typst compilation failed: {e.stderr}")
+                raise RuntimeError(f"Typst Error: {e.stderr}")
@@ -0,0 +1,272 @@
+import json
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from itertools import islice
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy 없으면 순수 Python 내적으로 계산
+    np = None
+
+from .embedding_cache import normalize_text
+from ..metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+
+class AnswerCache:
+    """
+    /rag/query 답변 캐시 (2단계)
+
+    1. 정규화된 질문 + 필터가 같으면 바로 반환
+    2. 필터가 같은 항목 중 질문 임베딩의 코사인 유사도가 threshold 이상인 가장 가까운 답변 반환
+
+    2단계 후보는 필터별 색인에서 최근 사용된 max_candidates개만 잠금 안에서 복사하고,
+    유사도 계산은 잠금 밖에서 함 (numpy가 있으면 행렬 곱)
+    답변의 sources에 포함된 document_id가 다시 색인되면 해당 항목은 삭제됨
+    (get 전에 받은 generation()을 put에 넘기면, 그 사이 무효화된 문서를 인용한 답변은 저장하지 않음)
+    """
+
+    def __init__(
+        self,
+        embed_fn: Optional[Callable[[str], Sequence[float]]] = None,
+        max_entries: int = 1000,
+        similarity_threshold: float = 0.95,
+        ttl: Optional[float] = None,
+        max_candidates: int = 256
+    ):
+        """
+        Args:
+            embed_fn: 질문 임베딩 함수 (없으면 2단계 비활성)
+            max_entries: 최대 항목 수 (오래 사용되지 않은 항목부터 삭제)
+            similarity_threshold: 2단계 매칭 최소 코사인 유사도
+            ttl: 항목 유효 시간(초), None이면 무제한
+            max_candidates: 2단계에서 비교할 같은 필터의 최근 항목 수
+        """
+        self.embed_fn = embed_fn
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.ttl = ttl
+        self.max_candidates = max_candidates
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._by_document: Dict[str, Set[str]] = {}
+        # 필터 키 -> (항목 키 -> 임베딩), 최근 사용 순
+        self._by_filters: Dict[str, "OrderedDict[str, List[float]]"] = {}
+        # 무효화할 때마다 증가, 문서별 마지막 무효화 시점
+        self._generation = 0
+        self._invalidated_at: Dict[str, int] = {}
+        self.hits = {"exact": 0, "semantic": 0}
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _filters_key(filters: Optional[Dict[str, str]]) -> str:
+        return json.dumps(
+            {k: str(v) for k, v in (filters or {}).items() if v is not None},
+            sort_keys=True,
+            ensure_ascii=False
+        )
+
+    def _key(self, question: str, filters: Optional[Dict[str, str]]) -> str:
+        return f"{self._filters_key(filters)}\x00{normalize_text(question)}"
+
+    # ============= Access =============
+
+    def get(self, question: str, filters: Optional[Dict[str, str]] = None) -> Optional[dict]:
+        """캐시된 답변, 없으면 None"""
+        key = self._key(question, filters)
+
+        with self._lock:
+            self._expire()
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._touch(key, entry)
+                self.hits["exact"] += 1
+                record_cache("answer", hits=1)
+                return entry["response"]
+
+        embedding = self._embed(question)
+        if embedding is not None:
+            filters_key = self._filters_key(filters)
+            with self._lock:
+                index = self._by_filters.get(filters_key)
+                candidates = list(islice(reversed(index.items()), self.max_candidates)) if index else []
+
+            best_key, best_score = self._best_match(embedding, candidates)
+            if best_key is not None:
+                with self._lock:
+                    # 계산하는 동안 삭제되었을 수 있음
+                    entry = self._entries.get(best_key)
+                    if entry is not None:
+                        self._touch(best_key, entry)
+                        self.hits["semantic"] += 1
+                        record_cache("answer", hits=1)
+                        logger.debug(f"Semantic answer cache hit ({best_score:.3f}): {question}")
+                        return entry["response"]
+
+        with self._lock:
+            self.misses += 1
+        record_cache("answer", misses=1)
+        return None
+
+    def generation(self) -> int:
+        """현재 무효화 세대 (답변 생성 전에 받아 put에 전달)"""
+        with self._lock:
+            return self._generation
+
+    def put(
+        self,
+        question: str,
+        filters: Optional[Dict[str, str]],
+        response: dict,
+        generation: Optional[int] = None
+    ) -> bool:
+        """
+        답변 저장 (sources의 document_id로 무효화 대상 등록)
+
+        Args:
+            generation: 답변 생성 전에 받은 generation(), 그 이후 sources 중 무효화된
+                문서가 있으면 (이미 지난 내용으로 만든 답변이므로) 저장하지 않음
+
+        Returns:
+            저장 여부
+        """
+        key = self._key(question, filters)
+        document_ids = {
+            s["document_id"] for s in response.get("sources", []) if s.get("document_id")
+        }
+        embedding = self._embed(question)
+
+        filters_key = self._filters_key(filters)
+
+        with self._lock:
+            if generation is not None and any(
+                self._invalidated_at.get(doc_id, -1) > generation for doc_id in document_ids
+            ):
+                logger.debug(f"Dropping stale answer (re-indexed while generating): {question}")
+                return False
+
+            self._remove(key)
+            self._entries[key] = {
+                "filters": filters_key,
+                "embedding": embedding,
+                "response": response,
+                "document_ids": document_ids,
+                "created_at": time.monotonic()
+            }
+            for doc_id in document_ids:
+                self._by_document.setdefault(doc_id, set()).add(key)
+            if embedding is not None:
+                self._by_filters.setdefault(filters_key, OrderedDict())[key] = embedding
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+        return True
+
+    def invalidate_document(self, document_id: str) -> int:
+        """document_id를 출처로 사용한 답변 삭제, 삭제된 수 반환"""
+        with self._lock:
+            self._generation += 1
+            self._invalidated_at[document_id] = self._generation
+            keys = list(self._by_document.get(document_id, ()))
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+
+        if keys:
+            logger.info(f"Invalidated {len(keys)} cached answers for {document_id}")
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_document.clear()
+            self._by_filters.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": dict(self.hits),
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ============= Internals =============
+
+    def _embed(self, question: str) -> Optional[List[float]]:
+        """정규화된(길이 1) 질문 임베딩, 실패 시 None (2단계만 건너뜀)"""
+        if self.embed_fn is None:
+            return None
+
+        try:
+            vector = list(self.embed_fn(normalize_text(question)))
+        except Exception as e:
+            logger.warning(f"Question embedding failed, skipping semantic cache: {e}")
+            return None
+
+        norm = math.sqrt(sum(x * x for x in vector))
+        return [x / norm for x in vector] if norm else None
+
+    def _best_match(
+        self,
+        embedding: List[float],
+        candidates: List[Tuple[str, List[float]]]
+    ) -> Tuple[Optional[str], float]:
+        """threshold 이상인 가장 가까운 후보 (잠금 밖에서 호출)"""
+        if not candidates:
+            return None, self.similarity_threshold
+
+        if np is not None:
+            scores = np.asarray([vector for _, vector in candidates]) @ np.asarray(embedding)
+            best = int(np.argmax(scores))
+            score = float(scores[best])
+            if score >= self.similarity_threshold:
+                return candidates[best][0], score
+            return None, self.similarity_threshold
+
+        best_key, best_score = None, self.similarity_threshold
+        for candidate_key, vector in candidates:
+            score = sum(a * b for a, b in zip(embedding, vector))
+            if score >= best_score and (best_key is None or score > best_score):
+                best_key, best_score = candidate_key, score
+        return best_key, best_score
+
+    def _touch(self, key: str, entry: dict):
+        self._entries.move_to_end(key)
+        index = self._by_filters.get(entry["filters"])
+        if index is not None and key in index:
+            index.move_to_end(key)
+
+    def _expire(self):
+        if self.ttl is None:
+            return
+        deadline = time.monotonic() - self.ttl
+        for key in [k for k, e in self._entries.items() if e["created_at"] < deadline]:
+            self._remove(key)
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        index = self._by_filters.get(entry["filters"])
+        if index is not None:
+            index.pop(key, None)
+            if not index:
+                del self._by_filters[entry["filters"]]
+        for doc_id in entry["document_ids"]:
+            keys = self._by_document.get(doc_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_document[doc_id]
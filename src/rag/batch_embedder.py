@@ -0,0 +1,219 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import httpx
+
+from .embedding_cache import DEFAULT_MODEL_LABEL, embedding_model_of, model_kwargs
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingEmbed:
+    """One embed() call waiting to be sent in a batch"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.vector: Optional[List[float]] = None
+        self.error: Optional[BaseException] = None
+        self.done = threading.Event()
+
+
+class BatchingEmbedder:
+    """
+    Embeds many texts in fixed-size batches with a bounded number of
+    batches in flight at once.
+
+    A batch is one request: the client's embed_batch(texts, model=...) if
+    it has one, otherwise Ollama's POST {base_url}/api/embed with
+    ``input=[...]`` (needs base_url and a known model: ``model`` or the
+    client's ``embedding_model``). Only without either are the texts of a
+    batch embedded one by one, with just the batches running concurrently.
+    /api/embed returns L2-normalised vectors. Per-batch latency is recorded
+    for stats().
+
+    Single embed() calls from concurrent threads (parallel ingests, query
+    workers) are coalesced: a call that finds all max_in_flight batches
+    busy queues its text, and the next free slot sends everything queued
+    (up to batch_size) as one batch. An idle embedder sends a call at once.
+    """
+
+    def __init__(
+        self,
+        client,
+        batch_size: int = 32,
+        max_in_flight: int = 4,
+        model: Optional[str] = None,
+        latency_window: int = 1000,
+        base_url: Optional[str] = None,
+        timeout: float = 120.0
+    ):
+        if batch_size < 1 or max_in_flight < 1:
+            raise ValueError("batch_size and max_in_flight must be >= 1")
+
+        self.client = client
+        self.batch_size = batch_size
+        self.max_in_flight = max_in_flight
+        self.model = model
+
+        # Keep-alive connections, one per batch in flight
+        self._http = httpx.Client(
+            base_url=base_url.rstrip("/"),
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_in_flight)
+        ) if base_url else None
+        self._warned_unbatched = False
+
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="embed")
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+        self._pending: Dict[str, "deque[_PendingEmbed]"] = {}
+        self._lock = threading.Lock()
+        self._latencies: "deque[float]" = deque(maxlen=latency_window)
+        self._batches = 0
+        self._texts = 0
+        self._errors = 0
+
+    def embed_many(self, texts: Sequence[str], model: Optional[str] = None) -> List[List[float]]:
+        """Embeddings in input order"""
+        model = model or self.model
+        batches = [
+            list(texts[i:i + self.batch_size])
+            for i in range(0, len(texts), self.batch_size)
+        ]
+        if not batches:
+            return []
+        if len(batches) == 1:
+            return self._send(batches[0], model)
+
+        futures = [self._executor.submit(self._send, batch, model) for batch in batches]
+        vectors: List[List[float]] = []
+        for future in futures:
+            vectors.extend(future.result())
+        return vectors
+
+    def embed(self, text: str, model: Optional[str] = None) -> List[float]:
+        """One embedding, sent together with other threads' concurrent calls"""
+        model = model or self.model
+        pending = _PendingEmbed(text)
+        with self._lock:
+            self._pending.setdefault(model, deque()).append(pending)
+
+        with self._in_flight:
+            with self._lock:
+                queue = self._pending[model]
+                batch = [queue.popleft() for _ in range(min(self.batch_size, len(queue)))]
+            if batch:
+                try:
+                    vectors = self._embed_batch([p.text for p in batch], model)
+                    for p, vector in zip(batch, vectors):
+                        p.vector = vector
+                except BaseException as e:
+                    for p in batch:
+                        p.error = e
+                finally:
+                    for p in batch:
+                        p.done.set()
+
+        # Every caller sends at least one queued text, so ours is sent by now or in flight
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.vector
+
+    def _send(self, batch: List[str], model: Optional[str]) -> List[List[float]]:
+        with self._in_flight:
+            return self._embed_batch(batch, model)
+
+    def _embed_batch(self, batch: List[str], model: Optional[str]) -> List[List[float]]:
+        start = time.perf_counter()
+        try:
+            embed_batch = getattr(self.client, "embed_batch", None)
+            http_model = self._http_model(model)
+            if callable(embed_batch):
+                vectors = embed_batch(batch, **model_kwargs(model))
+            elif http_model is not None:
+                vectors = self._post_embed(batch, http_model)
+            else:
+                vectors = [self.client.embed(text, **model_kwargs(model)) for text in batch]
+        except Exception:
+            with self._lock:
+                self._errors += 1
+            raise
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._latencies.append(elapsed)
+            self._batches += 1
+            self._texts += len(batch)
+        logger.debug(f"Embedded batch of {len(batch)} in {elapsed:.3f}s")
+        return vectors
+
+    def _http_model(self, model: Optional[str]) -> Optional[str]:
+        """Model for /api/embed, None when batches cannot go over HTTP"""
+        if self._http is None:
+            return None
+        model = model or embedding_model_of(self.client)
+        if model != DEFAULT_MODEL_LABEL:
+            return model
+        if not self._warned_unbatched:
+            self._warned_unbatched = True
+            logger.warning("Embedding model unknown, embedding one text per request (set OLLAMA_EMBEDDING_MODEL)")
+        return None
+
+    def _post_embed(self, batch: List[str], model: str) -> List[List[float]]:
+        response = self._http.post("/api/embed", json={"model": model, "input": batch})
+        response.raise_for_status()
+        vectors = response.json().get("embeddings") or []
+        if len(vectors) != len(batch):
+            raise ValueError(f"Ollama returned {len(vectors)} embeddings for {len(batch)} texts")
+        return vectors
+
+    def stats(self) -> dict:
+        """Batch counts and latency (seconds) over the recent window"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats = {
+                "batches": self._batches,
+                "texts": self._texts,
+                "errors": self._errors,
+                "batch_size": self.batch_size,
+                "max_in_flight": self.max_in_flight
+            }
+
+        if latencies:
+            stats["batch_latency"] = {
+                "avg": sum(latencies) / len(latencies),
+                "p50": latencies[int(0.50 * (len(latencies) - 1))],
+                "p95": latencies[int(0.95 * (len(latencies) - 1))],
+                "max": latencies[-1]
+            }
+        return stats
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+        if self._http is not None:
+            self._http.close()
+
+
+class BatchingEmbeddingClient:
+    """
+    Wraps an OllamaClient so embed() goes through a BatchingEmbedder
+    (for pipelines without an EmbeddingCache, which batches its misses
+    itself). Every other attribute is passed through.
+    """
+
+    def __init__(self, client, batcher: BatchingEmbedder):
+        self.client = client
+        self.batcher = batcher
+
+    def embed(self, text: str, model: Optional[str] = None) -> List[float]:
+        return self.batcher.embed(text, model=model)
+
+    def embed_many(self, texts: Sequence[str], model: Optional[str] = None) -> List[List[float]]:
+        return self.batcher.embed_many(texts, model=model)
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
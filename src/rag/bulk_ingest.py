@@ -0,0 +1,347 @@
+import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, Future
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .parse_cache import ParseCache
+from .parser import PDFTableParser
+
+logger = logging.getLogger(__name__)
+
+
+# ============= 파일명 → 메타데이터 =============
+
+DOCUMENT_TYPES = [
+    ("교수학습", "teaching_plan"),
+    ("학업성적관리규정", "academic_regulation")
+]
+
+_YEAR_RE = re.compile(r"(\d{4})학년도")
+_SCHOOL_RE = re.compile(r"학년도\s+(\S+?(?:초|중|고)(?:등학교|학교)?)(?=[\s_(]|$)")
+_GRADE_RE = re.compile(r"(\d)학년(?!도)")
+_SEMESTER_RE = re.compile(r"(\d)학기")
+
+
+def infer_metadata(pdf_path: Path, root: Path) -> dict:
+    """
+    downloads/{school_code}/{year}/teaching_plans/{파일명}.pdf 경로와
+    파일명(예: "2025학년도 동도중 교수학습 및 평가 운영 계획_1학년 2학기(수정).pdf")에서 메타데이터 추론
+    """
+    relative = pdf_path.relative_to(root)
+    parts = relative.parts
+    name = pdf_path.stem
+
+    school_code = parts[0] if len(parts) > 1 else "UNKNOWN"
+    year_match = _YEAR_RE.search(name)
+    if year_match:
+        year = year_match.group(1)
+    elif len(parts) > 2 and parts[1].isdigit():
+        year = parts[1]
+    else:
+        year = "0000"
+
+    school_name = None
+    school_match = _SCHOOL_RE.search(name)
+    if school_match:
+        school_name = school_match.group(1)
+        # "동도중" → "동도중학교"
+        if not school_name.endswith("학교"):
+            school_name += "학교"
+
+    grade_match = _GRADE_RE.search(name)
+    semester_match = _SEMESTER_RE.search(name)
+    subject = next((subject for keyword, subject in DOCUMENT_TYPES if keyword in name), "general")
+
+    metadata = {
+        "school_code": school_code,
+        "school_name": school_name or school_code,
+        "year": year,
+        "subject": subject,
+        "revised": "(수정)" in name
+    }
+    if grade_match:
+        metadata["grade"] = grade_match.group(1)
+    if semester_match:
+        metadata["semester"] = semester_match.group(1)
+    return metadata
+
+
+def discover_pdfs(
+    root: Path,
+    school_code: Optional[str] = None,
+    year: Optional[str] = None
+) -> List[Tuple[Path, dict]]:
+    """
+    root 아래 PDF와 추론한 메타데이터 목록
+
+    같은 문서의 원본과 "(수정)"본이 함께 있으면 수정본만 사용
+    """
+    files = []
+    for pdf_path in sorted(root.rglob("*.pdf")):
+        metadata = infer_metadata(pdf_path, root)
+        if school_code and metadata["school_code"] != school_code:
+            continue
+        if year and metadata["year"] != str(year):
+            continue
+        files.append((pdf_path, metadata))
+
+    return prefer_revised(files)
+
+
+def prefer_revised(files: Iterable[Tuple[Path, dict]]) -> List[Tuple[Path, dict]]:
+    """
+    같은 문서(document_id를 결정하는 필드가 같은 파일)는 하나만 남김
+
+    원본과 "(수정)"본이 함께 있으면 수정본 사용
+    """
+    by_document: Dict[tuple, Tuple[Path, dict]] = {}
+
+    for pdf_path, metadata in files:
+        key = tuple(metadata.get(f) for f in ("school_code", "year", "grade", "subject", "semester"))
+        existing = by_document.get(key)
+        if existing is None or (metadata["revised"] and not existing[1]["revised"]):
+            by_document[key] = (pdf_path, metadata)
+        elif metadata["revised"] == existing[1]["revised"]:
+            logger.warning(f"Skipping {pdf_path}: same document as {existing[0]}")
+
+    return sorted(by_document.values(), key=lambda item: str(item[0]))
+
+
+# ============= Checkpoint =============
+
+class BulkIngestCheckpoint:
+    """
+    처리 결과를 파일 단위로 JSON Lines에 추가 기록 (중단 후 재실행 시 이어서 처리)
+
+    파일 크기/수정 시각이 기록과 같고 성공한 파일은 건너뜀
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._records: Dict[str, dict] = {}
+
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 기록 중 중단된 마지막 줄
+                        continue
+                    self._records[record["path"]] = record
+
+    @staticmethod
+    def _fingerprint(pdf_path: Path) -> dict:
+        stat = pdf_path.stat()
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def is_done(self, pdf_path: Path) -> bool:
+        record = self._records.get(str(pdf_path))
+        return (
+            record is not None
+            and record["status"] == "done"
+            and {k: record.get(k) for k in ("size", "mtime_ns")} == self._fingerprint(pdf_path)
+        )
+
+    def has_failed(self, pdf_path: Path) -> bool:
+        record = self._records.get(str(pdf_path))
+        return record is not None and record["status"] == "failed"
+
+    def record(self, pdf_path: Path, status: str, **details):
+        record = {"path": str(pdf_path), "status": status, **self._fingerprint(pdf_path), **details}
+        self._records[record["path"]] = record
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+# ============= Bulk ingest =============
+
+def _parse_file(pdf_path: str, extraction_mode: str) -> str:
+    """프로세스 풀에서 실행되는 파싱 작업"""
+    return PDFTableParser(extraction_mode=extraction_mode).parse(pdf_path)
+
+
+@dataclass
+class BulkIngestStats:
+    total: int = 0
+    skipped: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    chunks_added: int = 0
+    chunks_updated: int = 0
+    chunks_removed: int = 0
+    elapsed: float = 0.0
+    failures: List[dict] = field(default_factory=list)
+
+    @property
+    def files_per_sec(self) -> float:
+        processed = self.succeeded + self.failed
+        return processed / self.elapsed if self.elapsed > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "total": self.total,
+            "skipped": self.skipped,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "chunks_added": self.chunks_added,
+            "chunks_updated": self.chunks_updated,
+            "chunks_removed": self.chunks_removed,
+            "elapsed_sec": round(self.elapsed, 3),
+            "files_per_sec": round(self.files_per_sec, 3),
+            "failures": self.failures
+        }
+
+
+class BulkIngester:
+    """
+    디렉토리 단위 대량 색인
+
+    - PDF 파싱(CPU)은 프로세스 풀에서 병렬로, 앞서 최대 workers * 2개까지 미리 파싱
+    - Enhanced JSON 생성 / 저장 / Vector Store 색인은 메인 프로세스에서 순서대로
+      (증분 색인이므로 이미 색인된 문서는 바뀐 섹션만 임베딩)
+    - log_every개 문서마다 진행 상황(files/sec) 기록, 파일마다 checkpoint 기록
+    """
+
+    def __init__(
+        self,
+        pipeline,
+        checkpoint: BulkIngestCheckpoint,
+        workers: int = os.cpu_count() or 1,
+        log_every: int = 16,
+        retry_failed: bool = True
+    ):
+        self.pipeline = pipeline
+        self.checkpoint = checkpoint
+        self.workers = max(1, workers)
+        self.log_every = max(1, log_every)
+        self.retry_failed = retry_failed
+
+    def run(self, files: List[Tuple[Path, dict]]) -> BulkIngestStats:
+        stats = BulkIngestStats(total=len(files))
+        pending = []
+        for pdf_path, metadata in files:
+            if self.checkpoint.is_done(pdf_path) or (
+                not self.retry_failed and self.checkpoint.has_failed(pdf_path)
+            ):
+                stats.skipped += 1
+            else:
+                pending.append((pdf_path, metadata))
+
+        logger.info(f"Bulk ingest: {len(pending)} to process, {stats.skipped} already done")
+        start = time.perf_counter()
+
+        if pending:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                for i, (pdf_path, metadata, markdown, error) in enumerate(self._parsed(executor, pending), 1):
+                    self._ingest_one(pdf_path, metadata, markdown, error, stats)
+
+                    if i % self.log_every == 0 or i == len(pending):
+                        stats.elapsed = time.perf_counter() - start
+                        logger.info(
+                            f"Progress {i}/{len(pending)}: {stats.succeeded} ok, {stats.failed} failed, "
+                            f"{stats.files_per_sec:.2f} files/sec"
+                        )
+
+        stats.elapsed = time.perf_counter() - start
+        return stats
+
+    def _parsed(
+        self,
+        executor: ProcessPoolExecutor,
+        pending: List[Tuple[Path, dict]]
+    ) -> Iterator[Tuple[Path, dict, Optional[str], Optional[str]]]:
+        """입력 순서대로 (경로, 메타데이터, 마크다운, 오류) - 파싱은 최대 workers * 2개 앞서 진행"""
+        window = self.workers * 2
+        in_flight: List[Tuple[Path, dict, Optional[str], Optional[Future]]] = []
+        queue = iter(pending)
+
+        def submit_next() -> bool:
+            item = next(queue, None)
+            if item is None:
+                return False
+            pdf_path, metadata = item
+            cached = self._cached_markdown(pdf_path)
+            future = None if cached else executor.submit(
+                _parse_file, str(pdf_path), self.pipeline.pdf_parser.extraction_mode
+            )
+            in_flight.append((pdf_path, metadata, cached, future))
+            return True
+
+        while len(in_flight) < window and submit_next():
+            pass
+
+        while in_flight:
+            pdf_path, metadata, markdown, future = in_flight.pop(0)
+            error = None
+            if future is not None:
+                try:
+                    markdown = future.result()
+                    if markdown:
+                        self._store_markdown(pdf_path, markdown)
+                except Exception as e:
+                    error = f"parse failed: {e}"
+            submit_next()
+            yield pdf_path, metadata, markdown, error
+
+    def _ingest_one(
+        self,
+        pdf_path: Path,
+        metadata: dict,
+        markdown: Optional[str],
+        error: Optional[str],
+        stats: BulkIngestStats
+    ):
+        if error is None and not markdown:
+            error = "parse failed: empty output"
+
+        if error is None:
+            try:
+                enhanced_json = self.pipeline.generate_enhanced_json(markdown, metadata)
+                self.pipeline.save_enhanced_json(enhanced_json)
+                result = self.pipeline.index_enhanced_json(enhanced_json)
+            except Exception as e:
+                error = str(e)
+
+        if error is not None:
+            logger.error(f"Bulk ingest failed for {pdf_path}: {error}")
+            stats.failed += 1
+            stats.failures.append({"path": str(pdf_path), "error": error})
+            self.checkpoint.record(pdf_path, "failed", error=error)
+            return
+
+        doc_id = enhanced_json["document_metadata"]["document_id"]
+        stats.succeeded += 1
+        stats.chunks_added += result.get("chunks_added", 0)
+        stats.chunks_updated += result.get("chunks_updated", 0)
+        stats.chunks_removed += result.get("chunks_removed", 0)
+        self.checkpoint.record(pdf_path, "done", document_id=doc_id)
+
+    # 파싱 캐시는 메인 프로세스에서만 사용 (워커 프로세스끼리 캐시 용량 계산이 어긋나지 않도록)
+
+    def _cache_key(self, pdf_path: Path) -> Optional[str]:
+        cache = self.pipeline.parse_cache
+        if cache is None:
+            return None
+        try:
+            return ParseCache.make_key(cache.file_hash(str(pdf_path)), self.pipeline.pdf_parser.version)
+        except OSError:
+            return None
+
+    def _cached_markdown(self, pdf_path: Path) -> Optional[str]:
+        key = self._cache_key(pdf_path)
+        return self.pipeline.parse_cache.get("markdown", key) if key else None
+
+    def _store_markdown(self, pdf_path: Path, markdown: str):
+        key = self._cache_key(pdf_path)
+        if key:
+            self.pipeline.parse_cache.put("markdown", key, markdown)
@@ -0,0 +1,261 @@
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class EnhancedJSONStore:
+    """
+    Enhanced JSON 영속 저장소
+
+    - 문서 하나당 {root_dir}/{document_id}.json 파일
+    - 목록 조회용 요약은 인덱스 파일(_index.json)에 보관하여 시작 시 한 번만 로드
+    - 저장/삭제는 인덱스 로그(_index.log)에 한 줄씩 추가하고, compact_every줄마다
+      (그리고 close/시작 시) _index.json으로 합침 - 문서마다 전체 인덱스를 다시 쓰지 않음
+    - 전체 문서는 처음 접근할 때 디스크에서 읽고, 최근 사용한 max_cached개만 메모리에 유지
+    """
+
+    INDEX_FILE = "_index.json"
+    INDEX_LOG = "_index.log"
+    SUMMARY_FIELDS = [
+        "school_code",
+        "school_name",
+        "year",
+        "grade",
+        "subject",
+        "semester",
+        "section_count",
+        "table_count"
+    ]
+
+    def __init__(
+        self,
+        root_dir: str = "./enhanced_jsons",
+        max_cached: int = 256,
+        compact_every: int = 1000
+    ):
+        self.root_dir = Path(root_dir)
+        self.max_cached = max_cached
+        self.compact_every = compact_every
+
+        self._lock = threading.RLock()
+        self._index: Dict[str, dict] = {}
+        self._cache: "OrderedDict[str, dict]" = OrderedDict()
+        self._log_lines = 0
+
+        self._load_index()
+
+    # ============= Index =============
+
+    def _load_index(self):
+        if not self.root_dir.exists():
+            return
+
+        index_path = self.root_dir / self.INDEX_FILE
+        if index_path.exists():
+            try:
+                with open(index_path, 'r', encoding='utf-8') as f:
+                    self._index = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Corrupt document index, rebuilding: {e}")
+                self._index = {}
+
+        # 마지막 compact 이후의 변경 적용
+        log_path = self.root_dir / self.INDEX_LOG
+        changed = False
+        if log_path.exists():
+            with open(log_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 비정상 종료로 잘린 마지막 줄
+                        continue
+                    if record.get("deleted"):
+                        self._index.pop(record["id"], None)
+                    else:
+                        self._index[record["id"]] = record["summary"]
+                    changed = True
+
+        # 인덱스와 실제 파일 목록 동기화 (목록 조회만, 문서 본문은 새 파일만 읽음)
+        on_disk = {
+            name[:-len(".json")]
+            for name in os.listdir(self.root_dir)
+            if name.endswith(".json") and name != self.INDEX_FILE
+        }
+
+        for doc_id in set(self._index) - on_disk:
+            del self._index[doc_id]
+            changed = True
+
+        for doc_id in sorted(on_disk - set(self._index)):
+            try:
+                with open(self._path(doc_id), 'r', encoding='utf-8') as f:
+                    self._index[doc_id] = self._summarize(json.load(f))
+                changed = True
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Skipping unreadable document {doc_id}: {e}")
+
+        if changed:
+            self._compact()
+
+        logger.info(f"Loaded document index: {len(self._index)} documents")
+
+    def _append_index(self, record: dict):
+        """인덱스 변경 한 건을 로그에 추가, compact_every줄이 쌓이면 합침"""
+        with open(self.root_dir / self.INDEX_LOG, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._log_lines += 1
+        if self._log_lines >= self.compact_every:
+            self._compact()
+
+    def _compact(self):
+        """현재 인덱스를 _index.json으로 쓰고 로그 비우기"""
+        self._atomic_write(self.root_dir / self.INDEX_FILE, self._index)
+        try:
+            (self.root_dir / self.INDEX_LOG).unlink()
+        except FileNotFoundError:
+            pass
+        self._log_lines = 0
+
+    def _summarize(self, enhanced_json: dict) -> dict:
+        metadata = enhanced_json.get("document_metadata", {})
+        return {field: metadata.get(field) for field in self.SUMMARY_FIELDS}
+
+    # ============= Access =============
+
+    def put(self, doc_id: str, enhanced_json: dict) -> Path:
+        """문서 저장 (파일 + 인덱스), 저장된 파일 경로 반환"""
+        with self._lock:
+            self.root_dir.mkdir(parents=True, exist_ok=True)
+            path = self._path(doc_id)
+            self._atomic_write(path, enhanced_json, indent=2)
+
+            summary = self._index[doc_id] = self._summarize(enhanced_json)
+            self._append_index({"id": doc_id, "summary": summary})
+            self._remember(doc_id, enhanced_json)
+
+        return path
+
+    def get(self, doc_id: str, remember: bool = True) -> Optional[dict]:
+        """
+        문서 조회 (메모리에 없으면 디스크에서 로드)
+
+        Args:
+            remember: False면 디스크에서 읽은 문서를 메모리 캐시에 넣지 않음
+                      (전체 순회 시 캐시가 밀려나지 않도록)
+        """
+        with self._lock:
+            if doc_id in self._cache:
+                self._cache.move_to_end(doc_id)
+                return self._cache[doc_id]
+
+            if doc_id not in self._index:
+                return None
+
+            try:
+                with open(self._path(doc_id), 'r', encoding='utf-8') as f:
+                    enhanced_json = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.error(f"Failed to load document {doc_id}: {e}")
+                return None
+
+            if remember:
+                self._remember(doc_id, enhanced_json)
+            return enhanced_json
+
+    def iter_documents(
+        self,
+        school_code: Optional[str] = None,
+        year: Optional[str] = None
+    ) -> Iterator[Tuple[str, dict]]:
+        """
+        (document_id, 문서)를 하나씩 반환 - 전체를 메모리에 올리지 않음
+        필터는 인덱스 요약으로 먼저 적용하므로 해당하지 않는 문서는 읽지 않음
+        """
+        for summary in self.summaries():
+            if school_code is not None and summary.get("school_code") != school_code:
+                continue
+            if year is not None and str(summary.get("year")) != str(year):
+                continue
+
+            enhanced_json = self.get(summary["document_id"], remember=False)
+            if enhanced_json is not None:
+                yield summary["document_id"], enhanced_json
+
+    def delete(self, doc_id: str) -> bool:
+        """문서 삭제"""
+        with self._lock:
+            if doc_id not in self._index:
+                return False
+
+            del self._index[doc_id]
+            self._cache.pop(doc_id, None)
+            try:
+                self._path(doc_id).unlink()
+            except FileNotFoundError:
+                pass
+            self._append_index({"id": doc_id, "deleted": True})
+            return True
+
+    def close(self):
+        """남은 인덱스 로그를 _index.json으로 합침 (서비스 종료 시)"""
+        with self._lock:
+            if self._log_lines:
+                self._compact()
+
+    def summaries(self) -> List[dict]:
+        """인덱스에 있는 문서 요약 목록 (디스크 읽기 없음)"""
+        with self._lock:
+            return [
+                {"document_id": doc_id, **summary}
+                for doc_id, summary in self._index.items()
+            ]
+
+    def ids(self) -> List[str]:
+        with self._lock:
+            return list(self._index)
+
+    def path_for(self, doc_id: str) -> Path:
+        return self._path(doc_id)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.ids())
+
+    def __getitem__(self, doc_id: str) -> dict:
+        enhanced_json = self.get(doc_id)
+        if enhanced_json is None:
+            raise KeyError(doc_id)
+        return enhanced_json
+
+    def __setitem__(self, doc_id: str, enhanced_json: dict):
+        self.put(doc_id, enhanced_json)
+
+    # ============= Internals =============
+
+    def _path(self, doc_id: str) -> Path:
+        return self.root_dir / f"{doc_id}.json"
+
+    def _remember(self, doc_id: str, enhanced_json: dict):
+        self._cache[doc_id] = enhanced_json
+        self._cache.move_to_end(doc_id)
+        while len(self._cache) > self.max_cached:
+            self._cache.popitem(last=False)
+
+    @staticmethod
+    def _atomic_write(path: Path, data, indent: Optional[int] = None):
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=indent)
+        os.replace(tmp_path, path)
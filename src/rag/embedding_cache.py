@@ -0,0 +1,244 @@
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from typing import Dict, List, Optional, Sequence
+
+from ..metrics import record_cache, timed
+
+logger = logging.getLogger(__name__)
+
+# Cache namespace for a client that does not say which model it embeds with
+DEFAULT_MODEL_LABEL = "default"
+
+
+def model_kwargs(model: Optional[str]) -> dict:
+    """model= for an embed request, only when a model was chosen (else the client's own default)"""
+    return {"model": model} if model else {}
+
+
+def embedding_model_of(client) -> str:
+    """The embedding model a client is configured with, or DEFAULT_MODEL_LABEL"""
+    for attr in ("embedding_model", "embed_model"):
+        value = getattr(client, attr, None)
+        if isinstance(value, str) and value:
+            return value
+    return DEFAULT_MODEL_LABEL
+
+
+def normalize_text(text: str) -> str:
+    """NFC normalisation + collapsed whitespace, so trivially different copies share a key"""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding cache.
+
+    Vectors are keyed by sha256(model + normalised text) and stored as
+    float32 blobs in SQLite. Lookups are batched, and the least recently
+    used entries are evicted once the cache grows past max_entries.
+    """
+
+    # SQLite limits the number of bound parameters per statement
+    _LOOKUP_BATCH = 500
+
+    def __init__(self, db_path: str = "./embedding_cache.db", max_entries: int = 200_000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    dim INTEGER NOT NULL,
+                    vector BLOB NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON embeddings(last_used)")
+            self._count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\x00{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _pack(vector: Sequence[float]) -> bytes:
+        return array("f", vector).tobytes()
+
+    @staticmethod
+    def _unpack(blob: bytes) -> List[float]:
+        vector = array("f")
+        vector.frombytes(blob)
+        return vector.tolist()
+
+    # ============= Access =============
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Cached vectors in input order, None for misses"""
+        keys = [self.make_key(model, text) for text in texts]
+        found: Dict[str, List[float]] = {}
+        unique_keys = list(dict.fromkeys(keys))
+
+        with self._lock:
+            for i in range(0, len(unique_keys), self._LOOKUP_BATCH):
+                batch = unique_keys[i:i + self._LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    batch
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = self._unpack(blob)
+
+            if found:
+                now = time.time()
+                with self._conn:
+                    self._conn.executemany(
+                        "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                        [(now, key) for key in found]
+                    )
+
+            result = [found.get(key) for key in keys]
+            hits = sum(1 for vector in result if vector is not None)
+            self.hits += hits
+            self.misses += len(result) - hits
+
+        record_cache("embedding", hits=hits, misses=len(result) - hits)
+        return result
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        return self.get_many(model, [text])[0]
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]):
+        """Stores vectors and evicts least recently used entries over max_entries"""
+        now = time.time()
+        rows = [
+            (self.make_key(model, text), model, len(vector), self._pack(vector), now)
+            for text, vector in zip(texts, vectors)
+        ]
+        if not rows:
+            return
+
+        with self._lock, self._conn:
+            # rowcount of the insert = new keys, so the entry count is kept without COUNT(*)
+            inserted = self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, model, dim, vector, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows
+            ).rowcount
+            if inserted < len(rows):
+                self._conn.executemany(
+                    "UPDATE embeddings SET model = ?, dim = ?, vector = ?, last_used = ? WHERE key = ?",
+                    [(row_model, dim, blob, used, key) for key, row_model, dim, blob, used in rows]
+                )
+            self._count += inserted
+
+            excess = self._count - self.max_entries
+            if excess > 0:
+                evicted = self._conn.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                    (excess,)
+                ).rowcount
+                self._count -= evicted
+                logger.debug(f"Evicted {evicted} embedding cache entries")
+
+    def put(self, model: str, text: str, vector: Sequence[float]):
+        self.put_many(model, [text], [vector])
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": self._count,
+                "max_entries": self.max_entries
+            }
+
+    def close(self):
+        self._conn.close()
+
+
+class CachedEmbeddingClient:
+    """
+    Wraps an OllamaClient so embed() goes through an EmbeddingCache.
+
+    Every other attribute (generate, ...) is passed through, so it can be
+    handed to the vector stores wherever an OllamaClient is expected.
+    Cache misses are embedded through `batcher` (a BatchingEmbedder) when
+    one is given.
+
+    ``model`` is sent with every request; without it the client embeds
+    with its own configured model, and entries are keyed by the model the
+    client reports (``embedding_model``), so switching models never
+    serves vectors of the old one.
+    """
+
+    def __init__(
+        self,
+        client,
+        cache: EmbeddingCache,
+        model: Optional[str] = None,
+        batcher=None
+    ):
+        self.client = client
+        self.cache = cache
+        self.model = model
+        self.cache_model = model or embedding_model_of(client)
+        self.batcher = batcher
+
+    def embed(self, text: str, model: Optional[str] = None) -> List[float]:
+        return self.embed_many([text], model=model)[0]
+
+    def embed_many(self, texts: Sequence[str], model: Optional[str] = None) -> List[List[float]]:
+        """Embeds texts, calling the model only for cache misses (each distinct text once)"""
+        model = model or self.model
+        cache_model = model or self.cache_model
+        vectors = self.cache.get_many(cache_model, texts)
+
+        missing: Dict[str, str] = {}
+        for text, vector in zip(texts, vectors):
+            if vector is None:
+                missing.setdefault(normalize_text(text), text)
+
+        if missing:
+            missing_texts = list(missing.values())
+            with timed("embed"):
+                if self.batcher is not None and len(missing_texts) == 1:
+                    # Coalesced with other threads' single misses (e.g. concurrent questions)
+                    missing_vectors = [self.batcher.embed(missing_texts[0], model=model)]
+                elif self.batcher is not None:
+                    missing_vectors = self.batcher.embed_many(missing_texts, model=model)
+                else:
+                    missing_vectors = [self.client.embed(text, **model_kwargs(model)) for text in missing_texts]
+
+            computed = dict(zip(missing, missing_vectors))
+            self.cache.put_many(cache_model, missing_texts, missing_vectors)
+            vectors = [
+                vector if vector is not None else computed[normalize_text(text)]
+                for text, vector in zip(texts, vectors)
+            ]
+
+        return vectors
+
+    def warm(self, texts: Sequence[str], model: Optional[str] = None) -> int:
+        """
+        Embeds texts ahead of a vector store insert so the store's own
+        per-chunk embed() calls are cache hits. Returns the number of misses.
+        """
+        misses = self.cache.misses
+        self.embed_many(texts, model=model)
+        return self.cache.misses - misses
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
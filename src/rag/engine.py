@@ -1,11 +1,15 @@
 import logging
 import json
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 from mathesis_core.db.chroma import ChromaHybridStore
 from mathesis_core.llm.clients import OllamaClient
 from .parser import PDFTableParser
 from .chunker import SectionChunker
+from .parse_cache import ParseCache
+from .embedding_cache import EmbeddingCache, CachedEmbeddingClient
+from .batch_embedder import BatchingEmbedder
+from ..metrics import timed
 
 logger = logging.getLogger(__name__)
 
@@ -14,9 +18,26 @@ class RAGEngine:
     Orchestrates the RAG pipeline: Ingestion -> Storage -> Retrieval -> Generation.
     """
     
-    def __init__(self, collection_name: str = "school_info_v1"):
+    def __init__(
+        self,
+        collection_name: str = "school_info_v1",
+        parse_cache: Optional[ParseCache] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        embedding_batch_size: int = 32,
+        embedding_max_in_flight: int = 4
+    ):
         # Initialize Common Components
         self.ollama = OllamaClient(base_url="http://localhost:11434")
+        self.embedder: Optional[BatchingEmbedder] = None
+        if embedding_cache is not None:
+            # Repeated chunks and questions are embedded once; new chunks are
+            # embedded in concurrent batches before the store asks for them
+            self.embedder = BatchingEmbedder(
+                self.ollama,
+                batch_size=embedding_batch_size,
+                max_in_flight=embedding_max_in_flight
+            )
+            self.ollama = CachedEmbeddingClient(self.ollama, embedding_cache, batcher=self.embedder)
         self.vector_store = ChromaHybridStore(
             collection_name=collection_name, 
             ollama_client=self.ollama,
@@ -24,7 +45,7 @@ class RAGEngine:
         )
         
         # Initialize Node-Specific Components
-        self.parser = PDFTableParser()
+        self.parser = PDFTableParser(cache=parse_cache)
         self.chunker = SectionChunker()
         
     def ingest_file(self, file_path: str, metadata: Dict[str, Any] = None) -> int:
@@ -55,7 +76,12 @@ class RAGEngine:
             # Ensure safe types
             safe_meta = {k: str(v) for k, v in meta.items()}
             metadatas.append(safe_meta)
-            
+
+        if isinstance(self.ollama, CachedEmbeddingClient):
+            # Batch-embed up front; the store's per-chunk embed() calls then hit the cache
+            embedded = self.ollama.warm(texts)
+            logger.info(f"Pre-embedded {embedded} new chunks: {self.embedder.stats()}")
+
         self.vector_store.add_documents(texts, metadatas)
         logger.info(f"Indexed {len(texts)} chunks.")
         return len(texts)
@@ -65,7 +91,8 @@ class RAGEngine:
         Answers a user query using RAG and returns structured JSON.
         """
         # 1. Retrieve
-        retrieved_docs = self.vector_store.hybrid_search(question, k=k)
+        with timed("retrieve"):
+            retrieved_docs = self.vector_store.hybrid_search(question, k=k)
         
         # 2. Construct Context
         context_str = "\n\n---\n\n".join([f"[Source: {d.get('metadata', {}).get('header', 'Unknown')}]\n{d['text']}" for d in retrieved_docs])
@@ -84,12 +111,13 @@ class RAGEngine:
         full_prompt = f"""Context:\n{context_str}\n\nQuestion: {question}"""
         
         try:
-            response_text = self.ollama.generate(
-                prompt=full_prompt, 
-                system=system_prompt,
-                format="json", # Force JSON mode if model supports
-                temperature=0.1
-            )
+            with timed("llm_generate"):
+                response_text = self.ollama.generate(
+                    prompt=full_prompt,
+                    system=system_prompt,
+                    format="json", # Force JSON mode if model supports
+                    temperature=0.1
+                )
             
             # Parse JSON safely
             try:
@@ -4,6 +4,9 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime
 from pathlib import Path
 
+# 출력 구조가 바뀌면 올려서 캐시된 Enhanced JSON이 재사용되지 않도록 함
+GENERATOR_VERSION = "1"
+
 class EnhancedJSONGenerator:
     """
     교육 문서를 고도화된 JSON으로 변환
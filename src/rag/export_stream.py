@@ -0,0 +1,56 @@
+import json
+import zlib
+from typing import Iterable, Iterator, Tuple
+
+# (document_id, Enhanced JSON) 쌍
+Documents = Iterable[Tuple[str, dict]]
+
+
+def iter_ndjson(documents: Documents) -> Iterator[bytes]:
+    """문서 하나당 한 줄의 NDJSON"""
+    for _, enhanced_json in documents:
+        yield json.dumps(enhanced_json, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def iter_json_object(documents: Documents) -> Iterator[bytes]:
+    """
+    {document_id: Enhanced JSON, ...} 객체를 문서 단위로 나누어 출력
+    (기존 /rag/export-all 응답과 같은 형태)
+    """
+    yield b"{"
+    first = True
+    for doc_id, enhanced_json in documents:
+        prefix = b"" if first else b","
+        first = False
+        yield (
+            prefix
+            + json.dumps(doc_id, ensure_ascii=False).encode("utf-8")
+            + b":"
+            + json.dumps(enhanced_json, ensure_ascii=False).encode("utf-8")
+        )
+    yield b"}"
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """바이트 스트림을 gzip으로 압축하며 그대로 흘려보냄"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+# ============= /rag/query/stream 이벤트 =============
+
+def encode_event_ndjson(event: dict) -> bytes:
+    """이벤트 하나를 NDJSON 한 줄로"""
+    return json.dumps(event, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def encode_event_sse(event: dict) -> bytes:
+    """이벤트 하나를 SSE 프레임으로 (event 필드를 SSE 이벤트 이름으로 사용)"""
+    name = event.get("event", "message")
+    payload = json.dumps(event, ensure_ascii=False)
+    return f"event: {name}\ndata: {payload}\n\n".encode("utf-8")
+
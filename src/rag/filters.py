@@ -0,0 +1,68 @@
+from typing import Dict, Optional
+
+from ..exceptions import RAGException
+
+# 검색 필터로 사용할 수 있는 청크 메타데이터 (IngestRequest 필드와 동일)
+FILTER_FIELDS = ("school_code", "year", "grade", "subject", "semester")
+
+
+def normalize_filters(filters: Optional[Dict[str, str]]) -> Dict[str, str]:
+    """
+    값이 없는 항목을 제거하고 값을 문자열로 통일 (메타데이터는 문자열로 저장됨)
+
+    Raises:
+        ValueError: 지원하지 않는 필터 필드
+    """
+    if not filters:
+        return {}
+
+    unknown = set(filters) - set(FILTER_FIELDS)
+    if unknown:
+        raise ValueError(
+            f"Unsupported filter fields: {sorted(unknown)} (allowed: {', '.join(FILTER_FIELDS)})"
+        )
+
+    return {field: str(value) for field, value in filters.items() if value is not None}
+
+
+def build_where(filters: Optional[Dict[str, str]]) -> Optional[dict]:
+    """필터 → Chroma where 절 (필터가 없으면 None)"""
+    filters = normalize_filters(filters)
+    if not filters:
+        return None
+    if len(filters) == 1:
+        return dict(filters)
+    # Chroma는 조건이 2개 이상이면 $and로 묶어야 함
+    return {"$and": [{field: value} for field, value in filters.items()]}
+
+
+def matches(metadata: dict, filters: Optional[Dict[str, str]]) -> bool:
+    """
+    청크 메타데이터가 필터를 모두 만족하는지
+    메타데이터에 없는 필드는 판단할 수 없으므로 통과시킴
+    """
+    return all(
+        str(metadata[field]) == value
+        for field, value in normalize_filters(filters).items()
+        if metadata.get(field) is not None
+    )
+
+
+def query_with_where(store, where: Optional[dict], **kwargs) -> dict:
+    """
+    store.query_with_parent_context 호출, where가 있으면 그대로 전달
+
+    Raises:
+        RAGException: Vector Store가 where를 받지 않음
+                      (필터 없이 검색하면 다른 학교/연도 청크가 섞이므로 중단)
+    """
+    if where is None:
+        return store.query_with_parent_context(**kwargs)
+    try:
+        return store.query_with_parent_context(**kwargs, where=where)
+    except TypeError as e:
+        if "where" not in str(e):
+            raise
+        raise RAGException(
+            f"{type(store).__name__}.query_with_parent_context does not accept 'where': {e}"
+        ) from e
@@ -0,0 +1,134 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def section_hash(section: dict) -> str:
+    """섹션 내용(제목, 본문, 테이블 포함) 해시"""
+    payload = json.dumps(section, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def section_hashes(enhanced_json: dict) -> Dict[str, str]:
+    """Enhanced JSON의 {section_id: 해시}"""
+    return {
+        section["section_id"]: section_hash(section)
+        for section in enhanced_json.get("sections", [])
+    }
+
+
+def diff_sections(old: Dict[str, str], new: Dict[str, str]) -> Dict[str, List[str]]:
+    """
+    이전/새 섹션 해시 비교
+
+    Returns:
+        {"added": [...], "updated": [...], "removed": [...], "unchanged": [...]}
+        (각각 section_id 목록)
+    """
+    return {
+        "added": [sid for sid in new if sid not in old],
+        "updated": [sid for sid in new if sid in old and old[sid] != new[sid]],
+        "removed": [sid for sid in old if sid not in new],
+        "unchanged": [sid for sid in new if old.get(sid) == new[sid]]
+    }
+
+
+class IndexManifest:
+    """
+    Vector Store에 색인된 섹션 해시 기록
+
+    - 문서별 {section_id: 해시}를 JSON 파일 하나에 보관
+    - 변경은 로그({path}.log)에 한 줄씩 추가하고, compact_every줄마다
+      (그리고 close/시작 시) JSON 파일로 합침 - 문서마다 전체 기록을 다시 쓰지 않음
+    - 재색인 시 이전 해시와 비교하여 바뀐 섹션만 다시 임베딩하는 데 사용
+    - Enhanced JSON 저장소와 별도로 두어, 저장 단계 이후 색인 단계가 실패해도
+      "실제로 색인된 상태"를 기준으로 비교함
+    """
+
+    def __init__(self, path: str, compact_every: int = 1000):
+        self.path = Path(path)
+        self.log_path = self.path.with_name(self.path.name + ".log")
+        self.compact_every = compact_every
+        self._lock = threading.Lock()
+        self._documents: Dict[str, Dict[str, str]] = {}
+        self._log_lines = 0
+
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._documents = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                # 기록이 없으면 다음 색인 때 문서 전체를 다시 색인함
+                logger.warning(f"Corrupt index manifest, starting empty: {e}")
+
+        # 마지막 compact 이후의 변경 적용
+        if self.log_path.exists():
+            with open(self.log_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 비정상 종료로 잘린 마지막 줄
+                        continue
+                    if record.get("deleted"):
+                        self._documents.pop(record["id"], None)
+                    else:
+                        self._documents[record["id"]] = record["hashes"]
+            self._compact()
+
+    def get(self, doc_id: str) -> Optional[Dict[str, str]]:
+        """색인된 섹션 해시, 한 번도 색인되지 않은 문서면 None"""
+        with self._lock:
+            hashes = self._documents.get(doc_id)
+            return dict(hashes) if hashes is not None else None
+
+    def set(self, doc_id: str, hashes: Dict[str, str]):
+        with self._lock:
+            self._documents[doc_id] = dict(hashes)
+            self._append({"id": doc_id, "hashes": self._documents[doc_id]})
+
+    def remove(self, doc_id: str):
+        with self._lock:
+            if self._documents.pop(doc_id, None) is not None:
+                self._append({"id": doc_id, "deleted": True})
+
+    def ids(self) -> List[str]:
+        with self._lock:
+            return list(self._documents)
+
+    def close(self):
+        """남은 로그를 JSON 파일로 합침 (서비스 종료 시)"""
+        with self._lock:
+            if self._log_lines:
+                self._compact()
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._documents
+
+    def _append(self, record: dict):
+        """변경 한 건을 로그에 추가, compact_every줄이 쌓이면 합침"""
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.log_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._log_lines += 1
+        if self._log_lines >= self.compact_every:
+            self._compact()
+
+    def _compact(self):
+        """현재 기록을 JSON 파일로 쓰고 로그 비우기"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._documents, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        try:
+            self.log_path.unlink()
+        except FileNotFoundError:
+            pass
+        self._log_lines = 0
@@ -0,0 +1,334 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from ..exceptions import WorkerPoolFullError
+from ..tracing import TRACER, span
+
+logger = logging.getLogger(__name__)
+
+# Blocking callable runner, e.g. WorkerPool.run or asyncio.to_thread
+BlockingRunner = Callable[..., Awaitable[Any]]
+
+
+class IngestJobQueue:
+    """
+    IntegratedRAGPipeline.ingest_pdf를 비동기 작업으로 실행하는 영속 작업 큐
+
+    - 작업은 SQLite 파일에 저장되어 재시작 후에도 이어서 처리
+    - 단계(parse → generate → save → index)별로 진행 상황 기록
+    - 실패한 단계만 지수 백오프로 재시도 (앞 단계 결과는 재사용)
+    """
+
+    STAGES = ["parse", "generate", "save", "index"]
+
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_SUCCEEDED = "succeeded"
+    STATUS_FAILED = "failed"
+
+    def __init__(
+        self,
+        pipeline,
+        db_path: str = "./ingest_jobs.db",
+        concurrency: int = 2,
+        max_attempts: int = 3,
+        retry_delay: float = 2.0,
+        runner: Optional[BlockingRunner] = None
+    ):
+        """
+        Args:
+            pipeline: IntegratedRAGPipeline (단계 메서드 제공)
+            db_path: 작업 저장용 SQLite 파일
+            concurrency: 동시에 처리할 작업 수
+            max_attempts: 단계별 최대 시도 횟수
+            retry_delay: 첫 재시도 대기 시간(초), 이후 2배씩 증가
+            runner: 블로킹 단계 실행기 (기본값: asyncio.to_thread)
+        """
+        self.pipeline = pipeline
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.runner = runner or asyncio.to_thread
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._db_lock = threading.Lock()
+        self._init_db()
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    def _init_db(self):
+        with self._db_lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS ingest_jobs (
+                    job_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    stage TEXT NOT NULL,
+                    pdf_path TEXT NOT NULL,
+                    metadata TEXT NOT NULL,
+                    artifacts TEXT NOT NULL DEFAULT '{}',
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+
+    # ============= Public API =============
+
+    async def start(self):
+        """워커 시작 및 미완료 작업 복구"""
+        self._queue = asyncio.Queue()
+
+        rows = await asyncio.to_thread(self._fetch_unfinished)
+
+        for row in rows:
+            await self._store(row["job_id"], status=self.STATUS_QUEUED)
+            self._queue.put_nowait(row["job_id"])
+
+        if rows:
+            logger.info(f"Recovered {len(rows)} unfinished ingest jobs")
+
+        self._workers = [
+            asyncio.create_task(self._worker_loop(i))
+            for i in range(self.concurrency)
+        ]
+
+    async def stop(self):
+        """워커 종료 (진행 중 작업은 다음 start 시 재개)"""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def close(self):
+        self._conn.close()
+
+    def submit(self, pdf_path: str, metadata: dict) -> dict:
+        """
+        색인 작업 등록
+
+        Returns:
+            작업 상태 딕셔너리 (job_id 포함)
+        """
+        job_id = uuid.uuid4().hex
+        now = datetime.now().isoformat()
+
+        with self._db_lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO ingest_jobs "
+                "(job_id, status, stage, pdf_path, metadata, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, self.STATUS_QUEUED, self.STAGES[0], pdf_path,
+                 json.dumps(metadata, ensure_ascii=False), now, now)
+            )
+
+        if self._queue is not None:
+            self._queue.put_nowait(job_id)
+
+        logger.info(f"Submitted ingest job {job_id}: {pdf_path}")
+        return self.get(job_id)
+
+    def retry(self, job_id: str) -> Optional[dict]:
+        """
+        실패한 작업을 실패한 단계부터 다시 실행
+
+        Returns:
+            작업 상태 딕셔너리, 작업이 없으면 None
+        """
+        row = self._fetch(job_id)
+        if row is None:
+            return None
+        if row["status"] != self.STATUS_FAILED:
+            raise ValueError(f"Job {job_id} is not failed (status: {row['status']})")
+
+        self._update(job_id, status=self.STATUS_QUEUED, attempts=0, error=None)
+        if self._queue is not None:
+            self._queue.put_nowait(job_id)
+
+        logger.info(f"Retrying ingest job {job_id} from stage '{row['stage']}'")
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """작업 상태 조회"""
+        row = self._fetch(job_id)
+        return self._to_public(row) if row else None
+
+    def list_jobs(self, limit: int = 50) -> List[dict]:
+        """최근 작업 목록"""
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT * FROM ingest_jobs ORDER BY created_at DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [self._to_public(row) for row in rows]
+
+    # ============= Worker =============
+
+    async def _worker_loop(self, worker_id: int):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                # 작업마다 별도 trace (요청과 분리되어 실행되므로)
+                with TRACER.trace("ingest.job", job_id=job_id) as root:
+                    await self._process(job_id)
+                if root is not None:
+                    logger.info(f"Ingest job {job_id} trace: {root.trace_id}")
+            except Exception as e:
+                logger.error(f"Ingest worker {worker_id} crashed on job {job_id}: {e}")
+                await self._store(job_id, status=self.STATUS_FAILED, error=str(e))
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, job_id: str):
+        row = await asyncio.to_thread(self._fetch, job_id)
+        if row is None or row["status"] in (self.STATUS_SUCCEEDED, self.STATUS_FAILED):
+            return
+
+        metadata = json.loads(row["metadata"])
+        artifacts = json.loads(row["artifacts"])
+        stage = row["stage"]
+
+        await self._store(job_id, status=self.STATUS_RUNNING)
+
+        for stage_name in self.STAGES[self.STAGES.index(stage):]:
+            await self._store(job_id, stage=stage_name, attempts=0)
+
+            try:
+                output = await self._run_stage_with_retry(
+                    job_id, stage_name, row["pdf_path"], metadata, artifacts
+                )
+            except Exception as e:
+                logger.error(f"Ingest job {job_id} failed at stage '{stage_name}': {e}")
+                await self._store(job_id, status=self.STATUS_FAILED, error=str(e))
+                return
+
+            artifacts[stage_name] = output
+            await self._store(job_id, artifacts=artifacts)
+
+        enhanced_json = artifacts["generate"]
+        result = {
+            "document_id": enhanced_json["document_metadata"]["document_id"],
+            "enhanced_json_path": artifacts["save"],
+            **artifacts["index"]
+        }
+
+        # 완료된 작업은 중간 산출물(마크다운, JSON)을 보관하지 않음
+        await self._store(
+            job_id,
+            status=self.STATUS_SUCCEEDED,
+            stage="done",
+            artifacts={},
+            result=result,
+            error=None
+        )
+        logger.info(f"Ingest job {job_id} finished: {result['document_id']}")
+
+    async def _run_stage_with_retry(
+        self,
+        job_id: str,
+        stage: str,
+        pdf_path: str,
+        metadata: dict,
+        artifacts: dict
+    ) -> Any:
+        attempt = 0
+        while True:
+            try:
+                with span("ingest.stage", stage=stage, attempt=attempt + 1):
+                    return await self._run_stage(stage, pdf_path, metadata, artifacts)
+            except WorkerPoolFullError:
+                # 실행 자리가 없을 뿐 실패가 아니므로 시도 횟수에 포함하지 않음
+                await asyncio.sleep(self.retry_delay)
+                continue
+            except Exception as e:
+                attempt += 1
+                await self._store(job_id, attempts=attempt, error=str(e))
+                if attempt >= self.max_attempts:
+                    raise
+
+                delay = self.retry_delay * (2 ** (attempt - 1))
+                logger.warning(
+                    f"Ingest job {job_id} stage '{stage}' failed "
+                    f"({attempt}/{self.max_attempts}), retrying in {delay:.1f}s: {e}"
+                )
+                await asyncio.sleep(delay)
+
+    async def _run_stage(self, stage: str, pdf_path: str, metadata: dict, artifacts: dict) -> Any:
+        if stage == "parse":
+            return await self.runner(self.pipeline.parse_pdf, pdf_path)
+        if stage == "generate":
+            return await self.runner(
+                self.pipeline.generate_enhanced_json, artifacts["parse"], metadata
+            )
+        if stage == "save":
+            return await self.runner(self.pipeline.save_enhanced_json, artifacts["generate"])
+        if stage == "index":
+            return await self.runner(self.pipeline.index_enhanced_json, artifacts["generate"])
+        raise ValueError(f"Unknown ingest stage: {stage}")
+
+    # ============= Storage =============
+
+    def _fetch(self, job_id: str) -> Optional[sqlite3.Row]:
+        with self._db_lock:
+            return self._conn.execute(
+                "SELECT * FROM ingest_jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+
+    def _fetch_unfinished(self) -> List[sqlite3.Row]:
+        with self._db_lock:
+            return self._conn.execute(
+                "SELECT job_id FROM ingest_jobs WHERE status IN (?, ?) ORDER BY created_at",
+                (self.STATUS_QUEUED, self.STATUS_RUNNING)
+            ).fetchall()
+
+    async def _store(self, job_id: str, **fields):
+        """
+        워커에서 쓰는 _update
+
+        산출물(마크다운, JSON) 직렬화와 SQLite 쓰기를 스레드에서 실행해
+        _db_lock 대기와 디스크 쓰기가 이벤트 루프를 막지 않게 함
+        """
+        await asyncio.to_thread(self._update, job_id, **fields)
+
+    def _update(self, job_id: str, **fields):
+        for key in ("artifacts", "result"):
+            if key in fields and fields[key] is not None:
+                fields[key] = json.dumps(fields[key], ensure_ascii=False)
+        fields["updated_at"] = datetime.now().isoformat()
+
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        with self._db_lock, self._conn:
+            self._conn.execute(
+                f"UPDATE ingest_jobs SET {assignments} WHERE job_id = ?",
+                (*fields.values(), job_id)
+            )
+
+    def _to_public(self, row: sqlite3.Row) -> Dict[str, Any]:
+        stage = row["stage"]
+        completed = len(self.STAGES) if stage == "done" else self.STAGES.index(stage)
+
+        return {
+            "job_id": row["job_id"],
+            "status": row["status"],
+            "pdf_path": row["pdf_path"],
+            "metadata": json.loads(row["metadata"]),
+            "progress": {
+                "stage": stage,
+                "completed_stages": self.STAGES[:completed],
+                "total_stages": len(self.STAGES),
+                "attempts": row["attempts"]
+            },
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"]
+        }
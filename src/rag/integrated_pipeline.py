@@ -1,13 +1,27 @@
 import logging
 import json
-from typing import Dict, Any, List, Optional
-from pathlib import Path
+import hashlib
+import os
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+import httpx
 
 from mathesis_core.db.hierarchical_chroma import HierarchicalChromaStore
 from mathesis_core.llm.clients import OllamaClient
 
 from .parser import PDFTableParser
-from .enhanced_json_generator import EnhancedJSONGenerator
+from .enhanced_json_generator import EnhancedJSONGenerator, GENERATOR_VERSION
+from .parse_cache import ParseCache
+from .document_store import EnhancedJSONStore
+from .embedding_cache import EmbeddingCache, CachedEmbeddingClient
+from .batch_embedder import BatchingEmbedder, BatchingEmbeddingClient
+from .answer_cache import AnswerCache
+from .filters import normalize_filters, build_where, matches, query_with_where
+from .shards import ShardedVectorStore
+from .index_manifest import IndexManifest, section_hashes, diff_sections
+from ..exceptions import RAGException
+from ..metrics import timed
+from ..tracing import span, annotate
 
 logger = logging.getLogger(__name__)
 
@@ -20,34 +34,126 @@ class IntegratedRAGPipeline:
     4. JSON Export (웹 LLM용)
     """
 
+    # 섹션 단위 삭제에 사용하는 Vector Store의 Chroma 컬렉션
+    CHUNK_COLLECTIONS = ("child_collection", "parent_collection")
+    MANIFEST_FILE = "section_manifest.json"
+
+    NO_CONTEXT_RESPONSE = {
+        "answer": "관련 정보를 찾을 수 없습니다.",
+        "sources": [],
+        "parent_contexts": []
+    }
+
+    ANSWER_SYSTEM_PROMPT = """당신은 교육 데이터 전문가입니다.
+제공된 문맥을 바탕으로 학생/학부모가 이해하기 쉽게 답변하십시오.
+
+**중요 규칙**:
+1. 제공된 문맥에 있는 사실만 사용하십시오
+2. 숫자나 비율은 정확히 인용하십시오
+3. 출처를 명시하십시오 (예: "평가 계획에 따르면...")
+4. 답변할 수 없으면 솔직히 "정보가 부족합니다"라고 하십시오
+
+**답변 형식** (JSON):
+{
+  "answer": "한국어 답변",
+  "key_facts": ["사실1", "사실2"],
+  "confidence": 0.95
+}"""
+
     def __init__(
         self,
         collection_name: str = "school_info_v2",
         ollama_base_url: str = "http://localhost:11434",
         ollama_model: str = "llama3:latest",
-        persist_dir: str = "./chroma_hierarchical"
+        persist_dir: str = "./chroma_hierarchical",
+        extraction_mode: str = PDFTableParser.MODE_LEGACY,
+        parser_workers: int = 1,
+        parse_cache: Optional[ParseCache] = None,
+        json_dir: str = "./enhanced_jsons",
+        json_cache_size: int = 256,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        answer_cache_size: int = 0,
+        answer_cache_similarity: float = 0.95,
+        answer_cache_ttl: Optional[float] = None,
+        stream_timeout: float = 120.0,
+        shard_by: Optional[str] = None,
+        embedding_batch_size: int = 32,
+        embedding_max_in_flight: int = 4,
+        embedding_model: Optional[str] = None
     ):
         # LLM 클라이언트
+        self.ollama_base_url = ollama_base_url.rstrip("/")
+        self.ollama_model = ollama_model
+        self.stream_timeout = stream_timeout
         self.ollama = OllamaClient(
             base_url=ollama_base_url,
             model=ollama_model
         )
 
+        # 임베딩 배치 (배치마다 Ollama /api/embed 한 번, 동시에 들어온 임베딩 요청을 묶어 보내고 동시 요청 수 제한)
+        # + 임베딩 캐시 (같은 청크/질문은 다시 임베딩하지 않음, 캐시 miss만 배치로 전송)
+        # embedding_model을 지정하지 않으면 OllamaClient에 설정된 임베딩 모델 사용
+        self.embedder = BatchingEmbedder(
+            self.ollama,
+            batch_size=embedding_batch_size,
+            max_in_flight=embedding_max_in_flight,
+            model=embedding_model,
+            base_url=ollama_base_url,
+            timeout=stream_timeout
+        )
+        self.embedding_cache = embedding_cache
+        if embedding_cache is not None:
+            self.ollama = CachedEmbeddingClient(
+                self.ollama, embedding_cache, model=embedding_model, batcher=self.embedder
+            )
+        else:
+            self.ollama = BatchingEmbeddingClient(self.ollama, self.embedder)
+
         # Hierarchical Vector Store
-        self.vector_store = HierarchicalChromaStore(
-            collection_prefix=collection_name,
-            ollama_client=self.ollama,
-            persist_dir=persist_dir
+        # shard_by(school | school_year)를 지정하면 학교(+연도)별 컬렉션으로 나누어 저장/검색
+        if shard_by:
+            self.vector_store = ShardedVectorStore(
+                store_factory=lambda prefix: HierarchicalChromaStore(
+                    collection_prefix=prefix,
+                    ollama_client=self.ollama,
+                    persist_dir=persist_dir
+                ),
+                collection_prefix=collection_name,
+                persist_dir=persist_dir,
+                strategy=shard_by
+            )
+        else:
+            self.vector_store = HierarchicalChromaStore(
+                collection_prefix=collection_name,
+                ollama_client=self.ollama,
+                persist_dir=persist_dir
+            )
+
+        # PDF Parser (parser_workers > 1이면 긴 문서는 페이지 구간별로 프로세스 풀에서 파싱)
+        self.pdf_parser = PDFTableParser(
+            workers=parser_workers,
+            extraction_mode=extraction_mode,
+            cache=parse_cache
         )
 
-        # PDF Parser
-        self.pdf_parser = PDFTableParser()
+        # 파싱 결과 캐시 (마크다운 + Enhanced JSON)
+        self.parse_cache = parse_cache
 
-        # JSON Generator
-        self.json_generator = EnhancedJSONGenerator()
+        # Enhanced JSON 저장소 (export용, 디스크에 영속)
+        self.json_storage = EnhancedJSONStore(json_dir, max_cached=json_cache_size)
 
-        # Enhanced JSON 저장소 (export용)
-        self.json_storage: Dict[str, dict] = {}
+        # 답변 캐시 (같은/비슷한 질문은 검색과 LLM 생성 생략), 크기 0이면 비활성
+        self.answer_cache: Optional[AnswerCache] = None
+        if answer_cache_size > 0:
+            self.answer_cache = AnswerCache(
+                embed_fn=self.ollama.embed,
+                max_entries=answer_cache_size,
+                similarity_threshold=answer_cache_similarity,
+                ttl=answer_cache_ttl
+            )
+
+        # 색인된 섹션 해시 (Vector Store와 같은 디렉토리에 보관)
+        self.index_manifest = IndexManifest(os.path.join(persist_dir, self.MANIFEST_FILE))
 
     def ingest_pdf(
         self,
@@ -65,49 +171,245 @@ class IntegratedRAGPipeline:
             {
                 "document_id": str,
                 "enhanced_json_path": str,
-                "chunks_added": int
+                "chunks_added": int,
+                "chunks_updated": int,
+                "chunks_removed": int,
+                "sections_unchanged": int
             }
         """
         logger.info(f"Ingesting PDF: {pdf_path}")
 
         # 1. PDF → Markdown
+        markdown_text = self.parse_pdf(pdf_path)
+
+        # 2. Markdown → Enhanced JSON
+        enhanced_json = self.generate_enhanced_json(markdown_text, metadata)
+        doc_id = enhanced_json["document_metadata"]["document_id"]
+
+        # 3. Enhanced JSON 저장 (export용 + 파일)
+        json_path = self.save_enhanced_json(enhanced_json)
+
+        # 4. Vector Store에 색인 (바뀐 섹션만)
+        index_result = self.index_enhanced_json(enhanced_json)
+
+        return {
+            "document_id": doc_id,
+            "enhanced_json_path": json_path,
+            **index_result
+        }
+
+    # ingest_pdf의 각 단계 (작업 큐에서 단계별 재시도에 사용)
+
+    def parse_pdf(self, pdf_path: str) -> str:
+        """PDF → Markdown"""
         markdown_text = self.pdf_parser.parse(pdf_path)
         if not markdown_text:
             raise ValueError(f"Failed to parse PDF: {pdf_path}")
+        return markdown_text
+
+    def generate_enhanced_json(self, markdown_text: str, metadata: dict) -> dict:
+        """Markdown → Enhanced JSON"""
+        cache_key = None
+        if self.parse_cache is not None:
+            # 마크다운은 PDF 해시 + 파서 버전으로 결정되므로 그 해시를 키로 사용
+            cache_key = ParseCache.make_key(
+                hashlib.sha256(markdown_text.encode("utf-8")).hexdigest(),
+                GENERATOR_VERSION,
+                json.dumps(metadata, sort_keys=True, ensure_ascii=False)
+            )
+            cached = self.parse_cache.get("enhanced_json", cache_key)
+            if cached is not None:
+                enhanced_json = json.loads(cached)
+                logger.info(f"Enhanced JSON cache hit: {enhanced_json['document_metadata']['document_id']}")
+                return enhanced_json
+
+        # 섹션/표 ID 카운터가 인스턴스에 있으므로 동시에 실행되는 작업끼리 공유하지 않도록 호출마다 생성
+        with timed("generate_json"), span("rag.generate_json"):
+            enhanced_json = EnhancedJSONGenerator().generate_from_markdown(
+                markdown_text,
+                metadata
+            )
 
-        # 2. Markdown → Enhanced JSON
-        enhanced_json = self.json_generator.generate_from_markdown(
-            markdown_text,
-            metadata
-        )
+        if cache_key:
+            self.parse_cache.put(
+                "enhanced_json",
+                cache_key,
+                json.dumps(enhanced_json, ensure_ascii=False)
+            )
 
         doc_id = enhanced_json["document_metadata"]["document_id"]
         logger.info(f"Generated enhanced JSON for document: {doc_id}")
+        return enhanced_json
 
-        # 3. Enhanced JSON 저장 (export용)
-        self.json_storage[doc_id] = enhanced_json
+    def save_enhanced_json(self, enhanced_json: dict) -> str:
+        """Enhanced JSON을 export 저장소와 파일로 저장하고 파일 경로 반환"""
+        doc_id = enhanced_json["document_metadata"]["document_id"]
+        with timed("write_json"), span("rag.save_json", document_id=doc_id):
+            json_path = self.json_storage.put(doc_id, enhanced_json)
 
-        # 4. JSON 파일로 저장
-        output_dir = Path("./enhanced_jsons")
-        output_dir.mkdir(exist_ok=True)
-        json_path = output_dir / f"{doc_id}.json"
+        logger.info(f"Saved enhanced JSON: {json_path}")
+        return str(json_path)
 
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(enhanced_json, f, ensure_ascii=False, indent=2)
+    @timed("index")
+    @span("rag.index")
+    def index_enhanced_json(self, enhanced_json: dict) -> dict:
+        """
+        Enhanced JSON → Vector Store (증분 색인)
 
-        logger.info(f"Saved enhanced JSON: {json_path}")
+        이전에 색인한 섹션 해시와 비교하여
+        - 새 섹션과 내용이 바뀐 섹션만 임베딩
+        - 바뀐 섹션과 사라진 섹션의 기존 청크는 삭제
+        같은 문서를 그대로 다시 넣으면 아무것도 임베딩하지 않음
 
-        # 5. Vector Store에 색인
-        chunks_added = self.vector_store.add_hierarchical_document(enhanced_json)
+        Returns:
+            {"chunks_added", "chunks_updated", "chunks_removed", "sections_unchanged"}
+        """
+        doc_id = enhanced_json["document_metadata"]["document_id"]
+        new_hashes = section_hashes(enhanced_json)
+        old_hashes = self.index_manifest.get(doc_id)
+
+        if old_hashes is None:
+            # 기록이 없으면 (이전 버전에서 색인된 경우 포함) 문서의 청크를 모두 교체
+            chunks_removed = self._delete_chunks(doc_id)
+            diff = diff_sections({}, new_hashes)
+        else:
+            diff = diff_sections(old_hashes, new_hashes)
+            chunks_removed = self._delete_chunks(doc_id, diff["removed"]) if diff["removed"] else 0
+            if diff["updated"]:
+                self._delete_chunks(doc_id, diff["updated"])
+
+        chunks_added = self._add_sections(enhanced_json, diff["added"])
+        chunks_updated = self._add_sections(enhanced_json, diff["updated"])
+
+        self.index_manifest.set(doc_id, new_hashes)
+        annotate(
+            document_id=doc_id,
+            chunks_added=chunks_added,
+            chunks_updated=chunks_updated,
+            chunks_removed=chunks_removed
+        )
 
-        logger.info(f"Added {chunks_added} chunks to vector store")
+        if self.answer_cache is not None and (chunks_added or chunks_updated or chunks_removed):
+            # 이 문서를 출처로 사용한 답변은 더 이상 유효하지 않음
+            self.answer_cache.invalidate_document(doc_id)
 
+        logger.info(
+            f"Indexed {doc_id}: {chunks_added} added, {chunks_updated} updated, "
+            f"{chunks_removed} removed, {len(diff['unchanged'])} sections unchanged"
+        )
         return {
-            "document_id": doc_id,
-            "enhanced_json_path": str(json_path),
-            "chunks_added": chunks_added
+            "chunks_added": chunks_added,
+            "chunks_updated": chunks_updated,
+            "chunks_removed": chunks_removed,
+            "sections_unchanged": len(diff["unchanged"])
         }
 
+    def delete_document(self, doc_id: str) -> bool:
+        """문서를 Vector Store와 저장소에서 모두 삭제"""
+        self._delete_chunks(doc_id)
+        if isinstance(self.vector_store, ShardedVectorStore):
+            self.vector_store.remove_document(doc_id)
+        self._forget_index(doc_id)
+        return self.json_storage.delete(doc_id)
+
+    def _forget_index(self, doc_id: str):
+        """색인 기록과 캐시된 답변 제거 (다음 색인 때 문서 전체를 다시 색인)"""
+        self.index_manifest.remove(doc_id)
+        if self.answer_cache is not None:
+            self.answer_cache.invalidate_document(doc_id)
+
+    # ============= Shards (shard_by 지정 시) =============
+
+    def _sharded_store(self) -> ShardedVectorStore:
+        if not isinstance(self.vector_store, ShardedVectorStore):
+            raise ValueError("Vector store sharding is not enabled")
+        return self.vector_store
+
+    def list_shards(self) -> List[dict]:
+        """샤드 목록 (문서 수, 컬렉션별 청크 수)"""
+        return self._sharded_store().list_shards()
+
+    def compact_shard(self, shard: str) -> dict:
+        """
+        샤드에서 더 이상 색인 기록이 없는 문서의 청크를 정리
+
+        Raises:
+            ValueError: 샤딩 비활성
+            KeyError: 없는 샤드
+        """
+        return self._sharded_store().compact_shard(shard, live_documents=set(self.index_manifest.ids()))
+
+    def drop_shard(self, shard: str) -> List[str]:
+        """
+        샤드 삭제 - 청크는 지우고 Enhanced JSON은 남겨 다시 색인할 수 있게 함
+
+        Raises:
+            ValueError: 샤딩 비활성
+            KeyError: 없는 샤드
+        """
+        documents = self._sharded_store().drop_shard(shard)
+        for doc_id in documents:
+            self._forget_index(doc_id)
+        return documents
+
+    def _add_sections(self, enhanced_json: dict, section_ids: List[str]) -> int:
+        """지정한 섹션만 담은 Enhanced JSON을 색인하고 추가된 청크 수 반환"""
+        if not section_ids:
+            return 0
+
+        wanted = set(section_ids)
+        sections = [s for s in enhanced_json.get("sections", []) if s["section_id"] in wanted]
+
+        rag_optimization = dict(enhanced_json.get("rag_optimization", {}))
+        if "chunk_mappings" in rag_optimization:
+            mappings = {
+                chunk_id: mapping
+                for chunk_id, mapping in rag_optimization["chunk_mappings"].items()
+                if mapping.get("section") in wanted
+            }
+            rag_optimization["chunk_mappings"] = mappings
+            rag_optimization["chunk_ids"] = list(mappings)
+
+        partial = {**enhanced_json, "sections": sections, "rag_optimization": rag_optimization}
+        return self.vector_store.add_hierarchical_document(partial)
+
+    def _delete_chunks(self, doc_id: str, section_ids: Optional[List[str]] = None) -> int:
+        """
+        문서(또는 문서의 일부 섹션)의 청크를 Vector Store에서 삭제하고 삭제된 청크 수 반환
+        청크 메타데이터의 document_id / section_id로 찾음
+
+        Raises:
+            RAGException: Vector Store에 청크 컬렉션이 없음 (지우지 못한 청크가
+                          남지 않도록 색인을 중단, 색인 기록도 갱신되지 않음)
+        """
+        if section_ids is None:
+            where = {"document_id": doc_id}
+        else:
+            where = {"$and": [
+                {"document_id": doc_id},
+                {"section_id": {"$in": list(section_ids)}}
+            ]}
+
+        if isinstance(self.vector_store, ShardedVectorStore):
+            collections = self.vector_store.collections_for(doc_id, self.CHUNK_COLLECTIONS)
+        else:
+            collections = [getattr(self.vector_store, name, None) for name in self.CHUNK_COLLECTIONS]
+
+        removed = 0
+        for name, collection in zip(self.CHUNK_COLLECTIONS, collections):
+            if collection is None:
+                raise RAGException(
+                    f"Vector store has no {name}; cannot delete chunks of {doc_id}"
+                )
+
+            ids = collection.get(where=where, include=[]).get("ids", [])
+            if ids:
+                collection.delete(ids=ids)
+                removed += len(ids)
+
+        return removed
+
+    @span("rag.query")
     def query(
         self,
         question: str,
@@ -129,76 +431,205 @@ class IntegratedRAGPipeline:
                 "parent_contexts": List[str]
             }
         """
+        # 답변은 k에 따라서도 달라지므로 캐시 키에 포함
+        cache_scope = {**normalize_filters(filters), "k": k}
+        generation = None
+        if self.answer_cache is not None:
+            # 생성 중에 출처 문서가 다시 색인되면 put에서 버려짐
+            generation = self.answer_cache.generation()
+            cached = self.answer_cache.get(question, cache_scope)
+            if cached is not None:
+                annotate(answer_cache_hit=True)
+                return cached
+
+        response = self._answer(question, k, filters)
+
+        if self._cacheable(response):
+            self.answer_cache.put(question, cache_scope, response, generation=generation)
+
+        return response
+
+    def query_stream(
+        self,
+        question: str,
+        k: int = 3,
+        filters: Optional[Dict[str, str]] = None
+    ) -> Iterator[dict]:
+        """
+        query()의 스트리밍 버전 - 생성 완료를 기다리지 않고 이벤트를 순서대로 반환
+
+        Yields:
+            {"event": "sources", "sources": [...]}   검색 직후
+            {"event": "token", "text": str}           Ollama가 생성하는 대로
+            {"event": "answer", **query() 결과}        마지막에 파싱된 최종 답변
+            {"event": "error", "detail": str}         검색 실패 시 (응답이 이미 시작되었으므로)
+
+        query()와 같은 답변 캐시 / 메트릭 / trace span을 사용하므로
+        서비스에서는 query_pool에서 실행 (WorkerPool.iterate)
+        """
+        with span("rag.query", stream=True):
+            yield from self._query_stream(question, k, filters)
+
+    def _query_stream(
+        self,
+        question: str,
+        k: int,
+        filters: Optional[Dict[str, str]]
+    ) -> Iterator[dict]:
+        cache_scope = {**normalize_filters(filters), "k": k}
+        generation = None
+        if self.answer_cache is not None:
+            # 생성 중에 출처 문서가 다시 색인되면 put에서 버려짐
+            generation = self.answer_cache.generation()
+            cached = self.answer_cache.get(question, cache_scope)
+            if cached is not None:
+                annotate(answer_cache_hit=True)
+                yield {"event": "sources", "sources": cached["sources"]}
+                yield {"event": "answer", **cached}
+                return
+
+        try:
+            parent_contexts = self._retrieve(question, k, filters)
+        except Exception as e:
+            logger.error(f"Retrieval failed: {e}")
+            yield {"event": "error", "detail": str(e)}
+            return
+
+        sources = self._sources(parent_contexts)
+        yield {"event": "sources", "sources": sources}
+
+        if not parent_contexts:
+            yield {"event": "answer", **self.NO_CONTEXT_RESPONSE}
+            return
+
+        tokens = []
+        try:
+            with timed("llm_generate"), span("rag.llm_generate", model=self.ollama_model, stream=True):
+                for token in self._generate_stream(self._build_prompt(question, parent_contexts)):
+                    tokens.append(token)
+                    yield {"event": "token", "text": token}
+            response_json = self._parse_answer("".join(tokens))
+        except Exception as e:
+            logger.error(f"LLM streaming failed: {e}")
+            response_json = self._error_answer(e)
+
+        response = self._response(response_json, parent_contexts)
+        if self._cacheable(response):
+            self.answer_cache.put(question, cache_scope, response, generation=generation)
+
+        yield {"event": "answer", **response}
+
+    # 답변 생성 단계 (query / query_stream 공용)
+
+    def _cacheable(self, response: dict) -> bool:
+        """출처가 있고 정상 생성된 답변만 캐시"""
+        return (
+            self.answer_cache is not None
+            and bool(response["sources"])
+            and response.get("confidence") != 0
+        )
+
+    def _answer(
+        self,
+        question: str,
+        k: int,
+        filters: Optional[Dict[str, str]]
+    ) -> dict:
+        """검색 + 답변 생성 (캐시 없이)"""
         # 1. Parent Context 검색
-        search_result = self.vector_store.query_with_parent_context(
+        parent_contexts = self._retrieve(question, k, filters)
+        if not parent_contexts:
+            return dict(self.NO_CONTEXT_RESPONSE)
+
+        # 2. LLM 답변 생성
+        try:
+            with timed("llm_generate"), span("rag.llm_generate", model=self.ollama_model):
+                response_text = self.ollama.generate(
+                    prompt=self._build_prompt(question, parent_contexts),
+                    system=self.ANSWER_SYSTEM_PROMPT,
+                    format="json",
+                    temperature=0.1
+                )
+            response_json = self._parse_answer(response_text)
+        except Exception as e:
+            logger.error(f"LLM generation failed: {e}")
+            response_json = self._error_answer(e)
+
+        # 3. 출처 정보 추가
+        return self._response(response_json, parent_contexts)
+
+    @timed("retrieve")
+    @span("rag.retrieve")
+    def _retrieve(
+        self,
+        question: str,
+        k: int,
+        filters: Optional[Dict[str, str]]
+    ) -> List[dict]:
+        """
+        Parent Context 검색
+
+        필터는 where 절로 Vector Store에 전달하여 벡터 검색과 BM25 검색 모두
+        해당 학교/연도/학년/과목/학기 청크 안에서만 수행되도록 함
+
+        Raises:
+            RAGException: 필터가 있는데 Vector Store가 where를 받지 않음
+        """
+        filters = normalize_filters(filters)
+        search_result = query_with_where(
+            self.vector_store,
+            build_where(filters),
             question=question,
             k=k,
             use_hybrid=True
         )
-
-        matched_children = search_result["matched_children"]
         parent_contexts = search_result["parent_contexts"]
+        if not filters:
+            return parent_contexts
+
+        # where를 받고도 무시하는 구현에 대비해 결과도 한 번 더 확인
+        matched = [p for p in parent_contexts if matches(p["metadata"], filters)]
+        if len(matched) < len(parent_contexts):
+            logger.warning(
+                f"Vector store ignored 'where': dropped {len(parent_contexts) - len(matched)} "
+                f"results outside filters {filters}"
+            )
+        return matched[:k]
 
-        if not parent_contexts:
-            return {
-                "answer": "관련 정보를 찾을 수 없습니다.",
-                "sources": [],
-                "parent_contexts": []
-            }
-
-        # 2. Parent Context 결합
+    def _build_prompt(self, question: str, parent_contexts: List[dict]) -> str:
+        """Parent Context를 결합한 사용자 프롬프트"""
         context_str = "\n\n---\n\n".join([
             f"[출처: {p['metadata'].get('section_title', 'Unknown')}]\n{p['text']}"
             for p in parent_contexts
         ])
 
-        # 3. LLM 답변 생성
-        system_prompt = """당신은 교육 데이터 전문가입니다.
-제공된 문맥을 바탕으로 학생/학부모가 이해하기 쉽게 답변하십시오.
-
-**중요 규칙**:
-1. 제공된 문맥에 있는 사실만 사용하십시오
-2. 숫자나 비율은 정확히 인용하십시오
-3. 출처를 명시하십시오 (예: "평가 계획에 따르면...")
-4. 답변할 수 없으면 솔직히 "정보가 부족합니다"라고 하십시오
-
-**답변 형식** (JSON):
-{
-  "answer": "한국어 답변",
-  "key_facts": ["사실1", "사실2"],
-  "confidence": 0.95
-}"""
-
-        user_prompt = f"""질문: {question}
+        return f"""질문: {question}
 
 참고 자료:
 {context_str}"""
 
+    @staticmethod
+    def _parse_answer(response_text: str) -> dict:
         try:
-            response_text = self.ollama.generate(
-                prompt=user_prompt,
-                system=system_prompt,
-                format="json",
-                temperature=0.1
-            )
-
-            response_json = json.loads(response_text)
+            return json.loads(response_text)
         except json.JSONDecodeError:
-            response_json = {
+            return {
                 "answer": response_text,
                 "key_facts": [],
                 "confidence": 0.5
             }
-        except Exception as e:
-            logger.error(f"LLM generation failed: {e}")
-            response_json = {
-                "answer": f"답변 생성 중 오류가 발생했습니다: {e}",
-                "key_facts": [],
-                "confidence": 0.0
-            }
 
-        # 4. 출처 정보 추가
-        sources = [
+    @staticmethod
+    def _error_answer(error: Exception) -> dict:
+        return {
+            "answer": f"답변 생성 중 오류가 발생했습니다: {error}",
+            "key_facts": [],
+            "confidence": 0.0
+        }
+
+    @staticmethod
+    def _sources(parent_contexts: List[dict]) -> List[dict]:
+        return [
             {
                 "section_title": p["metadata"].get("section_title"),
                 "school_name": p["metadata"].get("school_name"),
@@ -208,12 +639,51 @@ class IntegratedRAGPipeline:
             for p in parent_contexts
         ]
 
+    def _response(self, response_json: dict, parent_contexts: List[dict]) -> dict:
         return {
             **response_json,
-            "sources": sources,
+            "sources": self._sources(parent_contexts),
             "parent_contexts": [p["text"][:200] + "..." for p in parent_contexts]
         }
 
+    def _ollama_setting(self, name: str, default, kind):
+        """OllamaClient에 설정된 값 (없거나 형식이 다르면 default)"""
+        value = getattr(self.ollama, name, None)
+        return value if isinstance(value, kind) and not isinstance(value, bool) else default
+
+    def _generate_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Ollama /api/generate 스트리밍 호출, 생성된 토큰을 순서대로 반환
+
+        OllamaClient에 스트리밍 API가 없어 직접 호출하되,
+        주소/모델/타임아웃은 OllamaClient 설정을 그대로 사용
+        """
+        base_url = self._ollama_setting("base_url", self.ollama_base_url, str).rstrip("/")
+        with httpx.stream(
+            "POST",
+            f"{base_url}/api/generate",
+            json={
+                "model": self._ollama_setting("model", self.ollama_model, str),
+                "prompt": prompt,
+                "system": self.ANSWER_SYSTEM_PROMPT,
+                "format": "json",
+                "stream": True,
+                "options": {"temperature": 0.1}
+            },
+            timeout=self._ollama_setting("timeout", self.stream_timeout, (int, float))
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise RuntimeError(chunk["error"])
+                if chunk.get("response"):
+                    yield chunk["response"]
+                if chunk.get("done"):
+                    break
+
     def export_json(self, document_id: str) -> Optional[dict]:
         """
         웹 LLM용 Enhanced JSON 내보내기
@@ -226,22 +696,33 @@ class IntegratedRAGPipeline:
         """
         return self.json_storage.get(document_id)
 
-    def export_all_jsons(self) -> Dict[str, dict]:
-        """모든 문서의 Enhanced JSON 내보내기"""
-        return self.json_storage.copy()
+    def iter_export_jsons(
+        self,
+        school_code: Optional[str] = None,
+        year: Optional[str] = None
+    ) -> Iterator[Tuple[str, dict]]:
+        """Enhanced JSON을 한 문서씩 내보내기 (스트리밍 export용)"""
+        return self.json_storage.iter_documents(school_code=school_code, year=year)
 
     def list_documents(self) -> List[dict]:
-        """색인된 문서 목록"""
+        """색인된 문서 목록 (인덱스만 사용, 문서 본문은 읽지 않음)"""
         docs = []
-        for doc_id, json_data in self.json_storage.items():
-            metadata = json_data["document_metadata"]
+        for summary in self.json_storage.summaries():
             docs.append({
-                "document_id": doc_id,
-                "school_name": metadata.get("school_name"),
-                "year": metadata.get("year"),
-                "grade": metadata.get("grade"),
-                "subject": metadata.get("subject"),
-                "section_count": metadata.get("section_count"),
-                "table_count": metadata.get("table_count")
+                "document_id": summary["document_id"],
+                "school_name": summary.get("school_name"),
+                "year": summary.get("year"),
+                "grade": summary.get("grade"),
+                "subject": summary.get("subject"),
+                "section_count": summary.get("section_count"),
+                "table_count": summary.get("table_count")
             })
         return docs
+
+    def close(self):
+        """임베딩 배치 / 샤드 검색 스레드 정리, 문서 인덱스 / 섹션 해시 로그 합치기 (서비스 종료 시)"""
+        self.embedder.shutdown(wait=False)
+        self.json_storage.close()
+        self.index_manifest.close()
+        if isinstance(self.vector_store, ShardedVectorStore):
+            self.vector_store.shutdown()
@@ -0,0 +1,160 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from ..metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+
+class ParseCache:
+    """
+    Content-addressed on-disk cache for parse results.
+
+    Entries are keyed by a hash of the source content plus the producer
+    version (e.g. PDF sha256 + parser version), so an unchanged document
+    skips parsing no matter which path it is ingested from. Total size is
+    bounded; the least recently used entries are evicted first.
+    """
+
+    KINDS = {
+        "markdown": ".md",
+        "enhanced_json": ".json"
+    }
+
+    def __init__(self, cache_dir: str = "./parse_cache", max_bytes: int = 512 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits: Dict[str, int] = {kind: 0 for kind in self.KINDS}
+        self.misses: Dict[str, int] = {kind: 0 for kind in self.KINDS}
+
+        self._lock = threading.Lock()
+        # file name -> size, oldest first
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        # (path, size, mtime_ns) -> sha256, avoids re-hashing the same file
+        self._file_hashes: Dict[Tuple[str, int, int], str] = {}
+
+        self._load()
+
+    def _load(self):
+        if not self.cache_dir.exists():
+            return
+
+        files = [
+            p for p in self.cache_dir.iterdir()
+            if p.is_file() and p.suffix in self.KINDS.values()
+        ]
+        files.sort(key=lambda p: p.stat().st_mtime)
+        for path in files:
+            size = path.stat().st_size
+            self._entries[path.name] = size
+            self._total_bytes += size
+
+        logger.info(f"Loaded parse cache: {len(self._entries)} entries, {self._total_bytes} bytes")
+
+    # ============= Keys =============
+
+    def file_hash(self, file_path: str) -> str:
+        """sha256 of a file's content"""
+        stat = os.stat(file_path)
+        memo_key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+
+        cached = self._file_hashes.get(memo_key)
+        if cached:
+            return cached
+
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+
+        file_hash = digest.hexdigest()
+        self._file_hashes[memo_key] = file_hash
+        return file_hash
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """Combines content hash and version parts into one cache key"""
+        return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()
+
+    # ============= Access =============
+
+    def get(self, kind: str, key: str) -> Optional[str]:
+        """Returns the cached text, or None on a miss"""
+        name = key + self.KINDS[kind]
+        path = self.cache_dir / name
+
+        with self._lock:
+            if name not in self._entries:
+                self.misses[kind] += 1
+                record_cache(f"parse_{kind}", misses=1)
+                return None
+
+            try:
+                data = path.read_text(encoding="utf-8")
+            except OSError:
+                self._drop(name)
+                self.misses[kind] += 1
+                record_cache(f"parse_{kind}", misses=1)
+                return None
+
+            self._entries.move_to_end(name)
+            self.hits[kind] += 1
+            record_cache(f"parse_{kind}", hits=1)
+
+        # Persist recency so LRU order survives restarts
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def put(self, kind: str, key: str, data: str):
+        """Stores text and evicts least recently used entries over the size limit"""
+        name = key + self.KINDS[kind]
+        path = self.cache_dir / name
+        encoded = data.encode("utf-8")
+
+        if len(encoded) > self.max_bytes:
+            logger.warning(f"Not caching {name}: {len(encoded)} bytes exceeds cache size")
+            return
+
+        with self._lock:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(path.suffix + ".tmp")
+            tmp_path.write_bytes(encoded)
+            os.replace(tmp_path, path)
+
+            if name in self._entries:
+                self._total_bytes -= self._entries[name]
+            self._entries[name] = len(encoded)
+            self._entries.move_to_end(name)
+            self._total_bytes += len(encoded)
+
+            while self._total_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                logger.debug(f"Evicted parse cache entry: {oldest}")
+
+    def _drop(self, name: str):
+        self._total_bytes -= self._entries.pop(name)
+        try:
+            (self.cache_dir / name).unlink()
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            return {
+                "hits": dict(self.hits),
+                "misses": dict(self.misses),
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes
+            }
@@ -1,53 +1,219 @@
 import pdfplumber
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Optional
 
+from .parse_cache import ParseCache
+from ..metrics import timed
+from ..tracing import span, annotate
+
 logger = logging.getLogger(__name__)
 
+# Bump when the markdown output format changes so cached parses are not reused
+PARSER_VERSION = "1"
+
+
+def _parse_page_range(
+    pdf_path: str,
+    start: int,
+    end: int,
+    extraction_mode: str = "legacy"
+) -> List[str]:
+    """
+    Worker entry point for parallel parsing: renders pages [start, end).
+    Kept at module level so it can be pickled into a process pool.
+    """
+    parser = PDFTableParser(extraction_mode=extraction_mode)
+    markdown_output = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for page_num in range(start, end):
+            markdown_output.extend(parser._render_page(pdf.pages[page_num], page_num))
+    return markdown_output
+
+
 class PDFTableParser:
     """
     Parses PDF into Markdown format, attempting to preserve table structures.
     Uses pdfplumber for table extraction.
+
+    With workers > 1, documents longer than one shard are split into page
+    ranges that are parsed in a process pool and reassembled in page order.
+
+    Extraction modes:
+    - "legacy": full-page extract_text() followed by a "### Tables" block
+      from extract_tables(). Table text appears twice.
+    - "single_pass": tables are found once per page, their regions are left
+      out of the narrative text, and each table is placed inline where it
+      sits on the page.
     """
-    
+
+    MODE_LEGACY = "legacy"
+    MODE_SINGLE_PASS = "single_pass"
+
+    def __init__(
+        self,
+        workers: int = 1,
+        pages_per_shard: int = 16,
+        extraction_mode: str = MODE_LEGACY,
+        cache: Optional[ParseCache] = None
+    ):
+        if extraction_mode not in (self.MODE_LEGACY, self.MODE_SINGLE_PASS):
+            raise ValueError(f"Unknown extraction mode: {extraction_mode}")
+
+        self.workers = workers
+        self.pages_per_shard = pages_per_shard
+        self.extraction_mode = extraction_mode
+        self.cache = cache
+
+    @property
+    def version(self) -> str:
+        """Identifies the markdown this parser produces, used in cache keys"""
+        return f"{PARSER_VERSION}:{self.extraction_mode}"
+
+    @span("pdf.parse")
     def parse(self, pdf_path: str) -> str:
         """
         Parses a PDF file and returns a Markdown string.
         """
+        annotate(path=pdf_path, extraction_mode=self.extraction_mode)
+        cache_key = None
+        if self.cache is not None:
+            try:
+                cache_key = ParseCache.make_key(self.cache.file_hash(pdf_path), self.version)
+            except OSError as e:
+                logger.warning(f"Parse cache disabled for {pdf_path}: {e}")
+
+            if cache_key:
+                cached = self.cache.get("markdown", cache_key)
+                if cached is not None:
+                    logger.info(f"Parse cache hit: {pdf_path}")
+                    annotate(cache_hit=True)
+                    return cached
+
         logger.info(f"Parsing PDF: {pdf_path}")
         markdown_output = []
         
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                for page_num, page in enumerate(pdf.pages):
-                    markdown_output.append(f"## Page {page_num + 1}")
-                    
-                    # 1. Extract Text (Layout-aware)
-                    # We might want to separate tables from text, but pdfplumber's extract_text
-                    # sometimes merges them messily.
-                    # Strategy: Find tables, extract them, and try to place them? 
-                    # Simpler strategy for V1: Extract tables first, then extract text ignoring table areas?
-                    # Or just: Text extraction + Append found tables?
-                    
-                    # Let's try simple text extraction first, but converting tables to MD
-                    text = page.extract_text()
-                    if text:
-                        markdown_output.append(text)
-                    
-                    # 2. Extract Tables and convert to Markdown
-                    tables = page.extract_tables()
-                    if tables:
-                        markdown_output.append("\n### Tables\n")
-                        for table in tables:
-                            md_table = self._table_to_markdown(table)
-                            markdown_output.append(md_table)
-                            markdown_output.append("\n")
-                            
+            with timed("parse"):
+                with pdfplumber.open(pdf_path) as pdf:
+                    page_count = len(pdf.pages)
+                    parallel = self.workers > 1 and page_count > self.pages_per_shard
+
+                    if not parallel:
+                        for page_num, page in enumerate(pdf.pages):
+                            markdown_output.extend(self._render_page(page, page_num))
+
+                annotate(pages=page_count, parallel=parallel)
+                if parallel:
+                    markdown_output = self._parse_parallel(pdf_path, page_count)
+
         except Exception as e:
             logger.error(f"Failed to parse PDF {pdf_path}: {e}")
             return ""
 
-        return "\n".join(markdown_output)
+        markdown_text = "\n".join(markdown_output)
+        if cache_key and markdown_text:
+            self.cache.put("markdown", cache_key, markdown_text)
+
+        return markdown_text
+
+    def _parse_parallel(self, pdf_path: str, page_count: int) -> List[str]:
+        """Parses page ranges in a process pool and joins them in page order"""
+        shards = [
+            (start, min(start + self.pages_per_shard, page_count))
+            for start in range(0, page_count, self.pages_per_shard)
+        ]
+        logger.info(f"Parsing {page_count} pages in {len(shards)} shards with {self.workers} workers")
+
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(shards))) as executor:
+            futures = [
+                executor.submit(_parse_page_range, pdf_path, start, end, self.extraction_mode)
+                for start, end in shards
+            ]
+            # Collect in submission order so pages stay in sequence
+            markdown_output = []
+            for future in futures:
+                markdown_output.extend(future.result())
+
+        return markdown_output
+
+    def _render_page(self, page, page_num: int) -> List[str]:
+        """Renders a single page as Markdown pieces"""
+        if self.extraction_mode == self.MODE_SINGLE_PASS:
+            return self._render_page_single_pass(page, page_num)
+
+        markdown_output = [f"## Page {page_num + 1}"]
+
+        # 1. Extract Text (Layout-aware)
+        # We might want to separate tables from text, but pdfplumber's extract_text
+        # sometimes merges them messily.
+        # Strategy: Find tables, extract them, and try to place them? 
+        # Simpler strategy for V1: Extract tables first, then extract text ignoring table areas?
+        # Or just: Text extraction + Append found tables?
+        
+        # Let's try simple text extraction first, but converting tables to MD
+        text = page.extract_text()
+        if text:
+            markdown_output.append(text)
+        
+        # 2. Extract Tables and convert to Markdown
+        tables = page.extract_tables()
+        if tables:
+            markdown_output.append("\n### Tables\n")
+            for table in tables:
+                md_table = self._table_to_markdown(table)
+                markdown_output.append(md_table)
+                markdown_output.append("\n")
+
+        return markdown_output
+
+    def _render_page_single_pass(self, page, page_num: int) -> List[str]:
+        """
+        Renders a page with one table detection pass.
+        Text lines outside table regions and the tables themselves are
+        merged top-to-bottom, so tables land where they appear on the page.
+        """
+        markdown_output = [f"## Page {page_num + 1}"]
+
+        tables = page.find_tables()
+        bboxes = [table.bbox for table in tables]
+
+        def outside_tables(obj) -> bool:
+            if "text" not in obj:
+                return True
+            x = (obj["x0"] + obj["x1"]) / 2
+            y = (obj["top"] + obj["bottom"]) / 2
+            return not any(
+                x0 <= x <= x1 and top <= y <= bottom
+                for x0, top, x1, bottom in bboxes
+            )
+
+        text_page = page.filter(outside_tables) if bboxes else page
+
+        # (top, kind, content) blocks in reading order
+        blocks = [(line["top"], "text", line["text"]) for line in text_page.extract_text_lines()]
+        blocks += [(table.bbox[1], "table", table.extract()) for table in tables]
+        blocks.sort(key=lambda block: block[0])
+
+        paragraph = []
+        for _, kind, content in blocks:
+            if kind == "text":
+                paragraph.append(content)
+                continue
+
+            if paragraph:
+                markdown_output.append("\n".join(paragraph))
+                paragraph = []
+
+            md_table = self._table_to_markdown(content)
+            if md_table:
+                markdown_output.append(md_table)
+                markdown_output.append("")
+
+        if paragraph:
+            markdown_output.append("\n".join(paragraph))
+
+        return markdown_output
 
     def _table_to_markdown(self, table: List[List[str]]) -> str:
         """
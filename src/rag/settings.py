@@ -0,0 +1,48 @@
+"""
+환경 변수 → IntegratedRAGPipeline 설정
+
+API 서버(main.py)와 대량 색인 CLI(bulk_ingest.py)가 같은 설정을 쓰도록 한 곳에서 읽음
+(다른 임베딩 모델/컬렉션으로 색인되어 API 검색과 어긋나지 않도록)
+"""
+import os
+
+from .embedding_cache import EmbeddingCache
+from .parse_cache import ParseCache
+
+COLLECTION_NAME = "school_info_v2"
+PERSIST_DIR = "./chroma_hierarchical"
+
+
+def parse_cache_from_env() -> ParseCache:
+    return ParseCache(
+        cache_dir=os.getenv("PARSE_CACHE_DIR", "./parse_cache"),
+        max_bytes=int(os.getenv("PARSE_CACHE_MAX_MB", "512")) * 1024 * 1024
+    )
+
+
+def embedding_cache_from_env() -> EmbeddingCache:
+    return EmbeddingCache(
+        db_path=os.getenv("EMBEDDING_CACHE_DB", "./embedding_cache.db"),
+        max_entries=int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+    )
+
+
+def pipeline_kwargs_from_env() -> dict:
+    """캐시 객체를 제외한 IntegratedRAGPipeline 인자"""
+    return {
+        "collection_name": COLLECTION_NAME,
+        "ollama_base_url": os.getenv("OLLAMA_BASE_URL", "http://localhost:11434"),
+        "ollama_model": os.getenv("OLLAMA_MODEL", "llama3:latest"),
+        "persist_dir": PERSIST_DIR,
+        "extraction_mode": os.getenv("PDF_EXTRACTION_MODE", "legacy"),
+        "parser_workers": int(os.getenv("PARSER_WORKERS", "1")),
+        "json_dir": os.getenv("ENHANCED_JSON_DIR", "./enhanced_jsons"),
+        "json_cache_size": int(os.getenv("ENHANCED_JSON_CACHE_SIZE", "256")),
+        "answer_cache_size": int(os.getenv("ANSWER_CACHE_SIZE", "1000")),
+        "answer_cache_similarity": float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.95")),
+        "answer_cache_ttl": float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "86400")) or None,
+        "shard_by": os.getenv("VECTOR_SHARD_BY") or None,
+        "embedding_batch_size": int(os.getenv("EMBEDDING_BATCH_SIZE", "32")),
+        "embedding_max_in_flight": int(os.getenv("EMBEDDING_MAX_IN_FLIGHT", "4")),
+        "embedding_model": os.getenv("OLLAMA_EMBEDDING_MODEL") or None
+    }
@@ -0,0 +1,348 @@
+import contextvars
+import json
+import logging
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .filters import query_with_where
+from ..metrics import timed
+from ..tracing import span
+
+logger = logging.getLogger(__name__)
+
+
+def where_equalities(where: Optional[dict]) -> Dict[str, str]:
+    """Chroma where 절에서 단순 동등 조건({field: value})만 추출"""
+    if not where:
+        return {}
+    conditions = where["$and"] if "$and" in where else [where]
+
+    equalities = {}
+    for condition in conditions:
+        for field, value in condition.items():
+            if not field.startswith("$") and not isinstance(value, dict):
+                equalities[field] = str(value)
+    return equalities
+
+
+class ShardedVectorStore:
+    """
+    학교별 / 학교+연도별로 컬렉션을 나누는 Hierarchical Vector Store 샤딩 계층
+
+    - 문서는 document_metadata의 school_code(/year)로 샤드를 결정하여 저장
+    - 검색은 필터(where)로 해당되는 샤드에만 동시에 요청하고,
+      거리(작을수록 가까움) 또는 순위 융합(RRF)으로 하나의 결과로 병합
+    - 샤드 목록과 샤드별 문서는 registry 파일에 보관 (재시작 후에도 유지)
+
+    IntegratedRAGPipeline이 사용하는 add_hierarchical_document /
+    query_with_parent_context와 같은 인터페이스를 제공함
+    """
+
+    STRATEGIES = ("school", "school_year")
+    REGISTRY_FILE = "shards.json"
+    # Reciprocal Rank Fusion 상수 (상위 몇 개 순위 차이를 완만하게)
+    RRF_K = 60
+
+    def __init__(
+        self,
+        store_factory: Callable[[str], Any],
+        collection_prefix: str,
+        persist_dir: str,
+        strategy: str = "school",
+        fanout_workers: int = 4
+    ):
+        """
+        Args:
+            store_factory: collection_prefix → 샤드 Vector Store (HierarchicalChromaStore)
+            collection_prefix: 샤드 컬렉션 이름 앞부분 (샤드 이름이 뒤에 붙음)
+            persist_dir: registry 파일 위치
+            strategy: school | school_year
+            fanout_workers: 검색 시 동시에 요청할 샤드 수
+        """
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown shard strategy: {strategy} (allowed: {', '.join(self.STRATEGIES)})")
+
+        self.store_factory = store_factory
+        self.collection_prefix = collection_prefix
+        self.strategy = strategy
+        self.registry_path = Path(persist_dir) / self.REGISTRY_FILE
+
+        self._lock = threading.RLock()
+        self._stores: Dict[str, Any] = {}
+        # 샤드 이름 → {"school_code", "year", "documents": [document_id, ...]}
+        self._shards: Dict[str, dict] = {}
+        self._executor = ThreadPoolExecutor(max_workers=fanout_workers, thread_name_prefix="shard")
+
+        self._load_registry()
+
+    # ============= Routing =============
+
+    def shard_for(self, metadata: dict) -> str:
+        """문서 메타데이터 → 샤드 이름"""
+        parts = [metadata.get("school_code") or "unknown"]
+        if self.strategy == "school_year":
+            parts.append(str(metadata.get("year") or "0000"))
+        # Chroma 컬렉션 이름에 쓸 수 있는 문자만 사용
+        return re.sub(r"[^A-Za-z0-9_-]", "_", "_".join(str(p) for p in parts))
+
+    def shards_for_filters(self, filters: Dict[str, str]) -> List[str]:
+        """필터에 해당할 수 있는 샤드만 선택"""
+        with self._lock:
+            return [
+                name for name, info in self._shards.items()
+                if all(
+                    info.get(field) is None or str(info[field]) == value
+                    for field, value in filters.items()
+                    if field in ("school_code", "year")
+                )
+            ]
+
+    def shard_of_document(self, doc_id: str) -> Optional[str]:
+        with self._lock:
+            for name, info in self._shards.items():
+                if doc_id in info["documents"]:
+                    return name
+        return None
+
+    def _store(self, shard: str):
+        with self._lock:
+            if shard not in self._stores:
+                self._stores[shard] = self.store_factory(f"{self.collection_prefix}_{shard}")
+            return self._stores[shard]
+
+    # ============= Vector Store interface =============
+
+    def add_hierarchical_document(self, enhanced_json: dict) -> int:
+        metadata = enhanced_json["document_metadata"]
+        doc_id = metadata["document_id"]
+        shard = self.shard_for(metadata)
+
+        with self._lock:
+            info = self._shards.setdefault(shard, {
+                "school_code": metadata.get("school_code"),
+                "year": str(metadata["year"]) if self.strategy == "school_year" and metadata.get("year") else None,
+                "documents": []
+            })
+            if doc_id not in info["documents"]:
+                info["documents"].append(doc_id)
+                self._write_registry()
+
+        return self._store(shard).add_hierarchical_document(enhanced_json)
+
+    def query_with_parent_context(
+        self,
+        question: str,
+        k: int = 3,
+        use_hybrid: bool = True,
+        where: Optional[dict] = None
+    ) -> dict:
+        """해당 샤드에 동시에 검색하고 거리 또는 순위 융합으로 병합"""
+        shards = self.shards_for_filters(where_equalities(where))
+        if not shards:
+            return {"matched_children": [], "parent_contexts": []}
+
+        def search(shard: str) -> dict:
+            store = self._store(shard)
+            with timed("shard_search"), span("shard.search", shard=shard):
+                return query_with_where(store, where, question=question, k=k, use_hybrid=use_hybrid)
+
+        if len(shards) == 1:
+            return search(shards[0])
+
+        # 샤드 검색 스레드에서도 현재 trace span이 이어지도록 context 복사
+        futures = [
+            self._executor.submit(contextvars.copy_context().run, search, shard)
+            for shard in shards
+        ]
+        results = [future.result() for future in futures]
+        return {
+            "matched_children": self._merge([r.get("matched_children", []) for r in results], k),
+            "parent_contexts": self._merge([r.get("parent_contexts", []) for r in results], k)
+        }
+
+    def collections_for(self, doc_id: str, names: Tuple[str, ...]) -> List[Any]:
+        """
+        문서가 속한 샤드의 Chroma 컬렉션 (청크 삭제용), names 순서대로
+        샤드 Store에 없는 컬렉션은 None, 등록되지 않은 문서면 빈 목록
+        """
+        shard = self.shard_of_document(doc_id)
+        if shard is None:
+            return []
+        store = self._store(shard)
+        return [getattr(store, attr, None) for attr in names]
+
+    # ============= Admin =============
+
+    def list_shards(self) -> List[dict]:
+        with self._lock:
+            shards = [(name, dict(info)) for name, info in self._shards.items()]
+
+        result = []
+        for name, info in shards:
+            store = self._store(name)
+            chunks = {}
+            for attr in ("child_collection", "parent_collection"):
+                collection = getattr(store, attr, None)
+                if collection is not None:
+                    try:
+                        chunks[attr] = collection.count()
+                    except Exception as e:
+                        logger.warning(f"Could not count {attr} of shard {name}: {e}")
+            result.append({
+                "shard": name,
+                "collection_prefix": f"{self.collection_prefix}_{name}",
+                "school_code": info.get("school_code"),
+                "year": info.get("year"),
+                "document_count": len(info["documents"]),
+                "chunk_counts": chunks
+            })
+        return result
+
+    def compact_shard(self, shard: str, live_documents: Optional[set] = None) -> dict:
+        """
+        샤드 정리
+        - registry에 없는(또는 live_documents에 없는) 문서의 청크 삭제
+        - 문서가 하나도 남지 않으면 샤드를 registry에서 제거
+
+        Raises:
+            KeyError: 없는 샤드
+        """
+        with self._lock:
+            if shard not in self._shards:
+                raise KeyError(shard)
+            documents = set(self._shards[shard]["documents"])
+            if live_documents is not None:
+                stale_docs = documents - live_documents
+                documents -= stale_docs
+                self._shards[shard]["documents"] = [
+                    d for d in self._shards[shard]["documents"] if d in documents
+                ]
+                self._write_registry()
+
+        store = self._store(shard)
+        removed = 0
+        for attr in ("child_collection", "parent_collection"):
+            collection = getattr(store, attr, None)
+            if collection is None:
+                continue
+            result = collection.get(include=["metadatas"])
+            orphan_ids = [
+                chunk_id for chunk_id, metadata in zip(result.get("ids", []), result.get("metadatas") or [])
+                if (metadata or {}).get("document_id") not in documents
+            ]
+            if orphan_ids:
+                collection.delete(ids=orphan_ids)
+                removed += len(orphan_ids)
+
+        dropped = False
+        with self._lock:
+            if not self._shards[shard]["documents"]:
+                del self._shards[shard]
+                self._stores.pop(shard, None)
+                self._write_registry()
+                dropped = True
+
+        logger.info(f"Compacted shard {shard}: removed {removed} orphan chunks")
+        return {"shard": shard, "chunks_removed": removed, "documents": len(documents), "dropped": dropped}
+
+    def drop_shard(self, shard: str) -> List[str]:
+        """
+        샤드의 모든 청크 삭제 후 registry에서 제거, 삭제된 document_id 목록 반환
+
+        Raises:
+            KeyError: 없는 샤드
+        """
+        with self._lock:
+            if shard not in self._shards:
+                raise KeyError(shard)
+            documents = list(self._shards[shard]["documents"])
+
+        store = self._store(shard)
+        for attr in ("child_collection", "parent_collection"):
+            collection = getattr(store, attr, None)
+            if collection is None:
+                continue
+            ids = collection.get(include=[]).get("ids", [])
+            if ids:
+                collection.delete(ids=ids)
+
+        with self._lock:
+            self._shards.pop(shard, None)
+            self._stores.pop(shard, None)
+            self._write_registry()
+
+        logger.info(f"Dropped shard {shard} ({len(documents)} documents)")
+        return documents
+
+    def remove_document(self, doc_id: str):
+        """registry에서 문서 제거 (청크 삭제는 호출자가 collections_for로 수행)"""
+        with self._lock:
+            for info in self._shards.values():
+                if doc_id in info["documents"]:
+                    info["documents"].remove(doc_id)
+                    self._write_registry()
+                    return
+
+    # ============= Internals =============
+
+    @staticmethod
+    def _merge(per_shard: List[List[dict]], k: int) -> List[dict]:
+        """
+        샤드별 결과 병합
+        - 모든 결과에 "distance"가 있으면 (같은 임베딩 모델/거리 함수) 샤드 간 거리를 그대로 비교, 작을수록 가까움
+        - 아니면 Reciprocal Rank Fusion: 샤드 안 순위로 1 / (RRF_K + 순위) 점수를 매겨 합산
+          (hybrid 점수는 샤드마다 BM25 통계가 달라 샤드 간에 직접 비교할 수 없음)
+        같은 청크(id, 없으면 text)는 한 번만 포함
+        """
+        def key_of(item: dict):
+            return item.get("id") or item.get("text")
+
+        items = [item for shard_items in per_shard for item in shard_items]
+        if items and all(isinstance(item.get("distance"), (int, float)) for item in items):
+            ranked = sorted(items, key=lambda item: item["distance"])
+        else:
+            fused: Dict[Any, float] = {}
+            first: Dict[Any, dict] = {}
+            for shard_items in per_shard:
+                for rank, item in enumerate(shard_items):
+                    key = key_of(item)
+                    fused[key] = fused.get(key, 0.0) + 1.0 / (ShardedVectorStore.RRF_K + rank + 1)
+                    first.setdefault(key, item)
+            # 점수가 같으면 먼저 나온 샤드 순서 유지 (sorted는 stable)
+            ranked = [first[key] for key in sorted(fused, key=lambda key: -fused[key])]
+
+        merged, seen = [], set()
+        for item in ranked:
+            key = key_of(item)
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(item)
+            if len(merged) == k:
+                break
+        return merged
+
+    def _load_registry(self):
+        if not self.registry_path.exists():
+            return
+        try:
+            with open(self.registry_path, 'r', encoding='utf-8') as f:
+                self._shards = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Corrupt shard registry, starting empty: {e}")
+            self._shards = {}
+
+    def _write_registry(self):
+        self.registry_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.registry_path.with_name(self.registry_path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._shards, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.registry_path)
+
+    def shutdown(self):
+        """검색 스레드 정리 (IntegratedRAGPipeline.close에서 호출)"""
+        self._executor.shutdown(wait=False)
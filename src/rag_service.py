@@ -2,7 +2,7 @@
 import logging
 import os
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import random
 import time
 from .doc_processor import DocumentProcessor
@@ -11,16 +11,27 @@ from .models import SchoolData
 logger = logging.getLogger(__name__)
 
 from .rag.engine import RAGEngine
+from .rag.parse_cache import ParseCache
+from .rag.embedding_cache import EmbeddingCache
 
 class SchoolRAGService:
     """
     Service for RAG-based analysis of school documents.
     Uses RAGEngine for Retrieval and Generation.
     """
-    def __init__(self):
+    def __init__(
+        self,
+        parse_cache: Optional[ParseCache] = None,
+        embedding_cache: Optional[EmbeddingCache] = None
+    ):
         # We might want to persist the engine or collection per school?
         # For simplicity, we use one collection for now.
-        self.rag_engine = RAGEngine(collection_name="school_info_v1")
+        # A shared parse_cache lets repeated summaries skip re-parsing the same PDFs.
+        self.rag_engine = RAGEngine(
+            collection_name="school_info_v1",
+            parse_cache=parse_cache,
+            embedding_cache=embedding_cache
+        )
 
     async def summarize_school(self, school_data: SchoolData, docs: List[str]) -> str:
         """
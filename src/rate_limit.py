@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Dict
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Responses that mean "slow down"
+THROTTLE_STATUSES = frozenset({429, 503})
+
+
+class TokenBucket:
+    """Refills ``rate`` tokens per second up to ``burst``; ``acquire`` waits for one"""
+
+    def __init__(self, rate: float, burst: float):
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> float:
+        """Takes a token and returns 0, or returns the seconds until one is available"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    async def acquire(self):
+        while True:
+            wait = self.try_acquire()
+            if wait == 0:
+                return
+            await asyncio.sleep(wait)
+
+    def set_rate(self, rate: float):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+
+
+class HostLimit:
+    """
+    Rate and concurrency limit of one host, adapted AIMD-style: every
+    successful response raises the rate by ``increase`` (up to
+    ``max_rate``), a 429/503 multiplies it by ``decrease`` (down to
+    ``min_rate``). Decreases are at most one per ``cooldown`` seconds, so
+    a burst of throttled in-flight requests counts as one signal.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        max_concurrent: int,
+        min_rate: float,
+        max_rate: float,
+        increase: float = 0.1,
+        decrease: float = 0.5,
+        cooldown: float = 5.0
+    ):
+        self.bucket = TokenBucket(rate, burst)
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.max_concurrent = max_concurrent
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self.throttled = 0
+        self._last_decrease = float("-inf")
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self.bucket.rate
+
+    def record(self, status_code: int) -> bool:
+        """Adapts the rate to a response status; True if it was a throttle signal"""
+        with self._lock:
+            if status_code in THROTTLE_STATUSES:
+                self.throttled += 1
+                now = time.monotonic()
+                if now - self._last_decrease >= self.cooldown:
+                    self._last_decrease = now
+                    self.bucket.set_rate(max(self.min_rate, self.rate * self.decrease))
+                return True
+            if status_code < 400 and self.rate < self.max_rate:
+                self.bucket.set_rate(min(self.max_rate, self.rate + self.increase))
+            return False
+
+
+class HostRateLimiter:
+    """
+    Per-host token bucket plus max-concurrent-requests semaphore.
+
+    One instance is shared by every crawler in the process (RATE_LIMITER),
+    so parallel crawls of the same site add up against the same limit:
+
+        async with RATE_LIMITER.limit(url):
+            response = await client.get(url)
+            RATE_LIMITER.record(url, response.status_code)
+    """
+
+    def __init__(
+        self,
+        rate: float = 5.0,
+        burst: float = 5.0,
+        max_concurrent: int = 4,
+        min_rate: float = 0.2,
+        max_rate: float = 20.0,
+        cooldown: float = 5.0
+    ):
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, HostLimit] = {}
+        self.configure(rate, burst, max_concurrent, min_rate, max_rate, cooldown)
+
+    def configure(
+        self,
+        rate: float = 5.0,
+        burst: float = 5.0,
+        max_concurrent: int = 4,
+        min_rate: float = 0.2,
+        max_rate: float = 20.0,
+        cooldown: float = 5.0
+    ):
+        """Sets the limits for hosts seen from now on (resets adapted rates)"""
+        if not 0 < min_rate <= rate <= max_rate:
+            raise ValueError("Rates must satisfy 0 < min_rate <= rate <= max_rate")
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1")
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrent = max_concurrent
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.cooldown = cooldown
+        with self._lock:
+            self._hosts.clear()
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return urlsplit(url).netloc.lower() or url
+
+    def host(self, url: str) -> HostLimit:
+        key = self.host_of(url)
+        with self._lock:
+            limit = self._hosts.get(key)
+            if limit is None:
+                limit = self._hosts[key] = HostLimit(
+                    self.rate, self.burst, self.max_concurrent,
+                    self.min_rate, self.max_rate, cooldown=self.cooldown
+                )
+            return limit
+
+    @asynccontextmanager
+    async def limit(self, url: str):
+        """Holds a concurrency slot and one rate token of the url's host"""
+        host = self.host(url)
+        async with host.semaphore:
+            await host.bucket.acquire()
+            host.in_flight += 1
+            try:
+                yield host
+            finally:
+                host.in_flight -= 1
+
+    def record(self, url: str, status_code: int):
+        host = self.host(url)
+        if host.record(status_code):
+            logger.warning(
+                f"{self.host_of(url)} answered {status_code}, request rate now {host.rate:.2f}/s"
+            )
+
+    def stats(self) -> Dict[str, dict]:
+        with self._lock:
+            hosts = dict(self._hosts)
+        return {
+            name: {
+                "rate": round(host.rate, 3),
+                "in_flight": host.in_flight,
+                "max_concurrent": host.max_concurrent,
+                "throttled": host.throttled
+            }
+            for name, host in hosts.items()
+        }
+
+
+RATE_LIMITER = HostRateLimiter()
@@ -0,0 +1,158 @@
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import FrozenSet, Optional, Tuple, Type
+
+import httpx
+
+# Status codes worth retrying: the request may succeed unchanged later
+RETRYABLE_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+# Timeouts, connection resets/refusals and broken connections
+RETRYABLE_EXCEPTIONS: Tuple[Type[BaseException], ...] = (
+    httpx.TimeoutException,
+    httpx.NetworkError,
+    httpx.RemoteProtocolError
+)
+
+
+class RetryBudget:
+    """
+    Caps retries to a fraction of recent requests.
+
+    Within a sliding ``window`` (seconds) at most
+    ``min_retries + ratio * requests`` retries are allowed, so a site that
+    is down for everyone does not get every request multiplied by
+    ``max_retries`` during a mass crawl, while a quiet crawler can still
+    retry a few isolated failures.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 10, window: float = 10.0):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self._lock = threading.Lock()
+        self._requests: deque = deque()
+        self._retries: deque = deque()
+
+    def _trim(self, now: float):
+        cutoff = now - self.window
+        for events in (self._requests, self._retries):
+            while events and events[0] < cutoff:
+                events.popleft()
+
+    def record_request(self):
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            self._requests.append(now)
+
+    def try_acquire(self) -> bool:
+        """Takes one retry from the budget, False when it is spent"""
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            if len(self._retries) >= self.min_retries + self.ratio * len(self._requests):
+                return False
+            self._retries.append(now)
+            return True
+
+
+class RetryPolicy:
+    """
+    When and how long to wait before retrying a crawler request.
+
+    Backoff is exponential with full jitter: retry n waits a random time in
+    [0, min(max_delay, base_delay * multiplier ** n)], so clients that
+    failed together do not retry together. A Retry-After header (seconds or
+    HTTP date) on a retryable response is honoured as the minimum wait; if
+    it asks for more than ``max_retry_after`` the request is not retried.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        multiplier: float = 2.0,
+        jitter: bool = True,
+        retry_statuses: FrozenSet[int] = RETRYABLE_STATUSES,
+        retry_exceptions: Tuple[Type[BaseException], ...] = RETRYABLE_EXCEPTIONS,
+        max_retry_after: float = 120.0,
+        budget: Optional[RetryBudget] = None
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_exceptions = tuple(retry_exceptions)
+        self.max_retry_after = max_retry_after
+        self.budget = budget if budget is not None else RetryBudget()
+
+    # ============= Classification =============
+
+    def is_retryable_status(self, status_code: int) -> bool:
+        return status_code in self.retry_statuses
+
+    def is_retryable_exception(self, error: BaseException) -> bool:
+        return isinstance(error, self.retry_exceptions)
+
+    def is_retryable(self, error: BaseException) -> bool:
+        """Transient network errors and retryable HTTP status errors"""
+        if isinstance(error, httpx.HTTPStatusError):
+            return self.is_retryable_status(error.response.status_code)
+        return self.is_retryable_exception(error)
+
+    @staticmethod
+    def reason(error: BaseException) -> str:
+        """Retry reason label: timeout, connection or http_<status>"""
+        if isinstance(error, httpx.HTTPStatusError):
+            return f"http_{error.response.status_code}"
+        if isinstance(error, httpx.TimeoutException):
+            return "timeout"
+        return "connection"
+
+    # ============= Delays =============
+
+    def backoff(self, retry: int) -> float:
+        """Wait before retry number ``retry`` (0-based)"""
+        ceiling = min(self.max_delay, self.base_delay * self.multiplier ** retry)
+        return random.uniform(0, ceiling) if self.jitter else ceiling
+
+    @staticmethod
+    def retry_after(response: Optional[httpx.Response]) -> Optional[float]:
+        """Seconds requested by a Retry-After header, None if absent or invalid"""
+        if response is None:
+            return None
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at is None:
+            return None
+        return max(0.0, retry_at.timestamp() - time.time())
+
+    def delay(self, retry: int, response: Optional[httpx.Response] = None) -> Optional[float]:
+        """
+        Wait before retry number ``retry``, or None if the request should not
+        be retried (retries used up, or Retry-After longer than allowed)
+        """
+        if retry >= self.max_retries:
+            return None
+        wait = self.backoff(retry)
+        requested = self.retry_after(response)
+        if requested is not None:
+            if requested > self.max_retry_after:
+                return None
+            wait = max(wait, requested)
+        return wait
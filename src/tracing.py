@@ -0,0 +1,278 @@
+import functools
+import inspect
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Span:
+    """One timed operation in a trace; children are the spans opened inside it"""
+
+    def __init__(self, trace: "_Trace", name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.trace = trace
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = dict(attributes)
+        self.children: List["Span"] = []
+        self.start = time.time()
+        self.duration_ms: Optional[float] = None
+        self.error: Optional[str] = None
+        self._start_perf = time.perf_counter()
+
+    @property
+    def trace_id(self) -> str:
+        return self.trace.trace_id
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def finish(self, error: Optional[BaseException] = None):
+        self.duration_ms = round((time.perf_counter() - self._start_perf) * 1000, 3)
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": self.start,
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+            "error": self.error,
+            "children": [child.to_dict() for child in list(self.children)]
+        }
+
+
+class _Trace:
+    def __init__(self, max_spans: int):
+        self.trace_id = uuid.uuid4().hex
+        self.max_spans = max_spans
+        self.span_count = 0
+        self.dropped_spans = 0
+        self.lock = threading.Lock()
+
+
+# Current span of this task/thread. _NOT_SAMPLED marks a request that lost
+# the sampling draw, so nested trace() calls do not start traces of their own.
+_NOT_SAMPLED = object()
+_current: ContextVar[Any] = ContextVar("current_span", default=None)
+
+
+class _SpanScope:
+    """Context manager and decorator (sync or async) opening a span"""
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any], root: bool, force: bool = False):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.root = root
+        self.force = force
+        self._span: Optional[Span] = None
+        self._token = None
+
+    def __enter__(self) -> Optional[Span]:
+        parent = _current.get()
+
+        if parent is _NOT_SAMPLED:
+            return None
+        if parent is None:
+            if not self.root:
+                # Spans outside a trace cost one context lookup
+                return None
+            if not ((self.force and self.tracer.allow_forced()) or self.tracer.should_sample()):
+                self._token = _current.set(_NOT_SAMPLED)
+                return None
+            trace = _Trace(self.tracer.max_spans)
+        else:
+            trace = parent.trace
+
+        with trace.lock:
+            if trace.span_count >= trace.max_spans:
+                trace.dropped_spans += 1
+                return None
+            trace.span_count += 1
+            span = Span(trace, self.name, parent, self.attributes)
+            if parent is not None:
+                parent.children.append(span)
+
+        self._span = span
+        self._token = _current.set(span)
+        return span
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._token is not None:
+            _current.reset(self._token)
+        if self._span is not None:
+            self._span.finish(exc)
+            if self._span.parent_id is None:
+                self.tracer._finish(self._span)
+        return False
+
+    def __call__(self, func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with _SpanScope(self.tracer, self.name, self.attributes, self.root, self.force):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _SpanScope(self.tracer, self.name, self.attributes, self.root, self.force):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+class Tracer:
+    """
+    In-process span trees with head sampling.
+
+    ``trace()`` opens a root span; only a ``sample_rate`` fraction of roots
+    (or those opened with ``force=True``) are recorded. At most
+    ``max_forced_per_second`` roots per second are recorded because they were
+    forced; beyond that a forced root is sampled like any other. ``span()`` opens a
+    child of the current span and does nothing outside a sampled trace, so
+    instrumented code stays cheap when tracing is off.
+
+    Finished traces are kept in a bounded in-memory buffer and, when
+    ``export_path`` is set, appended to that file as JSON Lines.
+    The current span is held in a ContextVar: it follows asyncio tasks, and
+    work handed to threads sees it when run via ``contextvars.copy_context()``.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 0.0,
+        export_path: Optional[str] = None,
+        buffer_size: int = 100,
+        max_spans: int = 1000,
+        max_forced_per_second: Optional[float] = None
+    ):
+        self._lock = threading.Lock()
+        self._traces: "OrderedDict[str, dict]" = OrderedDict()
+        self._forced_window = 0
+        self._forced_in_window = 0
+        self.forced_rejected = 0
+        self.configure(sample_rate, export_path, buffer_size, max_spans, max_forced_per_second)
+
+    def configure(
+        self,
+        sample_rate: float = 0.0,
+        export_path: Optional[str] = None,
+        buffer_size: int = 100,
+        max_spans: int = 1000,
+        max_forced_per_second: Optional[float] = None
+    ):
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0 and 1")
+        if max_forced_per_second is not None and max_forced_per_second < 0:
+            raise ValueError("max_forced_per_second must not be negative")
+        self.sample_rate = sample_rate
+        self.export_path = Path(export_path) if export_path else None
+        self.buffer_size = buffer_size
+        self.max_spans = max_spans
+        self.max_forced_per_second = max_forced_per_second
+        with self._lock:
+            while len(self._traces) > self.buffer_size:
+                self._traces.popitem(last=False)
+
+    def should_sample(self) -> bool:
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def allow_forced(self) -> bool:
+        """Takes one forced trace from this second's allowance"""
+        if self.max_forced_per_second is None:
+            return True
+        window = int(time.monotonic())
+        with self._lock:
+            if window != self._forced_window:
+                self._forced_window = window
+                self._forced_in_window = 0
+            if self._forced_in_window >= self.max_forced_per_second:
+                self.forced_rejected += 1
+                return False
+            self._forced_in_window += 1
+            return True
+
+    def trace(self, name: str, force: bool = False, **attributes) -> _SpanScope:
+        """Root span (a child span when a trace is already active)"""
+        return _SpanScope(self, name, attributes, root=True, force=force)
+
+    def span(self, name: str, **attributes) -> _SpanScope:
+        """Child span of the current span, no-op outside a sampled trace"""
+        return _SpanScope(self, name, attributes, root=False)
+
+    # ============= Finished traces =============
+
+    def _finish(self, root: Span):
+        record = {
+            "trace_id": root.trace_id,
+            "name": root.name,
+            "start": root.start,
+            "duration_ms": root.duration_ms,
+            "span_count": root.trace.span_count,
+            "dropped_spans": root.trace.dropped_spans,
+            "error": root.error,
+            "root": root.to_dict()
+        }
+
+        with self._lock:
+            self._traces[root.trace_id] = record
+            while len(self._traces) > self.buffer_size:
+                self._traces.popitem(last=False)
+
+            if self.export_path is not None:
+                try:
+                    self.export_path.parent.mkdir(parents=True, exist_ok=True)
+                    with open(self.export_path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                except OSError as e:
+                    logger.warning(f"Could not export trace {root.trace_id}: {e}")
+
+    def recent(self, limit: int = 20) -> List[dict]:
+        """Newest finished traces first, without span trees"""
+        with self._lock:
+            records = list(self._traces.values())[-limit:] if limit > 0 else []
+        return [
+            {key: value for key, value in record.items() if key != "root"}
+            for record in reversed(records)
+        ]
+
+    def get(self, trace_id: str) -> Optional[dict]:
+        with self._lock:
+            return self._traces.get(trace_id)
+
+    def clear(self):
+        with self._lock:
+            self._traces.clear()
+
+
+TRACER = Tracer()
+
+
+def span(name: str, **attributes) -> _SpanScope:
+    """Child span on the shared tracer (context manager or decorator)"""
+    return TRACER.span(name, **attributes)
+
+
+def current_span() -> Optional[Span]:
+    value = _current.get()
+    return value if isinstance(value, Span) else None
+
+
+def annotate(**attributes):
+    """Adds attributes to the current span, if the request is being traced"""
+    current = current_span()
+    if current is not None:
+        current.attributes.update(attributes)
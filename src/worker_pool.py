@@ -0,0 +1,146 @@
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Iterable
+
+from .exceptions import WorkerPoolFullError
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+
+class WorkerPool:
+    """
+    Bounded thread pool for running blocking work off the event loop.
+
+    At most ``max_workers`` jobs run at once and at most ``max_queue`` more
+    may wait for a free worker. Anything beyond that is rejected immediately
+    with WorkerPoolFullError instead of piling up behind a slow job.
+    """
+
+    def __init__(self, name: str, max_workers: int = 2, max_queue: int = 8):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if max_queue < 0:
+            raise ValueError("max_queue must not be negative")
+
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix=f"pool-{name}"
+        )
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Runs ``func(*args, **kwargs)`` on the pool and awaits the result.
+
+        Raises:
+            WorkerPoolFullError: All workers are busy and the queue is full
+        """
+        future = self._submit(functools.partial(func, *args, **kwargs))
+        return await asyncio.wrap_future(future)
+
+    def iterate(self, func: Callable[..., Iterable], *args, **kwargs) -> AsyncIterator:
+        """
+        Runs the blocking generator ``func(*args, **kwargs)`` on the pool and
+        returns an async iterator over its items, e.g. for a StreamingResponse.
+
+        The whole iteration holds one worker. Admission is decided here, not
+        on first iteration, so a full pool can still be answered with a 503
+        before the response starts. Closing the async iterator early makes
+        the worker stop after the item it is producing.
+
+        Raises:
+            WorkerPoolFullError: All workers are busy and the queue is full
+        """
+        loop = asyncio.get_running_loop()
+        items: asyncio.Queue = asyncio.Queue()
+        stopped = threading.Event()
+
+        def put(item, error=None):
+            try:
+                loop.call_soon_threadsafe(items.put_nowait, (item, error))
+            except RuntimeError:
+                # Event loop already closed: nobody is reading any more
+                stopped.set()
+
+        def produce():
+            try:
+                for item in func(*args, **kwargs):
+                    if stopped.is_set():
+                        break
+                    put(item)
+            except BaseException as e:
+                put(_END, e)
+            else:
+                put(_END)
+
+        self._submit(produce)
+
+        async def consume():
+            try:
+                while True:
+                    item, error = await items.get()
+                    if item is _END:
+                        if error is not None:
+                            raise error
+                        return
+                    yield item
+            finally:
+                stopped.set()
+
+        return consume()
+
+    def _submit(self, job: Callable[[], Any]):
+        if not self._slots.acquire(blocking=False):
+            raise WorkerPoolFullError(
+                f"Worker pool '{self.name}' is full "
+                f"({self.max_workers} running, {self.max_queue} queued)"
+            )
+
+        with self._lock:
+            self._in_flight += 1
+
+        try:
+            # Run in a copy of the caller's context so the job sees its trace span
+            context = contextvars.copy_context()
+            future = self._executor.submit(context.run, job)
+        except Exception:
+            self._release()
+            raise
+
+        # Release the slot when the job really finishes, not when the awaiting
+        # request goes away - a cancelled request does not stop a running thread.
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def stats(self) -> dict:
+        """Current load of the pool"""
+        with self._lock:
+            in_flight = self._in_flight
+        return {
+            "name": self.name,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "running": min(in_flight, self.max_workers),
+            "queued": max(in_flight - self.max_workers, 0)
+        }
+
+    def shutdown(self, wait: bool = True):
+        """Stops accepting work and optionally waits for running jobs"""
+        logger.info(f"Shutting down worker pool '{self.name}'")
+        self._executor.shutdown(wait=wait)
@@ -1,15 +1,25 @@
 """Tests for src/agent_crawler.py"""
 import pytest
 import asyncio
+import os
 from unittest.mock import Mock, AsyncMock, patch, MagicMock
 
+from src.rate_limit import HostRateLimiter
+
+
+@pytest.fixture(autouse=True)
+def fast_rate_limiter():
+    """Unthrottled limiter so the many mocked runs never wait for tokens"""
+    with patch('src.agent_crawler.RATE_LIMITER', HostRateLimiter(rate=1000, burst=1000, max_rate=1000)) as limiter:
+        yield limiter
+
 
 @pytest.fixture
 def mock_playwright():
     """Mock playwright and browser objects"""
     # Create mock hierarchy: playwright -> browser -> context -> page
     mock_page = AsyncMock()
-    mock_page.goto = AsyncMock()
+    mock_page.goto = AsyncMock(return_value=Mock(status=200))
     mock_page.wait_for_load_state = AsyncMock()
     mock_page.evaluate = AsyncMock()
     mock_page.screenshot = AsyncMock()
@@ -25,6 +35,7 @@ def mock_playwright():
     mock_locator.click = AsyncMock()
     mock_locator.fill = AsyncMock()
     mock_locator.first = mock_locator
+    mock_locator.nth = Mock(return_value=mock_locator)
     mock_locator.count = AsyncMock(return_value=1)
     mock_locator.inner_text = AsyncMock(return_value="Test School")
     mock_locator.get_attribute = AsyncMock(return_value="href_value")
@@ -36,6 +47,9 @@ def mock_playwright():
     mock_context.new_page = AsyncMock(return_value=mock_page)
     mock_context.add_init_script = AsyncMock()
     mock_context.pages = [mock_page]
+    # Popup listener (no popup by default)
+    mock_context.once = Mock()
+    mock_context.remove_listener = Mock()
 
     # Mock expect_page for popup handling
     mock_expect_page = AsyncMock()
@@ -271,12 +285,8 @@ async def test_run_handles_new_page_popup(mock_playwright):
     new_page.content = AsyncMock(return_value="<html>Detail</html>")
     new_page.locator = Mock(return_value=mock_playwright['locator'])
 
-    mock_expect = AsyncMock()
-    mock_expect.value = new_page
-    mock_expect_page = AsyncMock()
-    mock_expect_page.__aenter__ = AsyncMock(return_value=mock_expect)
-    mock_expect_page.__aexit__ = AsyncMock()
-    mock_playwright['context'].expect_page = Mock(return_value=mock_expect_page)
+    # The result click opens a popup: the "page" listener fires with it
+    mock_playwright['context'].once = Mock(side_effect=lambda event, handler: handler(new_page))
 
     crawler = RealBrowserCrawler()
 
@@ -285,10 +295,13 @@ async def test_run_handles_new_page_popup(mock_playwright):
          patch('asyncio.sleep', return_value=None), \
          patch('builtins.open', create=True):
 
-        try:
-            await crawler.run("Test School", headless=True)
-        except:
-            pass
+        result = await crawler.run("Test School", headless=True)
+
+    # The crawl continued on the popup
+    new_page.wait_for_load_state.assert_any_await("load", timeout=60000)
+    new_page.screenshot.assert_awaited()
+    assert "detail_open" in result.durations
+    mock_playwright['context'].remove_listener.assert_called()
 
 
 @pytest.mark.asyncio
@@ -518,3 +531,223 @@ async def test_main_execution():
 
         # We can't actually test the __main__ block directly,
         # but we verified the run method is tested
+
+
+@pytest.mark.asyncio
+async def test_run_goes_through_rate_limiter(mock_playwright, fast_rate_limiter):
+    """Test navigations take host slots and feed back their status"""
+    from src.agent_crawler import RealBrowserCrawler
+
+    mock_playwright['page'].goto = AsyncMock(return_value=Mock(status=429))
+    mock_playwright['locator'].wait_for = AsyncMock(side_effect=Exception("No results"))
+    crawler = RealBrowserCrawler()
+    assert crawler.rate_limiter is fast_rate_limiter
+
+    with patch('src.agent_crawler.async_playwright', return_value=mock_playwright['playwright']), \
+         patch('os.makedirs'), \
+         patch('asyncio.sleep', return_value=None):
+        await crawler.run("Test School", headless=True)
+
+    stats = fast_rate_limiter.stats()["www.schoolinfo.go.kr"]
+    assert stats["throttled"] == 1
+    assert stats["in_flight"] == 0
+
+
+def make_pool(context):
+    """Pool double handing out one context and recording how leases were returned"""
+    entry = Mock(context=context)
+    pool = Mock()
+    pool.acquire = AsyncMock(return_value=entry)
+    pool.release = AsyncMock()
+    return pool, entry
+
+
+@pytest.mark.asyncio
+async def test_run_with_pool_reuses_leased_context(mock_playwright):
+    """Test runs with a pool crawl in leased contexts instead of launching Chromium"""
+    from src.agent_crawler import RealBrowserCrawler
+
+    pool, entry = make_pool(mock_playwright['context'])
+    crawler = RealBrowserCrawler(pool=pool)
+
+    with patch('src.agent_crawler.async_playwright') as launcher, \
+         patch('os.makedirs'), \
+         patch('builtins.open', create=True), \
+         patch('asyncio.sleep', return_value=None):
+        first = await crawler.run("School A")
+        second = await crawler.run("School B")
+
+    launcher.assert_not_called()
+    assert first.ok and second.ok
+    assert pool.acquire.await_count == 2
+    assert mock_playwright['context'].new_page.await_count == 2
+    pool.release.assert_awaited_with(entry, healthy=True)
+
+
+@pytest.mark.asyncio
+async def test_run_with_pool_returns_failed_browser_unhealthy(mock_playwright):
+    """Test a crawl that fails hands its browser back for relaunch"""
+    from src.agent_crawler import RealBrowserCrawler
+
+    mock_playwright['page'].goto = AsyncMock(side_effect=Exception("Target closed"))
+    pool, entry = make_pool(mock_playwright['context'])
+    crawler = RealBrowserCrawler(pool=pool)
+
+    with patch('os.makedirs'), patch('asyncio.sleep', return_value=None):
+        result = await crawler.run("School A")
+
+    assert not result.ok
+    assert "Target closed" in result.error
+    pool.release.assert_awaited_once_with(entry, healthy=False)
+
+
+@pytest.mark.asyncio
+async def test_run_with_pool_releases_unhealthy_when_crawl_raises(mock_playwright):
+    """Test an exception escaping the crawl still returns the browser, as unhealthy"""
+    from src.agent_crawler import RealBrowserCrawler
+
+    mock_playwright['context'].new_page = AsyncMock(side_effect=Exception("Browser crashed"))
+    pool, entry = make_pool(mock_playwright['context'])
+    crawler = RealBrowserCrawler(pool=pool)
+
+    with patch('os.makedirs'), pytest.raises(Exception, match="Browser crashed"):
+        await crawler.run("School A")
+
+    pool.release.assert_awaited_once_with(entry, healthy=False)
+
+
+@pytest.mark.asyncio
+async def test_run_records_search_failure(mock_playwright):
+    """Test a failed search ends the crawl with an error and no files"""
+    from src.agent_crawler import RealBrowserCrawler
+
+    mock_playwright['locator'].wait_for = AsyncMock(side_effect=Exception("No results"))
+    crawler = RealBrowserCrawler()
+
+    with patch('src.agent_crawler.async_playwright', return_value=mock_playwright['playwright']), \
+         patch('os.makedirs'), \
+         patch('asyncio.sleep', return_value=None):
+        result = await crawler.run("Test School", headless=True)
+
+    assert result.error.startswith("search failed")
+    assert result.files == []
+
+
+@pytest.mark.asyncio
+async def test_run_waits_on_events_not_sleeps(mock_playwright):
+    """Test a full run never sleeps and reports measured step durations"""
+    from src.agent_crawler import RealBrowserCrawler
+
+    crawler = RealBrowserCrawler(step_timeouts={"tab": 1234})
+
+    with patch('src.agent_crawler.async_playwright', return_value=mock_playwright['playwright']), \
+         patch('os.makedirs'), \
+         patch('builtins.open', create=True), \
+         patch('asyncio.sleep', new=AsyncMock()) as mock_sleep:
+        result = await crawler.run("Test School", headless=True)
+
+    mock_sleep.assert_not_awaited()
+    assert result.ok
+    durations = result.durations
+    for step in ("home_load", "home_settle", "search_input", "search_results",
+                 "detail_open", "detail_load", "year_select", "tab", "section_open", "file_list"):
+        assert step in durations
+        assert durations[step] >= 0
+    mock_playwright['page'].wait_for_load_state.assert_any_await("networkidle", timeout=1234)
+
+
+@pytest.mark.asyncio
+async def test_download_teaching_plans_returns_saved_files(mock_playwright, tmp_path):
+    """Test the orchestrator adapter searches the mapped name, selects the year and returns paths"""
+    from src.agent_crawler import RealBrowserCrawler
+
+    file_link = AsyncMock()
+    file_link.inner_text = AsyncMock(return_value="plan.pdf")
+    mock_playwright['locator'].all = AsyncMock(return_value=[file_link])
+    download = AsyncMock()
+    download.suggested_filename = "plan.pdf"
+    expect_download = MagicMock()
+    expect_download.__aenter__ = AsyncMock(return_value=Mock(value=asyncio.sleep(0, result=download)))
+    expect_download.__aexit__ = AsyncMock(return_value=False)
+    mock_playwright['page'].expect_download = Mock(return_value=expect_download)
+
+    crawler = RealBrowserCrawler(school_names={"B100000662": "동도중학교"})
+    crawler.base_dir = str(tmp_path)
+
+    with patch('src.agent_crawler.async_playwright', return_value=mock_playwright['playwright']), \
+         patch('builtins.open', create=True):
+        files = await crawler.download_teaching_plans("B100000662", 2024)
+
+    download_dir = tmp_path / "downloads" / "B100000662" / "2024" / "teaching_plans"
+    assert files
+    assert all(path.startswith(str(download_dir)) for path in files)
+    mock_playwright['locator'].fill.assert_any_await("동도중학교")
+    mock_playwright['locator'].select_option.assert_awaited_with(value="2024")
+
+
+@pytest.mark.asyncio
+async def test_download_teaching_plans_raises_on_failed_crawl(mock_playwright, tmp_path):
+    """Test a failed browser crawl surfaces as CrawlerException for the manifest"""
+    from src.agent_crawler import RealBrowserCrawler
+    from src.exceptions import CrawlerException
+
+    mock_playwright['locator'].wait_for = AsyncMock(side_effect=Exception("No results"))
+    crawler = RealBrowserCrawler()
+    crawler.base_dir = str(tmp_path)
+
+    with patch('src.agent_crawler.async_playwright', return_value=mock_playwright['playwright']), \
+         pytest.raises(CrawlerException, match="search failed"):
+        await crawler.download_teaching_plans("B100000662", 2025)
+
+
+@pytest.mark.asyncio
+async def test_runs_write_debug_artifacts_per_school_and_run(mock_playwright, tmp_path):
+    """Test parallel runs never share a debug or download directory"""
+    from src.agent_crawler import RealBrowserCrawler
+
+    mock_playwright['locator'].wait_for = AsyncMock(side_effect=Exception("No results"))
+    crawler = RealBrowserCrawler()
+    crawler.base_dir = str(tmp_path)
+
+    with patch('src.agent_crawler.async_playwright', return_value=mock_playwright['playwright']):
+        await asyncio.gather(crawler.run("동도중학교"), crawler.run("동도중학교"), crawler.run("능인 중학교"))
+
+    screenshots = [c.kwargs["path"] for c in mock_playwright['page'].screenshot.await_args_list]
+    run_dirs = {os.path.dirname(path) for path in screenshots}
+    assert len(run_dirs) == 3
+    assert all(os.path.dirname(d) in {
+        str(tmp_path / "debug_artifacts" / "동도중학교"), str(tmp_path / "debug_artifacts" / "능인_중학교")
+    } for d in run_dirs)
+    assert (tmp_path / "downloads" / "real" / "능인_중학교").is_dir()
+
+
+@pytest.mark.asyncio
+async def test_crawl_schools_shares_one_pool(mock_playwright):
+    """Test the multi-school entry point crawls every school on one pool and closes it"""
+    from src import agent_crawler
+
+    pool = Mock()
+    pool.__aenter__ = AsyncMock(return_value=pool)
+    pool.__aexit__ = AsyncMock(return_value=False)
+    runs = []
+
+    async def run(self, school_name, *args, **kwargs):
+        runs.append((school_name, self.pool))
+        return agent_crawler.BrowserCrawlResult(school_name)
+
+    with patch('src.agent_crawler.BrowserPool', return_value=pool) as pool_cls, \
+         patch.object(agent_crawler.RealBrowserCrawler, 'run', run):
+        results = await agent_crawler.crawl_schools(["A", "B", "C"], pool_size=2)
+
+    pool_cls.assert_called_once_with(size=2, headless=True)
+    assert [r.school_name for r in results] == ["A", "B", "C"]
+    assert all(used is pool for _, used in runs)
+    pool.__aexit__.assert_awaited_once()
+
+
+def test_path_slug():
+    from src.agent_crawler import path_slug
+
+    assert path_slug("동도중학교") == "동도중학교"
+    assert path_slug("../a b/c") == "a_b_c"
+    assert path_slug("///") == "school"
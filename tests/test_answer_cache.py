@@ -0,0 +1,174 @@
+"""Tests for src/rag/answer_cache.py"""
+import time
+from unittest.mock import Mock
+from src.rag.answer_cache import AnswerCache
+
+
+def make_response(*doc_ids):
+    return {
+        "answer": "수행평가 40%",
+        "confidence": 0.9,
+        "sources": [{"document_id": doc_id} for doc_id in doc_ids]
+    }
+
+
+VECTORS = {
+    "수행평가 비율은?": [1.0, 0.0],
+    "수행평가 비율이 어떻게 되나요?": [0.99, 0.14],
+    "급식 메뉴는?": [0.0, 1.0]
+}
+
+
+def test_exact_hit_normalises_question():
+    """Test whitespace differences still hit the exact tier"""
+    cache = AnswerCache()
+    cache.put("수행평가 비율은?", {"year": "2025"}, make_response("doc_1"))
+
+    assert cache.get("  수행평가   비율은? ", {"year": "2025"}) == make_response("doc_1")
+    assert cache.stats()["hits"]["exact"] == 1
+
+
+def test_filters_are_part_of_key():
+    """Test answers for other filters are not reused"""
+    cache = AnswerCache(embed_fn=lambda q: VECTORS[q])
+    cache.put("수행평가 비율은?", {"year": "2025"}, make_response("doc_1"))
+
+    assert cache.get("수행평가 비율은?", {"year": "2024"}) is None
+    assert cache.get("수행평가 비율은?") is None
+    assert cache.stats()["misses"] == 2
+
+
+def test_semantic_hit_above_threshold():
+    """Test a similar question reuses the nearest cached answer"""
+    cache = AnswerCache(embed_fn=lambda q: VECTORS[q], similarity_threshold=0.95)
+    cache.put("수행평가 비율은?", None, make_response("doc_1"))
+
+    assert cache.get("수행평가 비율이 어떻게 되나요?") == make_response("doc_1")
+    assert cache.get("급식 메뉴는?") is None
+    assert cache.stats()["hits"]["semantic"] == 1
+
+
+def test_embedding_failure_skips_semantic_tier():
+    """Test embed errors fall back to exact matching only"""
+    cache = AnswerCache(embed_fn=Mock(side_effect=ConnectionError("ollama down")))
+    cache.put("수행평가 비율은?", None, make_response("doc_1"))
+
+    assert cache.get("수행평가 비율은?") is not None
+    assert cache.get("수행평가 비율이 어떻게 되나요?") is None
+
+
+def test_invalidate_document():
+    """Test answers citing a re-ingested document are dropped"""
+    cache = AnswerCache()
+    cache.put("q1", None, make_response("doc_1", "doc_2"))
+    cache.put("q2", None, make_response("doc_2"))
+    cache.put("q3", None, make_response("doc_3"))
+
+    assert cache.invalidate_document("doc_2") == 2
+
+    assert cache.get("q1") is None
+    assert cache.get("q2") is None
+    assert cache.get("q3") is not None
+    assert cache.invalidate_document("doc_1") == 0
+
+
+
+def test_put_drops_answer_invalidated_since_generation():
+    """Test an answer citing a document invalidated after generation() is not stored"""
+    cache = AnswerCache()
+    generation = cache.generation()
+    cache.invalidate_document("doc_1")
+
+    assert cache.put("q1", None, make_response("doc_1"), generation=generation) is False
+    assert cache.put("q2", None, make_response("doc_2"), generation=generation) is True
+    assert cache.put("q3", None, make_response("doc_1"), generation=cache.generation()) is True
+
+    assert cache.get("q1") is None
+    assert cache.get("q2") is not None
+    assert cache.get("q3") is not None
+
+def test_evicts_least_recently_used():
+    """Test max_entries bound"""
+    cache = AnswerCache(max_entries=2)
+    cache.put("q1", None, make_response("doc_1"))
+    cache.put("q2", None, make_response("doc_2"))
+    cache.get("q1")
+    cache.put("q3", None, make_response("doc_3"))
+
+    assert len(cache) == 2
+    assert cache.get("q2") is None
+    # Evicted entries no longer block invalidation bookkeeping
+    assert cache.invalidate_document("doc_2") == 0
+
+
+def test_ttl_expiry():
+    """Test entries older than ttl are not returned"""
+    cache = AnswerCache(ttl=0.01)
+    cache.put("q1", None, make_response("doc_1"))
+    time.sleep(0.02)
+
+    assert cache.get("q1") is None
+    assert len(cache) == 0
+
+
+def test_semantic_scoring_runs_outside_lock():
+    """Test candidates are scored without holding the cache lock"""
+    cache = AnswerCache(embed_fn=lambda q: VECTORS[q], similarity_threshold=0.95)
+    cache.put("수행평가 비율은?", None, make_response("doc_1"))
+    held = []
+    original = cache._best_match
+
+    def best_match(embedding, candidates):
+        held.append(cache._lock.locked())
+        return original(embedding, candidates)
+
+    cache._best_match = best_match
+
+    assert cache.get("수행평가 비율이 어떻게 되나요?") == make_response("doc_1")
+    assert held == [False]
+
+
+def test_semantic_candidates_limited_to_recent_entries_of_same_filters():
+    """Test only the most recently used entries of the same filters are compared"""
+    vectors = {"q1": [1.0, 0.0], "q2": [0.0, 1.0], "q3": [0.0, 1.0], "q1 다시": [1.0, 0.0]}
+    cache = AnswerCache(embed_fn=lambda q: vectors[q], max_candidates=2)
+    cache.put("q1", None, make_response("doc_1"))
+    cache.put("q2", None, make_response("doc_2"))
+    cache.put("q3", {"year": "2025"}, make_response("doc_3"))
+
+    assert cache.get("q1 다시") == make_response("doc_1")
+
+    cache.put("q3", None, make_response("doc_3"))
+    cache.get("q2")
+    # q1은 같은 필터의 최근 2개(q2, q3)에 들지 않음
+    assert cache.get("q1 다시") is None
+
+
+def test_semantic_match_removed_concurrently_is_a_miss():
+    """Test an entry removed while scoring is not returned"""
+    cache = AnswerCache(embed_fn=lambda q: VECTORS[q], similarity_threshold=0.95)
+    cache.put("수행평가 비율은?", None, make_response("doc_1"))
+    original = cache._best_match
+
+    def best_match(embedding, candidates):
+        result = original(embedding, candidates)
+        cache.invalidate_document("doc_1")
+        return result
+
+    cache._best_match = best_match
+
+    assert cache.get("수행평가 비율이 어떻게 되나요?") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_filter_index_follows_removals():
+    """Test the per-filter index drops invalidated and cleared entries"""
+    cache = AnswerCache(embed_fn=lambda q: VECTORS[q])
+    cache.put("수행평가 비율은?", {"year": "2025"}, make_response("doc_1"))
+    cache.put("급식 메뉴는?", None, make_response("doc_2"))
+
+    cache.invalidate_document("doc_1")
+    assert list(cache._by_filters) == [cache._filters_key(None)]
+
+    cache.clear()
+    assert cache._by_filters == {}
@@ -4,6 +4,9 @@ from unittest.mock import AsyncMock, Mock, patch
 import httpx
 from src.base_crawler import BaseCrawler
 from src.exceptions import CrawlerException, CrawlerTimeoutError
+from src.metrics import CRAWLER_RETRIES
+from src.rate_limit import HostRateLimiter
+from src.retry import RetryBudget, RetryPolicy
 
 
 class TestCrawler(BaseCrawler):
@@ -14,7 +17,16 @@ class TestCrawler(BaseCrawler):
 
 @pytest.fixture
 def crawler():
-    return TestCrawler(base_url="https://example.com")
+    return TestCrawler(
+        base_url="https://example.com",
+        retry_policy=RetryPolicy(base_delay=0),
+        rate_limiter=HostRateLimiter(rate=1000, burst=1000, max_rate=1000)
+    )
+
+
+def _response(status_code, headers=None):
+    request = httpx.Request("GET", "https://example.com/api")
+    return httpx.Response(status_code, headers=headers, request=request)
 
 
 def test_crawler_initialization():
@@ -52,11 +64,12 @@ async def test_fetch_method(crawler):
 @pytest.mark.asyncio
 async def test_get_success(crawler):
     """Test successful GET request"""
-    mock_response = Mock()
+    mock_response = Mock(status_code=200)
     mock_response.raise_for_status = Mock()
 
     with patch('httpx.AsyncClient') as mock_client:
-        mock_client.return_value.__aenter__.return_value.get = AsyncMock(return_value=mock_response)
+        mock_client.return_value.is_closed = False
+        mock_client.return_value.get = AsyncMock(return_value=mock_response)
 
         result = await crawler._get("https://example.com/api")
 
@@ -66,19 +79,21 @@ async def test_get_success(crawler):
 @pytest.mark.asyncio
 async def test_get_timeout_with_retry(crawler):
     """Test GET request timeout with successful retry"""
-    mock_response = Mock()
+    mock_response = Mock(status_code=200)
     mock_response.raise_for_status = Mock()
 
     with patch('httpx.AsyncClient') as mock_client:
         mock_get = AsyncMock()
         # First call raises timeout, second succeeds
         mock_get.side_effect = [httpx.TimeoutException("Timeout"), mock_response]
-        mock_client.return_value.__aenter__.return_value.get = mock_get
+        mock_client.return_value.get = mock_get
+        retries = CRAWLER_RETRIES.value(crawler="TestCrawler", reason="timeout")
 
         result = await crawler._get("https://example.com/api")
 
         assert result == mock_response
         assert mock_get.call_count == 2
+        assert CRAWLER_RETRIES.value(crawler="TestCrawler", reason="timeout") == retries + 1
 
 
 @pytest.mark.asyncio
@@ -86,7 +101,7 @@ async def test_get_timeout_max_retries(crawler):
     """Test GET request timeout exceeding max retries"""
     with patch('httpx.AsyncClient') as mock_client:
         mock_get = AsyncMock(side_effect=httpx.TimeoutException("Timeout"))
-        mock_client.return_value.__aenter__.return_value.get = mock_get
+        mock_client.return_value.get = mock_get
 
         with pytest.raises(CrawlerTimeoutError) as exc_info:
             await crawler._get("https://example.com/api")
@@ -99,7 +114,7 @@ async def test_get_http_error(crawler):
     """Test GET request HTTP error"""
     with patch('httpx.AsyncClient') as mock_client:
         mock_get = AsyncMock(side_effect=httpx.HTTPError("HTTP Error"))
-        mock_client.return_value.__aenter__.return_value.get = mock_get
+        mock_client.return_value.get = mock_get
 
         with pytest.raises(CrawlerException) as exc_info:
             await crawler._get("https://example.com/api")
@@ -112,7 +127,7 @@ async def test_get_unexpected_error(crawler):
     """Test GET request unexpected error"""
     with patch('httpx.AsyncClient') as mock_client:
         mock_get = AsyncMock(side_effect=Exception("Unexpected"))
-        mock_client.return_value.__aenter__.return_value.get = mock_get
+        mock_client.return_value.get = mock_get
 
         with pytest.raises(CrawlerException) as exc_info:
             await crawler._get("https://example.com/api")
@@ -123,13 +138,188 @@ async def test_get_unexpected_error(crawler):
 @pytest.mark.asyncio
 async def test_get_with_params(crawler):
     """Test GET request with query parameters"""
-    mock_response = Mock()
+    mock_response = Mock(status_code=200)
     mock_response.raise_for_status = Mock()
 
     with patch('httpx.AsyncClient') as mock_client:
         mock_get = AsyncMock(return_value=mock_response)
-        mock_client.return_value.__aenter__.return_value.get = mock_get
+        mock_client.return_value.get = mock_get
 
         await crawler._get("https://example.com/api", params={"key": "value"})
 
         mock_get.assert_called_once_with("https://example.com/api", params={"key": "value"})
+
+
+@pytest.mark.asyncio
+async def test_client_reused_across_requests(crawler):
+    """Test one pooled client serves every request until closed"""
+    mock_response = Mock(status_code=200)
+    mock_response.raise_for_status = Mock()
+
+    with patch('httpx.AsyncClient') as mock_client:
+        mock_client.return_value.is_closed = False
+        mock_client.return_value.get = AsyncMock(return_value=mock_response)
+        mock_client.return_value.aclose = AsyncMock()
+
+        await crawler._get("https://example.com/a")
+        await crawler._get("https://example.com/b")
+
+        assert mock_client.call_count == 1
+        assert mock_client.return_value.get.call_count == 2
+
+        await crawler.close()
+        mock_client.return_value.aclose.assert_awaited_once()
+
+        # A closed crawler opens a fresh client on next use
+        await crawler._get("https://example.com/c")
+        assert mock_client.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_client_configuration():
+    """Test connection limits and headers are passed to the pooled client"""
+    crawler = TestCrawler(
+        base_url="https://example.com",
+        max_connections=5,
+        max_keepalive_connections=2,
+        keepalive_expiry=10.0,
+        http2=False
+    )
+
+    async with crawler:
+        client = crawler._client
+        assert isinstance(client, httpx.AsyncClient)
+        assert client.headers["User-Agent"] == crawler.headers["User-Agent"]
+        assert crawler.limits.max_connections == 5
+        assert crawler.limits.max_keepalive_connections == 2
+        assert crawler.limits.keepalive_expiry == 10.0
+
+    assert client.is_closed
+    assert crawler._client is None
+
+
+def test_http2_requires_h2():
+    """Test HTTP/2 is only enabled when the h2 package is available"""
+    with patch('importlib.util.find_spec', return_value=None):
+        assert TestCrawler(base_url="https://example.com").http2 is False
+
+    with patch('importlib.util.find_spec', return_value=Mock()):
+        assert TestCrawler(base_url="https://example.com").http2 is True
+        assert TestCrawler(base_url="https://example.com", http2=False).http2 is False
+
+
+@pytest.mark.asyncio
+async def test_get_retries_server_errors(crawler):
+    """Test 5xx responses and connection resets are retried"""
+    ok = _response(200)
+
+    with patch('httpx.AsyncClient') as mock_client:
+        mock_get = AsyncMock(side_effect=[
+            _response(503),
+            httpx.ConnectError("Connection reset"),
+            ok
+        ])
+        mock_client.return_value.get = mock_get
+        retries_503 = CRAWLER_RETRIES.value(crawler="TestCrawler", reason="http_503")
+        retries_conn = CRAWLER_RETRIES.value(crawler="TestCrawler", reason="connection")
+
+        result = await crawler._get("https://example.com/api")
+
+        assert result is ok
+        assert mock_get.call_count == 3
+        assert CRAWLER_RETRIES.value(crawler="TestCrawler", reason="http_503") == retries_503 + 1
+        assert CRAWLER_RETRIES.value(crawler="TestCrawler", reason="connection") == retries_conn + 1
+
+
+@pytest.mark.asyncio
+async def test_get_does_not_retry_client_errors(crawler):
+    """Test 4xx responses other than 408/425/429 fail without retrying"""
+    with patch('httpx.AsyncClient') as mock_client:
+        mock_get = AsyncMock(return_value=_response(404))
+        mock_client.return_value.get = mock_get
+
+        with pytest.raises(CrawlerException) as exc_info:
+            await crawler._get("https://example.com/api")
+
+        assert "HTTP Error" in str(exc_info.value)
+        assert mock_get.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_get_server_error_after_retries(crawler):
+    """Test a persistent 5xx surfaces as CrawlerException once retries run out"""
+    with patch('httpx.AsyncClient') as mock_client:
+        mock_get = AsyncMock(side_effect=lambda *a, **kw: _response(502))
+        mock_client.return_value.get = mock_get
+
+        with pytest.raises(CrawlerException) as exc_info:
+            await crawler._get("https://example.com/api")
+
+        assert "after 3 retries" in str(exc_info.value)
+        assert mock_get.call_count == 4
+
+
+@pytest.mark.asyncio
+async def test_get_honours_retry_after(crawler):
+    """Test Retry-After sets the minimum wait before the retry"""
+    with patch('httpx.AsyncClient') as mock_client, \
+            patch('src.base_crawler.asyncio.sleep', new=AsyncMock()) as mock_sleep:
+        mock_client.return_value.get = AsyncMock(side_effect=[
+            _response(429, headers={"Retry-After": "7"}),
+            _response(200)
+        ])
+
+        await crawler._get("https://example.com/api")
+
+        mock_sleep.assert_awaited_once_with(7.0)
+
+
+@pytest.mark.asyncio
+async def test_get_stops_when_budget_exhausted():
+    """Test an empty retry budget turns the first failure into an error"""
+    policy = RetryPolicy(base_delay=0, budget=RetryBudget(ratio=0, min_retries=0))
+    crawler = TestCrawler(base_url="https://example.com", retry_policy=policy)
+
+    with patch('httpx.AsyncClient') as mock_client:
+        mock_get = AsyncMock(side_effect=httpx.ReadTimeout("Timeout"))
+        mock_client.return_value.get = mock_get
+
+        with pytest.raises(CrawlerTimeoutError) as exc_info:
+            await crawler._get("https://example.com/api")
+
+        assert "after 0 retries" in str(exc_info.value)
+        assert mock_get.call_count == 1
+
+
+def test_retry_policy_defaults_to_max_retries():
+    """Test crawlers without a policy get one with their max_retries"""
+    crawler = TestCrawler(base_url="https://example.com", max_retries=5)
+    assert crawler.retry_policy.max_retries == 5
+
+    policy = RetryPolicy(max_retries=1)
+    shared = [TestCrawler(base_url="https://example.com", retry_policy=policy) for _ in range(2)]
+    assert all(c.retry_policy is policy and c.max_retries == 1 for c in shared)
+
+
+@pytest.mark.asyncio
+async def test_get_feeds_rate_limiter(crawler):
+    """Test every attempt goes through the host limiter and reports its status"""
+    with patch('httpx.AsyncClient') as mock_client:
+        mock_client.return_value.get = AsyncMock(side_effect=[_response(429), _response(200)])
+
+        await crawler._get("https://example.com/api")
+
+    stats = crawler.rate_limiter.stats()["example.com"]
+    assert stats["throttled"] == 1
+    assert stats["in_flight"] == 0
+    assert stats["rate"] < 1000
+
+
+def test_crawlers_share_process_rate_limiter():
+    """Test crawlers default to the process-wide limiter"""
+    from src.rate_limit import RATE_LIMITER
+
+    first = TestCrawler(base_url="https://example.com")
+    second = TestCrawler(base_url="https://example.com")
+    assert first.rate_limiter is RATE_LIMITER
+    assert second.rate_limiter is RATE_LIMITER
@@ -0,0 +1,243 @@
+"""Tests for src/rag/batch_embedder.py"""
+import json
+import threading
+import time
+import httpx
+import pytest
+from unittest.mock import Mock
+from src.rag.batch_embedder import BatchingEmbedder
+
+
+def make_client():
+    client = Mock(spec=["embed"])
+    client.embed = Mock(side_effect=lambda text, model=None: [float(len(text))])
+    return client
+
+
+def test_embed_many_preserves_order():
+    """Test vectors come back in input order across batches"""
+    embedder = BatchingEmbedder(make_client(), batch_size=2, max_in_flight=3)
+    texts = ["a", "bb", "ccc", "dddd", "eeeee"]
+
+    assert embedder.embed_many(texts) == [[1.0], [2.0], [3.0], [4.0], [5.0]]
+    assert embedder.stats()["batches"] == 3
+    assert embedder.stats()["texts"] == 5
+    embedder.shutdown()
+
+
+def test_embed_many_empty():
+    """Test nothing is embedded for empty input"""
+    embedder = BatchingEmbedder(make_client())
+
+    assert embedder.embed_many([]) == []
+    assert "batch_latency" not in embedder.stats()
+    embedder.shutdown()
+
+
+def test_uses_embed_batch_when_available():
+    """Test one client call per batch when the client supports it"""
+    client = Mock()
+    client.embed_batch = Mock(side_effect=lambda texts, model: [[1.0] for _ in texts])
+    embedder = BatchingEmbedder(client, batch_size=3, model="nomic")
+
+    result = embedder.embed_many(["a", "b", "c", "d"])
+
+    assert len(result) == 4
+    assert client.embed_batch.call_count == 2
+    client.embed_batch.assert_any_call(["a", "b", "c"], model="nomic")
+    client.embed.assert_not_called()
+    embedder.shutdown()
+
+
+def test_in_flight_is_bounded():
+    """Test no more than max_in_flight batches run at once"""
+    lock = threading.Lock()
+    state = {"running": 0, "peak": 0}
+
+    def slow_embed(text, model=None):
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        time.sleep(0.02)
+        with lock:
+            state["running"] -= 1
+        return [0.0]
+
+    client = Mock(spec=["embed"])
+    client.embed = Mock(side_effect=slow_embed)
+    embedder = BatchingEmbedder(client, batch_size=1, max_in_flight=2)
+
+    embedder.embed_many([str(i) for i in range(8)])
+
+    assert state["peak"] == 2
+    embedder.shutdown()
+
+
+def test_latency_stats():
+    """Test per-batch latency summary"""
+    embedder = BatchingEmbedder(make_client(), batch_size=1)
+    embedder.embed_many(["a", "b", "c"])
+
+    latency = embedder.stats()["batch_latency"]
+
+    assert set(latency) == {"avg", "p50", "p95", "max"}
+    assert 0 <= latency["p50"] <= latency["max"]
+    embedder.shutdown()
+
+
+def test_errors_propagate_and_are_counted():
+    """Test a failing batch raises and is counted"""
+    client = Mock(spec=["embed"])
+    client.embed = Mock(side_effect=ConnectionError("ollama down"))
+    embedder = BatchingEmbedder(client, batch_size=1)
+
+    with pytest.raises(ConnectionError):
+        embedder.embed_many(["a", "b"])
+
+    assert embedder.stats()["errors"] >= 1
+    embedder.shutdown()
+
+
+def test_invalid_config():
+    """Test batch size and in-flight limit must be positive"""
+    with pytest.raises(ValueError):
+        BatchingEmbedder(make_client(), batch_size=0)
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.001)
+
+
+def test_concurrent_embeds_are_coalesced():
+    """Test single embed() calls that wait for a busy embedder go out as one batch"""
+    release = threading.Event()
+    batches = []
+
+    def embed_batch(texts, model=None):
+        batches.append(list(texts))
+        if len(batches) == 1:
+            release.wait(timeout=2)
+        return [[float(len(text))] for text in texts]
+
+    client = Mock(spec=["embed_batch"])
+    client.embed_batch = Mock(side_effect=embed_batch)
+    embedder = BatchingEmbedder(client, batch_size=8, max_in_flight=1)
+    results = {}
+
+    def call(text):
+        results[text] = embedder.embed(text)
+
+    first = threading.Thread(target=call, args=("a",))
+    first.start()
+    wait_until(lambda: batches)
+    # The only slot is busy: these queue up behind the first batch
+    others = [threading.Thread(target=call, args=(text,)) for text in ("bb", "ccc", "dddd")]
+    for thread in others:
+        thread.start()
+    wait_until(lambda: len(embedder._pending[None]) == 3)
+    release.set()
+    for thread in [first, *others]:
+        thread.join(timeout=2)
+
+    assert results == {"a": [1.0], "bb": [2.0], "ccc": [3.0], "dddd": [4.0]}
+    assert batches[0] == ["a"]
+    assert sorted(batches[1]) == ["bb", "ccc", "dddd"]
+    assert len(batches) == 2
+    embedder.shutdown()
+
+
+def test_embed_error_reaches_every_coalesced_caller():
+    client = Mock(spec=["embed"])
+    client.embed = Mock(side_effect=ConnectionError("ollama down"))
+    embedder = BatchingEmbedder(client)
+
+    with pytest.raises(ConnectionError):
+        embedder.embed("a")
+    assert embedder.stats()["errors"] == 1
+    embedder.shutdown()
+
+
+def test_batching_client_passes_through():
+    """Test the cache-less wrapper batches embeds and forwards everything else"""
+    from src.rag.batch_embedder import BatchingEmbeddingClient
+    client = make_client()
+    client.generate = Mock(return_value="answer")
+    embedder = BatchingEmbedder(client, batch_size=2)
+    wrapped = BatchingEmbeddingClient(client, embedder)
+
+    assert wrapped.embed("abc") == [3.0]
+    assert wrapped.embed_many(["a", "bb", "ccc"]) == [[1.0], [2.0], [3.0]]
+    assert wrapped.generate("q") == "answer"
+    assert embedder.stats()["texts"] == 4
+    embedder.shutdown()
+
+
+def ollama_transport(requests):
+    """httpx transport standing in for Ollama /api/embed, recording each request"""
+    def handler(request):
+        payload = json.loads(request.content)
+        requests.append(payload)
+        return httpx.Response(200, json={"embeddings": [[float(len(t))] for t in payload["input"]]})
+    return httpx.MockTransport(handler)
+
+
+def http_embedder(requests, **kwargs):
+    embedder = BatchingEmbedder(make_client(), base_url="http://ollama:11434/", **kwargs)
+    embedder._http = httpx.Client(base_url="http://ollama:11434", transport=ollama_transport(requests))
+    return embedder
+
+
+def test_batches_sent_as_one_http_request_each():
+    """Test each batch is one POST /api/embed with all its texts"""
+    requests = []
+    embedder = http_embedder(requests, batch_size=4, model="nomic-embed-text")
+    texts = [f"chunk {'x' * i}" for i in range(10)]
+
+    vectors = embedder.embed_many(texts)
+
+    assert vectors == [[float(len(t))] for t in texts]
+    assert len(requests) == 3
+    assert sorted(len(r["input"]) for r in requests) == [2, 4, 4]
+    assert all(r["model"] == "nomic-embed-text" for r in requests)
+    embedder.client.embed.assert_not_called()
+    embedder.shutdown()
+
+
+def test_http_batch_uses_client_embedding_model():
+    """Test the client's configured embedding model is used when none is given"""
+    requests = []
+    embedder = http_embedder(requests)
+    embedder.client.embedding_model = "bge-m3"
+
+    embedder.embed_many(["a", "b"])
+
+    assert requests == [{"model": "bge-m3", "input": ["a", "b"]}]
+    embedder.shutdown()
+
+
+def test_unknown_model_falls_back_to_one_request_per_text():
+    """Test without a known model texts are embedded one by one through the client"""
+    requests = []
+    embedder = http_embedder(requests)
+
+    assert embedder.embed_many(["a", "bb"]) == [[1.0], [2.0]]
+    assert requests == []
+    assert embedder.client.embed.call_count == 2
+    embedder.shutdown()
+
+
+def test_http_batch_count_mismatch_raises():
+    """Test a response with the wrong number of embeddings is an error"""
+    def handler(request):
+        return httpx.Response(200, json={"embeddings": [[1.0]]})
+
+    embedder = BatchingEmbedder(make_client(), base_url="http://ollama:11434", model="nomic")
+    embedder._http = httpx.Client(base_url="http://ollama:11434", transport=httpx.MockTransport(handler))
+
+    with pytest.raises(ValueError):
+        embedder.embed_many(["a", "b"])
+    assert embedder.stats()["errors"] == 1
+    embedder.shutdown()
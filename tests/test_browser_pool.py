@@ -0,0 +1,255 @@
+"""Tests for src/browser_pool.py"""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock
+from src.browser_pool import BrowserPool, CONTEXT_OPTIONS, LAUNCH_ARGS, STEALTH_SCRIPT
+
+
+def make_browser():
+    page = AsyncMock()
+    context = AsyncMock()
+    context.pages = [page]
+    browser = AsyncMock()
+    browser.is_connected = Mock(return_value=True)
+    browser.new_context = AsyncMock(return_value=context)
+    return browser
+
+
+@pytest.fixture
+def playwright():
+    """Factory for BrowserPool: each chromium.launch returns a new mock browser"""
+    pw = AsyncMock()
+    pw.chromium = Mock()
+    pw.chromium.launch = AsyncMock(side_effect=lambda **kwargs: make_browser())
+    pw.stop = AsyncMock()
+    factory = Mock()
+    factory.return_value.start = AsyncMock(return_value=pw)
+    return pw, factory
+
+
+def test_pool_validates_arguments():
+    with pytest.raises(ValueError):
+        BrowserPool(size=0)
+    with pytest.raises(ValueError):
+        BrowserPool(max_uses=0)
+
+
+@pytest.mark.asyncio
+async def test_lease_reuses_warm_browser(playwright):
+    """Test sequential leases share one browser and context, with pages closed in between"""
+    pw, factory = playwright
+    pool = BrowserPool(size=2, playwright_factory=factory)
+
+    async with pool.lease() as first:
+        page = first.pages[0]
+    async with pool.lease() as second:
+        pass
+
+    assert first is second
+    assert pw.chromium.launch.call_count == 1
+    pw.chromium.launch.assert_called_with(headless=True, args=LAUNCH_ARGS)
+    first.add_init_script.assert_awaited_once_with(STEALTH_SCRIPT)
+    page.close.assert_awaited()
+    assert pool.stats()["idle"] == 1
+
+    await pool.close()
+    pw.stop.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_context_options(playwright):
+    pw, factory = playwright
+    pool = BrowserPool(playwright_factory=factory)
+
+    async with pool.lease():
+        pass
+
+    browser = pool._all[0].browser
+    browser.new_context.assert_awaited_once_with(**CONTEXT_OPTIONS)
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_parallel_leases_capped_at_size(playwright):
+    """Test concurrent leases get separate browsers and wait beyond the pool size"""
+    pw, factory = playwright
+    pool = BrowserPool(size=2, playwright_factory=factory)
+    active = peak = 0
+    contexts = set()
+
+    async def crawl():
+        nonlocal active, peak
+        async with pool.lease() as context:
+            contexts.add(id(context))
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    await asyncio.gather(*(crawl() for _ in range(6)))
+
+    assert peak == 2
+    assert len(contexts) == 2
+    assert pw.chromium.launch.call_count == 2
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_recycle_after_max_uses(playwright):
+    """Test a browser is closed and replaced after max_uses leases"""
+    pw, factory = playwright
+    pool = BrowserPool(size=1, max_uses=2, playwright_factory=factory)
+
+    for _ in range(2):
+        async with pool.lease():
+            pass
+    first_browser = pw.chromium.launch.call_count
+    async with pool.lease():
+        pass
+
+    assert first_browser == 1
+    assert pw.chromium.launch.call_count == 2
+    assert pool.stats()["recycled"] == 1
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_unhealthy_browser_is_relaunched(playwright):
+    """Test a disconnected idle browser fails the health check and is replaced"""
+    pw, factory = playwright
+    pool = BrowserPool(size=1, playwright_factory=factory)
+
+    async with pool.lease():
+        pass
+    crashed = pool._all[0].browser
+    crashed.is_connected.return_value = False
+
+    async with pool.lease():
+        assert pool._all[0].browser is not crashed
+
+    crashed.close.assert_awaited_once()
+    assert pw.chromium.launch.call_count == 2
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_lease_discards_browser(playwright):
+    """Test an exception inside the lease recycles the browser and frees the slot"""
+    pw, factory = playwright
+    pool = BrowserPool(size=1, playwright_factory=factory)
+
+    with pytest.raises(RuntimeError):
+        async with pool.lease():
+            raise RuntimeError("page crashed")
+
+    async with pool.lease():
+        pass
+
+    assert pw.chromium.launch.call_count == 2
+    assert pool.stats() == {"size": 1, "browsers": 1, "idle": 1, "launched": 2, "recycled": 1}
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_closed_pool_rejects_leases(playwright):
+    _, factory = playwright
+    pool = BrowserPool(playwright_factory=factory)
+    await pool.close()
+
+    with pytest.raises(RuntimeError):
+        async with pool.lease():
+            pass
+
+
+@pytest.mark.asyncio
+async def test_failed_context_closes_browser_and_frees_slot(playwright):
+    """Test a browser whose context cannot be created is closed and its slot returned"""
+    pw, factory = playwright
+    broken = make_browser()
+    broken.new_context = AsyncMock(side_effect=RuntimeError("context failed"))
+    pw.chromium.launch = AsyncMock(side_effect=[broken, make_browser()])
+    pool = BrowserPool(size=1, playwright_factory=factory)
+
+    with pytest.raises(RuntimeError, match="context failed"):
+        await pool.acquire()
+
+    broken.close.assert_awaited_once()
+    assert pool.stats()["browsers"] == 0
+    # The slot was released: the next lease does not block
+    async with pool.lease() as context:
+        assert context is pool._all[0].context
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_launch_frees_slot(playwright):
+    pw, factory = playwright
+    pw.chromium.launch = AsyncMock(side_effect=RuntimeError("no chromium"))
+    pool = BrowserPool(size=1, playwright_factory=factory)
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError, match="no chromium"):
+            await asyncio.wait_for(pool.acquire(), timeout=1)
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_page_reset_relaunches(playwright):
+    """Test a context whose pages cannot be closed is not reused"""
+    pw, factory = playwright
+    pool = BrowserPool(size=1, playwright_factory=factory)
+
+    async with pool.lease() as context:
+        context.pages[0].close = AsyncMock(side_effect=RuntimeError("page hung"))
+    async with pool.lease() as second:
+        pass
+
+    assert second is not context
+    assert pw.chromium.launch.call_count == 2
+    assert pool.stats()["recycled"] == 1
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_release_unhealthy_discards_browser(playwright):
+    """Test release(healthy=False) recycles even a connected browser"""
+    pw, factory = playwright
+    pool = BrowserPool(size=1, playwright_factory=factory)
+
+    entry = await pool.acquire()
+    await pool.release(entry, healthy=False)
+
+    entry.browser.close.assert_awaited_once()
+    assert pool.stats()["browsers"] == 0
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_health_check_and_close_errors_are_contained(playwright):
+    """Test a browser that raises on is_connected/close is treated as dead, not fatal"""
+    pw, factory = playwright
+    pool = BrowserPool(size=1, playwright_factory=factory)
+
+    async with pool.lease():
+        pass
+    dead = pool._all[0].browser
+    dead.is_connected = Mock(side_effect=RuntimeError("driver gone"))
+    dead.close = AsyncMock(side_effect=RuntimeError("driver gone"))
+
+    async with pool.lease():
+        assert pool._all[0].browser is not dead
+
+    assert pw.chromium.launch.call_count == 2
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_pool_as_context_manager(playwright):
+    pw, factory = playwright
+
+    async with BrowserPool(playwright_factory=factory) as pool:
+        async with pool.lease():
+            pass
+
+    assert pool.stats()["browsers"] == 0
+    pw.stop.assert_awaited_once()
@@ -0,0 +1,155 @@
+"""Tests for src/browser_waits.py"""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock
+from src.browser_waits import DEFAULT_TIMEOUTS, StepWaits
+from src.metrics import BROWSER_STEP_SECONDS
+
+
+def make_page(wait_for=None):
+    page = AsyncMock()
+    locator = AsyncMock()
+    locator.first = locator
+    locator.nth = Mock(return_value=locator)
+    locator.count = AsyncMock(return_value=0)
+    locator.wait_for = wait_for or AsyncMock()
+    page.locator = Mock(return_value=locator)
+    return page, locator
+
+
+async def hang(**kwargs):
+    """A selector that never appears"""
+    await asyncio.Event().wait()
+
+
+class FakeContext:
+    """Event emitter with Playwright's once/remove_listener"""
+
+    def __init__(self):
+        self.listeners = []
+
+    def once(self, event, handler):
+        self.listeners.append((event, handler))
+
+    def remove_listener(self, event, handler):
+        self.listeners.remove((event, handler))
+
+    def emit(self, event, value):
+        for name, handler in list(self.listeners):
+            if name == event:
+                handler(value)
+
+
+def test_timeouts_override_defaults():
+    waits = StepWaits({"tab": 100})
+
+    assert waits.timeout("tab") == 100
+    assert waits.timeout("download") == DEFAULT_TIMEOUTS["download"]
+    assert waits.timeout("unknown") == 10000
+
+
+@pytest.mark.asyncio
+async def test_load_measures_step():
+    """Test load waits for the state with the step timeout and records its duration"""
+    page, _ = make_page()
+    waits = StepWaits({"detail_settle": 250})
+    before = BROWSER_STEP_SECONDS.snapshot(step="detail_settle")["count"]
+
+    assert await waits.load(page, "detail_settle", state="networkidle") is True
+
+    page.wait_for_load_state.assert_awaited_once_with("networkidle", timeout=250)
+    assert waits.durations["detail_settle"] >= 0
+    assert BROWSER_STEP_SECONDS.snapshot(step="detail_settle")["count"] == before + 1
+
+
+@pytest.mark.asyncio
+async def test_optional_waits_do_not_raise():
+    """Test a timed out readiness wait returns False and is still measured"""
+    page, locator = make_page(wait_for=AsyncMock(side_effect=TimeoutError("Timeout 5000ms exceeded")))
+    page.wait_for_load_state = AsyncMock(side_effect=TimeoutError("Timeout"))
+    waits = StepWaits()
+
+    assert await waits.selector(page, "a.file", "file_list") is False
+    assert await waits.load(page, "tab", state="networkidle") is False
+    locator.wait_for.assert_awaited_once_with(state="visible", timeout=DEFAULT_TIMEOUTS["file_list"])
+    assert set(waits.durations) == {"file_list", "tab"}
+
+
+@pytest.mark.asyncio
+async def test_step_accumulates_repeated_steps():
+    waits = StepWaits()
+
+    for _ in range(3):
+        async with waits.step("download"):
+            pass
+
+    assert list(waits.summary()) == ["download"]
+
+
+@pytest.mark.asyncio
+async def test_click_and_wait_returns_popup():
+    """Test a popup opened by the click wins over the in-page selector"""
+    page, _ = make_page(wait_for=AsyncMock(side_effect=hang))
+    context = FakeContext()
+    popup = Mock()
+
+    async def click():
+        context.emit("page", popup)
+
+    result = await StepWaits().click_and_wait(context, page, click, "#gsYear", "detail_open")
+
+    assert result is popup
+    assert context.listeners == []
+
+
+@pytest.mark.asyncio
+async def test_click_and_wait_returns_none_for_in_page_content():
+    """Test content appearing in place returns None without waiting for a popup"""
+    page, locator = make_page()
+    context = FakeContext()
+    click = AsyncMock()
+
+    result = await StepWaits({"section_open": 60000}).click_and_wait(context, page, click, "a.file", "section_open")
+
+    assert result is None
+    click.assert_awaited_once()
+    locator.nth.assert_called_once_with(0)
+    locator.wait_for.assert_awaited_once_with(state="visible", timeout=60000)
+    assert context.listeners == []
+
+
+@pytest.mark.asyncio
+async def test_click_and_wait_ignores_matches_present_before_click():
+    """Test links already on the page do not end the wait before a popup opens"""
+    page, locator = make_page()
+    locator.count = AsyncMock(return_value=3)
+    old_links = AsyncMock()
+    new_link = AsyncMock()
+    new_link.wait_for = AsyncMock(side_effect=hang)
+    locator.nth = Mock(side_effect=lambda i: new_link if i == 3 else old_links)
+    context = FakeContext()
+    popup = Mock()
+
+    async def click():
+        # The popup opens a moment after the click
+        asyncio.get_running_loop().call_later(0.01, context.emit, "page", popup)
+
+    result = await StepWaits().click_and_wait(context, page, click, "a.file", "section_open")
+
+    assert result is popup
+    locator.nth.assert_called_once_with(3)
+    old_links.wait_for.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_click_and_wait_times_out():
+    """Test neither popup nor content within the step timeout gives None after the timeout"""
+    page, _ = make_page(wait_for=AsyncMock(side_effect=hang))
+    context = FakeContext()
+    waits = StepWaits({"section_open": 50})
+
+    result = await waits.click_and_wait(context, page, AsyncMock(), "a.file", "section_open")
+
+    assert result is None
+    assert 0.04 <= waits.durations["section_open"] < 1
+    assert context.listeners == []
@@ -0,0 +1,227 @@
+"""Tests for src/rag/bulk_ingest.py"""
+import json
+import pytest
+from pathlib import Path
+from unittest.mock import Mock
+from src.rag import bulk_ingest
+from src.rag.bulk_ingest import (
+    infer_metadata, discover_pdfs, prefer_revised, BulkIngestCheckpoint, BulkIngester, BulkIngestStats
+)
+
+
+def fake_parse(pdf_path, extraction_mode):
+    """Runs in the worker process instead of PDFTableParser"""
+    content = Path(pdf_path).read_text(encoding="utf-8")
+    if content == "broken":
+        raise RuntimeError("corrupt pdf")
+    return f"## Page 1\n{content}"
+
+
+def touch(root: Path, relative: str, content: str = "content") -> Path:
+    path = root / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+    return path
+
+
+def test_infer_metadata_teaching_plan(tmp_path):
+    """Test grade, semester, school name and revision from a teaching plan filename"""
+    path = touch(tmp_path, "B100000662/2025/teaching_plans/2025학년도 동도중 교수학습 및 평가 운영 계획_1학년 2학기(수정).pdf")
+
+    assert infer_metadata(path, tmp_path) == {
+        "school_code": "B100000662",
+        "school_name": "동도중학교",
+        "year": "2025",
+        "subject": "teaching_plan",
+        "revised": True,
+        "grade": "1",
+        "semester": "2"
+    }
+
+
+def test_infer_metadata_regulation(tmp_path):
+    """Test a school-wide regulation has no grade/semester"""
+    path = touch(tmp_path, "D100000999/2025/teaching_plans/2025학년도 능인중학교 학업성적관리규정(정보공시용).pdf")
+
+    metadata = infer_metadata(path, tmp_path)
+
+    assert metadata["school_name"] == "능인중학교"
+    assert metadata["subject"] == "academic_regulation"
+    assert "grade" not in metadata
+    assert "semester" not in metadata
+
+
+def test_infer_metadata_falls_back_to_path(tmp_path):
+    """Test year comes from the directory when the filename has none"""
+    path = touch(tmp_path, "B100000662/2024/2024_Academic_Plan.pdf")
+
+    metadata = infer_metadata(path, tmp_path)
+
+    assert metadata["year"] == "2024"
+    assert metadata["school_name"] == "B100000662"
+    assert metadata["subject"] == "general"
+
+
+def test_infer_metadata_high_school(tmp_path):
+    """Test 고등학교 names are kept whole"""
+    path = touch(tmp_path, "C1/2025/teaching_plans/2025학년도 중앙고등학교 교수학습 및 평가 운영 계획_2학년 1학기.pdf")
+
+    metadata = infer_metadata(path, tmp_path)
+
+    assert metadata["school_name"] == "중앙고등학교"
+    assert metadata["grade"] == "2"
+    assert metadata["semester"] == "1"
+
+
+def test_discover_prefers_revised(tmp_path):
+    """Test the (수정) file replaces the original of the same document"""
+    base = "A/2025/teaching_plans/2025학년도 동도중 교수학습 및 평가 운영 계획_1학년 2학기"
+    touch(tmp_path, base + ".pdf")
+    revised = touch(tmp_path, base + "(수정).pdf")
+    other = touch(tmp_path, "A/2025/teaching_plans/2025학년도 동도중 교수학습 및 평가 운영 계획_2학년 2학기.pdf")
+
+    files = discover_pdfs(tmp_path)
+
+    assert [p for p, _ in files] == [revised, other]
+
+
+def test_prefer_revised_keeps_revised_regardless_of_order(tmp_path):
+    """Test the (수정) copy wins even when it comes before the original (crawler download order)"""
+    base = "A/2025/teaching_plans/2025학년도 동도중 교수학습 및 평가 운영 계획_1학년 2학기"
+    revised = touch(tmp_path, base + "(수정).pdf")
+    original = touch(tmp_path, base + ".pdf")
+
+    files = prefer_revised([(p, infer_metadata(p, tmp_path)) for p in (revised, original)])
+
+    assert [p for p, _ in files] == [revised]
+
+
+def test_discover_filters(tmp_path):
+    """Test school/year filters"""
+    touch(tmp_path, "A/2025/teaching_plans/2025학년도 동도중 교수학습 및 평가 운영 계획_1학년 2학기.pdf")
+    touch(tmp_path, "A/2024/teaching_plans/2024학년도 동도중 교수학습 및 평가 운영 계획_1학년 2학기.pdf")
+    touch(tmp_path, "B/2025/teaching_plans/2025학년도 능인중 교수학습 및 평가 운영 계획_1학년 2학기.pdf")
+
+    assert len(discover_pdfs(tmp_path)) == 3
+    assert len(discover_pdfs(tmp_path, school_code="A")) == 2
+    assert len(discover_pdfs(tmp_path, school_code="A", year=2025)) == 1
+
+
+def test_checkpoint_resume(tmp_path):
+    """Test done files are remembered across instances until they change"""
+    pdf = touch(tmp_path, "a.pdf")
+    path = str(tmp_path / "checkpoint.jsonl")
+
+    checkpoint = BulkIngestCheckpoint(path)
+    checkpoint.record(pdf, "done", document_id="doc_a")
+
+    reloaded = BulkIngestCheckpoint(path)
+    assert reloaded.is_done(pdf)
+
+    pdf.write_text("changed content", encoding="utf-8")
+    assert not reloaded.is_done(pdf)
+
+
+def test_checkpoint_ignores_truncated_line(tmp_path):
+    """Test a partially written last line is ignored"""
+    pdf = touch(tmp_path, "a.pdf")
+    path = tmp_path / "checkpoint.jsonl"
+    BulkIngestCheckpoint(str(path)).record(pdf, "failed", error="x")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"path": "b.pdf", "sta')
+
+    checkpoint = BulkIngestCheckpoint(str(path))
+
+    assert checkpoint.has_failed(pdf)
+    assert not checkpoint.is_done(pdf)
+
+
+def test_stats_files_per_sec():
+    """Test throughput excludes skipped files"""
+    stats = BulkIngestStats(total=10, skipped=4, succeeded=5, failed=1, elapsed=2.0)
+
+    assert stats.files_per_sec == 3.0
+    assert stats.to_dict()["files_per_sec"] == 3.0
+    assert BulkIngestStats().files_per_sec == 0.0
+
+
+@pytest.fixture
+def pipeline():
+    pipeline = Mock()
+    pipeline.parse_cache = None
+    pipeline.pdf_parser.extraction_mode = "legacy"
+    pipeline.generate_enhanced_json = Mock(
+        side_effect=lambda markdown, metadata: {"document_metadata": {"document_id": f"doc_{metadata['grade']}"}}
+    )
+    pipeline.index_enhanced_json = Mock(return_value={"chunks_added": 2, "chunks_updated": 1, "chunks_removed": 0})
+    return pipeline
+
+
+def make_files(tmp_path, contents):
+    return [
+        (touch(tmp_path, f"A/2025/{i}.pdf", content), {"school_code": "A", "grade": str(i)})
+        for i, content in enumerate(contents)
+    ]
+
+
+def test_bulk_ingester_runs_and_resumes(tmp_path, pipeline, monkeypatch):
+    """Test files are parsed in worker processes, indexed and skipped on rerun"""
+    monkeypatch.setattr(bulk_ingest, "_parse_file", fake_parse)
+    files = make_files(tmp_path, ["one", "broken", "three"])
+    checkpoint_path = str(tmp_path / "checkpoint.jsonl")
+
+    stats = BulkIngester(pipeline, BulkIngestCheckpoint(checkpoint_path), workers=2, log_every=2).run(files)
+
+    assert stats.succeeded == 2
+    assert stats.failed == 1
+    assert stats.chunks_added == 4
+    assert stats.chunks_updated == 2
+    assert "corrupt pdf" in stats.failures[0]["error"]
+    pipeline.generate_enhanced_json.assert_any_call("## Page 1\none", files[0][1])
+    assert pipeline.save_enhanced_json.call_count == 2
+
+    # Rerun: finished files are skipped, the failed one is retried
+    pipeline.generate_enhanced_json.reset_mock()
+    rerun = BulkIngester(pipeline, BulkIngestCheckpoint(checkpoint_path), workers=2).run(files)
+
+    assert rerun.skipped == 2
+    assert rerun.failed == 1
+    pipeline.generate_enhanced_json.assert_not_called()
+
+    skip_failed = BulkIngester(
+        pipeline, BulkIngestCheckpoint(checkpoint_path), workers=2, retry_failed=False
+    ).run(files)
+    assert skip_failed.skipped == 3
+
+
+def test_bulk_ingester_records_index_failures(tmp_path, pipeline, monkeypatch):
+    """Test indexing errors are recorded and do not stop the run"""
+    monkeypatch.setattr(bulk_ingest, "_parse_file", fake_parse)
+    pipeline.index_enhanced_json.side_effect = [Exception("ollama down"), {"chunks_added": 1}]
+    files = make_files(tmp_path, ["one", "two"])
+    checkpoint = BulkIngestCheckpoint(str(tmp_path / "checkpoint.jsonl"))
+
+    stats = BulkIngester(pipeline, checkpoint, workers=1).run(files)
+
+    assert stats.failed == 1
+    assert stats.succeeded == 1
+    assert checkpoint.has_failed(files[0][0])
+    assert checkpoint.is_done(files[1][0])
+
+
+def test_bulk_ingester_uses_parse_cache(tmp_path, pipeline, monkeypatch):
+    """Test cached markdown skips the worker process and new parses are cached"""
+    from src.rag.parse_cache import ParseCache
+
+    monkeypatch.setattr(bulk_ingest, "_parse_file", fake_parse)
+    pipeline.parse_cache = ParseCache(cache_dir=str(tmp_path / "cache"))
+    pipeline.pdf_parser.version = "1:legacy"
+    files = make_files(tmp_path, ["one"])
+    checkpoint = BulkIngestCheckpoint(str(tmp_path / "checkpoint.jsonl"))
+
+    BulkIngester(pipeline, checkpoint, workers=1).run(files)
+    assert pipeline.parse_cache.stats()["entries"] == 1
+
+    monkeypatch.setattr(bulk_ingest, "_parse_file", None)  # would fail if a worker were used
+    BulkIngester(pipeline, BulkIngestCheckpoint(str(tmp_path / "other.jsonl")), workers=1).run(files)
+    assert pipeline.parse_cache.stats()["hits"]["markdown"] == 1
@@ -0,0 +1,144 @@
+"""Tests for src/crawl_orchestrator.py"""
+import asyncio
+import json
+import pytest
+from unittest.mock import AsyncMock, Mock
+from src.crawl_orchestrator import CrawlManifest, CrawlOrchestrator
+from src.exceptions import CrawlerException
+
+
+class FakeCrawler:
+    """Records concurrency and fails for the given school codes"""
+
+    def __init__(self, failing=(), delay=0.01):
+        self.failing = set(failing)
+        self.delay = delay
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+
+    async def download_teaching_plans(self, school_code, year):
+        self.calls.append((school_code, year))
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if school_code in self.failing:
+                raise CrawlerException(f"Timeout crawling {school_code}")
+            return [f"/downloads/{school_code}/{year}/teaching_plans/plan_{i}.pdf" for i in range(2)]
+        finally:
+            self.active -= 1
+
+
+def test_targets_are_unique_pairs():
+    """Test school x year expansion keeps input order and drops duplicates"""
+    targets = CrawlOrchestrator.targets(["A", "B", "A"], [2024, "2025"])
+
+    assert targets == [("A", 2024), ("A", 2025), ("B", 2024), ("B", 2025)]
+
+
+def test_manifest_resume(tmp_path):
+    """Test records survive reopening and a truncated last line is ignored"""
+    path = tmp_path / "manifest.jsonl"
+    manifest = CrawlManifest(str(path))
+    manifest.record("A", 2025, "failed", error="boom")
+    manifest.record("A", 2025, "done", files=["a.pdf"])
+    manifest.record("B", 2025, "failed", error="boom")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"key": "C/20')
+
+    reopened = CrawlManifest(str(path))
+
+    assert reopened.is_done("A", 2025)
+    assert reopened.get("A", 2025)["attempts"] == 2
+    assert reopened.has_failed("B", 2025)
+    assert reopened.get("C", 2025) is None
+    assert reopened.summary() == {"done": 1, "failed": 1}
+
+
+@pytest.mark.asyncio
+async def test_run_respects_concurrency_cap(tmp_path):
+    """Test schools run concurrently but never above the cap"""
+    crawler = FakeCrawler()
+    orchestrator = CrawlOrchestrator(crawler, CrawlManifest(str(tmp_path / "m.jsonl")), concurrency=3)
+
+    stats = await orchestrator.run(CrawlOrchestrator.targets([f"S{i}" for i in range(10)], [2025]))
+
+    assert stats.succeeded == 10
+    assert stats.files == 20
+    assert crawler.peak == 3
+    assert not orchestrator.running
+
+
+@pytest.mark.asyncio
+async def test_run_records_failures_and_resumes(tmp_path):
+    """Test failures are recorded and only unfinished schools are crawled again"""
+    path = str(tmp_path / "m.jsonl")
+    targets = CrawlOrchestrator.targets(["A", "B", "C"], [2025])
+
+    stats = await CrawlOrchestrator(FakeCrawler(failing={"B"}), CrawlManifest(path)).run(targets)
+    assert (stats.succeeded, stats.failed) == (2, 1)
+    assert stats.failures == [{"school_code": "B", "year": 2025, "error": "download failed: Timeout crawling B"}]
+
+    crawler = FakeCrawler()
+    stats = await CrawlOrchestrator(crawler, CrawlManifest(path)).run(targets)
+    assert crawler.calls == [("B", 2025)]
+    assert (stats.skipped, stats.succeeded) == (2, 1)
+
+    records = [json.loads(line) for line in open(path, encoding="utf-8")]
+    assert [r["status"] for r in records if r["school_code"] == "B"] == ["failed", "done"]
+
+
+@pytest.mark.asyncio
+async def test_run_can_skip_failed(tmp_path):
+    manifest = CrawlManifest(str(tmp_path / "m.jsonl"))
+    manifest.record("A", 2025, "failed", error="boom")
+    crawler = FakeCrawler()
+
+    stats = await CrawlOrchestrator(crawler, manifest, retry_failed=False).run([("A", 2025)])
+
+    assert crawler.calls == []
+    assert stats.skipped == 1
+
+
+@pytest.mark.asyncio
+async def test_downloads_feed_ingest(tmp_path):
+    """Test downloaded files are handed to the ingest callback and job ids recorded"""
+    manifest = CrawlManifest(str(tmp_path / "m.jsonl"))
+    on_downloaded = Mock(side_effect=lambda code, year, files: [f"job-{code}-{i}" for i in range(len(files))])
+
+    stats = await CrawlOrchestrator(FakeCrawler(), manifest, on_downloaded=on_downloaded).run([("A", 2025)])
+
+    on_downloaded.assert_called_once()
+    assert on_downloaded.call_args.args[:2] == ("A", 2025)
+    assert stats.ingest_jobs == 2
+    assert manifest.get("A", 2025)["job_ids"] == ["job-A-0", "job-A-1"]
+
+
+@pytest.mark.asyncio
+async def test_async_ingest_failure_marks_school_failed(tmp_path):
+    """Test a school whose files could not be handed off is crawled again next run"""
+    manifest = CrawlManifest(str(tmp_path / "m.jsonl"))
+    on_downloaded = AsyncMock(side_effect=RuntimeError("queue closed"))
+
+    stats = await CrawlOrchestrator(FakeCrawler(), manifest, on_downloaded=on_downloaded).run([("A", 2025)])
+
+    assert stats.failed == 1
+    record = manifest.get("A", 2025)
+    assert record["status"] == "failed"
+    assert record["error"] == "ingest submit failed: queue closed"
+    assert len(record["files"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_run_notes_per_host_cap(tmp_path, caplog):
+    """Test a concurrency above the crawler's per-host limit is reported"""
+    from src.rate_limit import HostRateLimiter
+    crawler = FakeCrawler()
+    crawler.rate_limiter = HostRateLimiter(max_concurrent=2)
+    orchestrator = CrawlOrchestrator(crawler, CrawlManifest(str(tmp_path / "m.jsonl")), concurrency=8)
+
+    with caplog.at_level("INFO", logger="src.crawl_orchestrator"):
+        await orchestrator.run([("A", 2025)])
+
+    assert "exceeds the per-host limit 2" in caplog.text
@@ -213,3 +213,25 @@ def test_get_fallback_data_unknown():
     assert result.school_code == "UNKNOWN456"
     assert "Unknown School" in result.school_name
     assert result.address == "N/A"
+
+
+@pytest.mark.asyncio
+async def test_download_teaching_plans_compiles_off_event_loop():
+    """Test Typst compiles run in a worker thread, not on the event loop"""
+    import threading
+    crawler = SchoolInfoCrawler(base_url="https://test.com")
+    loop_thread = threading.get_ident()
+    compile_threads = []
+
+    generator = Mock()
+    generator.compile.side_effect = lambda *args: compile_threads.append(threading.get_ident())
+
+    with patch('os.makedirs'), \
+         patch('os.path.exists', return_value=True), \
+         patch('src.pdf_gen.TypstGenerator', return_value=generator), \
+         patch('asyncio.sleep', new=AsyncMock()):
+        result = await crawler.download_teaching_plans("B100000662", 2025)
+
+    assert len(result) == 4
+    assert len(compile_threads) == 4
+    assert loop_thread not in compile_threads
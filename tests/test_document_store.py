@@ -0,0 +1,243 @@
+"""Tests for src/rag/document_store.py"""
+import json
+import pytest
+from src.rag.document_store import EnhancedJSONStore
+
+
+def make_doc(doc_id, school_code="TEST", year="2025"):
+    return {
+        "document_metadata": {
+            "document_id": doc_id,
+            "school_code": school_code,
+            "school_name": "Test School",
+            "year": year,
+            "grade": "1",
+            "subject": "math",
+            "semester": "2",
+            "section_count": 3,
+            "table_count": 1
+        },
+        "sections": []
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    return EnhancedJSONStore(str(tmp_path / "jsons"), max_cached=2)
+
+
+def test_store_initialization_does_not_create_dir(tmp_path):
+    """Test an empty store touches nothing on disk"""
+    store = EnhancedJSONStore(str(tmp_path / "jsons"))
+
+    assert len(store) == 0
+    assert not (tmp_path / "jsons").exists()
+
+
+def test_put_and_get(store):
+    """Test documents are written to disk and readable"""
+    path = store.put("doc_1", make_doc("doc_1"))
+
+    assert path.exists()
+    assert json.loads(path.read_text(encoding="utf-8"))["document_metadata"]["document_id"] == "doc_1"
+    assert store.get("doc_1")["document_metadata"]["school_code"] == "TEST"
+    assert "doc_1" in store
+    assert store.get("missing") is None
+
+
+def test_mapping_interface(store):
+    """Test dict-style access"""
+    store["doc_1"] = make_doc("doc_1")
+
+    assert store["doc_1"]["sections"] == []
+    assert list(store) == ["doc_1"]
+    with pytest.raises(KeyError):
+        store["missing"]
+
+
+def test_summaries_from_index(store):
+    """Test summaries carry listing fields"""
+    store.put("doc_1", make_doc("doc_1"))
+
+    summaries = store.summaries()
+
+    assert summaries == [{
+        "document_id": "doc_1",
+        "school_code": "TEST",
+        "school_name": "Test School",
+        "year": "2025",
+        "grade": "1",
+        "subject": "math",
+        "semester": "2",
+        "section_count": 3,
+        "table_count": 1
+    }]
+
+
+def test_restart_loads_index_without_reading_documents(tmp_path):
+    """Test a new store lists documents from the index and loads bodies lazily"""
+    root = str(tmp_path / "jsons")
+    first = EnhancedJSONStore(root)
+    first.put("doc_1", make_doc("doc_1"))
+    first.put("doc_2", make_doc("doc_2"))
+
+    second = EnhancedJSONStore(root)
+
+    assert len(second) == 2
+    assert second.ids() == ["doc_1", "doc_2"]
+    assert len(second._cache) == 0
+
+    assert second.get("doc_2")["document_metadata"]["document_id"] == "doc_2"
+    assert list(second._cache) == ["doc_2"]
+
+
+def test_index_rebuilt_from_existing_files(tmp_path):
+    """Test JSON files written before the index existed are picked up"""
+    root = tmp_path / "jsons"
+    root.mkdir()
+    (root / "doc_old.json").write_text(json.dumps(make_doc("doc_old")), encoding="utf-8")
+
+    store = EnhancedJSONStore(str(root))
+
+    assert store.ids() == ["doc_old"]
+    assert (root / EnhancedJSONStore.INDEX_FILE).exists()
+
+
+def test_index_drops_deleted_files(tmp_path):
+    """Test index entries whose files are gone are removed on load"""
+    root = tmp_path / "jsons"
+    store = EnhancedJSONStore(str(root))
+    store.put("doc_1", make_doc("doc_1"))
+    (root / "doc_1.json").unlink()
+
+    assert EnhancedJSONStore(str(root)).ids() == []
+
+
+def test_corrupt_index_is_rebuilt(tmp_path):
+    """Test a corrupt index file is rebuilt from documents"""
+    root = tmp_path / "jsons"
+    store = EnhancedJSONStore(str(root))
+    store.put("doc_1", make_doc("doc_1"))
+    (root / EnhancedJSONStore.INDEX_FILE).write_text("{not json", encoding="utf-8")
+
+    assert EnhancedJSONStore(str(root)).ids() == ["doc_1"]
+
+
+def test_put_appends_to_index_log(tmp_path):
+    """Test puts append one log line instead of rewriting the index"""
+    root = tmp_path / "jsons"
+    store = EnhancedJSONStore(str(root))
+    store.put("doc_1", make_doc("doc_1"))
+    store.put("doc_2", make_doc("doc_2"))
+    store.delete("doc_1")
+
+    assert not (root / EnhancedJSONStore.INDEX_FILE).exists()
+    lines = (root / EnhancedJSONStore.INDEX_LOG).read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["id"] for line in lines] == ["doc_1", "doc_2", "doc_1"]
+
+    # Restart replays the log and compacts it into the index file
+    assert EnhancedJSONStore(str(root)).ids() == ["doc_2"]
+    assert not (root / EnhancedJSONStore.INDEX_LOG).exists()
+    assert list(json.loads((root / EnhancedJSONStore.INDEX_FILE).read_text(encoding="utf-8"))) == ["doc_2"]
+
+
+def test_index_log_compacted_every_n_changes(tmp_path):
+    """Test the log is folded into the index file after compact_every lines"""
+    root = tmp_path / "jsons"
+    store = EnhancedJSONStore(str(root), compact_every=2)
+    store.put("doc_1", make_doc("doc_1"))
+    assert not (root / EnhancedJSONStore.INDEX_FILE).exists()
+
+    store.put("doc_2", make_doc("doc_2"))
+    assert not (root / EnhancedJSONStore.INDEX_LOG).exists()
+    assert sorted(json.loads((root / EnhancedJSONStore.INDEX_FILE).read_text(encoding="utf-8"))) == ["doc_1", "doc_2"]
+
+    store.put("doc_3", make_doc("doc_3"))
+    store.close()
+    assert not (root / EnhancedJSONStore.INDEX_LOG).exists()
+    assert EnhancedJSONStore(str(root)).ids() == ["doc_1", "doc_2", "doc_3"]
+
+
+def test_truncated_index_log_line_ignored(tmp_path):
+    """Test a log line cut off by a crash is skipped"""
+    root = tmp_path / "jsons"
+    store = EnhancedJSONStore(str(root))
+    store.put("doc_1", make_doc("doc_1"))
+    with open(root / EnhancedJSONStore.INDEX_LOG, "a", encoding="utf-8") as f:
+        f.write('{"id": "doc_2", "summ')
+
+    assert EnhancedJSONStore(str(root)).ids() == ["doc_1"]
+
+
+def test_unreadable_document_skipped(tmp_path):
+    """Test broken JSON files are skipped when building the index"""
+    root = tmp_path / "jsons"
+    root.mkdir()
+    (root / "doc_bad.json").write_text("{broken", encoding="utf-8")
+
+    assert EnhancedJSONStore(str(root)).ids() == []
+
+
+def test_memory_cache_is_bounded(store):
+    """Test only max_cached documents stay in memory"""
+    for i in range(4):
+        store.put(f"doc_{i}", make_doc(f"doc_{i}"))
+
+    assert list(store._cache) == ["doc_2", "doc_3"]
+
+    # Evicted documents are reloaded from disk
+    assert store.get("doc_0")["document_metadata"]["document_id"] == "doc_0"
+    assert list(store._cache) == ["doc_3", "doc_0"]
+
+
+def test_get_handles_missing_file(store):
+    """Test a document removed from disk behind the store returns None"""
+    store.put("doc_1", make_doc("doc_1"))
+    store._cache.clear()
+    store.path_for("doc_1").unlink()
+
+    assert store.get("doc_1") is None
+
+
+def test_delete(store):
+    """Test deleting removes file, index entry and cache"""
+    store.put("doc_1", make_doc("doc_1"))
+
+    assert store.delete("doc_1") is True
+    assert "doc_1" not in store
+    assert not store.path_for("doc_1").exists()
+    assert store.delete("doc_1") is False
+
+
+def test_iter_documents_filters_by_index(store):
+    """Test iteration filters on school_code/year"""
+    store.put("doc_a", make_doc("doc_a", school_code="A", year="2024"))
+    store.put("doc_b", make_doc("doc_b", school_code="A", year="2025"))
+    store.put("doc_c", make_doc("doc_c", school_code="B", year="2025"))
+
+    assert [d for d, _ in store.iter_documents()] == ["doc_a", "doc_b", "doc_c"]
+    assert [d for d, _ in store.iter_documents(school_code="A")] == ["doc_a", "doc_b"]
+    assert [d for d, _ in store.iter_documents(year="2025")] == ["doc_b", "doc_c"]
+    assert [d for d, _ in store.iter_documents(school_code="A", year=2025)] == ["doc_b"]
+
+
+def test_iter_documents_does_not_fill_cache(store):
+    """Test streaming all documents leaves the memory cache alone"""
+    for i in range(3):
+        store.put(f"doc_{i}", make_doc(f"doc_{i}"))
+    store._cache.clear()
+
+    docs = list(store.iter_documents())
+
+    assert len(docs) == 3
+    assert len(store._cache) == 0
+
+
+def test_iter_documents_skips_unreadable(store):
+    """Test documents whose file disappeared are skipped"""
+    store.put("doc_1", make_doc("doc_1"))
+    store.put("doc_2", make_doc("doc_2"))
+    store._cache.clear()
+    store.path_for("doc_1").unlink()
+
+    assert [d for d, _ in store.iter_documents()] == ["doc_2"]
@@ -0,0 +1,175 @@
+"""Tests for src/rag/embedding_cache.py"""
+import unicodedata
+import pytest
+from unittest.mock import Mock
+from src.rag.embedding_cache import EmbeddingCache, CachedEmbeddingClient, normalize_text
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = EmbeddingCache(db_path=str(tmp_path / "embeddings.db"), max_entries=100)
+    yield cache
+    cache.close()
+
+
+def test_normalize_text():
+    """Test whitespace and unicode normalisation"""
+    assert normalize_text("  수행평가\n\t비율  ") == "수행평가 비율"
+    # Decomposed hangul (NFD) matches composed form
+    assert normalize_text("한") == "한"
+
+
+def test_put_and_get(cache):
+    """Test vectors round-trip as float32"""
+    cache.put("model", "수행평가 비율", [0.5, 0.25, -1.0])
+
+    assert cache.get("model", "수행평가 비율") == [0.5, 0.25, -1.0]
+    assert cache.get("model", "수행평가  비율 ") == [0.5, 0.25, -1.0]
+
+
+def test_keyed_by_model(cache):
+    """Test different models do not share entries"""
+    cache.put("model-a", "text", [1.0])
+
+    assert cache.get("model-b", "text") is None
+
+
+def test_get_many_preserves_order(cache):
+    """Test batched lookup returns vectors in input order with None for misses"""
+    cache.put_many("model", ["a", "b"], [[1.0], [2.0]])
+
+    assert cache.get_many("model", ["b", "missing", "a", "b"]) == [[2.0], None, [1.0], [2.0]]
+    assert cache.stats()["hits"] == 3
+    assert cache.stats()["misses"] == 1
+
+
+def test_get_many_large_batch(cache):
+    """Test lookups larger than the SQLite parameter batch"""
+    texts = [f"text {i}" for i in range(90)]
+    cache.put_many("model", texts, [[float(i)] for i in range(90)])
+    cache._LOOKUP_BATCH = 7
+
+    result = cache.get_many("model", texts)
+
+    assert result == [[float(i)] for i in range(90)]
+
+
+def test_evicts_least_recently_used(tmp_path):
+    """Test entries over max_entries are evicted oldest first"""
+    cache = EmbeddingCache(db_path=str(tmp_path / "e.db"), max_entries=2)
+    cache.put("model", "a", [1.0])
+    cache.put("model", "b", [2.0])
+    cache.get("model", "a")  # a is now more recent than b
+    cache.put("model", "c", [3.0])
+
+    assert cache.get("model", "b") is None
+    assert cache.get("model", "a") == [1.0]
+    assert cache.get("model", "c") == [3.0]
+    assert cache.stats()["entries"] == 2
+    cache.close()
+
+
+def test_persists(tmp_path):
+    """Test cache survives reopening"""
+    path = str(tmp_path / "e.db")
+    cache = EmbeddingCache(db_path=path)
+    cache.put("model", "a", [1.0, 2.0])
+    cache.close()
+
+    reopened = EmbeddingCache(db_path=path)
+
+    assert reopened.get("model", "a") == [1.0, 2.0]
+    assert reopened.stats()["entries"] == 1
+    reopened.close()
+
+
+def test_client_embeds_misses_only(cache):
+    """Test the wrapped client is only called for texts not in the cache"""
+    client = Mock()
+    client.embed = Mock(side_effect=lambda text, model: [float(len(text))])
+    cached = CachedEmbeddingClient(client, cache, model="nomic")
+    cache.put("nomic", "known", [9.0])
+
+    result = cached.embed_many(["known", "new", " new "])
+
+    assert result == [[9.0], [3.0], [3.0]]
+    client.embed.assert_called_once_with("new", model="nomic")
+    assert cached.embed("new") == [3.0]
+    assert client.embed.call_count == 1
+
+
+def test_client_passes_other_attributes_through(cache):
+    """Test generate and other methods reach the wrapped client"""
+    client = Mock()
+    client.generate = Mock(return_value="answer")
+    cached = CachedEmbeddingClient(client, cache)
+
+    assert cached.generate(prompt="q") == "answer"
+    client.generate.assert_called_once_with(prompt="q")
+
+
+def test_client_uses_batcher_for_misses(cache):
+    """Test misses go through the batcher in one call"""
+    client = Mock()
+    batcher = Mock()
+    batcher.embed_many = Mock(side_effect=lambda texts, model: [[1.0] for _ in texts])
+    cached = CachedEmbeddingClient(client, cache, model="nomic", batcher=batcher)
+    cache.put("nomic", "known", [9.0])
+
+    result = cached.embed_many(["known", "a", "b", "a"])
+
+    assert result == [[9.0], [1.0], [1.0], [1.0]]
+    batcher.embed_many.assert_called_once_with(["a", "b"], model="nomic")
+    client.embed.assert_not_called()
+
+
+def test_warm_counts_misses(cache):
+    """Test warm embeds uncached texts and reports how many missed"""
+    client = Mock()
+    client.embed = Mock(return_value=[1.0])
+    cached = CachedEmbeddingClient(client, cache)
+
+    assert cached.warm(["a", "b"]) == 2
+    assert cached.warm(["a", "b"]) == 0
+
+
+def test_entry_count_tracks_inserts_replacements_and_evictions(tmp_path):
+    """Test the entry count is kept from the rows written, without recounting the table"""
+    cache = EmbeddingCache(db_path=str(tmp_path / "count.db"), max_entries=3)
+
+    cache.put_many("model", ["a", "b", "a"], [[1.0], [2.0], [3.0]])
+    assert cache.stats()["entries"] == 2
+    cache.put("model", "b", [4.0])
+    assert cache.stats()["entries"] == 2
+    assert cache.get("model", "b") == [4.0]
+    cache.put_many("model", ["c", "d", "e"], [[5.0], [6.0], [7.0]])
+
+    count = cache._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+    assert cache.stats()["entries"] == count == 3
+    cache.close()
+
+
+def test_client_uses_its_own_model_unless_configured(cache):
+    """Test no model= is forced on the client, and entries are keyed by the client's model"""
+    client = Mock(spec=["embed", "embedding_model"])
+    client.embedding_model = "bge-m3"
+    client.embed = Mock(return_value=[1.0])
+    cached = CachedEmbeddingClient(client, cache)
+
+    cached.embed("text")
+
+    client.embed.assert_called_once_with("text")
+    assert cached.cache_model == "bge-m3"
+    assert cache.get("bge-m3", "text") == [1.0]
+
+
+def test_client_without_model_attribute_uses_default_label(cache):
+    from src.rag.embedding_cache import DEFAULT_MODEL_LABEL
+    client = Mock(spec=["embed"])
+    client.embed = Mock(return_value=[1.0])
+
+    cached = CachedEmbeddingClient(client, cache)
+    cached.embed("text")
+
+    assert cached.cache_model == DEFAULT_MODEL_LABEL
+    assert cache.get(DEFAULT_MODEL_LABEL, "text") == [1.0]
@@ -126,3 +126,39 @@ def test_query_with_k_parameter(mock_components):
 
     call_args = mock_components['store'].hybrid_search.call_args
     assert call_args[1]["k"] == 10
+
+
+def test_engine_with_embedding_cache(mock_components, tmp_path):
+    """Test the vector store receives the caching client"""
+    from src.rag.engine import RAGEngine
+    from src.rag.embedding_cache import EmbeddingCache, CachedEmbeddingClient
+
+    cache = EmbeddingCache(db_path=str(tmp_path / "embeddings.db"))
+    with patch('src.rag.engine.ChromaHybridStore') as mock_store:
+        engine = RAGEngine("test_collection", embedding_cache=cache)
+
+    assert isinstance(engine.ollama, CachedEmbeddingClient)
+    assert engine.ollama.client is mock_components['ollama']
+    assert mock_store.call_args.kwargs["ollama_client"] is engine.ollama
+    cache.close()
+
+
+def test_ingest_file_pre_embeds_in_batches(mock_components, tmp_path):
+    """Test chunks are batch-embedded into the cache before the store insert"""
+    from src.rag.engine import RAGEngine
+    from src.rag.embedding_cache import EmbeddingCache
+
+    cache = EmbeddingCache(db_path=str(tmp_path / "embeddings.db"))
+    mock_components['ollama'].embed = Mock(return_value=[0.5])
+    del mock_components['ollama'].embed_batch  # plain OllamaClient: one embed() per text
+    engine = RAGEngine("test_collection", embedding_cache=cache, embedding_batch_size=1)
+
+    engine.ingest_file("test.pdf")
+
+    assert engine.embedder.stats()["batches"] == 2
+    # No model configured: the client's own model, keyed under the default label
+    mock_components['ollama'].embed.assert_called_with("chunk2")
+    assert cache.get_many(engine.ollama.cache_model, ["chunk1", "chunk2"]) == [[0.5], [0.5]]
+    mock_components['store'].add_documents.assert_called_once()
+    engine.embedder.shutdown()
+    cache.close()
@@ -9,7 +9,8 @@ from src.exceptions import (
     ValidationError,
     LoadError,
     RAGException,
-    ExportException
+    ExportException,
+    WorkerPoolFullError
 )
 
 
@@ -78,6 +79,13 @@ def test_export_exception():
     assert isinstance(exc, MathesisBaseException)
 
 
+def test_worker_pool_full_error():
+    """Test WorkerPoolFullError"""
+    exc = WorkerPoolFullError("Pool full")
+    assert str(exc) == "Pool full"
+    assert isinstance(exc, MathesisBaseException)
+
+
 def test_exception_raising():
     """Test that exceptions can be raised and caught"""
     with pytest.raises(SchoolNotFoundError):
@@ -0,0 +1,96 @@
+"""Tests for src/rag/export_stream.py"""
+import gzip
+import json
+from src.rag.export_stream import (
+    iter_ndjson, iter_json_object, gzip_chunks, encode_event_ndjson, encode_event_sse
+)
+
+
+DOCS = [
+    ("doc_1", {"document_metadata": {"document_id": "doc_1", "school_name": "동도중학교"}}),
+    ("doc_2", {"document_metadata": {"document_id": "doc_2", "school_name": "능인중학교"}})
+]
+
+
+def test_iter_ndjson():
+    """Test one JSON document per line"""
+    lines = b"".join(iter_ndjson(DOCS)).decode("utf-8").splitlines()
+
+    assert len(lines) == 2
+    assert json.loads(lines[0]) == DOCS[0][1]
+    assert "동도중학교" in lines[0]  # not ascii-escaped
+
+
+def test_iter_ndjson_empty():
+    """Test no documents produce no output"""
+    assert list(iter_ndjson([])) == []
+
+
+def test_iter_json_object():
+    """Test streamed object matches the old export shape"""
+    body = b"".join(iter_json_object(DOCS))
+
+    assert json.loads(body) == dict(DOCS)
+
+
+def test_iter_json_object_streams_per_document():
+    """Test each document is emitted as its own chunk"""
+    chunks = list(iter_json_object(DOCS))
+
+    assert chunks[0] == b"{"
+    assert chunks[-1] == b"}"
+    assert len(chunks) == 4
+
+
+def test_iter_json_object_empty():
+    """Test empty export is a valid empty object"""
+    assert json.loads(b"".join(iter_json_object([]))) == {}
+
+
+def test_iter_json_object_is_lazy():
+    """Test documents are pulled one at a time"""
+    pulled = []
+
+    def documents():
+        for doc in DOCS:
+            pulled.append(doc[0])
+            yield doc
+
+    stream = iter_json_object(documents())
+    next(stream)
+    next(stream)
+
+    assert pulled == ["doc_1"]
+
+
+def test_gzip_chunks_round_trip():
+    """Test gzip output decompresses to the original stream"""
+    raw = b"".join(iter_ndjson(DOCS))
+
+    compressed = b"".join(gzip_chunks(iter_ndjson(DOCS)))
+
+    assert gzip.decompress(compressed) == raw
+
+
+EVENTS = [
+    {"event": "sources", "sources": [{"document_id": "doc_1"}]},
+    {"event": "token", "text": "{\"answer\""},
+    {"event": "answer", "answer": "40%"}
+]
+
+
+def test_encode_event_ndjson():
+    """Test one event per line"""
+    lines = b"".join(encode_event_ndjson(e) for e in EVENTS).decode("utf-8").splitlines()
+
+    assert [json.loads(line) for line in lines] == EVENTS
+
+
+def test_encode_event_sse():
+    """Test SSE framing uses the event name"""
+    body = b"".join(encode_event_sse(e) for e in EVENTS).decode("utf-8")
+    frames = body.split("\n\n")[:-1]
+
+    assert len(frames) == 3
+    assert frames[0].startswith("event: sources\ndata: ")
+    assert json.loads(frames[2].split("data: ", 1)[1]) == EVENTS[2]
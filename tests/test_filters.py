@@ -0,0 +1,79 @@
+"""Tests for src/rag/filters.py"""
+import pytest
+from unittest.mock import Mock
+from src.exceptions import RAGException
+from src.rag.filters import normalize_filters, build_where, matches, query_with_where
+
+
+def test_normalize_filters():
+    """Test None values dropped and values stringified"""
+    assert normalize_filters({"year": 2025, "grade": None}) == {"year": "2025"}
+    assert normalize_filters(None) == {}
+
+
+def test_normalize_filters_rejects_unknown_fields():
+    """Test unsupported fields raise"""
+    with pytest.raises(ValueError, match="Unsupported filter fields"):
+        normalize_filters({"teacher": "김"})
+
+
+def test_build_where_single():
+    """Test a single condition is a plain equality"""
+    assert build_where({"school_code": "B100000662"}) == {"school_code": "B100000662"}
+
+
+def test_build_where_multiple():
+    """Test several conditions are combined with $and"""
+    assert build_where({"year": "2025", "grade": "1"}) == {
+        "$and": [{"year": "2025"}, {"grade": "1"}]
+    }
+
+
+def test_build_where_empty():
+    """Test no filters means no where clause"""
+    assert build_where({}) is None
+    assert build_where({"year": None}) is None
+
+
+def test_matches():
+    """Test metadata matching"""
+    metadata = {"school_code": "A", "year": "2025", "grade": 1}
+
+    assert matches(metadata, {"year": "2025", "grade": "1"})
+    assert not matches(metadata, {"school_code": "B"})
+    assert matches(metadata, None)
+
+
+def test_matches_ignores_missing_fields():
+    """Test fields absent from metadata do not exclude the chunk"""
+    assert matches({"year": "2025"}, {"year": "2025", "semester": "2"})
+
+
+def test_query_with_where_passes_where():
+    """Test where is passed as is, and omitted when None"""
+    store = Mock()
+
+    query_with_where(store, {"year": "2025"}, question="q", k=3)
+    store.query_with_parent_context.assert_called_with(question="q", k=3, where={"year": "2025"})
+
+    query_with_where(store, None, question="q", k=3)
+    store.query_with_parent_context.assert_called_with(question="q", k=3)
+
+
+def test_query_with_where_rejects_store_without_where():
+    """Test a store without a where parameter raises RAGException"""
+    class NoWhereStore:
+        def query_with_parent_context(self, question, k):
+            return {}
+
+    with pytest.raises(RAGException, match="NoWhereStore"):
+        query_with_where(NoWhereStore(), {"year": "2025"}, question="q", k=3)
+
+
+def test_query_with_where_keeps_other_type_errors():
+    """Test unrelated TypeErrors from the store are not masked"""
+    store = Mock()
+    store.query_with_parent_context.side_effect = TypeError("bad operand")
+
+    with pytest.raises(TypeError, match="bad operand"):
+        query_with_where(store, {"year": "2025"}, question="q", k=3)
@@ -0,0 +1,114 @@
+"""Tests for src/rag/index_manifest.py"""
+import json
+from src.rag.index_manifest import IndexManifest, section_hash, section_hashes, diff_sections
+
+
+def test_section_hash_is_order_independent():
+    """Test hash does not depend on dict key order"""
+    a = {"section_id": "sec_000", "content": "x", "tables": []}
+    b = {"tables": [], "content": "x", "section_id": "sec_000"}
+
+    assert section_hash(a) == section_hash(b)
+    assert section_hash(a) != section_hash({**a, "content": "y"})
+
+
+def test_section_hashes():
+    """Test hashes keyed by section id"""
+    doc = {"sections": [{"section_id": "sec_000"}, {"section_id": "sec_001"}]}
+
+    assert list(section_hashes(doc)) == ["sec_000", "sec_001"]
+    assert section_hashes({}) == {}
+
+
+def test_diff_sections():
+    """Test added/updated/removed/unchanged classification"""
+    old = {"sec_000": "h0", "sec_001": "h1", "sec_002": "h2"}
+    new = {"sec_000": "h0", "sec_001": "h1x", "sec_003": "h3"}
+
+    assert diff_sections(old, new) == {
+        "added": ["sec_003"],
+        "updated": ["sec_001"],
+        "removed": ["sec_002"],
+        "unchanged": ["sec_000"]
+    }
+
+
+def test_manifest_persists(tmp_path):
+    """Test manifest round-trips through its file"""
+    path = tmp_path / "chroma" / "section_manifest.json"
+    manifest = IndexManifest(str(path))
+    manifest.set("doc_1", {"sec_000": "h0"})
+
+    reloaded = IndexManifest(str(path))
+
+    assert reloaded.get("doc_1") == {"sec_000": "h0"}
+    assert "doc_1" in reloaded
+    assert reloaded.get("doc_2") is None
+
+
+def test_manifest_remove(tmp_path):
+    """Test removing a document"""
+    path = tmp_path / "section_manifest.json"
+    manifest = IndexManifest(str(path))
+    manifest.set("doc_1", {"sec_000": "h0"})
+
+    manifest.remove("doc_1")
+    manifest.remove("doc_missing")
+
+    assert IndexManifest(str(path)).get("doc_1") is None
+
+
+def test_manifest_get_returns_copy(tmp_path):
+    """Test callers cannot mutate stored hashes"""
+    manifest = IndexManifest(str(tmp_path / "m.json"))
+    manifest.set("doc_1", {"sec_000": "h0"})
+
+    manifest.get("doc_1")["sec_000"] = "changed"
+
+    assert manifest.get("doc_1") == {"sec_000": "h0"}
+
+
+def test_corrupt_manifest_starts_empty(tmp_path):
+    """Test corrupt file is treated as no history"""
+    path = tmp_path / "section_manifest.json"
+    path.write_text("{not json", encoding="utf-8")
+
+    assert IndexManifest(str(path)).get("doc_1") is None
+
+
+def test_manifest_appends_changes_instead_of_rewriting(tmp_path):
+    """Test set/remove append to the log and reload replays it"""
+    path = tmp_path / "section_manifest.json"
+    manifest = IndexManifest(str(path))
+    manifest.set("doc_1", {"sec_000": "h0"})
+    manifest.set("doc_2", {"sec_000": "h1"})
+    manifest.remove("doc_1")
+
+    assert not path.exists()
+    assert len(manifest.log_path.read_text(encoding="utf-8").splitlines()) == 3
+
+    with open(manifest.log_path, "a", encoding="utf-8") as f:
+        f.write('{"id": "doc_3", "hash')  # truncated by a crash
+
+    reloaded = IndexManifest(str(path))
+
+    assert reloaded.ids() == ["doc_2"]
+    assert path.exists()
+    assert not reloaded.log_path.exists()
+
+
+def test_manifest_compacts_every_n_changes(tmp_path):
+    """Test the log is merged into the JSON file after compact_every lines and on close"""
+    path = tmp_path / "section_manifest.json"
+    manifest = IndexManifest(str(path), compact_every=2)
+    manifest.set("doc_1", {"sec_000": "h0"})
+    manifest.set("doc_2", {"sec_000": "h1"})
+
+    assert not manifest.log_path.exists()
+    assert set(json.loads(path.read_text(encoding="utf-8"))) == {"doc_1", "doc_2"}
+
+    manifest.set("doc_3", {"sec_000": "h2"})
+    manifest.close()
+
+    assert not manifest.log_path.exists()
+    assert set(json.loads(path.read_text(encoding="utf-8"))) == {"doc_1", "doc_2", "doc_3"}
@@ -0,0 +1,239 @@
+"""Tests for src/rag/ingest_jobs.py"""
+import asyncio
+import threading
+import pytest
+from unittest.mock import Mock
+from src.rag.ingest_jobs import IngestJobQueue
+from src.exceptions import WorkerPoolFullError
+
+
+ENHANCED_JSON = {
+    "document_metadata": {"document_id": "doc_TEST_2025_1_math_1"},
+    "sections": []
+}
+
+
+@pytest.fixture
+def pipeline():
+    mock = Mock()
+    mock.parse_pdf = Mock(return_value="## Page 1\nContent")
+    mock.generate_enhanced_json = Mock(return_value=ENHANCED_JSON)
+    mock.save_enhanced_json = Mock(return_value="enhanced_jsons/doc_TEST_2025_1_math_1.json")
+    mock.index_enhanced_json = Mock(return_value={
+        "chunks_added": 5,
+        "chunks_updated": 0,
+        "chunks_removed": 0,
+        "sections_unchanged": 0
+    })
+    return mock
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "jobs.db")
+
+
+async def wait_for_status(queue, job_id, statuses=("succeeded", "failed")):
+    for _ in range(200):
+        job = queue.get(job_id)
+        if job["status"] in statuses:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+@pytest.mark.asyncio
+async def test_submit_returns_queued_job(pipeline, db_path):
+    """Test submit stores a queued job"""
+    queue = IngestJobQueue(pipeline, db_path=db_path)
+
+    job = queue.submit("test.pdf", {"school_code": "TEST"})
+
+    assert job["job_id"]
+    assert job["status"] == "queued"
+    assert job["progress"]["stage"] == "parse"
+    assert job["progress"]["completed_stages"] == []
+    assert job["metadata"] == {"school_code": "TEST"}
+    queue.close()
+
+
+@pytest.mark.asyncio
+async def test_job_runs_all_stages(pipeline, db_path):
+    """Test a job runs parse → generate → save → index"""
+    queue = IngestJobQueue(pipeline, db_path=db_path)
+    await queue.start()
+
+    job = queue.submit("test.pdf", {"school_code": "TEST"})
+    job = await wait_for_status(queue, job["job_id"])
+    await queue.stop()
+
+    assert job["status"] == "succeeded"
+    assert job["progress"]["stage"] == "done"
+    assert job["progress"]["completed_stages"] == IngestJobQueue.STAGES
+    assert job["result"] == {
+        "document_id": "doc_TEST_2025_1_math_1",
+        "enhanced_json_path": "enhanced_jsons/doc_TEST_2025_1_math_1.json",
+        "chunks_added": 5,
+        "chunks_updated": 0,
+        "chunks_removed": 0,
+        "sections_unchanged": 0
+    }
+    pipeline.parse_pdf.assert_called_once_with("test.pdf")
+    pipeline.generate_enhanced_json.assert_called_once_with(
+        "## Page 1\nContent", {"school_code": "TEST"}
+    )
+    pipeline.index_enhanced_json.assert_called_once_with(ENHANCED_JSON)
+    queue.close()
+
+
+@pytest.mark.asyncio
+async def test_worker_writes_run_off_event_loop(pipeline, db_path):
+    """Test stage results are serialised and written outside the event loop thread"""
+    queue = IngestJobQueue(pipeline, db_path=db_path)
+    loop_thread = threading.get_ident()
+    writer_threads = []
+    original = queue._update
+
+    def update(job_id, **fields):
+        writer_threads.append(threading.get_ident())
+        original(job_id, **fields)
+
+    queue._update = update
+    await queue.start()
+
+    job = queue.submit("test.pdf", {"school_code": "TEST"})
+    job = await wait_for_status(queue, job["job_id"])
+    await queue.stop()
+
+    assert job["status"] == "succeeded"
+    assert writer_threads
+    assert loop_thread not in writer_threads
+    queue.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_stage_is_retried(pipeline, db_path):
+    """Test a failing stage is retried without re-running earlier stages"""
+    pipeline.index_enhanced_json.side_effect = [Exception("Ollama down"), {"chunks_added": 7}]
+
+    queue = IngestJobQueue(pipeline, db_path=db_path, retry_delay=0)
+    await queue.start()
+
+    job = queue.submit("test.pdf", {})
+    job = await wait_for_status(queue, job["job_id"])
+    await queue.stop()
+
+    assert job["status"] == "succeeded"
+    assert job["result"]["chunks_added"] == 7
+    assert pipeline.index_enhanced_json.call_count == 2
+    pipeline.parse_pdf.assert_called_once()
+    queue.close()
+
+
+@pytest.mark.asyncio
+async def test_job_fails_after_max_attempts(pipeline, db_path):
+    """Test a job is marked failed at the failing stage"""
+    pipeline.generate_enhanced_json.side_effect = Exception("Bad markdown")
+
+    queue = IngestJobQueue(pipeline, db_path=db_path, max_attempts=2, retry_delay=0)
+    await queue.start()
+
+    job = queue.submit("test.pdf", {})
+    job = await wait_for_status(queue, job["job_id"])
+    await queue.stop()
+
+    assert job["status"] == "failed"
+    assert job["error"] == "Bad markdown"
+    assert job["progress"]["stage"] == "generate"
+    assert job["progress"]["completed_stages"] == ["parse"]
+    assert job["progress"]["attempts"] == 2
+    assert pipeline.generate_enhanced_json.call_count == 2
+    queue.close()
+
+
+@pytest.mark.asyncio
+async def test_retry_resumes_from_failed_stage(pipeline, db_path):
+    """Test manual retry reuses output of completed stages"""
+    pipeline.save_enhanced_json.side_effect = Exception("Disk full")
+
+    queue = IngestJobQueue(pipeline, db_path=db_path, max_attempts=1, retry_delay=0)
+    await queue.start()
+
+    job = queue.submit("test.pdf", {})
+    await wait_for_status(queue, job["job_id"])
+
+    pipeline.save_enhanced_json.side_effect = None
+    queue.retry(job["job_id"])
+    job = await wait_for_status(queue, job["job_id"], statuses=("succeeded",))
+    await queue.stop()
+
+    assert job["status"] == "succeeded"
+    pipeline.parse_pdf.assert_called_once()
+    pipeline.generate_enhanced_json.assert_called_once()
+    queue.close()
+
+
+@pytest.mark.asyncio
+async def test_retry_rejects_unfinished_job(pipeline, db_path):
+    """Test retry only applies to failed jobs"""
+    queue = IngestJobQueue(pipeline, db_path=db_path)
+    job = queue.submit("test.pdf", {})
+
+    with pytest.raises(ValueError, match="not failed"):
+        queue.retry(job["job_id"])
+
+    assert queue.retry("missing") is None
+    queue.close()
+
+
+@pytest.mark.asyncio
+async def test_pending_jobs_recovered_on_start(pipeline, db_path):
+    """Test jobs persisted before a restart are processed on start"""
+    first = IngestJobQueue(pipeline, db_path=db_path)
+    job = first.submit("test.pdf", {})
+    first.close()
+
+    second = IngestJobQueue(pipeline, db_path=db_path)
+    await second.start()
+    job = await wait_for_status(second, job["job_id"])
+    await second.stop()
+
+    assert job["status"] == "succeeded"
+    second.close()
+
+
+@pytest.mark.asyncio
+async def test_pool_full_does_not_count_as_attempt(pipeline, db_path):
+    """Test WorkerPoolFullError waits instead of failing the stage"""
+    calls = []
+
+    async def runner(func, *args):
+        calls.append(func)
+        if len(calls) == 1:
+            raise WorkerPoolFullError("full")
+        return func(*args)
+
+    queue = IngestJobQueue(pipeline, db_path=db_path, max_attempts=1, retry_delay=0, runner=runner)
+    await queue.start()
+
+    job = queue.submit("test.pdf", {})
+    job = await wait_for_status(queue, job["job_id"])
+    await queue.stop()
+
+    assert job["status"] == "succeeded"
+    queue.close()
+
+
+def test_get_and_list_jobs(pipeline, db_path):
+    """Test job lookup and listing"""
+    queue = IngestJobQueue(pipeline, db_path=db_path)
+    first = queue.submit("a.pdf", {})
+    second = queue.submit("b.pdf", {})
+
+    assert queue.get("missing") is None
+    assert queue.get(first["job_id"])["pdf_path"] == "a.pdf"
+
+    jobs = queue.list_jobs()
+    assert {j["job_id"] for j in jobs} == {first["job_id"], second["job_id"]}
+    assert len(queue.list_jobs(limit=1)) == 1
+    queue.close()
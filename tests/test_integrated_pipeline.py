@@ -4,6 +4,7 @@ import json
 import sys
 from unittest.mock import Mock, patch, MagicMock
 from pathlib import Path
+from src.rag.document_store import EnhancedJSONStore
 
 # Mock mathesis_core before import
 sys.modules['mathesis_core'] = Mock()
@@ -14,8 +15,11 @@ sys.modules['mathesis_core.llm.clients'] = Mock()
 
 
 @pytest.fixture
-def mock_dependencies():
+def mock_dependencies(tmp_path, monkeypatch):
     """Mock all external dependencies"""
+    # Enhanced JSON store writes under ./enhanced_jsons
+    monkeypatch.chdir(tmp_path)
+
     with patch('src.rag.integrated_pipeline.HierarchicalChromaStore') as mock_store, \
          patch('src.rag.integrated_pipeline.OllamaClient') as mock_ollama, \
          patch('src.rag.integrated_pipeline.PDFTableParser') as mock_parser, \
@@ -24,6 +28,8 @@ def mock_dependencies():
         # Setup mock store
         mock_store_instance = Mock()
         mock_store_instance.add_hierarchical_document = Mock(return_value=5)
+        mock_store_instance.child_collection.get = Mock(return_value={"ids": []})
+        mock_store_instance.parent_collection.get = Mock(return_value={"ids": []})
         mock_store_instance.query_with_parent_context = Mock(return_value={
             "matched_children": [],
             "parent_contexts": []
@@ -33,6 +39,8 @@ def mock_dependencies():
         # Setup mock ollama
         mock_ollama_instance = Mock()
         mock_ollama_instance.generate = Mock(return_value='{"answer": "Test answer", "key_facts": [], "confidence": 0.9}')
+        # One request per text (no embed_batch), like OllamaClient
+        del mock_ollama_instance.embed_batch
         mock_ollama.return_value = mock_ollama_instance
 
         # Setup mock parser
@@ -73,9 +81,18 @@ def test_pipeline_initialization(mock_dependencies):
     assert pipeline.ollama is not None
     assert pipeline.vector_store is not None
     assert pipeline.pdf_parser is not None
-    assert pipeline.json_generator is not None
-    assert isinstance(pipeline.json_storage, dict)
+    assert isinstance(pipeline.json_storage, EnhancedJSONStore)
+    assert len(pipeline.json_storage) == 0
+
+
+
+def test_pipeline_passes_parser_workers(mock_dependencies):
+    """Test parser_workers enables the parser's page-range process pool"""
+    from src.rag import integrated_pipeline
 
+    integrated_pipeline.IntegratedRAGPipeline(parser_workers=4)
+
+    assert integrated_pipeline.PDFTableParser.call_args.kwargs["workers"] == 4
 
 def test_ingest_pdf_success(mock_dependencies, tmp_path):
     """Test successful PDF ingestion"""
@@ -91,12 +108,7 @@ def test_ingest_pdf_success(mock_dependencies, tmp_path):
         "subject": "math"
     }
 
-    with patch('pathlib.Path.mkdir'), \
-         patch('builtins.open', create=True) as mock_open:
-        mock_file = MagicMock()
-        mock_open.return_value.__enter__.return_value = mock_file
-
-        result = pipeline.ingest_pdf("test.pdf", metadata)
+    result = pipeline.ingest_pdf("test.pdf", metadata)
 
     assert "document_id" in result
     assert result["document_id"] == "doc_TEST_2025_1_math_1"
@@ -128,13 +140,12 @@ def test_ingest_pdf_stores_json(mock_dependencies):
 
     metadata = {"school_code": "TEST", "school_name": "Test"}
 
-    with patch('pathlib.Path.mkdir'), \
-         patch('builtins.open', create=True):
-        result = pipeline.ingest_pdf("test.pdf", metadata)
+    result = pipeline.ingest_pdf("test.pdf", metadata)
 
     doc_id = result["document_id"]
     assert doc_id in pipeline.json_storage
     assert pipeline.json_storage[doc_id]["document_metadata"]["document_id"] == doc_id
+    assert Path(result["enhanced_json_path"]).exists()
 
 
 def test_query_success(mock_dependencies):
@@ -258,23 +269,6 @@ def test_export_json_nonexistent(mock_dependencies):
     assert result is None
 
 
-def test_export_all_jsons(mock_dependencies):
-    """Test exporting all JSONs"""
-    from src.rag.integrated_pipeline import IntegratedRAGPipeline
-
-    pipeline = IntegratedRAGPipeline()
-    pipeline.json_storage = {
-        "doc_1": {"data": 1},
-        "doc_2": {"data": 2}
-    }
-
-    result = pipeline.export_all_jsons()
-
-    assert len(result) == 2
-    assert "doc_1" in result
-    assert "doc_2" in result
-
-
 def test_list_documents_empty(mock_dependencies):
     """Test listing documents when empty"""
     from src.rag.integrated_pipeline import IntegratedRAGPipeline
@@ -291,26 +285,24 @@ def test_list_documents_with_data(mock_dependencies):
     from src.rag.integrated_pipeline import IntegratedRAGPipeline
 
     pipeline = IntegratedRAGPipeline()
-    pipeline.json_storage = {
-        "doc_1": {
-            "document_metadata": {
-                "school_name": "School A",
-                "year": "2025",
-                "grade": "1",
-                "subject": "math",
-                "section_count": 5,
-                "table_count": 3
-            }
-        },
-        "doc_2": {
-            "document_metadata": {
-                "school_name": "School B",
-                "year": "2024",
-                "grade": "2",
-                "subject": "science",
-                "section_count": 7,
-                "table_count": 2
-            }
+    pipeline.json_storage["doc_1"] = {
+        "document_metadata": {
+            "school_name": "School A",
+            "year": "2025",
+            "grade": "1",
+            "subject": "math",
+            "section_count": 5,
+            "table_count": 3
+        }
+    }
+    pipeline.json_storage["doc_2"] = {
+        "document_metadata": {
+            "school_name": "School B",
+            "year": "2024",
+            "grade": "2",
+            "subject": "science",
+            "section_count": 7,
+            "table_count": 2
         }
     }
 
@@ -364,17 +356,16 @@ def test_query_formats_context_correctly(mock_dependencies):
     assert "[출처: Section 2]" in prompt
 
 
-def test_ingest_pdf_creates_output_directory(mock_dependencies):
+def test_ingest_pdf_creates_output_directory(mock_dependencies, tmp_path):
     """Test that ingest creates output directory"""
     from src.rag.integrated_pipeline import IntegratedRAGPipeline
 
-    pipeline = IntegratedRAGPipeline()
+    pipeline = IntegratedRAGPipeline(json_dir=str(tmp_path / "out"))
+    assert not (tmp_path / "out").exists()
 
-    with patch('pathlib.Path.mkdir') as mock_mkdir, \
-         patch('builtins.open', create=True):
-        pipeline.ingest_pdf("test.pdf", {"school_code": "TEST"})
+    pipeline.ingest_pdf("test.pdf", {"school_code": "TEST"})
 
-        mock_mkdir.assert_called_once_with(exist_ok=True)
+    assert (tmp_path / "out" / "doc_TEST_2025_1_math_1.json").exists()
 
 
 def test_query_includes_parent_context_preview(mock_dependencies):
@@ -396,3 +387,605 @@ def test_query_includes_parent_context_preview(mock_dependencies):
     assert "parent_contexts" in result
     assert len(result["parent_contexts"][0]) <= 203  # 200 + "..."
     assert result["parent_contexts"][0].endswith("...")
+
+
+def test_generate_enhanced_json_uses_cache(mock_dependencies, tmp_path):
+    """Test Enhanced JSON is served from the parse cache for the same markdown"""
+    from src.rag.integrated_pipeline import IntegratedRAGPipeline
+    from src.rag.parse_cache import ParseCache
+
+    cache = ParseCache(cache_dir=str(tmp_path / "cache"))
+    pipeline = IntegratedRAGPipeline(parse_cache=cache)
+
+    first = pipeline.generate_enhanced_json("## Page 1\nContent", {"school_code": "TEST"})
+    second = pipeline.generate_enhanced_json("## Page 1\nContent", {"school_code": "TEST"})
+
+    assert first == second
+    mock_dependencies['json_gen'].generate_from_markdown.assert_called_once()
+    assert cache.stats()["hits"]["enhanced_json"] == 1
+
+    # Different metadata must not reuse the cached document
+    pipeline.generate_enhanced_json("## Page 1\nContent", {"school_code": "OTHER"})
+    assert mock_dependencies['json_gen'].generate_from_markdown.call_count == 2
+
+
+def test_concurrent_generation_has_deterministic_section_ids(mock_dependencies):
+    """Test jobs generating at the same time do not share section/table counters"""
+    import sys
+    from concurrent.futures import ThreadPoolExecutor
+    from src.rag.integrated_pipeline import IntegratedRAGPipeline
+    from src.rag.enhanced_json_generator import EnhancedJSONGenerator
+
+    markdown = "\n".join(
+        f"## Page {page}\n### 평가 {page}\n| 영역 | 비율 |\n|---|---|\n| 지필 | 60% |\n| 수행 | 40% |"
+        for page in range(1, 41)
+    )
+    metadata = {"school_code": "TEST", "year": "2025", "grade": "1", "subject": "math"}
+
+    switch_interval = sys.getswitchinterval()
+    with patch('src.rag.integrated_pipeline.EnhancedJSONGenerator', EnhancedJSONGenerator):
+        pipeline = IntegratedRAGPipeline()
+        expected = pipeline.generate_enhanced_json(markdown, metadata)
+        # Switch threads often so that shared counters would interleave
+        sys.setswitchinterval(1e-6)
+        try:
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                results = list(executor.map(
+                    lambda _: pipeline.generate_enhanced_json(markdown, metadata), range(8)
+                ))
+        finally:
+            sys.setswitchinterval(switch_interval)
+
+    expected_ids = [s["section_id"] for s in expected["sections"]]
+    assert expected_ids[0] == "sec_000"
+    for result in results:
+        assert [s["section_id"] for s in result["sections"]] == expected_ids
+
+
+def test_documents_survive_restart(mock_dependencies, tmp_path):
+    """Test exports are reloaded from disk by a new pipeline instance"""
+    from src.rag.integrated_pipeline import IntegratedRAGPipeline
+
+    json_dir = str(tmp_path / "jsons")
+    IntegratedRAGPipeline(json_dir=json_dir).ingest_pdf("test.pdf", {"school_code": "TEST"})
+
+    restarted = IntegratedRAGPipeline(json_dir=json_dir)
+
+    assert restarted.list_documents()[0]["document_id"] == "doc_TEST_2025_1_math_1"
+    assert restarted.export_json("doc_TEST_2025_1_math_1")["document_metadata"]["school_code"] == "TEST"
+    assert [doc_id for doc_id, _ in restarted.iter_export_jsons()] == ["doc_TEST_2025_1_math_1"]
+
+
+def test_iter_export_jsons_filters(mock_dependencies):
+    """Test streaming export delegates filters to the store"""
+    from src.rag.integrated_pipeline import IntegratedRAGPipeline
+
+    pipeline = IntegratedRAGPipeline()
+    pipeline.json_storage["doc_1"] = {"document_metadata": {"school_code": "A", "year": "2025"}}
+    pipeline.json_storage["doc_2"] = {"document_metadata": {"school_code": "B", "year": "2025"}}
+
+    result = list(pipeline.iter_export_jsons(school_code="B"))
+
+    assert [doc_id for doc_id, _ in result] == ["doc_2"]
+
+
+def make_sections_doc(*sections):
+    return {
+        "document_metadata": {"document_id": "doc_TEST_2025_1_math_1", "school_code": "TEST"},
+        "sections": [
+            {"section_id": sid, "section_title": sid, "content": content, "tables": []}
+            for sid, content in sections
+        ],
+        "rag_optimization": {
+            "chunk_ids": [f"chunk_{sid}" for sid, _ in sections],
+            "chunk_mappings": {f"chunk_{sid}": {"section": sid} for sid, _ in sections}
+        }
+    }
+
+
+def indexed_section_ids(store_mock):
+    """Section ids passed to the latest add_hierarchical_document call"""
+    partial = store_mock.add_hierarchical_document.call_args[0][0]
+    return [s["section_id"] for s in partial["sections"]]
+
+
+def test_index_first_time_adds_all_sections(mock_dependencies):
+    """Test a new document indexes every section"""
+    from src.rag.integrated_pipeline import IntegratedRAGPipeline
+
+    pipeline = IntegratedRAGPipeline()
+    store = mock_dependencies['store']
+
+    result = pipeline.index_enhanced_json(make_sections_doc(("sec_000", "a"), ("sec_001", "b")))
+
+    assert result == {
+        "chunks_added": 5,
+        "chunks_updated": 0,
+        "chunks_removed": 0,
+        "sections_unchanged": 0
+    }
+    assert indexed_section_ids(store) == ["sec_000", "sec_001"]
+    # Legacy chunks of the same document are cleared first
+    store.child_collection.get.assert_called_once_with(
+        where={"document_id": "doc_TEST_2025_1_math_1"}, include=[]
+    )
+
+
+def test_reindex_unchanged_document_is_noop(mock_dependencies):
+    """Test re-ingesting identical content embeds nothing"""
+    from src.rag.integrated_pipeline import IntegratedRAGPipeline
+
+    pipeline = IntegratedRAGPipeline()
+    store = mock_dependencies['store']
+    doc = make_sections_doc(("sec_000", "a"), ("sec_001", "b"))
+
+    pipeline.index_enhanced_json(doc)
+    store.add_hierarchical_document.reset_mock()
+    store.child_collection.delete.reset_mock()
+
+    result = pipeline.index_enhanced_json(doc)
+
+    assert result == {
+        "chunks_added": 0,
+        "chunks_updated": 0,
+        "chunks_removed": 0,
+        "sections_unchanged": 2
+    }
+    store.add_hierarchical_document.assert_not_called()
+    store.child_collection.delete.assert_not_called()
+
+
+def test_reindex_only_changed_sections(mock_dependencies):
+    """Test revised document re-embeds changed sections and drops removed ones"""
+    from src.rag.integrated_pipeline import IntegratedRAGPipeline
+
+    pipeline = IntegratedRAGPipeline()
+    store = mock_dependencies['store']
+    pipeline.index_enhanced_json(make_sections_doc(("sec_000", "a"), ("sec_001", "b"), ("sec_002", "c")))
+
+    store.add_hierarchical_document.reset_mock()
+    store.add_hierarchical_document.side_effect = [1, 2]
+    store.child_collection.get.side_effect = [{"ids": ["c1", "c2"]}, {"ids": ["u1"]}]
+    store.parent_collection.get.side_effect = [{"ids": ["p1"]}, {"ids": ["p2"]}]
+
+    revised = make_sections_doc(("sec_000", "a"), ("sec_001", "b (수정)"), ("sec_003", "d"))
+    result = pipeline.index_enhanced_json(revised)
+
+    assert result == {
+        "chunks_added": 1,
+        "chunks_updated": 2,
+        "chunks_removed": 3,
+        "sections_unchanged": 1
+    }
+    added_call, updated_call = store.add_hierarchical_document.call_args_list
+    assert [s["section_id"] for s in added_call[0][0]["sections"]] == ["sec_003"]
+    assert added_call[0][0]["rag_optimization"]["chunk_ids"] == ["chunk_sec_003"]
+    assert [s["section_id"] for s in updated_call[0][0]["sections"]] == ["sec_001"]
+
+    store.child_collection.get.assert_any_call(
+        where={"$and": [
+            {"document_id": "doc_TEST_2025_1_math_1"},
+            {"section_id": {"$in": ["sec_002"]}}
+        ]},
+        include=[]
+    )
+    store.child_collection.delete.assert_any_call(ids=["c1", "c2"])
+    store.parent_collection.delete.assert_any_call(ids=["p2"])
+
+
+def test_missing_chunk_collection_fails_indexing(mock_dependencies):
+    """Test a store without a chunk collection stops indexing instead of leaving stale chunks"""
+    from src.rag.integrated_pipeline import IntegratedRAGPipeline
+    from src.exceptions import RAGException
+
+    store = mock_dependencies['store']
+    store.parent_collection = None
+    pipeline = IntegratedRAGPipeline()
+
+    with pytest.raises(RAGException, match="parent_collection"):
+        pipeline.index_enhanced_json(make_sections_doc(("sec_000", "a")))
+
+    store.add_hierarchical_document.assert_not_called()
+    assert pipeline.index_manifest.get("doc_TEST_2025_1_math_1") is None
+
+
+def test_index_manifest_survives_restart(mock_dependencies):
+    """Test section hashes are persisted next to the vector store"""
+    from src.rag.integrated_pipeline import IntegratedRAGPipeline
+
+    doc = make_sections_doc(("sec_000", "a"))
+    IntegratedRAGPipeline().index_enhanced_json(doc)
+    mock_dependencies['store'].add_hierarchical_document.reset_mock()
+
+    result = IntegratedRAGPipeline().index_enhanced_json(doc)
+
+    assert result["sections_unchanged"] == 1
+    mock_dependencies['store'].add_hierarchical_document.assert_not_called()
+
+
+def test_delete_document(mock_dependencies):
+    """Test deleting a document clears chunks, manifest and stored JSON"""
+    from src.rag.integrated_pipeline import IntegratedRAGPipeline
+
+    pipeline = IntegratedRAGPipeline()
+    doc = make_sections_doc(("sec_000", "a"))
+    pipeline.save_enhanced_json(doc)
+    pipeline.index_enhanced_json(doc)
+    mock_dependencies['store'].child_collection.get.return_value = {"ids": ["c1"]}
+
+    assert pipeline.delete_document("doc_TEST_2025_1_math_1") is True
+    assert "doc_TEST_2025_1_math_1" not in pipeline.index_manifest
+    assert "doc_TEST_2025_1_math_1" not in pipeline.json_storage
+    mock_dependencies['store'].child_collection.delete.assert_called_with(ids=["c1"])
+
+
+def test_pipeline_with_embedding_cache(mock_dependencies, tmp_path):
+    """Test embeddings for the hierarchical store go through the cache"""
+    from src.rag.integrated_pipeline import IntegratedRAGPipeline, HierarchicalChromaStore
+    from src.rag.embedding_cache import EmbeddingCache, CachedEmbeddingClient
+
+    cache = EmbeddingCache(db_path=str(tmp_path / "embeddings.db"))
+    pipeline = IntegratedRAGPipeline(embedding_cache=cache)
+
+    assert isinstance(pipeline.ollama, CachedEmbeddingClient)
+    assert pipeline.embedding_cache is cache
+    assert HierarchicalChromaStore.call_args.kwargs["ollama_client"] is pipeline.ollama
+    assert pipeline.ollama.batcher is pipeline.embedder
+    cache.close()
+
+
+def test_pipeline_batches_embeddings_without_cache(mock_dependencies):
+    """Test the hierarchical store embeds through the batcher even without a cache"""
+    from src.rag.integrated_pipeline import IntegratedRAGPipeline, HierarchicalChromaStore
+    from src.rag.batch_embedder import BatchingEmbeddingClient
+
+    mock_dependencies['ollama'].embed = Mock(return_value=[1.0, 0.0])
+    pipeline = IntegratedRAGPipeline(embedding_batch_size=8, embedding_max_in_flight=2)
+    store_client = HierarchicalChromaStore.call_args.kwargs["ollama_client"]
+
+    assert isinstance(store_client, BatchingEmbeddingClient)
+    assert store_client.embed("청크") == [1.0, 0.0]
+    assert pipeline.embedder.stats()["texts"] == 1
+    assert pipeline.embedder.max_in_flight == 2
+    pipeline.close()
+
+
+def test_pipeline_embeds_batches_over_ollama_http(mock_dependencies):
+    """Test a cached ingest sends its misses to Ollama /api/embed, one request per batch"""
+    import httpx
+    from src.rag.integrated_pipeline import IntegratedRAGPipeline
+    from src.rag.embedding_cache import EmbeddingCache
+
+    requests = []
+
+    def handler(request):
+        texts = json.loads(request.content)["input"]
+        requests.append(request.url.path)
+        return httpx.Response(200, json={"embeddings": [[1.0] for _ in texts]})
+
+    cache = EmbeddingCache(db_path=":memory:")
+    pipeline = IntegratedRAGPipeline(
+        ollama_base_url="http://ollama:11434",
+        embedding_cache=cache,
+        embedding_model="nomic-embed-text",
+        embedding_batch_size=16
+    )
+    pipeline.embedder._http = httpx.Client(base_url="http://ollama:11434", transport=httpx.MockTransport(handler))
+
+    pipeline.ollama.embed_many([f"청크 {i}" for i in range(40)])
+
+    assert requests == ["/api/embed"] * 3
+    mock_dependencies['ollama'].embed.assert_not_called()
+    pipeline.close()
+    cache.close()
+
+
+def mock_retrieval(store, doc_id="doc_TEST_2025_1_math_1"):
+    store.query_with_parent_context.return_value = {
+        "matched_children": [],
+        "parent_contexts": [{
+            "text": "수행평가 40%",
+            "metadata": {"section_title": "평가", "document_id": doc_id}
+        }]
+    }
+
+
+def test_query_answer_cache(mock_dependencies):
+    """Test repeated questions skip retrieval and generation"""
+    from src.rag.integrated_pipeline import IntegratedRAGPipeline
+
+    mock_retrieval(mock_dependencies['store'])
+    mock_dependencies['ollama'].embed = Mock(return_value=[1.0, 0.0])
+    pipeline = IntegratedRAGPipeline(answer_cache_size=10)
+
+    first = pipeline.query("수행평가 비율은?")
+    second = pipeline.query("수행평가 비율은?")
+
+    assert first == second
+    assert mock_dependencies['store'].query_with_parent_context.call_count == 1
+    assert mock_dependencies['ollama'].generate.call_count == 1
+    # Different k is a different answer
+    pipeline.query("수행평가 비율은?", k=5)
+    assert mock_dependencies['store'].query_with_parent_context.call_count == 2
+
+
+def test_query_answer_cache_invalidated_on_reindex(mock_dependencies):
+    """Test re-indexing a source document drops its cached answers"""
+    from src.rag.integrated_pipeline import IntegratedRAGPipeline
+
+    mock_retrieval(mock_dependencies['store'])
+    pipeline = IntegratedRAGPipeline(answer_cache_size=10)
+    pipeline.query("수행평가 비율은?")
+
+    pipeline.index_enhanced_json(make_sections_doc(("sec_000", "개정")))
+    pipeline.query("수행평가 비율은?")
+
+    assert mock_dependencies['store'].query_with_parent_context.call_count == 2
+
+
+
+def test_answer_generated_during_reindex_not_cached(mock_dependencies):
+    """Test an answer whose source is re-indexed while it is being generated is not cached"""
+    from src.rag.integrated_pipeline import IntegratedRAGPipeline
+
+    mock_retrieval(mock_dependencies['store'])
+    pipeline = IntegratedRAGPipeline(answer_cache_size=10)
+
+    def generate_while_reindexing(*args, **kwargs):
+        pipeline.index_enhanced_json(make_sections_doc(("sec_000", "개정")))
+        return '{"answer": "수행평가 40%", "confidence": 0.9}'
+
+    mock_dependencies['ollama'].generate.side_effect = generate_while_reindexing
+    pipeline.query("수행평가 비율은?")
+
+    assert len(pipeline.answer_cache) == 0
+
+def test_query_errors_not_cached(mock_dependencies):
+    """Test failed generations are not cached"""
+    from src.rag.integrated_pipeline import IntegratedRAGPipeline
+
+    mock_retrieval(mock_dependencies['store'])
+    mock_dependencies['ollama'].generate.side_effect = [Exception("timeout"), '{"answer": "ok", "confidence": 0.9}']
+    pipeline = IntegratedRAGPipeline(answer_cache_size=10)
+
+    assert pipeline.query("q")["confidence"] == 0.0
+    assert pipeline.query("q")["answer"] == "ok"
+    assert len(pipeline.answer_cache) == 1
+
+
+def test_answer_cache_disabled_by_default(mock_dependencies):
+    """Test no answer cache unless a size is configured"""
+    from src.rag.integrated_pipeline import IntegratedRAGPipeline
+
+    assert IntegratedRAGPipeline().answer_cache is None
+
+
+class FakeStreamResponse:
+    """Minimal stand-in for an httpx streaming response from /api/generate"""
+
+    def __init__(self, lines):
+        self.lines = lines
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self):
+        return iter(self.lines)
+
+
+OLLAMA_STREAM = [
+    json.dumps({"response": '{"answer": "40%", ', "done": False}),
+    "",
+    json.dumps({"response": '"key_facts": [], "confidence": 0.9}', "done": False}),
+    json.dumps({"response": "", "done": True})
+]
+
+
+def test_query_stream_event_order(mock_dependencies):
+    """Test sources arrive first, then tokens, then the parsed answer"""
+    from src.rag.integrated_pipeline import IntegratedRAGPipeline
+
+    mock_retrieval(mock_dependencies['store'])
+    pipeline = IntegratedRAGPipeline(ollama_base_url="http://ollama:11434/")
+
+    with patch('src.rag.integrated_pipeline.httpx.stream', return_value=FakeStreamResponse(OLLAMA_STREAM)) as stream:
+        events = list(pipeline.query_stream("수행평가 비율은?"))
+
+    assert [e["event"] for e in events] == ["sources", "token", "token", "answer"]
+    assert events[0]["sources"][0]["document_id"] == "doc_TEST_2025_1_math_1"
+    assert events[-1]["answer"] == "40%"
+    assert events[-1]["confidence"] == 0.9
+    assert events[-1]["sources"] == events[0]["sources"]
+
+    args, kwargs = stream.call_args
+    assert args == ("POST", "http://ollama:11434/api/generate")
+    assert kwargs["json"]["stream"] is True
+    assert kwargs["json"]["format"] == "json"
+    mock_dependencies['ollama'].generate.assert_not_called()
+
+
+def test_query_stream_no_context(mock_dependencies):
+    """Test empty retrieval ends with the not-found answer"""
+    from src.rag.integrated_pipeline import IntegratedRAGPipeline
+
+    events = list(IntegratedRAGPipeline().query_stream("q"))
+
+    assert events == [
+        {"event": "sources", "sources": []},
+        {"event": "answer", "answer": "관련 정보를 찾을 수 없습니다.", "sources": [], "parent_contexts": []}
+    ]
+
+
+def test_query_stream_generation_error(mock_dependencies):
+    """Test Ollama errors end the stream with an error answer"""
+    from src.rag.integrated_pipeline import IntegratedRAGPipeline
+
+    mock_retrieval(mock_dependencies['store'])
+    pipeline = IntegratedRAGPipeline()
+    lines = [json.dumps({"error": "model not found"})]
+
+    with patch('src.rag.integrated_pipeline.httpx.stream', return_value=FakeStreamResponse(lines)):
+        events = list(pipeline.query_stream("q"))
+
+    assert [e["event"] for e in events] == ["sources", "answer"]
+    assert events[-1]["confidence"] == 0.0
+    assert "model not found" in events[-1]["answer"]
+
+
+def test_query_stream_retrieval_error(mock_dependencies):
+    """Test retrieval failure is reported as an error event"""
+    from src.rag.integrated_pipeline import IntegratedRAGPipeline
+
+    mock_dependencies['store'].query_with_parent_context.side_effect = Exception("chroma down")
+
+    events = list(IntegratedRAGPipeline().query_stream("q"))
+
+    assert events == [{"event": "error", "detail": "chroma down"}]
+
+
+def test_query_stream_uses_answer_cache(mock_dependencies):
+    """Test streamed answers are cached and replayed without generation"""
+    from src.rag.integrated_pipeline import IntegratedRAGPipeline
+
+    mock_retrieval(mock_dependencies['store'])
+    pipeline = IntegratedRAGPipeline(answer_cache_size=10)
+
+    with patch('src.rag.integrated_pipeline.httpx.stream', return_value=FakeStreamResponse(OLLAMA_STREAM)) as stream:
+        first = list(pipeline.query_stream("q"))
+        second = list(pipeline.query_stream("q"))
+
+    assert stream.call_count == 1
+    assert [e["event"] for e in second] == ["sources", "answer"]
+    assert second[-1] == first[-1]
+    assert pipeline.query("q")["answer"] == "40%"
+
+
+def test_query_stream_uses_ollama_client_settings(mock_dependencies):
+    """Test streaming reuses the OllamaClient address, model and timeout"""
+    from src.rag.integrated_pipeline import IntegratedRAGPipeline
+    from src.metrics import STAGE_SECONDS
+
+    mock_retrieval(mock_dependencies['store'])
+    mock_dependencies['ollama'].base_url = "http://gpu:11434/"
+    mock_dependencies['ollama'].model = "qwen2.5:7b"
+    mock_dependencies['ollama'].timeout = 30
+    pipeline = IntegratedRAGPipeline()
+    before = STAGE_SECONDS.snapshot(stage="llm_generate")["count"]
+
+    with patch('src.rag.integrated_pipeline.httpx.stream', return_value=FakeStreamResponse(OLLAMA_STREAM)) as stream:
+        list(pipeline.query_stream("q"))
+
+    args, kwargs = stream.call_args
+    assert args == ("POST", "http://gpu:11434/api/generate")
+    assert kwargs["json"]["model"] == "qwen2.5:7b"
+    assert kwargs["timeout"] == 30
+    assert STAGE_SECONDS.snapshot(stage="llm_generate")["count"] == before + 1
+
+
+def test_query_pushes_filters_into_store(mock_dependencies):
+    """Test filters are passed to the hybrid search as a where clause"""
+    from src.rag.integrated_pipeline import IntegratedRAGPipeline
+
+    mock_retrieval(mock_dependencies['store'])
+    pipeline = IntegratedRAGPipeline()
+
+    pipeline.query("q", k=2, filters={"school_code": "TEST", "year": 2025})
+
+    mock_dependencies['store'].query_with_parent_context.assert_called_once_with(
+        question="q",
+        k=2,
+        use_hybrid=True,
+        where={"$and": [{"school_code": "TEST"}, {"year": "2025"}]}
+    )
+
+
+def test_query_without_filters_has_no_where(mock_dependencies):
+    """Test unfiltered queries call the store exactly as before"""
+    from src.rag.integrated_pipeline import IntegratedRAGPipeline
+
+    IntegratedRAGPipeline().query("q", filters={"grade": None})
+
+    mock_dependencies['store'].query_with_parent_context.assert_called_once_with(
+        question="q", k=3, use_hybrid=True
+    )
+
+
+def test_query_fails_when_where_unsupported(mock_dependencies):
+    """Test a store that cannot filter fails loudly instead of searching everything"""
+    from src.rag.integrated_pipeline import IntegratedRAGPipeline
+    from src.exceptions import RAGException
+
+    def query_with_parent_context(question, k, use_hybrid=True):
+        return {"matched_children": [], "parent_contexts": []}
+
+    mock_dependencies['store'].query_with_parent_context = query_with_parent_context
+    pipeline = IntegratedRAGPipeline()
+
+    with pytest.raises(RAGException, match="where"):
+        pipeline._retrieve("q", 1, {"year": "2025"})
+
+    # Without filters the store is called as before
+    assert pipeline._retrieve("q", 1, None) == []
+
+
+def test_query_drops_results_when_where_ignored(mock_dependencies):
+    """Test results outside the filters are still dropped if the store ignores where"""
+    from src.rag.integrated_pipeline import IntegratedRAGPipeline
+
+    mock_dependencies['store'].query_with_parent_context.return_value = {
+        "matched_children": [],
+        "parent_contexts": [
+            {"text": "a", "metadata": {"document_id": "doc_a", "year": "2024"}},
+            {"text": "b", "metadata": {"document_id": "doc_b", "year": "2025"}}
+        ]
+    }
+    pipeline = IntegratedRAGPipeline()
+
+    result = pipeline.query("q", k=2, filters={"year": "2025"})
+
+    assert [s["document_id"] for s in result["sources"]] == ["doc_b"]
+
+
+def test_query_rejects_unknown_filter(mock_dependencies):
+    """Test unsupported filter fields raise"""
+    from src.rag.integrated_pipeline import IntegratedRAGPipeline
+
+    with pytest.raises(ValueError):
+        IntegratedRAGPipeline().query("q", filters={"teacher": "김"})
+
+
+def test_sharded_pipeline(mock_dependencies):
+    """Test shard_by routes through ShardedVectorStore and admin calls work"""
+    from src.rag.integrated_pipeline import IntegratedRAGPipeline, HierarchicalChromaStore
+    from src.rag.shards import ShardedVectorStore
+
+    pipeline = IntegratedRAGPipeline(shard_by="school")
+    assert isinstance(pipeline.vector_store, ShardedVectorStore)
+
+    result = pipeline.index_enhanced_json(make_sections_doc(("sec_000", "a")))
+
+    assert result["chunks_added"] == 5
+    assert HierarchicalChromaStore.call_args.kwargs["collection_prefix"] == "school_info_v2_TEST"
+    assert [s["shard"] for s in pipeline.list_shards()] == ["TEST"]
+
+    mock_dependencies['store'].child_collection.get.return_value = {"ids": ["c1"]}
+    assert pipeline.drop_shard("TEST") == ["doc_TEST_2025_1_math_1"]
+    assert "doc_TEST_2025_1_math_1" not in pipeline.index_manifest
+
+    pipeline.close()
+    with pytest.raises(RuntimeError):
+        pipeline.vector_store._executor.submit(lambda: None)
+
+
+def test_shard_admin_requires_sharding(mock_dependencies):
+    """Test admin calls fail when sharding is off"""
+    from src.rag.integrated_pipeline import IntegratedRAGPipeline
+
+    with pytest.raises(ValueError):
+        IntegratedRAGPipeline().list_shards()
@@ -0,0 +1,130 @@
+"""Tests for src/metrics.py"""
+import asyncio
+import math
+import pytest
+from src.metrics import MetricsRegistry, Histogram, STAGE_SECONDS, CACHE_REQUESTS, timed, record_cache
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+def test_counter_inc_and_render(registry):
+    """Test counters accumulate per label set and render in text format"""
+    counter = registry.counter("requests_total", "Requests", ("cache", "result"))
+    counter.inc(cache="answer", result="hit")
+    counter.inc(2, cache="answer", result="hit")
+    counter.inc(cache="answer", result="miss")
+
+    assert counter.value(cache="answer", result="hit") == 3
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{cache="answer",result="hit"} 3' in text
+    assert 'requests_total{cache="answer",result="miss"} 1' in text
+
+
+def test_counter_rejects_bad_input(registry):
+    """Test negative increments and wrong labels are rejected"""
+    counter = registry.counter("c_total", "C", ("a",))
+
+    with pytest.raises(ValueError):
+        counter.inc(-1, a="x")
+    with pytest.raises(ValueError):
+        counter.inc(b="x")
+
+
+def test_histogram_buckets(registry):
+    """Test observations land in cumulative buckets with sum and count"""
+    histogram = registry.histogram("latency_seconds", "Latency", ("stage",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, stage="parse")
+    histogram.observe(0.5, stage="parse")
+    histogram.observe(5, stage="parse")
+
+    snapshot = histogram.snapshot(stage="parse")
+    assert snapshot["count"] == 3
+    assert snapshot["sum"] == pytest.approx(5.55)
+    assert snapshot["buckets"] == {0.1: 1, 1.0: 2, math.inf: 3}
+
+    text = registry.render()
+    assert 'latency_seconds_bucket{stage="parse",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{stage="parse",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{stage="parse"} 3' in text
+
+
+def test_timer_context_manager_records_on_error(registry):
+    """Test the timer observes even when the block raises"""
+    histogram = registry.histogram("t_seconds", "T", ("stage",))
+
+    with histogram.time(stage="ok"):
+        pass
+    with pytest.raises(RuntimeError):
+        with histogram.time(stage="fail"):
+            raise RuntimeError("boom")
+
+    assert histogram.snapshot(stage="ok")["count"] == 1
+    assert histogram.snapshot(stage="fail")["count"] == 1
+
+
+def test_timer_decorator_sync_and_async(registry):
+    """Test the timer wraps sync and async functions"""
+    histogram = registry.histogram("d_seconds", "D", ("stage",))
+
+    @histogram.time(stage="sync")
+    def add(a, b):
+        return a + b
+
+    @histogram.time(stage="async")
+    async def double(a):
+        return a * 2
+
+    assert add(1, 2) == 3
+    assert add(2, 2) == 4
+    assert asyncio.run(double(4)) == 8
+    assert add.__name__ == "add"
+    assert histogram.snapshot(stage="sync")["count"] == 2
+    assert histogram.snapshot(stage="async")["count"] == 1
+
+
+def test_registry_reuses_and_rejects_conflicts(registry):
+    """Test registering the same name returns the metric, other types fail"""
+    first = registry.counter("x_total", "X")
+
+    assert registry.counter("x_total", "X") is first
+    with pytest.raises(ValueError):
+        registry.histogram("x_total", "X")
+
+
+def test_label_values_escaped(registry):
+    """Test quotes, backslashes and newlines in label values are escaped"""
+    registry.counter("e_total", "E", ("v",)).inc(v='a"b\\c\nd')
+
+    assert 'e_total{v="a\\"b\\\\c\\nd"} 1' in registry.render()
+
+
+def test_reset_keeps_metrics(registry):
+    """Test reset clears values but keeps HELP/TYPE lines"""
+    registry.counter("r_total", "R").inc()
+    registry.reset()
+
+    text = registry.render()
+    assert "# TYPE r_total counter" in text
+    assert "r_total 1" not in text
+
+
+def test_default_helpers():
+    """Test timed() and record_cache() feed the shared metrics"""
+    before = STAGE_SECONDS.snapshot(stage="test_stage")["count"]
+    with timed("test_stage"):
+        pass
+    assert STAGE_SECONDS.snapshot(stage="test_stage")["count"] == before + 1
+
+    hits = CACHE_REQUESTS.value(cache="test", result="hit")
+    record_cache("test", hits=2, misses=0)
+    assert CACHE_REQUESTS.value(cache="test", result="hit") == hits + 2
+    assert CACHE_REQUESTS.value(cache="test", result="miss") == 0
+
+
+def test_histogram_always_has_inf_bucket():
+    """Test +Inf is appended when not given"""
+    assert Histogram("h", "H", buckets=(1, 2)).buckets == (1.0, 2.0, math.inf)
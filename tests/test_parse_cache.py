@@ -0,0 +1,122 @@
+"""Tests for src/rag/parse_cache.py"""
+import os
+import time
+import pytest
+from src.rag.parse_cache import ParseCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ParseCache(cache_dir=str(tmp_path / "cache"), max_bytes=1024)
+
+
+def test_cache_initialization(cache):
+    """Test empty cache state"""
+    stats = cache.stats()
+
+    assert stats["entries"] == 0
+    assert stats["bytes"] == 0
+    assert stats["max_bytes"] == 1024
+    assert stats["hits"] == {"markdown": 0, "enhanced_json": 0}
+
+
+def test_put_and_get(cache):
+    """Test stored text is returned on hit"""
+    cache.put("markdown", "key1", "## Page 1\n내용")
+
+    assert cache.get("markdown", "key1") == "## Page 1\n내용"
+    assert cache.stats()["hits"]["markdown"] == 1
+
+
+def test_get_miss(cache):
+    """Test a miss returns None and is counted"""
+    assert cache.get("markdown", "missing") is None
+    assert cache.get("enhanced_json", "missing") is None
+
+    stats = cache.stats()
+    assert stats["misses"] == {"markdown": 1, "enhanced_json": 1}
+
+
+def test_kinds_are_separate(cache):
+    """Test the same key is distinct per kind"""
+    cache.put("markdown", "key", "md")
+    cache.put("enhanced_json", "key", "{}")
+
+    assert cache.get("markdown", "key") == "md"
+    assert cache.get("enhanced_json", "key") == "{}"
+
+
+def test_put_overwrites_entry(cache):
+    """Test re-putting a key replaces the entry and its size"""
+    cache.put("markdown", "key", "a" * 100)
+    cache.put("markdown", "key", "b" * 10)
+
+    assert cache.get("markdown", "key") == "b" * 10
+    assert cache.stats()["bytes"] == 10
+
+
+def test_lru_eviction(cache):
+    """Test least recently used entries are evicted over the size limit"""
+    cache.put("markdown", "a", "x" * 400)
+    cache.put("markdown", "b", "x" * 400)
+    cache.get("markdown", "a")  # a is now most recently used
+    cache.put("markdown", "c", "x" * 400)
+
+    assert cache.get("markdown", "b") is None
+    assert cache.get("markdown", "a") is not None
+    assert cache.get("markdown", "c") is not None
+    assert cache.stats()["bytes"] <= 1024
+
+
+def test_oversized_entry_not_cached(cache):
+    """Test entries larger than the cache are skipped"""
+    cache.put("markdown", "big", "x" * 2048)
+
+    assert cache.get("markdown", "big") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_cache_reloads_from_disk(tmp_path):
+    """Test entries survive a restart in LRU order"""
+    cache_dir = str(tmp_path / "cache")
+    first = ParseCache(cache_dir=cache_dir, max_bytes=1024)
+    first.put("markdown", "old", "x" * 400)
+    time.sleep(0.01)
+    first.put("markdown", "new", "x" * 400)
+
+    second = ParseCache(cache_dir=cache_dir, max_bytes=1024)
+    assert second.stats()["entries"] == 2
+    assert second.stats()["bytes"] == 800
+
+    second.put("markdown", "newest", "x" * 400)
+    assert second.get("markdown", "old") is None
+    assert second.get("markdown", "new") == "x" * 400
+
+
+def test_missing_file_counts_as_miss(cache):
+    """Test an entry deleted behind the cache's back is dropped"""
+    cache.put("markdown", "key", "data")
+    os.remove(os.path.join(cache.cache_dir, "key.md"))
+
+    assert cache.get("markdown", "key") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_file_hash(cache, tmp_path):
+    """Test file hashing follows content"""
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(b"pdf content")
+    first = cache.file_hash(str(path))
+
+    other = tmp_path / "copy.pdf"
+    other.write_bytes(b"pdf content")
+    assert cache.file_hash(str(other)) == first
+
+    path.write_bytes(b"changed content")
+    assert cache.file_hash(str(path)) != first
+
+
+def test_make_key():
+    """Test keys depend on every part"""
+    assert ParseCache.make_key("hash", "1") == ParseCache.make_key("hash", "1")
+    assert ParseCache.make_key("hash", "1") != ParseCache.make_key("hash", "2")
@@ -172,3 +172,264 @@ def test_parse_no_text(parser):
 
     # Should still have page header
     assert "## Page 1" in result
+
+
+def make_mock_pdf(page_count):
+    pages = []
+    for i in range(page_count):
+        page = Mock()
+        page.extract_text.return_value = f"Page {i + 1} content"
+        page.extract_tables.return_value = []
+        pages.append(page)
+
+    mock_pdf = Mock()
+    mock_pdf.pages = pages
+    mock_pdf.__enter__ = Mock(return_value=mock_pdf)
+    mock_pdf.__exit__ = Mock(return_value=False)
+    return mock_pdf
+
+
+def test_parser_default_is_serial():
+    """Test default parser settings"""
+    parser = PDFTableParser()
+
+    assert parser.workers == 1
+    assert parser.pages_per_shard == 16
+
+
+def test_parse_small_document_stays_serial():
+    """Test documents within one shard are not sent to the process pool"""
+    parser = PDFTableParser(workers=4, pages_per_shard=4)
+
+    with patch('pdfplumber.open', return_value=make_mock_pdf(3)), \
+         patch.object(parser, '_parse_parallel') as mock_parallel:
+        result = parser.parse("test.pdf")
+
+    mock_parallel.assert_not_called()
+    assert "## Page 3" in result
+
+
+def test_parse_parallel_shards_in_page_order():
+    """Test page ranges are sharded and reassembled in order"""
+    parser = PDFTableParser(workers=2, pages_per_shard=2)
+
+    def fake_range(pdf_path, start, end, extraction_mode):
+        return [f"## Page {n + 1}" for n in range(start, end)]
+
+    class InlineExecutor:
+        """Runs submitted work synchronously in the test process"""
+        def __init__(self, max_workers):
+            self.max_workers = max_workers
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            return False
+
+        def submit(self, fn, *args):
+            future = Mock()
+            future.result.return_value = fn(*args)
+            return future
+
+    with patch('pdfplumber.open', return_value=make_mock_pdf(5)), \
+         patch('src.rag.parser.ProcessPoolExecutor', InlineExecutor), \
+         patch('src.rag.parser._parse_page_range', side_effect=fake_range) as mock_range:
+        result = parser.parse("test.pdf")
+
+    assert [c.args for c in mock_range.call_args_list] == [
+        ("test.pdf", 0, 2, "legacy"), ("test.pdf", 2, 4, "legacy"), ("test.pdf", 4, 5, "legacy")
+    ]
+    assert result == "\n".join(f"## Page {n}" for n in range(1, 6))
+
+
+def test_parse_page_range_renders_requested_pages():
+    """Test the worker entry point renders only its page range"""
+    from src.rag.parser import _parse_page_range
+
+    with patch('pdfplumber.open', return_value=make_mock_pdf(4)):
+        result = _parse_page_range("test.pdf", 1, 3)
+
+    assert result == ["## Page 2", "Page 2 content", "## Page 3", "Page 3 content"]
+
+
+def test_parse_parallel_matches_serial_output():
+    """Test parallel parsing of a real PDF matches the serial path"""
+    import glob
+    import os
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    pdfs = glob.glob(os.path.join(root, "downloads/D100000999/2025/teaching_plans/*능인중 교수학습*1학년*.pdf"))
+    if not pdfs:
+        pytest.skip("Sample PDF not available")
+
+    serial = PDFTableParser().parse(pdfs[0])
+    parallel = PDFTableParser(workers=2, pages_per_shard=1).parse(pdfs[0])
+
+    assert serial
+    assert parallel == serial
+
+
+def make_mock_table(bbox, rows):
+    table = Mock()
+    table.bbox = bbox
+    table.extract.return_value = rows
+    return table
+
+
+def test_parser_invalid_extraction_mode():
+    """Test unknown extraction modes are rejected"""
+    with pytest.raises(ValueError, match="Unknown extraction mode"):
+        PDFTableParser(extraction_mode="fast")
+
+
+def test_single_pass_places_tables_inline():
+    """Test single-pass mode interleaves text and tables by position"""
+    parser = PDFTableParser(extraction_mode=PDFTableParser.MODE_SINGLE_PASS)
+
+    mock_page = Mock()
+    mock_page.find_tables.return_value = [
+        make_mock_table((0, 100, 500, 200), [["평가 종류", "반영 비율"], ["수행평가", "40%"]])
+    ]
+    filtered_page = Mock()
+    filtered_page.extract_text_lines.return_value = [
+        {"top": 10, "text": "1. 교과 운영 목표"},
+        {"top": 20, "text": "목표 설명"},
+        {"top": 250, "text": "2. 기타"}
+    ]
+    mock_page.filter.return_value = filtered_page
+
+    result = parser._render_page(mock_page, 0)
+
+    assert result == [
+        "## Page 1",
+        "1. 교과 운영 목표\n목표 설명",
+        "| 평가 종류 | 반영 비율 |\n| --- | --- |\n| 수행평가 | 40% |",
+        "",
+        "2. 기타"
+    ]
+    mock_page.find_tables.assert_called_once()
+    mock_page.extract_text.assert_not_called()
+    mock_page.extract_tables.assert_not_called()
+
+
+def test_single_pass_excludes_table_text():
+    """Test the filter drops characters inside table regions"""
+    parser = PDFTableParser(extraction_mode=PDFTableParser.MODE_SINGLE_PASS)
+
+    mock_page = Mock()
+    mock_page.find_tables.return_value = [make_mock_table((0, 100, 500, 200), [["A"], ["1"]])]
+    mock_page.filter.return_value.extract_text_lines.return_value = []
+
+    parser._render_page(mock_page, 0)
+
+    outside_tables = mock_page.filter.call_args[0][0]
+    inside_char = {"text": "A", "x0": 10, "x1": 20, "top": 110, "bottom": 120}
+    outside_char = {"text": "B", "x0": 10, "x1": 20, "top": 210, "bottom": 220}
+    assert outside_tables(inside_char) is False
+    assert outside_tables(outside_char) is True
+    assert outside_tables({"object_type": "rect"}) is True
+
+
+def test_single_pass_page_without_tables():
+    """Test single-pass mode on a page with text only"""
+    parser = PDFTableParser(extraction_mode=PDFTableParser.MODE_SINGLE_PASS)
+
+    mock_page = Mock()
+    mock_page.find_tables.return_value = []
+    mock_page.extract_text_lines.return_value = [{"top": 10, "text": "Only text"}]
+
+    result = parser._render_page(mock_page, 2)
+
+    assert result == ["## Page 3", "Only text"]
+    mock_page.filter.assert_not_called()
+
+
+def test_single_pass_skips_empty_table():
+    """Test empty tables do not produce markdown"""
+    parser = PDFTableParser(extraction_mode=PDFTableParser.MODE_SINGLE_PASS)
+
+    mock_page = Mock()
+    mock_page.find_tables.return_value = [make_mock_table((0, 0, 10, 10), [])]
+    mock_page.filter.return_value.extract_text_lines.return_value = []
+
+    assert parser._render_page(mock_page, 0) == ["## Page 1"]
+
+
+def test_parse_page_range_uses_extraction_mode():
+    """Test the worker entry point honours the extraction mode"""
+    from src.rag.parser import _parse_page_range
+
+    mock_pdf = make_mock_pdf(1)
+    mock_pdf.pages[0].find_tables.return_value = []
+    mock_pdf.pages[0].extract_text_lines.return_value = [{"top": 0, "text": "Line"}]
+
+    with patch('pdfplumber.open', return_value=mock_pdf):
+        result = _parse_page_range("test.pdf", 0, 1, "single_pass")
+
+    assert result == ["## Page 1", "Line"]
+
+
+def test_parse_uses_cache(tmp_path):
+    """Test an unchanged PDF is served from the parse cache"""
+    from src.rag.parse_cache import ParseCache
+
+    pdf_path = tmp_path / "plan.pdf"
+    pdf_path.write_bytes(b"fake pdf")
+    cache = ParseCache(cache_dir=str(tmp_path / "cache"))
+    parser = PDFTableParser(cache=cache)
+
+    with patch('pdfplumber.open', return_value=make_mock_pdf(1)) as mock_open:
+        first = parser.parse(str(pdf_path))
+        second = parser.parse(str(pdf_path))
+
+    assert first == second
+    assert mock_open.call_count == 1
+    assert cache.stats()["hits"]["markdown"] == 1
+    assert cache.stats()["misses"]["markdown"] == 1
+
+
+def test_parse_cache_keyed_by_parser_version(tmp_path):
+    """Test different extraction modes do not share cache entries"""
+    from src.rag.parse_cache import ParseCache
+
+    pdf_path = tmp_path / "plan.pdf"
+    pdf_path.write_bytes(b"fake pdf")
+    cache = ParseCache(cache_dir=str(tmp_path / "cache"))
+
+    legacy = PDFTableParser(cache=cache)
+    single = PDFTableParser(cache=cache, extraction_mode="single_pass")
+    assert legacy.version != single.version
+
+    with patch('pdfplumber.open', return_value=make_mock_pdf(1)):
+        legacy.parse(str(pdf_path))
+
+    assert cache.get("markdown", ParseCache.make_key(cache.file_hash(str(pdf_path)), single.version)) is None
+
+
+def test_parse_failure_not_cached(tmp_path):
+    """Test failed parses are not stored"""
+    from src.rag.parse_cache import ParseCache
+
+    pdf_path = tmp_path / "bad.pdf"
+    pdf_path.write_bytes(b"broken")
+    cache = ParseCache(cache_dir=str(tmp_path / "cache"))
+    parser = PDFTableParser(cache=cache)
+
+    with patch('pdfplumber.open', side_effect=Exception("PDF error")):
+        assert parser.parse(str(pdf_path)) == ""
+
+    assert cache.stats()["entries"] == 0
+
+
+def test_parse_cache_skipped_for_missing_file(tmp_path):
+    """Test a file that cannot be hashed falls back to parsing"""
+    from src.rag.parse_cache import ParseCache
+
+    cache = ParseCache(cache_dir=str(tmp_path / "cache"))
+    parser = PDFTableParser(cache=cache)
+
+    with patch('pdfplumber.open', return_value=make_mock_pdf(1)):
+        result = parser.parse(str(tmp_path / "missing.pdf"))
+
+    assert "## Page 1" in result
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,120 @@
+"""Tests for src/rate_limit.py"""
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from src.rate_limit import HostLimit, HostRateLimiter, TokenBucket
+
+
+def test_bucket_burst_then_wait():
+    """Test the bucket serves a burst, then reports the time to the next token"""
+    with patch("src.rate_limit.time.monotonic", return_value=100.0):
+        bucket = TokenBucket(rate=2.0, burst=3)
+        assert [bucket.try_acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert bucket.try_acquire() == pytest.approx(0.5)
+
+    with patch("src.rate_limit.time.monotonic", return_value=100.5):
+        assert bucket.try_acquire() == 0.0
+
+
+def test_bucket_rejects_invalid_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0, burst=1)
+
+
+@pytest.mark.asyncio
+async def test_bucket_acquire_paces_requests():
+    """Test acquire sleeps until a token has refilled"""
+    bucket = TokenBucket(rate=50.0, burst=1)
+    loop = asyncio.get_running_loop()
+
+    start = loop.time()
+    for _ in range(4):
+        await bucket.acquire()
+
+    assert loop.time() - start >= 0.05
+
+
+def test_host_limit_aimd():
+    """Test successes raise the rate additively and throttles halve it"""
+    limit = HostLimit(rate=4.0, burst=1, max_concurrent=2, min_rate=1.0, max_rate=4.5, cooldown=0)
+
+    assert limit.record(200) is False
+    assert limit.rate == pytest.approx(4.1)
+    for _ in range(10):
+        limit.record(200)
+    assert limit.rate == pytest.approx(4.5)
+
+    assert limit.record(429) is True
+    assert limit.rate == pytest.approx(2.25)
+    limit.record(503)
+    limit.record(503)
+    assert limit.rate == pytest.approx(1.0)
+    assert limit.throttled == 3
+
+    # Other errors leave the rate alone
+    limit.record(404)
+    limit.record(500)
+    assert limit.rate == pytest.approx(1.0)
+
+
+def test_host_limit_cooldown():
+    """Test throttles within the cooldown count as one decrease"""
+    limit = HostLimit(rate=8.0, burst=1, max_concurrent=2, min_rate=0.1, max_rate=8.0, cooldown=60)
+
+    for _ in range(5):
+        limit.record(429)
+
+    assert limit.rate == pytest.approx(4.0)
+    assert limit.throttled == 5
+
+
+def test_limiter_keys_by_host():
+    """Test hosts get separate limits and ports/case are part of the key"""
+    limiter = HostRateLimiter()
+
+    assert limiter.host("https://a.example.com/x") is limiter.host("https://A.example.com/y")
+    assert limiter.host("https://a.example.com/x") is not limiter.host("https://b.example.com/x")
+    assert limiter.host_of("http://a.example.com:8080/x") == "a.example.com:8080"
+
+
+def test_limiter_record_adapts_host():
+    limiter = HostRateLimiter(rate=4.0, min_rate=0.5, max_rate=10.0)
+
+    limiter.record("https://a.example.com/x", 429)
+
+    assert limiter.stats()["a.example.com"]["rate"] == 2.0
+    assert limiter.host("https://b.example.com/").rate == 4.0
+
+
+def test_limiter_configure_validates_and_resets():
+    limiter = HostRateLimiter()
+    limiter.record("https://a.example.com/", 429)
+
+    limiter.configure(rate=2.0, min_rate=1.0, max_rate=3.0)
+
+    assert limiter.stats() == {}
+    assert limiter.host("https://a.example.com/").rate == 2.0
+    with pytest.raises(ValueError):
+        limiter.configure(rate=5.0, max_rate=3.0)
+    with pytest.raises(ValueError):
+        limiter.configure(max_concurrent=0)
+
+
+@pytest.mark.asyncio
+async def test_limit_caps_concurrency():
+    """Test no more than max_concurrent requests to one host run at once"""
+    limiter = HostRateLimiter(rate=1000, burst=1000, max_rate=1000, max_concurrent=2)
+    peak = 0
+
+    async def request():
+        nonlocal peak
+        async with limiter.limit("https://a.example.com/") as host:
+            peak = max(peak, host.in_flight)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(request() for _ in range(6)))
+
+    assert peak == 2
+    assert limiter.stats()["a.example.com"]["in_flight"] == 0
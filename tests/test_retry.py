@@ -0,0 +1,125 @@
+"""Tests for src/retry.py"""
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from src.retry import RetryBudget, RetryPolicy
+
+
+def _response(status_code, headers=None):
+    request = httpx.Request("GET", "https://example.com")
+    return httpx.Response(status_code, headers=headers, request=request)
+
+
+def _status_error(status_code):
+    response = _response(status_code)
+    return httpx.HTTPStatusError("error", request=response.request, response=response)
+
+
+def test_backoff_is_exponential_and_capped():
+    """Test backoff without jitter doubles up to max_delay"""
+    policy = RetryPolicy(base_delay=1.0, max_delay=5.0, jitter=False)
+
+    assert [policy.backoff(n) for n in range(5)] == [1.0, 2.0, 4.0, 5.0, 5.0]
+
+
+def test_backoff_full_jitter():
+    """Test jittered backoff stays within [0, ceiling]"""
+    policy = RetryPolicy(base_delay=1.0, max_delay=30.0)
+
+    for retry in range(6):
+        ceiling = min(30.0, 2.0 ** retry)
+        assert all(0 <= policy.backoff(retry) <= ceiling for _ in range(50))
+
+
+def test_delay_stops_after_max_retries():
+    """Test no delay is given once retries are used up"""
+    policy = RetryPolicy(max_retries=2, jitter=False)
+
+    assert policy.delay(0) is not None
+    assert policy.delay(1) is not None
+    assert policy.delay(2) is None
+
+
+@pytest.mark.parametrize("status,retryable", [
+    (429, True), (500, True), (502, True), (503, True), (504, True), (408, True),
+    (400, False), (401, False), (403, False), (404, False), (501, False)
+])
+def test_retryable_statuses(status, retryable):
+    """Test status classification"""
+    policy = RetryPolicy()
+
+    assert policy.is_retryable(_status_error(status)) is retryable
+
+
+def test_retryable_exceptions():
+    """Test transient network errors are retryable, others are not"""
+    policy = RetryPolicy()
+
+    assert policy.is_retryable(httpx.ReadTimeout("timeout"))
+    assert policy.is_retryable(httpx.ConnectError("refused"))
+    assert policy.is_retryable(httpx.ReadError("reset"))
+    assert policy.is_retryable(httpx.RemoteProtocolError("closed"))
+    assert not policy.is_retryable(httpx.TooManyRedirects("loop"))
+    assert not policy.is_retryable(ValueError("bug"))
+
+
+def test_reason_labels():
+    """Test retry reasons used for the retry counter"""
+    assert RetryPolicy.reason(httpx.ConnectTimeout("t")) == "timeout"
+    assert RetryPolicy.reason(httpx.ConnectError("c")) == "connection"
+    assert RetryPolicy.reason(_status_error(503)) == "http_503"
+
+
+def test_retry_after_seconds_and_date():
+    """Test Retry-After in delta-seconds and HTTP-date forms"""
+    assert RetryPolicy.retry_after(_response(503, {"Retry-After": "12"})) == 12.0
+    assert RetryPolicy.retry_after(_response(503)) is None
+    assert RetryPolicy.retry_after(_response(503, {"Retry-After": "soon"})) is None
+    assert RetryPolicy.retry_after(None) is None
+
+    later = datetime.now(timezone.utc) + timedelta(seconds=60)
+    seconds = RetryPolicy.retry_after(_response(503, {"Retry-After": format_datetime(later, usegmt=True)}))
+    assert 55 <= seconds <= 60
+
+    earlier = datetime.now(timezone.utc) - timedelta(seconds=60)
+    assert RetryPolicy.retry_after(_response(503, {"Retry-After": format_datetime(earlier, usegmt=True)})) == 0.0
+
+
+def test_delay_honours_retry_after():
+    """Test Retry-After raises the wait, and an excessive one cancels the retry"""
+    policy = RetryPolicy(base_delay=1.0, jitter=False, max_retry_after=60)
+
+    assert policy.delay(0, _response(429, {"Retry-After": "10"})) == 10.0
+    assert policy.delay(3, _response(429, {"Retry-After": "1"})) is None
+    assert policy.delay(0, _response(503, {"Retry-After": "3600"})) is None
+
+
+def test_budget_allows_minimum_then_ratio():
+    """Test the budget allows min_retries plus a share of requests"""
+    budget = RetryBudget(ratio=0.5, min_retries=2, window=10.0)
+
+    assert budget.try_acquire()
+    assert budget.try_acquire()
+    assert not budget.try_acquire()
+
+    for _ in range(4):
+        budget.record_request()
+    assert budget.try_acquire()
+    assert budget.try_acquire()
+    assert not budget.try_acquire()
+
+
+def test_budget_window_expires():
+    """Test old requests and retries fall out of the window"""
+    budget = RetryBudget(ratio=0, min_retries=1, window=10.0)
+
+    with patch("src.retry.time.monotonic", return_value=100.0):
+        assert budget.try_acquire()
+        assert not budget.try_acquire()
+
+    with patch("src.retry.time.monotonic", return_value=111.0):
+        assert budget.try_acquire()
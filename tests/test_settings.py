@@ -0,0 +1,58 @@
+"""Tests for src/rag/settings.py"""
+import pytest
+from src.rag import settings
+
+
+@pytest.fixture(autouse=True)
+def clean_env(monkeypatch):
+    for name in (
+        "OLLAMA_BASE_URL", "OLLAMA_MODEL", "OLLAMA_EMBEDDING_MODEL", "PARSER_WORKERS",
+        "EMBEDDING_BATCH_SIZE", "EMBEDDING_MAX_IN_FLIGHT",
+        "ANSWER_CACHE_TTL_SECONDS", "VECTOR_SHARD_BY"
+    ):
+        monkeypatch.delenv(name, raising=False)
+
+
+def test_pipeline_kwargs_defaults():
+    """Test defaults match the API server configuration"""
+    kwargs = settings.pipeline_kwargs_from_env()
+
+    assert kwargs["collection_name"] == "school_info_v2"
+    assert kwargs["persist_dir"] == "./chroma_hierarchical"
+    assert kwargs["ollama_base_url"] == "http://localhost:11434"
+    assert kwargs["embedding_batch_size"] == 32
+    assert kwargs["embedding_model"] is None
+    assert kwargs["parser_workers"] == 1
+    assert kwargs["shard_by"] is None
+
+
+def test_pipeline_kwargs_read_ollama_and_embedding_env(monkeypatch):
+    """Test Ollama, embedding batch and parser settings come from the environment"""
+    monkeypatch.setenv("OLLAMA_BASE_URL", "http://ollama:11434")
+    monkeypatch.setenv("OLLAMA_MODEL", "qwen2:7b")
+    monkeypatch.setenv("OLLAMA_EMBEDDING_MODEL", "nomic-embed-text")
+    monkeypatch.setenv("EMBEDDING_BATCH_SIZE", "64")
+    monkeypatch.setenv("EMBEDDING_MAX_IN_FLIGHT", "2")
+    monkeypatch.setenv("ANSWER_CACHE_TTL_SECONDS", "0")
+    monkeypatch.setenv("PARSER_WORKERS", "4")
+
+    kwargs = settings.pipeline_kwargs_from_env()
+
+    assert kwargs["ollama_base_url"] == "http://ollama:11434"
+    assert kwargs["ollama_model"] == "qwen2:7b"
+    assert kwargs["embedding_model"] == "nomic-embed-text"
+    assert kwargs["embedding_batch_size"] == 64
+    assert kwargs["embedding_max_in_flight"] == 2
+    assert kwargs["answer_cache_ttl"] is None
+    assert kwargs["parser_workers"] == 4
+
+
+def test_caches_from_env(tmp_path, monkeypatch):
+    """Test cache locations and limits come from the environment"""
+    monkeypatch.setenv("PARSE_CACHE_DIR", str(tmp_path / "parse"))
+    monkeypatch.setenv("PARSE_CACHE_MAX_MB", "1")
+    monkeypatch.setenv("EMBEDDING_CACHE_DB", str(tmp_path / "emb.db"))
+    monkeypatch.setenv("EMBEDDING_CACHE_MAX_ENTRIES", "10")
+
+    assert settings.parse_cache_from_env().stats()["max_bytes"] == 1024 * 1024
+    assert settings.embedding_cache_from_env().max_entries == 10
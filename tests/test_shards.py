@@ -0,0 +1,310 @@
+"""Tests for src/rag/shards.py"""
+import pytest
+from unittest.mock import Mock
+from src.rag.shards import ShardedVectorStore, where_equalities
+
+
+def make_doc(doc_id, school_code="A", year="2025"):
+    return {"document_metadata": {"document_id": doc_id, "school_code": school_code, "year": year}}
+
+
+class FakeShardStore:
+    """Stand-in for HierarchicalChromaStore with per-shard results"""
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.added = []
+        self.results = {"matched_children": [], "parent_contexts": []}
+        self.child_collection = Mock()
+        self.parent_collection = Mock()
+        self.query_calls = []
+
+    def add_hierarchical_document(self, enhanced_json):
+        self.added.append(enhanced_json["document_metadata"]["document_id"])
+        return 3
+
+    def query_with_parent_context(self, question, k, use_hybrid=True, where=None):
+        self.query_calls.append({"k": k, "where": where})
+        return self.results
+
+
+@pytest.fixture
+def stores():
+    return {}
+
+
+@pytest.fixture
+def make_sharded(tmp_path, stores):
+    def factory(prefix):
+        stores[prefix] = FakeShardStore(prefix)
+        return stores[prefix]
+
+    def make(strategy="school"):
+        return ShardedVectorStore(factory, "school_info_v2", str(tmp_path), strategy=strategy)
+
+    return make
+
+
+def test_where_equalities():
+    """Test equality conditions are extracted from where clauses"""
+    assert where_equalities(None) == {}
+    assert where_equalities({"year": "2025"}) == {"year": "2025"}
+    assert where_equalities({"$and": [{"school_code": "A"}, {"section_id": {"$in": ["s"]}}]}) == {
+        "school_code": "A"
+    }
+
+
+def test_routes_documents_by_school(make_sharded, stores):
+    """Test each school gets its own collection prefix"""
+    sharded = make_sharded()
+
+    assert sharded.add_hierarchical_document(make_doc("doc_1", "A")) == 3
+    sharded.add_hierarchical_document(make_doc("doc_2", "B"))
+    sharded.add_hierarchical_document(make_doc("doc_3", "A", "2024"))
+
+    assert stores["school_info_v2_A"].added == ["doc_1", "doc_3"]
+    assert stores["school_info_v2_B"].added == ["doc_2"]
+    assert sharded.shard_of_document("doc_2") == "B"
+
+
+def test_routes_by_school_and_year(make_sharded, stores):
+    """Test school_year strategy separates years"""
+    sharded = make_sharded("school_year")
+
+    sharded.add_hierarchical_document(make_doc("doc_1", "A", "2025"))
+    sharded.add_hierarchical_document(make_doc("doc_2", "A", "2024"))
+
+    assert set(stores) == {"school_info_v2_A_2025", "school_info_v2_A_2024"}
+
+
+def test_unknown_strategy(tmp_path):
+    """Test invalid strategy raises"""
+    with pytest.raises(ValueError):
+        ShardedVectorStore(Mock(), "p", str(tmp_path), strategy="region")
+
+
+def test_query_fans_out_only_to_matching_shards(make_sharded, stores):
+    """Test school/year filters select shards"""
+    sharded = make_sharded("school_year")
+    for doc_id, school, year in [("d1", "A", "2025"), ("d2", "A", "2024"), ("d3", "B", "2025")]:
+        sharded.add_hierarchical_document(make_doc(doc_id, school, year))
+
+    where = {"$and": [{"school_code": "A"}, {"year": "2025"}]}
+    sharded.query_with_parent_context("q", k=3, where=where)
+
+    assert stores["school_info_v2_A_2025"].query_calls == [{"k": 3, "where": where}]
+    assert stores["school_info_v2_A_2024"].query_calls == []
+    assert stores["school_info_v2_B_2025"].query_calls == []
+
+    sharded.query_with_parent_context("q", k=3, where={"year": "2025"})
+    assert len(stores["school_info_v2_B_2025"].query_calls) == 1
+    assert len(stores["school_info_v2_A_2024"].query_calls) == 0
+
+
+def test_query_no_matching_shard(make_sharded):
+    """Test empty result when no shard matches"""
+    sharded = make_sharded()
+    sharded.add_hierarchical_document(make_doc("doc_1", "A"))
+
+    result = sharded.query_with_parent_context("q", k=3, where={"school_code": "Z"})
+
+    assert result == {"matched_children": [], "parent_contexts": []}
+
+
+def test_merge_compares_distances_across_shards(make_sharded, stores):
+    """Test Chroma distances are merged globally, lowest (closest) first"""
+    sharded = make_sharded()
+    sharded.add_hierarchical_document(make_doc("d1", "A"))
+    sharded.add_hierarchical_document(make_doc("d2", "B"))
+    # Shard A's best hit is further away than all of shard B's
+    stores["school_info_v2_A"].results = {"matched_children": [], "parent_contexts": [
+        {"text": "a1", "distance": 0.8}, {"text": "a2", "distance": 1.4}
+    ]}
+    stores["school_info_v2_B"].results = {"matched_children": [], "parent_contexts": [
+        {"text": "b1", "distance": 0.2}, {"text": "b2", "distance": 0.3}, {"text": "b3", "distance": 0.9}
+    ]}
+
+    result = sharded.query_with_parent_context("q", k=3)
+
+    assert [p["text"] for p in result["parent_contexts"]] == ["b1", "b2", "a1"]
+
+
+def test_merge_fuses_ranks_when_distances_are_missing():
+    """Test per-shard scores on different scales are fused by rank, not compared"""
+    merged = ShardedVectorStore._merge([
+        [{"text": "a1", "score": 40.0}, {"text": "a2", "score": 10.0}],
+        [{"text": "b1", "score": 0.9}, {"text": "b2", "score": 0.7}, {"text": "b3", "score": 0.5}]
+    ], k=4)
+
+    # Equal ranks interleave in shard order; no shard wins on its score scale
+    assert [m["text"] for m in merged] == ["a1", "b1", "a2", "b2"]
+
+
+def test_merge_uses_rank_without_scores():
+    """Test rank-based scores when results carry no score; a chunk found twice ranks higher"""
+    merged = ShardedVectorStore._merge([
+        [{"text": "a1"}, {"text": "a2"}],
+        [{"text": "b1"}, {"text": "a1"}]
+    ], k=10)
+
+    assert [m["text"] for m in merged] == ["a1", "b1", "a2"]
+
+
+def test_merge_deduplicates_by_id():
+    merged = ShardedVectorStore._merge([
+        [{"id": "c1", "text": "x", "distance": 0.1}],
+        [{"id": "c1", "text": "x", "distance": 0.1}, {"id": "c2", "text": "y", "distance": 0.5}]
+    ], k=5)
+
+    assert [m["id"] for m in merged] == ["c1", "c2"]
+
+
+def test_registry_persists(make_sharded):
+    """Test shard membership survives restart"""
+    make_sharded().add_hierarchical_document(make_doc("doc_1", "A"))
+
+    reloaded = make_sharded()
+
+    assert reloaded.shard_of_document("doc_1") == "A"
+    assert [s["shard"] for s in reloaded.list_shards()] == ["A"]
+
+
+def test_search_fails_when_shard_store_ignores_where(tmp_path):
+    """Test a shard store without a where parameter fails instead of searching unfiltered"""
+    from src.exceptions import RAGException
+
+    class NoWhereStore(FakeShardStore):
+        def query_with_parent_context(self, question, k, use_hybrid=True):
+            return self.results
+
+    sharded = ShardedVectorStore(NoWhereStore, "school_info_v2", str(tmp_path), strategy="school")
+    sharded.add_hierarchical_document(make_doc("doc_1", "A"))
+
+    with pytest.raises(RAGException, match="where"):
+        sharded.query_with_parent_context("q", k=3, where={"school_code": "A"})
+
+
+def test_collections_for(make_sharded, stores):
+    """Test chunk collections are looked up in the document's shard only"""
+    sharded = make_sharded()
+    sharded.add_hierarchical_document(make_doc("doc_1", "A"))
+
+    collections = sharded.collections_for("doc_1", ("child_collection", "parent_collection"))
+
+    assert collections == [stores["school_info_v2_A"].child_collection, stores["school_info_v2_A"].parent_collection]
+    assert sharded.collections_for("doc_unknown", ("child_collection",)) == []
+    assert sharded.collections_for("doc_1", ("missing_collection",)) == [None]
+
+
+def test_list_shards(make_sharded, stores):
+    """Test shard listing includes document and chunk counts"""
+    sharded = make_sharded()
+    sharded.add_hierarchical_document(make_doc("doc_1", "A"))
+    stores["school_info_v2_A"].child_collection.count.return_value = 12
+    stores["school_info_v2_A"].parent_collection.count.return_value = 4
+
+    assert sharded.list_shards() == [{
+        "shard": "A",
+        "collection_prefix": "school_info_v2_A",
+        "school_code": "A",
+        "year": None,
+        "document_count": 1,
+        "chunk_counts": {"child_collection": 12, "parent_collection": 4}
+    }]
+
+
+def test_compact_shard_removes_orphans(make_sharded, stores):
+    """Test chunks of documents no longer live are deleted"""
+    sharded = make_sharded()
+    sharded.add_hierarchical_document(make_doc("doc_1", "A"))
+    sharded.add_hierarchical_document(make_doc("doc_2", "A"))
+    store = stores["school_info_v2_A"]
+    store.child_collection.get.return_value = {
+        "ids": ["c1", "c2", "c3"],
+        "metadatas": [{"document_id": "doc_1"}, {"document_id": "doc_2"}, {"document_id": "doc_old"}]
+    }
+    store.parent_collection.get.return_value = {"ids": [], "metadatas": []}
+
+    result = sharded.compact_shard("A", live_documents={"doc_1"})
+
+    store.child_collection.delete.assert_called_once_with(ids=["c2", "c3"])
+    assert result == {"shard": "A", "chunks_removed": 2, "documents": 1, "dropped": False}
+    assert sharded.shard_of_document("doc_2") is None
+
+
+def test_compact_empty_shard_is_dropped(make_sharded, stores):
+    """Test a shard with no live documents is removed from the registry"""
+    sharded = make_sharded()
+    sharded.add_hierarchical_document(make_doc("doc_1", "A"))
+    for collection in (stores["school_info_v2_A"].child_collection, stores["school_info_v2_A"].parent_collection):
+        collection.get.return_value = {"ids": [], "metadatas": []}
+
+    assert sharded.compact_shard("A", live_documents=set())["dropped"] is True
+    assert sharded.list_shards() == []
+
+
+def test_drop_shard(make_sharded, stores):
+    """Test dropping deletes all chunks and returns its documents"""
+    sharded = make_sharded()
+    sharded.add_hierarchical_document(make_doc("doc_1", "A"))
+    store = stores["school_info_v2_A"]
+    store.child_collection.get.return_value = {"ids": ["c1"]}
+    store.parent_collection.get.return_value = {"ids": []}
+
+    assert sharded.drop_shard("A") == ["doc_1"]
+    store.child_collection.delete.assert_called_once_with(ids=["c1"])
+    assert sharded.shard_of_document("doc_1") is None
+
+    with pytest.raises(KeyError):
+        sharded.drop_shard("A")
+    with pytest.raises(KeyError):
+        sharded.compact_shard("A")
+
+
+def test_list_shards_tolerates_count_errors(make_sharded, stores):
+    sharded = make_sharded()
+    sharded.add_hierarchical_document(make_doc("doc_1", "A"))
+    stores["school_info_v2_A"].child_collection.count.side_effect = RuntimeError("collection gone")
+    stores["school_info_v2_A"].parent_collection = None
+
+    assert sharded.list_shards()[0]["chunk_counts"] == {}
+
+
+def test_compact_and_drop_skip_missing_collections(make_sharded, stores):
+    sharded = make_sharded()
+    sharded.add_hierarchical_document(make_doc("doc_1", "A"))
+    store = stores["school_info_v2_A"]
+    store.parent_collection = None
+    store.child_collection.get.return_value = {"ids": [], "metadatas": []}
+
+    assert sharded.compact_shard("A")["chunks_removed"] == 0
+    assert sharded.drop_shard("A") == ["doc_1"]
+
+
+def test_remove_document(make_sharded):
+    sharded = make_sharded()
+    sharded.add_hierarchical_document(make_doc("doc_1", "A"))
+    sharded.add_hierarchical_document(make_doc("doc_2", "A"))
+
+    sharded.remove_document("doc_1")
+    sharded.remove_document("doc_unknown")
+
+    assert sharded.shard_of_document("doc_1") is None
+    assert make_sharded().shard_of_document("doc_2") == "A"
+
+
+def test_corrupt_registry_starts_empty(tmp_path):
+    (tmp_path / ShardedVectorStore.REGISTRY_FILE).write_text("{not json", encoding="utf-8")
+
+    sharded = ShardedVectorStore(FakeShardStore, "school_info_v2", str(tmp_path))
+
+    assert sharded.list_shards() == []
+    sharded.shutdown()
+
+
+def test_shutdown_stops_fanout(make_sharded):
+    sharded = make_sharded()
+    sharded.shutdown()
+
+    with pytest.raises(RuntimeError):
+        sharded._executor.submit(lambda: None)
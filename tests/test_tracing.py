@@ -0,0 +1,196 @@
+"""Tests for src/tracing.py"""
+import asyncio
+import json
+import pytest
+from src.tracing import Tracer, current_span, annotate
+
+
+@pytest.fixture
+def tracer():
+    return Tracer(sample_rate=1.0, buffer_size=10)
+
+
+def test_span_tree(tracer):
+    """Test nested spans form a tree under the root"""
+    with tracer.trace("request", path="/rag/query") as root:
+        with tracer.span("parse"):
+            with tracer.span("page"):
+                pass
+        with tracer.span("generate"):
+            pass
+
+    record = tracer.get(root.trace_id)
+    assert record["name"] == "request"
+    assert record["span_count"] == 4
+    tree = record["root"]
+    assert tree["attributes"] == {"path": "/rag/query"}
+    assert [c["name"] for c in tree["children"]] == ["parse", "generate"]
+    assert tree["children"][0]["children"][0]["name"] == "page"
+    assert tree["children"][0]["parent_id"] == tree["span_id"]
+    assert tree["duration_ms"] >= 0
+
+
+def test_span_outside_trace_is_noop(tracer):
+    """Test spans without an active trace record nothing"""
+    with tracer.span("parse") as span:
+        assert span is None
+        assert current_span() is None
+
+    assert tracer.recent() == []
+
+
+def test_unsampled_trace_records_nothing():
+    """Test a root that loses the sampling draw disables nested spans and traces"""
+    tracer = Tracer(sample_rate=0.0)
+
+    with tracer.trace("request") as root:
+        assert root is None
+        with tracer.trace("nested") as nested:
+            assert nested is None
+        with tracer.span("parse") as span:
+            assert span is None
+
+    assert tracer.recent() == []
+
+
+def test_force_overrides_sampling():
+    """Test force=True records even with sample_rate 0"""
+    tracer = Tracer(sample_rate=0.0)
+
+    with tracer.trace("request", force=True) as root:
+        pass
+
+    assert tracer.get(root.trace_id) is not None
+
+
+def test_forced_traces_capped_per_second(monkeypatch):
+    """Test forced roots beyond max_forced_per_second fall back to sampling"""
+    import src.tracing as tracing
+    now = [100.0]
+    monkeypatch.setattr(tracing.time, "monotonic", lambda: now[0])
+    tracer = Tracer(sample_rate=0.0, max_forced_per_second=2)
+
+    roots = []
+    for _ in range(3):
+        with tracer.trace("request", force=True) as root:
+            roots.append(root)
+
+    assert [root is not None for root in roots] == [True, True, False]
+    assert tracer.forced_rejected == 1
+
+    now[0] = 101.0
+    with tracer.trace("request", force=True) as root:
+        assert root is not None
+
+
+def test_invalid_forced_rate():
+    """Test the forced trace cap must not be negative"""
+    with pytest.raises(ValueError):
+        Tracer(max_forced_per_second=-1)
+
+
+def test_invalid_sample_rate():
+    """Test sample_rate must be a probability"""
+    with pytest.raises(ValueError):
+        Tracer(sample_rate=1.5)
+
+
+def test_error_recorded_and_raised(tracer):
+    """Test exceptions are recorded on the span and propagate"""
+    with pytest.raises(RuntimeError):
+        with tracer.trace("request") as root:
+            with tracer.span("llm"):
+                raise RuntimeError("ollama down")
+
+    record = tracer.get(root.trace_id)
+    assert record["error"] == "RuntimeError: ollama down"
+    assert record["root"]["children"][0]["error"] == "RuntimeError: ollama down"
+
+
+def test_decorator_sync_and_async(tracer):
+    """Test span() decorates sync and async functions"""
+    @tracer.span("sync_step")
+    def sync_step():
+        annotate(rows=3)
+        return 1
+
+    @tracer.span("async_step")
+    async def async_step():
+        await asyncio.sleep(0)
+        return 2
+
+    async def handler():
+        with tracer.trace("request") as root:
+            assert sync_step() == 1
+            assert await async_step() == 2
+        return root
+
+    root = asyncio.run(handler())
+    children = tracer.get(root.trace_id)["root"]["children"]
+    assert [c["name"] for c in children] == ["sync_step", "async_step"]
+    assert children[0]["attributes"] == {"rows": 3}
+
+
+def test_context_follows_tasks_and_threads(tracer):
+    """Test spans opened in child tasks and copied-context threads join the trace"""
+    def blocking():
+        with tracer.span("thread_work"):
+            pass
+
+    async def handler():
+        with tracer.trace("request") as root:
+            async def task_work():
+                with tracer.span("task_work"):
+                    await asyncio.sleep(0)
+            await asyncio.gather(task_work(), task_work())
+            await asyncio.to_thread(blocking)
+        return root
+
+    root = asyncio.run(handler())
+    names = sorted(c["name"] for c in tracer.get(root.trace_id)["root"]["children"])
+    assert names == ["task_work", "task_work", "thread_work"]
+
+
+def test_max_spans(tracer):
+    """Test spans beyond max_spans are dropped and counted"""
+    tracer.configure(sample_rate=1.0, max_spans=3)
+
+    with tracer.trace("request") as root:
+        for _ in range(5):
+            with tracer.span("step"):
+                pass
+
+    record = tracer.get(root.trace_id)
+    assert record["span_count"] == 3
+    assert record["dropped_spans"] == 3
+    assert len(record["root"]["children"]) == 2
+
+
+def test_buffer_and_recent(tracer):
+    """Test the buffer keeps the newest traces and recent() omits span trees"""
+    tracer.configure(sample_rate=1.0, buffer_size=2)
+    ids = []
+    for i in range(3):
+        with tracer.trace(f"request{i}") as root:
+            ids.append(root.trace_id)
+
+    recent = tracer.recent()
+    assert [r["trace_id"] for r in recent] == [ids[2], ids[1]]
+    assert "root" not in recent[0]
+    assert tracer.get(ids[0]) is None
+    assert tracer.recent(limit=0) == []
+
+
+def test_export_file(tmp_path):
+    """Test finished traces are appended as JSON Lines"""
+    path = tmp_path / "traces" / "traces.jsonl"
+    tracer = Tracer(sample_rate=1.0, export_path=str(path))
+
+    for _ in range(2):
+        with tracer.trace("request"):
+            with tracer.span("parse"):
+                pass
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 2
+    assert json.loads(lines[0])["root"]["children"][0]["name"] == "parse"
@@ -0,0 +1,191 @@
+"""Tests for src/worker_pool.py"""
+import asyncio
+import contextvars
+import threading
+import time
+import pytest
+from src.worker_pool import WorkerPool
+from src.exceptions import WorkerPoolFullError
+
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool("test", max_workers=1, max_queue=1)
+    yield pool
+    pool.shutdown()
+
+
+def test_pool_initialization(pool):
+    """Test pool initialization"""
+    assert pool.name == "test"
+    assert pool.max_workers == 1
+    assert pool.max_queue == 1
+
+
+def test_pool_invalid_parameters():
+    """Test pool rejects invalid sizes"""
+    with pytest.raises(ValueError):
+        WorkerPool("bad", max_workers=0)
+
+    with pytest.raises(ValueError):
+        WorkerPool("bad", max_queue=-1)
+
+
+@pytest.mark.asyncio
+async def test_run_returns_result(pool):
+    """Test run passes args and returns the function result"""
+    result = await pool.run(lambda a, b=0: a + b, 1, b=2)
+
+    assert result == 3
+
+
+@pytest.mark.asyncio
+async def test_run_uses_worker_thread(pool):
+    """Test work is executed off the event loop thread"""
+    loop_thread = threading.get_ident()
+
+    worker_thread = await pool.run(threading.get_ident)
+
+    assert worker_thread != loop_thread
+
+
+@pytest.mark.asyncio
+async def test_run_copies_context(pool):
+    """Test the job sees the caller's context variables (e.g. the trace span)"""
+    var = contextvars.ContextVar("var", default=None)
+    var.set("request-1")
+
+    assert await pool.run(var.get) == "request-1"
+
+
+@pytest.mark.asyncio
+async def test_run_propagates_exception(pool):
+    """Test exceptions from the job are raised to the caller"""
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        await pool.run(fail)
+
+    assert pool.stats()["running"] == 0
+
+
+@pytest.mark.asyncio
+async def test_run_rejects_when_full(pool):
+    """Test the pool rejects work beyond workers + queue"""
+    release = threading.Event()
+
+    running = asyncio.ensure_future(pool.run(release.wait))
+    queued = asyncio.ensure_future(pool.run(release.wait))
+    await asyncio.sleep(0.05)
+
+    stats = pool.stats()
+    assert stats["running"] == 1
+    assert stats["queued"] == 1
+
+    with pytest.raises(WorkerPoolFullError):
+        await pool.run(release.wait)
+
+    release.set()
+    await asyncio.gather(running, queued)
+
+    assert pool.stats()["running"] == 0
+    assert await pool.run(lambda: "ok") == "ok"
+
+
+@pytest.mark.asyncio
+async def test_event_loop_not_blocked(pool):
+    """Test the event loop keeps serving while a job runs"""
+    release = threading.Event()
+    job = asyncio.ensure_future(pool.run(release.wait))
+
+    # The loop must still be able to run other coroutines
+    await asyncio.sleep(0.01)
+    assert not job.done()
+
+    release.set()
+    assert await job is True
+
+
+@pytest.mark.asyncio
+async def test_run_after_shutdown_releases_slot():
+    """Test a failed submit does not leak a slot"""
+    pool = WorkerPool("closed", max_workers=1, max_queue=0)
+    pool.shutdown()
+
+    with pytest.raises(RuntimeError):
+        await pool.run(lambda: None)
+
+    assert pool.stats()["running"] == 0
+
+
+@pytest.mark.asyncio
+async def test_iterate_yields_items_from_worker(pool):
+    """Test iterate runs the generator off the event loop and yields its items"""
+    loop_thread = threading.get_ident()
+    var = contextvars.ContextVar("var", default=None)
+    var.set("request-1")
+
+    def produce(n):
+        for i in range(n):
+            yield (i, threading.get_ident(), var.get())
+
+    items = [item async for item in pool.iterate(produce, 3)]
+
+    assert [i for i, _, _ in items] == [0, 1, 2]
+    assert all(thread != loop_thread for _, thread, _ in items)
+    assert all(value == "request-1" for _, _, value in items)
+
+
+@pytest.mark.asyncio
+async def test_iterate_propagates_exception(pool):
+    """Test a generator error is raised after the items produced before it"""
+    def produce():
+        yield 1
+        raise RuntimeError("boom")
+
+    received = []
+    with pytest.raises(RuntimeError, match="boom"):
+        async for item in pool.iterate(produce):
+            received.append(item)
+
+    assert received == [1]
+
+
+@pytest.mark.asyncio
+async def test_iterate_rejects_when_full_before_iteration(pool):
+    """Test admission is checked when iterate is called"""
+    release = threading.Event()
+    running = asyncio.ensure_future(pool.run(release.wait))
+    queued = asyncio.ensure_future(pool.run(release.wait))
+    await asyncio.sleep(0.05)
+
+    with pytest.raises(WorkerPoolFullError):
+        pool.iterate(lambda: iter([1]))
+
+    release.set()
+    await asyncio.gather(running, queued)
+
+
+@pytest.mark.asyncio
+async def test_iterate_closed_early_stops_worker(pool):
+    """Test closing the iterator stops the generator and frees the worker"""
+    produced = []
+    closed = threading.Event()
+
+    def produce():
+        try:
+            for i in range(1000):
+                produced.append(i)
+                yield i
+                time.sleep(0.001)
+        finally:
+            closed.set()
+
+    events = pool.iterate(produce)
+    assert await events.__anext__() == 0
+    await events.aclose()
+
+    assert await asyncio.to_thread(closed.wait, 2)
+    assert len(produced) < 1000
+    assert await pool.run(lambda: "ok") == "ok"